@@ -187,6 +187,17 @@ export const movieApi = {
     return response.data;
   },
 
+  // Récupérer plusieurs films (avec acteurs, réalisateurs, producteurs) en un seul appel
+  getBatch: async (titles: string[]): Promise<{
+    status: string;
+    message?: string;
+    found: number;
+    results: Array<{query: string; status: 'found' | 'not_found'; similarity?: number; movie?: Movie}>;
+  }> => {
+    const response = await api.post('/movies/batch', { titles });
+    return response.data;
+  },
+
   // Créer un nouveau film
   create: async (movieData: Partial<Movie>): Promise<ApiResponse<Movie>> => {
     const response = await api.post('/movies', movieData);
@@ -7,8 +7,22 @@ interface PerformanceMetric {
   responseTime: number;
   status: number;
   timestamp: Date;
+  serverTiming: string;
 }
 
+// En-tête Server-Timing de l'API : "auth;dur=1.2, db;dur=30.5, total;dur=33.0"
+const formatServerTiming = (header: string | null) => {
+  if (!header) return '';
+  return header
+    .split(',')
+    .map(part => {
+      const [name, ...params] = part.trim().split(';');
+      const duration = params.find(param => param.trim().startsWith('dur='));
+      return duration ? `${name} ${Math.round(parseFloat(duration.trim().slice(4)))}ms` : name;
+    })
+    .join(' · ');
+};
+
 const ApiMetrics: React.FC = () => {
   const [metrics, setMetrics] = useState<PerformanceMetric[]>([]);
   const [isMonitoring, setIsMonitoring] = useState(false);
@@ -32,7 +46,8 @@ const ApiMetrics: React.FC = () => {
               method: options?.method || 'GET',
               responseTime: Math.round(endTime - startTime),
               status: response.status,
-              timestamp: new Date()
+              timestamp: new Date(),
+              serverTiming: formatServerTiming(response.headers.get('Server-Timing'))
             };
             
             setMetrics(prev => [metric, ...prev.slice(0, 19)]); // Garder les 20 dernières métriques
@@ -48,7 +63,8 @@ const ApiMetrics: React.FC = () => {
               method: options?.method || 'GET',
               responseTime: Math.round(endTime - startTime),
               status: 0,
-              timestamp: new Date()
+              timestamp: new Date(),
+              serverTiming: ''
             };
             
             setMetrics(prev => [metric, ...prev.slice(0, 19)]);
@@ -152,6 +168,7 @@ const ApiMetrics: React.FC = () => {
               <div className="metric-column">Méthode</div>
               <div className="metric-column">Statut</div>
               <div className="metric-column">Temps</div>
+              <div className="metric-column">Serveur</div>
               <div className="metric-column">Heure</div>
             </div>
             {metrics.map((metric, index) => (
@@ -170,6 +187,9 @@ const ApiMetrics: React.FC = () => {
                 >
                   {metric.responseTime}ms
                 </div>
+                <div className="metric-column server-timing">
+                  {metric.serverTiming || '-'}
+                </div>
                 <div className="metric-column timestamp">
                   {metric.timestamp.toLocaleTimeString()}
                 </div>
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark : débit des écritures admin selon la résolution du rôle.
+
+Démarre un serveur uvicorn avec le cache des rôles désactivé (ROLE_CACHE_TTL=0)
+puis envoie des mises à jour de film (PUT /movies/{title}) avec :
+- un token sans claim `role` (format d'avant) : le rôle est relu dans Neo4j à
+  chaque requête, comme l'ancien verify_admin ;
+- un token émis par /login, avec claim `role` : aucune lecture du rôle.
+Un second serveur avec le cache actif (ROLE_CACHE_TTL=60) mesure le cas des
+anciens tokens servis par le cache.
+
+Nécessite une base Neo4j configurée via .env.
+
+Usage : python benchmarks/bench_admin_auth.py --concurrency 1 10 50 --duration 10
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+
+import httpx
+from jose import jwt
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.auth import ALGORITHM, SECRET_KEY
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ADMIN = "bench_admin"
+PASSWORD = "bench_admin_pw"
+TITLE = "Bench Admin Auth"
+
+
+def start_server(port: int, cache_ttl: str):
+    env = dict(os.environ, ROLE_CACHE_TTL=cache_ttl)
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--workers", "1", "--log-level", "warning"],
+        cwd=BASE_DIR, env=env,
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                return process
+        except httpx.TransportError:
+            time.sleep(0.3)
+    process.terminate()
+    raise RuntimeError("Le serveur n'a pas démarré")
+
+
+def prepare(base_url: str):
+    """Créer l'admin et le film de test, renvoyer (token sans rôle, token avec rôle)"""
+    httpx.post(f"{base_url}/users/register", json={"username": ADMIN, "password": PASSWORD, "role": "admin"})
+    response = httpx.post(f"{base_url}/users/login", data={"username": ADMIN, "password": PASSWORD})
+    response.raise_for_status()
+    claim_token = response.json()["access_token"]
+    legacy_token = jwt.encode(
+        {"sub": ADMIN, "exp": datetime.utcnow() + timedelta(minutes=30)}, SECRET_KEY, algorithm=ALGORITHM
+    )
+    httpx.post(f"{base_url}/movies", json={"title": TITLE, "released": 2000},
+               headers={"Authorization": f"Bearer {claim_token}"})
+    return legacy_token, claim_token
+
+
+async def run_level(base_url: str, token: str, concurrency: int, duration: float):
+    requests = errors = 0
+    stop_at = time.perf_counter() + duration
+    headers = {"Authorization": f"Bearer {token}"}
+
+    async def client(worker_id: int, http: httpx.AsyncClient):
+        nonlocal requests, errors
+        i = 0
+        while time.perf_counter() < stop_at:
+            i += 1
+            response = await http.put(f"{base_url}/movies/{TITLE}", json={"tagline": f"{worker_id}-{i}"}, headers=headers)
+            requests += 1
+            if response.status_code != 200 or response.json().get("status") != "success":
+                errors += 1
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=60) as http:
+        await asyncio.gather(*(client(i, http) for i in range(concurrency)))
+    return requests / duration, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+    base_url = f"http://127.0.0.1:{args.port}"
+
+    print(f"{'résolution du rôle':>24} {'clients':>8} {'req/s':>8} {'erreurs':>8}")
+    for cache_ttl, cases in (("0", ("neo4j", "claim")), ("60", ("cache",))):
+        process = start_server(args.port, cache_ttl)
+        try:
+            legacy_token, claim_token = prepare(base_url)
+            tokens = {"neo4j": legacy_token, "cache": legacy_token, "claim": claim_token}
+            for case in cases:
+                for concurrency in args.concurrency:
+                    rps, errors = asyncio.run(run_level(base_url, tokens[case], concurrency, args.duration))
+                    print(f"{case:>24} {concurrency:>8} {rps:>8.0f} {errors:>8}")
+        finally:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
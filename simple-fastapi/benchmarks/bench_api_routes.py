@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Benchmark des routes de l'API : latence p50/p95/p99 et débit par endpoint.
+
+Les requêtes passent par l'application ASGI dans le processus (httpx +
+ASGITransport, sans réseau ni uvicorn), avec tous les middlewares et
+dépendances. Deux bases possibles :
+- `--backend standin` (défaut) : substitut en mémoire de Neo4j
+  (benchmarks/graph_standin.py) chargé d'un catalogue synthétique de
+  `--movies` films (de 1k à 1M) ; mesure le coût propre de l'API ;
+- `--backend memory` : le même catalogue servi par le stockage en mémoire
+  (STORAGE_BACKEND=memory, repositories/memory.py), routers synchrones ;
+- `--backend neo4j` : la base configurée dans .env, avec ses données.
+Les titres, noms et watchlists des requêtes sont tirés au hasard dans les
+listes renvoyées par l'API elle-même. Seules les routes de lecture sont
+mesurées (plus POST /movies/batch) : les écritures modifieraient la base.
+
+Une réponse compte comme erreur si son statut HTTP est ≥ 400 ou si son corps
+porte `"status": "error"` (y compris « aucun résultat », par exemple deux
+personnes sans chemin entre elles).
+
+Les résultats sont enregistrés en JSON (`--output`) ; `--compare` affiche
+l'écart avec un fichier précédent, par exemple celui du commit d'avant.
+
+Usage :
+  python benchmarks/bench_api_routes.py --movies 10000 --requests 500 --concurrency 8 --output bench.json
+  python benchmarks/bench_api_routes.py --mode async --compare bench.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import re
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (nom, méthode, chemin, authentifié) ; {movie}, {person}, {actor}, {actor2}, {watchlist} tirés au hasard,
+# {costar1} et {costar2} : deux acteurs d'un même film
+ENDPOINTS = [
+    ("movies.list", "GET", "/movies/?limit=20", False),
+    ("movies.detail", "GET", "/movies/{movie}", False),
+    ("movies.actors", "GET", "/movies/{movie}/actors", False),
+    ("movies.search", "GET", "/movies/search?q={movie_word}", False),
+    ("movies.search_alias", "GET", "/movies/search/movies?q={movie_word}", False),
+    ("movies.similar", "GET", "/movies/recommend/similar/{movie}", False),
+    ("movies.similar_alias", "GET", "/movies/recommend/movies/similar/{movie}", False),
+    ("movies.also_liked", "GET", "/movies/recommend/also-liked/{movie}", False),
+    ("movies.batch", "POST", "/movies/batch", False),
+    ("persons.list", "GET", "/persons/?limit=20", False),
+    ("persons.detail", "GET", "/persons/{person}", False),
+    ("persons.actor_movies", "GET", "/persons/actors/{actor}/movies", False),
+    ("persons.path", "GET", "/persons/path?person1={actor}&person2={actor2}", False),
+    ("persons.collaborations", "GET", "/persons/collaborations?person1={costar1}&person2={costar2}", False),
+    ("reviews.movie", "GET", "/reviews/{movie}", False),
+    ("stats", "GET", "/stats/", False),
+    ("users.feed", "GET", "/users/me/feed", True),
+    ("users.also_liked", "GET", "/users/me/also-liked", True),
+    ("watchlists.mine", "GET", "/watchlists", True),
+    ("watchlists.detail", "GET", "/watchlists/{watchlist}", True),
+    ("watchlists.public", "GET", "/watchlists/public/all?limit=20", False),
+    ("watchlists.check", "GET", "/watchlists/movie/{movie}/check", True),
+    ("export", "GET", "/export?ratings=true&watchlists=true", False),
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=("standin", "memory", "neo4j"), default="standin")
+    parser.add_argument("--mode", choices=("sync", "async"), default="sync", help="NEO4J_DRIVER_MODE")
+    parser.add_argument("--movies", type=int, default=1000, help="taille du catalogue synthétique (standin, memory)")
+    parser.add_argument("--requests", type=int, default=300, help="requêtes mesurées par endpoint")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--export-requests", type=int, default=3, help="requêtes pour /export (tout le catalogue)")
+    parser.add_argument("--only", help="expression régulière sur les noms d'endpoints")
+    parser.add_argument("--username", help="utilisateur des routes authentifiées (neo4j : à fournir)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="fichier JSON des résultats")
+    parser.add_argument("--compare", help="fichier JSON d'un run précédent")
+    return parser.parse_args()
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def prepare_backend(args):
+    """Brancher la base et charger les structures en mémoire comme le lifespan (sans tâches de fond)"""
+    from db.neo4j_conn import AsyncInstrumentedDriver, InstrumentedDriver, neo4j_conn
+    from services.fuzzy_index import load_movie_titles, load_person_names
+    from services.graph_snapshot import graph_snapshot
+    from services.rating_similarity import fetch_ratings, rating_similarity
+    from services.recommendations import load_recommendations
+    from services.stats_counters import reconcile_stats
+    from services.user_feed import user_feeds
+
+    if args.backend in ("standin", "memory"):
+        from benchmarks.graph_standin import AsyncStandInDriver, StandInDriver, SyntheticCatalog, snapshot_records
+        from repositories import memory_graph
+        start = time.perf_counter()
+        catalog = SyntheticCatalog(args.movies, args.seed)
+        print(f"catalogue synthétique : {len(catalog.movies)} films, {len(catalog.persons)} personnes, "
+              f"{len(catalog.users)} utilisateurs ({time.perf_counter() - start:.1f} s)")
+        # Le substitut répond aussi aux routes hors dépôts (export) en mode memory
+        neo4j_conn.driver = InstrumentedDriver(StandInDriver(catalog), neo4j_conn.query_monitor)
+        neo4j_conn.async_driver = AsyncInstrumentedDriver(AsyncStandInDriver(catalog), neo4j_conn.query_monitor)
+        if args.backend == "memory":
+            memory_graph.load(snapshot_records(catalog))
+        username = args.username or "user1"
+    else:
+        if not neo4j_conn.connect() or (args.mode == "async" and not asyncio.run(neo4j_conn.connect_async())):
+            sys.exit("Connexion à Neo4j impossible (voir .env)")
+        username = args.username or "bench_user"
+
+    start = time.perf_counter()
+    load_movie_titles()
+    load_person_names()
+    load_recommendations()
+    reconcile_stats()
+    graph_snapshot.rebuild()
+    rating_similarity.rebuild(fetch_ratings())
+    user_feeds.refresh_popular()
+    user_feeds.refresh(username)
+    print(f"structures en mémoire chargées en {time.perf_counter() - start:.1f} s")
+    return username
+
+
+def percentile(sorted_values, fraction: float) -> float:
+    """Rang le plus proche"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+def is_error(response) -> bool:
+    if response.status_code >= 400:
+        return True
+    if response.headers.get("content-type", "").startswith("application/json"):
+        body = response.json()
+        return isinstance(body, dict) and body.get("status") == "error"
+    return False
+
+
+async def sample_values(http):
+    movies = (await http.get("/movies/?limit=500")).json()["movies"]
+    persons = (await http.get("/persons/?limit=500")).json()["persons"]
+    watchlists = (await http.get("/watchlists/public/all?limit=100")).json()
+    titles = [movie["title"] for movie in movies]
+    details = (await http.post("/movies/batch", json={"titles": titles[:100]})).json()["results"]
+    casts = [sorted(actor["name"] for actor in result["movie"]["actors"])
+             for result in details if result["status"] == "found"]
+    return {
+        "movie": titles,
+        "person": [person["name"] for person in persons],
+        "actor": sorted({name for cast in casts for name in cast}),
+        "costars": [(cast[0], cast[-1]) for cast in casts if len(cast) > 1],
+        "watchlist": [watchlist["id"] for watchlist in watchlists],
+    }
+
+
+def build_request(rng, method, path, values):
+    movie = rng.choice(values["movie"])
+    costar1, costar2 = rng.choice(values["costars"]) if values["costars"] else ("none", "none")
+    fields = {
+        "movie": movie,
+        "movie_word": movie.split()[0],
+        "person": rng.choice(values["person"]),
+        "actor": rng.choice(values["actor"]),
+        "actor2": rng.choice(values["actor"]),
+        "costar1": costar1,
+        "costar2": costar2,
+        "watchlist": rng.choice(values["watchlist"]) if values["watchlist"] else "none",
+    }
+    body = {"titles": rng.sample(values["movie"], min(20, len(values["movie"])))} if method == "POST" else None
+    return path.format(**fields), body
+
+
+async def bench_endpoint(http, rng, endpoint, values, headers, count: int, warmup: int, concurrency: int):
+    name, method, path, authenticated = endpoint
+    requests = [build_request(rng, method, path, values) for _ in range(count + warmup)]
+    request_headers = headers if authenticated else {}
+    latencies, errors, first_error = [], 0, None
+    queue = iter(enumerate(requests))
+
+    async def worker():
+        nonlocal errors, first_error
+        for i, (url, body) in queue:
+            start = time.perf_counter()
+            response = await http.request(method, url, json=body, headers=request_headers)
+            _ = response.content
+            elapsed = time.perf_counter() - start
+            if i < warmup:
+                continue
+            latencies.append(elapsed * 1000)
+            if is_error(response):
+                errors += 1
+                first_error = first_error or response.text[:200]
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - start
+    latencies.sort()
+    measured = len(latencies)
+    return {
+        "requests": measured,
+        "errors": errors,
+        "first_error": first_error,
+        "p50_ms": round(percentile(latencies, 0.50), 3),
+        "p95_ms": round(percentile(latencies, 0.95), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3),
+        "mean_ms": round(sum(latencies) / measured, 3) if measured else 0.0,
+        # Débit sur toute la série (échauffement compris dans la durée, proportion faible)
+        "requests_per_second": round((measured + warmup) / wall, 1) if wall else 0.0,
+    }
+
+
+def api_routes(app):
+    """Routes des routers de routes/"""
+    return [route for route in app.routes
+            if getattr(getattr(route, "endpoint", None), "__module__", "").startswith("routes.")]
+
+
+def unmeasured_routes(app, endpoints):
+    """Routes que le benchmark ne mesure pas : (GET, autres méthodes)"""
+    measured = {(method, re.sub(r"\?.*", "", path)) for _, method, path, _ in endpoints}
+    reads, writes = [], []
+    for route in api_routes(app):
+        for method in sorted(route.methods):
+            template = re.sub(r"\{\w+\}", "{}", route.path)
+            if not any(m == method and re.sub(r"\{\w+\}", "{}", p) == template for m, p in measured):
+                (reads if method == "GET" else writes).append(f"{method} {route.path}")
+    return reads, writes
+
+
+def shadowed_routes(app):
+    """Routes GET jamais atteintes : leur chemin est capturé par une route déclarée avant"""
+    from starlette.routing import Match
+
+    shadowed = []
+    routes = api_routes(app)
+    for route in routes:
+        if "GET" not in route.methods:
+            continue
+        scope = {"type": "http", "method": "GET", "path": re.sub(r"\{\w+\}", "x", route.path), "root_path": ""}
+        first = next(r for r in routes if r.matches(scope)[0] == Match.FULL)
+        if first is not route:
+            shadowed.append(f"GET {route.path} (capturée par {first.path})")
+    return shadowed
+
+
+async def run(args, app, username):
+    import httpx
+    from services.auth import create_access_token
+
+    rng = random.Random(args.seed)
+    headers = {"Authorization": f"Bearer {create_access_token(username, 'user')}"}
+    endpoints = [e for e in ENDPOINTS if not args.only or re.search(args.only, e[0])]
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=600) as http:
+        values = await sample_values(http)
+        print(f"\n{'endpoint':<22} {'req':>6} {'err':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>9}")
+        for endpoint in endpoints:
+            heavy = endpoint[0] == "export"
+            result = await bench_endpoint(
+                http, rng, endpoint, values, headers,
+                args.export_requests if heavy else args.requests, 0 if heavy else args.warmup,
+                1 if heavy else args.concurrency)
+            results[endpoint[0]] = result
+            print(f"{endpoint[0]:<22} {result['requests']:>6} {result['errors']:>5} {result['p50_ms']:>9.2f} "
+                  f"{result['p95_ms']:>9.2f} {result['p99_ms']:>9.2f} {result['requests_per_second']:>9.0f}")
+    return results
+
+
+def compare(results: dict, previous_path: str):
+    with open(previous_path, encoding="utf-8") as f:
+        previous = json.load(f)
+    print(f"\ncomparaison avec {previous_path} (commit {previous['meta'].get('commit')}) : rapport nouveau / ancien")
+    print(f"{'endpoint':<22} {'p50':>8} {'p95':>8} {'p99':>8} {'req/s':>8}")
+    for name, result in results.items():
+        old = previous["endpoints"].get(name)
+        if not old:
+            continue
+        ratios = [result[key] / old[key] if old[key] else float("nan")
+                  for key in ("p50_ms", "p95_ms", "p99_ms", "requests_per_second")]
+        print(f"{name:<22} " + " ".join(f"{ratio:>8.2f}" for ratio in ratios))
+
+
+def main():
+    args = parse_args()
+    os.environ["NEO4J_DRIVER_MODE"] = args.mode
+    os.environ["STORAGE_BACKEND"] = "memory" if args.backend == "memory" else "neo4j"
+    os.environ.setdefault("SERVER_TIMING_LOG_RATE", "0")
+    import main as api
+
+    username = prepare_backend(args)
+    results = asyncio.run(run(args, api.app, username))
+
+    shadowed = shadowed_routes(api.app)
+    if shadowed:
+        print(f"\n⚠️ routes GET inaccessibles : {', '.join(shadowed)}")
+    reads, writes = unmeasured_routes(api.app, ENDPOINTS)
+    if reads:
+        print(f"\nroutes GET non mesurées : {', '.join(reads)}")
+    if writes:
+        print(f"\nroutes non mesurées (écritures, authentification) : {', '.join(writes)}")
+    if args.backend != "neo4j":
+        unsupported = api.neo4j_conn.driver._driver.unsupported | api.neo4j_conn.async_driver._driver.unsupported
+        for query in sorted(unsupported):
+            print(f"⚠️ requête non servie par le substitut : {query[:150]}")
+
+    report = {
+        "meta": {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "backend": args.backend,
+            "mode": args.mode,
+            "movies": args.movies if args.backend != "neo4j" else None,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "python": platform.python_version(),
+        },
+        "endpoints": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\nrésultats enregistrés dans {args.output}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark : débit de POST /movies/bulk (films par seconde).
+
+Génère un fichier NDJSON synthétique (films avec réalisateur, producteur et
+distribution tirés d'un vivier de personnes), mesure d'abord le découpage et la
+validation seuls (sans Neo4j), puis l'envoie en flux à un serveur lancé avec une
+base Neo4j configurée via .env. Les films créés (préfixe "Bench Bulk") sont
+supprimés à la fin, sauf avec --keep.
+
+Usage : python benchmarks/bench_bulk_ingest.py --movies 100000 --base-url http://127.0.0.1:8000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from routes.movies import validate_bulk_movie
+from services.bulk_ingest import BULK_BATCH_SIZE, NdjsonBatcher
+
+PREFIX = "Bench Bulk"
+ADMIN = "bench_admin"
+PASSWORD = "bench_admin_pw"
+CHUNK_SIZE = 64 * 1024
+
+
+def write_dataset(path: str, movies: int, persons: int, cast: int, seed: int):
+    rng = random.Random(seed)
+    names = [f"{PREFIX} Person {i}" for i in range(persons)]
+    with open(path, "w", encoding="utf-8") as out:
+        for i in range(movies):
+            out.write(json.dumps({
+                "title": f"{PREFIX} Movie {i}",
+                "released": rng.randint(1920, 2024),
+                "tagline": "",
+                "directors": [rng.choice(names)],
+                "producers": [rng.choice(names)],
+                "actors": [{"name": name, "roles": [f"Role {k}"]} for k, name in enumerate(rng.sample(names, cast))],
+            }) + "\n")
+
+
+def read_chunks(path: str):
+    with open(path, "rb") as source:
+        while chunk := source.read(CHUNK_SIZE):
+            yield chunk
+
+
+def parse_only(path: str):
+    batcher = NdjsonBatcher(validate_bulk_movie)
+    movies = 0
+    for chunk in read_chunks(path):
+        movies += sum(len(batch) for batch in batcher.feed(chunk))
+    return movies + sum(len(batch) for batch in batcher.finish())
+
+
+def admin_token(base_url: str) -> str:
+    httpx.post(f"{base_url}/users/register", json={"username": ADMIN, "password": PASSWORD, "role": "admin"})
+    response = httpx.post(f"{base_url}/users/login", data={"username": ADMIN, "password": PASSWORD})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+def cleanup():
+    from db.neo4j_conn import neo4j_conn
+    if not neo4j_conn.connect():
+        return
+    with neo4j_conn.driver.session() as session:
+        for label in ("Movie", "Person"):
+            key = "title" if label == "Movie" else "name"
+            session.run(f"""
+                MATCH (n:{label}) WHERE n.{key} STARTS WITH $prefix
+                CALL {{ WITH n DETACH DELETE n }} IN TRANSACTIONS OF 10000 ROWS
+            """, prefix=PREFIX)
+    neo4j_conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--movies", type=int, default=100_000)
+    parser.add_argument("--persons", type=int, default=50_000)
+    parser.add_argument("--cast", type=int, default=8)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--parse-only", action="store_true", help="ne mesurer que le découpage (sans serveur)")
+    parser.add_argument("--keep", action="store_true", help="garder les films créés")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "movies.ndjson")
+        write_dataset(path, args.movies, args.persons, args.cast, args.seed)
+        size = os.path.getsize(path)
+        print(f"{args.movies} films, {size / 2**20:.1f} Mo, lots de {BULK_BATCH_SIZE}")
+
+        start = time.perf_counter()
+        parsed = parse_only(path)
+        elapsed = time.perf_counter() - start
+        print(f"découpage et validation seuls : {parsed / elapsed:>10.0f} films/s")
+        if args.parse_only:
+            return
+
+        token = admin_token(args.base_url)
+        start = time.perf_counter()
+        response = httpx.post(f"{args.base_url}/movies/bulk", content=read_chunks(path),
+                              headers={"Authorization": f"Bearer {token}", "Content-Type": "application/x-ndjson"},
+                              timeout=None)
+        elapsed = time.perf_counter() - start
+        report = response.json()
+        print(f"POST /movies/bulk : {report['created']} créés, {report['failed']} en erreur en {elapsed:.1f} s "
+              f"→ {report['created'] / elapsed:.0f} films/s")
+    if not args.keep:
+        cleanup()
+
+
+if __name__ == "__main__":
+    main()
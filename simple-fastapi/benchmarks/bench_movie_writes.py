@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark : écriture d'un film avec une grosse distribution.
+
+Compare l'ancienne écriture (une vérification puis un session.run par réalisateur,
+producteur et acteur) à la transaction unique avec UNWIND utilisée par create_movie.
+Nécessite une base Neo4j configurée via .env (NEO4J_URI, NEO4J_USERNAME, NEO4J_PASSWORD).
+
+Usage : python benchmarks/bench_movie_writes.py --cast 10 40 200 --repeat 5
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.neo4j_conn import neo4j_conn
+from routes.movies import create_movie_tx
+
+PREFIX = "Bench Write"
+
+
+class CountingRunner:
+    """Compte les appels à run() d'une session ou d'une transaction"""
+    def __init__(self, runner, counter):
+        self.runner = runner
+        self.counter = counter
+
+    def run(self, *args, **kwargs):
+        self.counter["runs"] += 1
+        return self.runner.run(*args, **kwargs)
+
+
+def legacy_create(session, title, released, tagline, directors, producers, actors):
+    """Ancienne implémentation de create_movie (une requête auto-commit par lien)"""
+    if session.run("MATCH (m:Movie {title: $title}) RETURN m", title=title).single():
+        return None
+    session.run("CREATE (m:Movie {title: $title, released: $released, tagline: $tagline}) RETURN m",
+                title=title, released=released, tagline=tagline)
+    for name in directors:
+        session.run("MERGE (p:Person {name: $name}) WITH p MATCH (m:Movie {title: $title}) MERGE (p)-[:DIRECTED]->(m)",
+                    name=name, title=title)
+    for name in producers:
+        session.run("MERGE (p:Person {name: $name}) WITH p MATCH (m:Movie {title: $title}) MERGE (p)-[:PRODUCED]->(m)",
+                    name=name, title=title)
+    for actor in actors:
+        session.run("MERGE (p:Person {name: $name}) WITH p MATCH (m:Movie {title: $title}) MERGE (p)-[:ACTED_IN {roles: $roles}]->(m)",
+                    name=actor["name"], title=title, roles=actor["roles"])
+    return True
+
+
+def unwind_create(session, title, released, tagline, directors, producers, actors):
+    counter = session.counter
+    return session.runner.execute_write(
+        lambda tx: create_movie_tx(CountingRunner(tx, counter), title, released, tagline, directors, producers, actors)
+    )
+
+
+def make_credits(cast_size):
+    directors = [f"{PREFIX} Director {i}" for i in range(2)]
+    producers = [f"{PREFIX} Producer {i}" for i in range(2)]
+    actors = [{"name": f"{PREFIX} Actor {i}", "roles": [f"Role {i}"]} for i in range(cast_size)]
+    return directors, producers, actors
+
+
+def cleanup(session):
+    session.run("MATCH (n) WHERE (n:Movie AND n.title STARTS WITH $prefix) OR (n:Person AND n.name STARTS WITH $prefix) DETACH DELETE n",
+                prefix=PREFIX)
+
+
+def run(cast_sizes, repeat):
+    neo4j_conn.connect()
+    results = []
+    with neo4j_conn.driver.session() as raw_session:
+        cleanup(raw_session)
+        for cast_size in cast_sizes:
+            credits = make_credits(cast_size)
+            for label, writer in (("legacy", legacy_create), ("unwind", unwind_create)):
+                timings = []
+                counter = {"runs": 0}
+                for i in range(repeat):
+                    title = f"{PREFIX} {label} {cast_size} {i}"
+                    session = CountingRunner(raw_session, counter)
+                    start = time.perf_counter()
+                    writer(session, title, 2024, "bench", *credits)
+                    timings.append((time.perf_counter() - start) * 1000)
+                results.append({
+                    "cast": cast_size,
+                    "mode": label,
+                    "runs_per_movie": counter["runs"] / repeat,
+                    "median_ms": statistics.median(timings),
+                    "max_ms": max(timings),
+                })
+                cleanup(raw_session)
+    neo4j_conn.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cast", type=int, nargs="+", default=[10, 40, 200])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    print(f"{'acteurs':>8} {'mode':>8} {'requêtes':>9} {'médiane ms':>11} {'max ms':>8}")
+    for row in run(args.cast, args.repeat):
+        print(f"{row['cast']:>8} {row['mode']:>8} {row['runs_per_movie']:>9.0f} {row['median_ms']:>11.1f} {row['max_ms']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
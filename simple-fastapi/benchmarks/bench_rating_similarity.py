@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark : similarités item-item sur un jeu de notes synthétique.
+
+Génère des notes (popularité des films en loi de Zipf, notes de 1 à 5) puis mesure :
+- la construction de la matrice creuse centrée et le calcul complet des voisins ;
+- le même calcul via RatingSimilarity.rebuild (conversion des tuples comprise) ;
+- un recalcul incrémental après une note, puis après les notes de quelques utilisateurs
+  (films recalculés et durée du verrou qui bloque les lectures).
+Aucune base Neo4j n'est nécessaire.
+
+Usage : python benchmarks/bench_rating_similarity.py --users 100000 --movies 10000 --ratings-per-user 20
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.rating_similarity import RatingSimilarity, centred_matrix, compute_neighbours
+
+
+def synthetic_ratings(users: int, movies: int, per_user: int, seed: int):
+    rng = np.random.default_rng(seed)
+    popularity = 1.0 / np.arange(1, movies + 1) ** 0.8
+    popularity /= popularity.sum()
+    user_idx = np.repeat(np.arange(users), per_user)
+    movie_idx = rng.choice(movies, size=users * per_user, p=popularity)
+    # Une seule note par couple (utilisateur, film)
+    pairs = np.unique(user_idx.astype(np.int64) * movies + movie_idx)
+    user_idx, movie_idx = pairs // movies, pairs % movies
+    ratings = rng.integers(1, 6, size=len(pairs))
+    return user_idx, movie_idx, ratings
+
+
+def timed(label: str, func):
+    start = time.perf_counter()
+    result = func()
+    print(f"{label:<48} {time.perf_counter() - start:>8.2f} s")
+    return result
+
+
+def print_incremental(run: dict):
+    print(f"  {run['recomputed_movies']} films recalculés, {run['patched_movies']} listes complétées "
+          f"({run['republished_movies']} top changés), {run['approximated_movies']} approchées jusqu'à la "
+          f"reconstruction, verrou tenu {run['lock_ms']} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--movies", type=int, default=10_000)
+    parser.add_argument("--ratings-per-user", type=int, default=20)
+    parser.add_argument("--top-n", type=int, default=50)
+    parser.add_argument("--dirty-users", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    user_idx, movie_idx, ratings = timed("génération des notes", lambda: synthetic_ratings(
+        args.users, args.movies, args.ratings_per_user, args.seed))
+    print(f"{len(ratings)} notes, {args.users} utilisateurs × {args.movies} films")
+
+    matrix = timed("matrice creuse centrée", lambda: centred_matrix(
+        user_idx, movie_idx, ratings, (args.users, args.movies)))
+    neighbours = timed(f"voisins complets (top {args.top_n})", lambda: compute_neighbours(matrix, args.top_n))
+    print(f"{sum(len(cols) for cols, _ in neighbours.values())} voisins gardés")
+
+    store = RatingSimilarity(top_n=args.top_n)
+    rows = [(f"user{u}", f"movie{m}", int(r)) for u, m, r in zip(user_idx, movie_idx, ratings)]
+    timed("RatingSimilarity.rebuild", lambda: store.rebuild(rows))
+
+    rng = np.random.default_rng(args.seed + 1)
+    store.record_rating(f"user{rng.integers(args.users)}", f"movie{rng.integers(args.movies)}", int(rng.integers(1, 6)))
+    timed("recalcul incrémental (1 note)", store.process_pending)
+    print_incremental(store.last_run)
+    for u in rng.choice(args.users, size=args.dirty_users, replace=False):
+        store.record_rating(f"user{u}", f"movie{rng.integers(args.movies)}", int(rng.integers(1, 6)))
+    timed(f"recalcul incrémental ({args.dirty_users} utilisateurs)", store.process_pending)
+    print_incremental(store.last_run)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,484 @@
+"""
+Substitut en mémoire de Neo4j pour les benchmarks des routes.
+
+`SyntheticCatalog` génère un catalogue (films, personnes, crédits,
+utilisateurs, avis, watchlists) de taille réglable, indexé par dictionnaires.
+`StandInDriver` (et `AsyncStandInDriver`) imite l'interface du driver utilisée
+par l'API (sessions, `run`, `execute_read` / `execute_write`, résultats) et
+répond aux requêtes de lecture des routes et des chargements du démarrage :
+chaque requête est reconnue par son empreinte (db.query_monitor.fingerprint)
+puis servie par une fonction Python sur le catalogue. Ce n'est pas un moteur
+Cypher : une requête inconnue (écritures comprises) lève `UnsupportedQuery`
+et son empreinte est notée dans `driver.unsupported`.
+
+Les chiffres obtenus mesurent donc le coût propre de l'API (routage,
+authentification, validation, index en mémoire, sérialisation) avec une base
+de latence quasi nulle.
+"""
+import bisect
+import itertools
+import os
+import random
+import sys
+from collections import defaultdict
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.query_monitor import fingerprint
+from repositories.neo4j import (
+    COUNT_QUERIES,
+    LATEST_MOVIE_QUERY,
+    MOVIES_DETAILS_CYPHER,
+    POPULAR_MOVIES_QUERY,
+    ROLE_QUERY,
+    SIMILAR_MOVIES_CYPHER,
+    USER_HISTORY_QUERY,
+)
+from services.export import EXPORT_QUERIES
+
+WORDS = ("Matrix", "Heat", "Night", "River", "Storm", "Silent", "Glass", "Iron", "Last", "Red", "Blue", "City",
+         "Ghost", "Dream", "Shadow", "Winter", "Summer", "Secret", "Lost", "Golden", "Wild", "Dark", "Star", "Road")
+FIRST_NAMES = ("Ann", "Bob", "Carla", "David", "Emma", "Frank", "Grace", "Hugo", "Iris", "Jack", "Kate", "Leo")
+LAST_NAMES = ("Martin", "Bernard", "Durand", "Moreau", "Laurent", "Simon", "Michel", "Lefebvre", "Garcia", "Roux")
+
+
+class UnsupportedQuery(Exception):
+    pass
+
+
+class SyntheticCatalog:
+    """Catalogue synthétique : persons ≈ 2 × films, 4 acteurs, 1 réalisateur et 1 producteur par film"""
+
+    def __init__(self, movies: int = 1000, seed: int = 42):
+        rng = random.Random(seed)
+        self.movies = {}
+        self.persons = {}
+        self.acted = defaultdict(list)         # film -> [(personne, rôles)]
+        self.directed = defaultdict(list)      # film -> [personnes]
+        self.produced = defaultdict(list)
+        self.person_acted = defaultdict(list)  # personne -> [(film, rôles)]
+        self.person_directed = defaultdict(list)
+        self.person_produced = defaultdict(list)
+        for i in range(max(movies * 2, 10)):
+            name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {i}"
+            self.persons[name] = {"name": name, "born": rng.randint(1930, 2000)}
+        names = list(self.persons)
+        # Popularité en loi de puissance : quelques personnes très créditées
+        weights = list(itertools.accumulate(1.0 / (rank + 1) ** 0.7 for rank in range(len(names))))
+        for i in range(movies):
+            title = f"{rng.choice(WORDS)} {rng.choice(WORDS)} {i}"
+            self.movies[title] = {"title": title, "released": rng.randint(1950, 2024),
+                                  "tagline": f"Tagline {i}"}
+            for name in set(rng.choices(names, cum_weights=weights, k=4)):
+                roles = [f"Role {rng.randint(1, 99)}"]
+                self.acted[title].append((name, roles))
+                self.person_acted[name].append((title, roles))
+            director, producer = rng.choices(names, cum_weights=weights, k=2)
+            self.directed[title].append(director)
+            self.person_directed[director].append(title)
+            self.produced[title].append(producer)
+            self.person_produced[producer].append(title)
+
+        titles = list(self.movies)
+        start = datetime(2024, 1, 1)
+        self.users = {}
+        self.ratings = defaultdict(list)       # film -> [avis]
+        self.user_ratings = defaultdict(dict)  # utilisateur -> {film: note}
+        self.watchlists = {}
+        self.user_watchlists = defaultdict(list)
+        for i in range(max(movies // 10, 10)):
+            username = f"user{i}"
+            self.users[username] = {"username": username, "role": "admin" if i == 0 else "user"}
+            for title in rng.sample(titles, min(20, len(titles))):
+                rating = rng.randint(1, 5)
+                created_at = (start + timedelta(minutes=rng.randint(0, 500_000))).isoformat()
+                self.ratings[title].append({"username": username, "rating": rating,
+                                            "comment": f"Avis de {username}", "created_at": created_at})
+                self.user_ratings[username][title] = rating
+            watchlist_id = f"wl-{i}"
+            self.watchlists[watchlist_id] = {
+                "id": watchlist_id, "name": f"Watchlist {i}", "description": "", "is_public": i % 2 == 0,
+                "created_at": (start + timedelta(minutes=i)).isoformat(), "owner": username,
+                "movies": rng.sample(titles, min(10, len(titles))),
+            }
+            self.user_watchlists[username].append(watchlist_id)
+
+        # Ordres des pages (clés de tri croissantes)
+        self.movies_order = sorted((-movie["released"], title) for title, movie in self.movies.items())
+        self.persons_order = sorted(self.persons)
+        self.public_order = sorted((_desc(w["created_at"]), w["id"])
+                                   for w in self.watchlists.values() if w["is_public"])
+
+    def movie_row(self, title):
+        movie = self.movies[title]
+        return {"title": title, "released": movie["released"], "tagline": movie["tagline"]}
+
+    def movie_details(self, title):
+        return {**self.movie_row(title),
+                "actors": [{"name": name, "roles": roles} for name, roles in self.acted[title]],
+                "directors": list(self.directed[title]), "producers": list(self.produced[title])}
+
+    def credited(self, title):
+        return [name for name, _ in self.acted[title]] + self.directed[title] + self.produced[title]
+
+    def watchlist_row(self, watchlist, **extra):
+        return {key: watchlist[key] for key in ("id", "name", "description", "is_public", "created_at")} | extra
+
+
+def _desc(text: str) -> tuple:
+    """Clé de tri décroissant pour une chaîne"""
+    return tuple(-ord(char) for char in text) + (1,)
+
+
+# Requêtes servies : (empreinte exacte ou fragments présents dans l'empreinte) -> fonction(catalogue, paramètres)
+
+def movies_page(c, p):
+    start = 0
+    if "released" in p:
+        start = bisect.bisect_right(c.movies_order, (-p["released"], p["title"]))
+    rows = c.movies_order[start + p["skip"]:start + p["skip"] + p["limit"]]
+    return [c.movie_row(title) for _, title in rows]
+
+
+def persons_page(c, p):
+    start = bisect.bisect_right(c.persons_order, p["name"]) if "name" in p else 0
+    return [c.persons[name] for name in c.persons_order[start + p["skip"]:start + p["skip"] + p["limit"]]]
+
+
+def public_watchlists_page(c, p):
+    start = bisect.bisect_right(c.public_order, (_desc(p["created_at"]), p["id"])) if "id" in p else 0
+    rows = c.public_order[start + p["skip"]:start + p["skip"] + p["limit"]]
+    return [c.watchlist_row(c.watchlists[wid], movie_count=len(c.watchlists[wid]["movies"]),
+                            username=c.watchlists[wid]["owner"]) for _, wid in rows]
+
+
+def movie_details(c, p):
+    return [c.movie_details(p["title"])] if p["title"] in c.movies else []
+
+
+def person_details(c, p):
+    name = p["name"]
+    if name not in c.persons:
+        return []
+    return [{**c.persons[name],
+             "acted_in": [{"movie": title, "roles": roles} for title, roles in c.person_acted[name]],
+             "directed": list(c.person_directed[name]), "produced": list(c.person_produced[name])}]
+
+
+def actor_movies(c, p):
+    rows = [{"title": title, "released": c.movies[title]["released"], "roles": roles}
+            for title, roles in c.person_acted.get(p["name"], ())]
+    return sorted(rows, key=lambda row: -row["released"])
+
+
+def common_movies(c, p):
+    return sorted({title for title, _ in c.person_acted.get(p["person1"], ())}
+                  & {title for title, _ in c.person_acted.get(p["person2"], ())})
+
+
+def collaborations(c, p):
+    common = common_movies(c, p)
+    return [{"movies": common, "collaborations": len(common), "person1": p["person1"], "person2": p["person2"]}] \
+        if common else []
+
+
+def similar_movies(c, p):
+    scores = defaultdict(int)
+    for name in c.credited(p["title"]) if p["title"] in c.movies else ():
+        for title in ([t for t, _ in c.person_acted[name]] + c.person_directed[name] + c.person_produced[name]):
+            if title != p["title"]:
+                scores[title] += 1
+    ranked = sorted(scores.items(), key=lambda item: (-item[1], -c.movies[item[0]]["released"]))[:p["limit"]]
+    return [{"title": title, "released": c.movies[title]["released"], "score": score} for title, score in ranked]
+
+
+def user_history(c, p):
+    username = p["username"]
+    if username not in c.users:
+        return []
+    saved = {title for wid in c.user_watchlists[username] for title in c.watchlists[wid]["movies"]}
+    return [{"rated": [{"title": title, "rating": rating} for title, rating in c.user_ratings[username].items()],
+             "saved": sorted(saved)}]
+
+
+def popular_movies(c, p):
+    stats = [(title, len(reviews), sum(r["rating"] for r in reviews) / len(reviews))
+             for title, reviews in c.ratings.items()]
+    stats = [s for s in stats if s[2] >= p["min_average"]]
+    stats.sort(key=lambda s: (-s[1], -s[2], s[0]))
+    return [{"title": title} for title, _, _ in stats[:p["limit"]]]
+
+
+def latest_movie(c, p):
+    if not c.movies_order:
+        return []
+    title = c.movies_order[0][1]
+    return [{"title": title, "released": c.movies[title]["released"]}]
+
+
+def user_watchlists(c, p):
+    rows = [c.watchlist_row(c.watchlists[wid], movie_count=len(c.watchlists[wid]["movies"]))
+            for wid in c.user_watchlists.get(p["username"], ())]
+    return sorted(rows, key=lambda row: row["created_at"], reverse=True)
+
+
+def watchlist_access(c, p):
+    watchlist = c.watchlists.get(p["watchlist_id"])
+    return [{"w": c.watchlist_row(watchlist), "owner_username": watchlist["owner"]}] if watchlist else []
+
+
+def watchlist_movies(c, p):
+    watchlist = c.watchlists.get(p["watchlist_id"])
+    return [c.movie_row(title) for title in sorted(watchlist["movies"])] if watchlist else []
+
+
+def watchlist_check(c, p):
+    return [{"id": wid, "name": c.watchlists[wid]["name"]} for wid in c.user_watchlists.get(p["username"], ())
+            if p["movie_title"] in c.watchlists[wid]["movies"]]
+
+
+def export_movies(c, p):
+    return (c.movie_details(title) for title in c.movies)
+
+
+def export_ratings(c, p):
+    return ({"username": r["username"], "movie_title": title, "rating": r["rating"], "comment": r["comment"],
+             "created_at": r["created_at"]} for title, reviews in c.ratings.items() for r in reviews)
+
+
+def export_watchlists(c, p):
+    return ({**c.watchlist_row(w), "username": w["owner"], "movies": list(w["movies"])}
+            for w in c.watchlists.values() if w["is_public"])
+
+
+def snapshot_records(c):
+    """Catalogue au format d'instantané de repositories.memory (watchlists privées et rôles compris)"""
+    for section, rows in (("movie", export_movies(c, {})), ("person", c.persons.values()),
+                          ("rating", export_ratings(c, {}))):
+        for row in rows:
+            yield {"type": section, **row}
+    for username, user in c.users.items():
+        yield {"type": "user", "username": username, "role": user["role"]}
+    for w in c.watchlists.values():
+        yield {"type": "watchlist", **c.watchlist_row(w), "username": w["owner"], "movies": list(w["movies"])}
+
+
+EXACT_QUERIES = {
+    COUNT_QUERIES["movies"]: lambda c, p: [{"count": len(c.movies)}],
+    COUNT_QUERIES["persons"]: lambda c, p: [{"count": len(c.persons)}],
+    COUNT_QUERIES["acted_in"]: lambda c, p: [{"count": sum(map(len, c.acted.values()))}],
+    COUNT_QUERIES["directed"]: lambda c, p: [{"count": sum(map(len, c.directed.values()))}],
+    COUNT_QUERIES["produced"]: lambda c, p: [{"count": sum(map(len, c.produced.values()))}],
+    LATEST_MOVIE_QUERY: latest_movie,
+    ROLE_QUERY: lambda c, p: [{"role": c.users[p["username"]]["role"]}] if p["username"] in c.users else [],
+    MOVIES_DETAILS_CYPHER: lambda c, p: [c.movie_details(t) for t in p["titles"] if t in c.movies],
+    SIMILAR_MOVIES_CYPHER: similar_movies,
+    USER_HISTORY_QUERY: user_history,
+    POPULAR_MOVIES_QUERY: popular_movies,
+    EXPORT_QUERIES["movie"]: export_movies,
+    EXPORT_QUERIES["person"]: lambda c, p: iter(c.persons.values()),
+    EXPORT_QUERIES["rating"]: export_ratings,
+    EXPORT_QUERIES["watchlist"]: export_watchlists,
+    # Chargements du démarrage (index approchés, co-crédits, graphe, similarités de notes)
+    "MATCH (m:Movie) RETURN m.title as title, m.released as released":
+        lambda c, p: [{"title": t, "released": m["released"]} for t, m in c.movies.items()],
+    "MATCH (p:Person) RETURN p.name as name": lambda c, p: [{"name": name} for name in c.persons],
+    """MATCH (m:Movie)
+       OPTIONAL MATCH (m)<-[:ACTED_IN|DIRECTED|PRODUCED]-(p:Person)
+       RETURN m.title as title, m.released as released, collect(p.name) as credited""":
+        lambda c, p: [{"title": t, "released": m["released"], "credited": c.credited(t)} for t, m in c.movies.items()],
+    """MATCH (p:Person)-[:ACTED_IN|DIRECTED|PRODUCED]->(m:Movie)
+       RETURN p.name as name, m.title as title""":
+        lambda c, p: [{"name": name, "title": title} for title in c.movies for name in c.credited(title)],
+    """MATCH (u:User)-[r:RATED]->(m:Movie)
+       RETURN u.username as username, m.title as title, r.rating as rating""":
+        lambda c, p: [{"username": u, "title": t, "rating": r} for u, rated in c.user_ratings.items()
+                      for t, r in rated.items()],
+}
+
+# Les routes de routes/aio gardent leurs propres requêtes de lecture : leurs
+# fragments, plus précis, précèdent ceux des requêtes de repositories.neo4j
+FRAGMENT_QUERIES = [
+    (("MATCH (m:Movie {title: $title}) OPTIONAL MATCH (p:Person)-[r:ACTED_IN]->(m)",), movie_details),
+    (("MATCH (p:Person)-[r:ACTED_IN]->(m:Movie {title: $title})", "m.title as movie"),
+     lambda c, p: sorted(({"name": name, "roles": roles, "movie": p["title"]} for name, roles in c.acted.get(p["title"], ())),
+                         key=lambda row: row["name"])),
+    (("MATCH (p:Person {name: $name}) OPTIONAL MATCH (p)-[r:ACTED_IN]->(m:Movie)",), person_details),
+    (("MATCH (p:Person {name: $name})-[r:ACTED_IN]->(m:Movie)", "p.name as actor"),
+     lambda c, p: [dict(row, actor=p["name"]) for row in actor_movies(c, p)]),
+    (("RETURN collect(m.title) as movies",), collaborations),
+    (("RETURN w, owner.username as owner_username",), watchlist_access),
+    (("MATCH (m:Movie)", "ORDER BY m.released DESC, m.title SKIP $skip LIMIT $limit"), movies_page),
+    (("MATCH (p:Person)", "ORDER BY p.name SKIP $skip LIMIT $limit"), persons_page),
+    (("(w:Watchlist {is_public: true})", "ORDER BY w.created_at DESC, w.id SKIP $skip LIMIT $limit"),
+     public_watchlists_page),
+    (("MATCH (p:Person)-[r:ACTED_IN]->(m:Movie {title: $title})", "ORDER BY name"),
+     lambda c, p: sorted(({"name": name, "roles": roles} for name, roles in c.acted.get(p["title"], ())),
+                         key=lambda row: row["name"])),
+    (("UNWIND $titles AS t MATCH (m:Movie {title: t})",),
+     lambda c, p: [c.movie_row(t) for t in p["titles"] if t in c.movies]),
+    (("WHERE toLower(m.title) CONTAINS toLower($search)",),
+     lambda c, p: sorted((c.movie_row(t) for t in c.movies if p["search"].lower() in t.lower()),
+                         key=lambda row: -row["released"])[:p["limit"]]),
+    (("MATCH (p:Person {name: $name}) RETURN p.name as name, p.born as born",), person_details),
+    (("MATCH (p:Person {name: $name})-[r:ACTED_IN]->(m:Movie)",), actor_movies),
+    (("MATCH (p1:Person {name: $person1})-[:ACTED_IN]->(m:Movie)<-[:ACTED_IN]-(p2:Person {name: $person2})",),
+     lambda c, p: [{"title": title} for title in common_movies(c, p)]),
+    (("MATCH (u:User)-[r:RATED]->(m:Movie {title: $movie_title})",),
+     lambda c, p: sorted(c.ratings.get(p["movie_title"], ()), key=lambda r: r["created_at"], reverse=True)),
+    (("MATCH (u:User {username: $username})-[:OWNS]->(w:Watchlist) OPTIONAL MATCH (w)-[:CONTAINS]->(m:Movie)",),
+     user_watchlists),
+    (("MATCH (w:Watchlist {id: $watchlist_id}) OPTIONAL MATCH (owner:User)-[:OWNS]->(w)",),
+     lambda c, p: [c.watchlist_row(c.watchlists[p["watchlist_id"]], username=c.watchlists[p["watchlist_id"]]["owner"])]
+     if p["watchlist_id"] in c.watchlists else []),
+    (("MATCH (w:Watchlist {id: $watchlist_id})-[:CONTAINS]->(m:Movie)",), watchlist_movies),
+    (("-[:CONTAINS]->(m:Movie {title: $movie_title}) RETURN w.id as id, w.name as name",), watchlist_check),
+]
+
+_EXACT = {fingerprint(query): handler for query, handler in EXACT_QUERIES.items()}
+
+
+def find_handler(query: str):
+    key = fingerprint(query)
+    handler = _EXACT.get(key)
+    if handler is None:
+        handler = next((h for fragments, h in FRAGMENT_QUERIES if all(f in key for f in fragments)), None)
+    return key, handler
+
+
+SUMMARY = SimpleNamespace(result_available_after=0, result_consumed_after=0,
+                          counters=SimpleNamespace(nodes_created=0, relationships_created=0, nodes_deleted=0,
+                                                   relationships_deleted=0, properties_set=0))
+
+
+class StandInResult:
+    def __init__(self, records):
+        self._records = iter(records)
+        self._peeked = []
+
+    def __iter__(self):
+        while self._peeked:
+            yield self._peeked.pop(0)
+        yield from self._records
+
+    def single(self, strict: bool = False):
+        return next(iter(self), None)
+
+    def data(self, *keys):
+        return [dict(record) for record in self]
+
+    def values(self, *keys):
+        return [list(record.values()) for record in self]
+
+    def value(self, key=0, default=None):
+        return [record.get(key, default) if isinstance(key, str) else list(record.values())[key] for record in self]
+
+    def fetch(self, n: int):
+        return [record for _, record in zip(range(n), self)]
+
+    def peek(self):
+        if not self._peeked:
+            self._peeked = self.fetch(1)
+        return self._peeked[0] if self._peeked else None
+
+    def consume(self):
+        for _ in self:
+            pass
+        return SUMMARY
+
+
+class StandInSession:
+    def __init__(self, driver):
+        self._driver = driver
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def close(self):
+        pass
+
+    def run(self, query, parameters=None, **kwargs):
+        return StandInResult(self._driver.answer(query, {**(parameters or {}), **kwargs}))
+
+    def execute_read(self, work, *args, **kwargs):
+        return work(self, *args, **kwargs)
+
+    execute_write = execute_read
+
+
+class StandInDriver:
+    def __init__(self, catalog: SyntheticCatalog):
+        self.catalog = catalog
+        self.unsupported = set()
+
+    def answer(self, query, parameters: dict):
+        key, handler = find_handler(getattr(query, "text", query))
+        if handler is None:
+            self.unsupported.add(key)
+            raise UnsupportedQuery(f"Requête non servie par le substitut : {key[:120]}")
+        return handler(self.catalog, parameters)
+
+    def session(self, **config):
+        return StandInSession(self)
+
+    def close(self):
+        pass
+
+
+class AsyncStandInResult(StandInResult):
+    async def __aiter__(self):
+        for record in StandInResult.__iter__(self):
+            yield record
+
+    async def single(self, strict: bool = False):
+        return StandInResult.single(self, strict)
+
+    async def data(self, *keys):
+        return StandInResult.data(self, *keys)
+
+    async def values(self, *keys):
+        return StandInResult.values(self, *keys)
+
+    async def value(self, key=0, default=None):
+        return StandInResult.value(self, key, default)
+
+    async def fetch(self, n: int):
+        return StandInResult.fetch(self, n)
+
+    async def peek(self):
+        return StandInResult.peek(self)
+
+    async def consume(self):
+        return StandInResult.consume(self)
+
+
+class AsyncStandInSession(StandInSession):
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    async def close(self):
+        pass
+
+    async def run(self, query, parameters=None, **kwargs):
+        return AsyncStandInResult(self._driver.answer(query, {**(parameters or {}), **kwargs}))
+
+    async def execute_read(self, work, *args, **kwargs):
+        return await work(self, *args, **kwargs)
+
+    execute_write = execute_read
+
+
+class AsyncStandInDriver(StandInDriver):
+    def session(self, **config):
+        return AsyncStandInSession(self)
+
+    async def close(self):
+        pass
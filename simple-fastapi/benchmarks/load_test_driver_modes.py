@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Test de charge : concurrence par worker en mode driver sync puis async.
+
+Pour chaque mode (NEO4J_DRIVER_MODE=sync puis async), le script démarre un
+serveur uvicorn à un seul worker, envoie des requêtes de lecture avec un nombre
+croissant de clients simultanés, puis arrête le serveur. En mode sync chaque
+requête en attente de Neo4j occupe un thread du threadpool de Starlette (40 par
+défaut) : au-delà, le débit plafonne et la latence augmente. En mode async la
+concurrence n'est limitée que par le pool de connexions du driver.
+
+Nécessite une base Neo4j configurée via .env.
+
+Usage : python benchmarks/load_test_driver_modes.py --concurrency 10 50 100 200 --duration 10
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PATHS = ["/movies/", "/movies/The Matrix", "/persons/Keanu Reeves", "/stats/"]
+
+
+def start_server(mode: str, port: int):
+    env = dict(os.environ, NEO4J_DRIVER_MODE=mode)
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--workers", "1", "--log-level", "warning"],
+        cwd=BASE_DIR, env=env,
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                return process
+        except httpx.TransportError:
+            time.sleep(0.3)
+    process.terminate()
+    raise RuntimeError(f"Le serveur ({mode}) n'a pas démarré")
+
+
+async def run_level(base_url: str, concurrency: int, duration: float):
+    latencies = []
+    errors = 0
+    stop_at = time.perf_counter() + duration
+
+    async def client(worker_id: int, http: httpx.AsyncClient):
+        nonlocal errors
+        i = worker_id
+        while time.perf_counter() < stop_at:
+            path = PATHS[i % len(PATHS)]
+            i += 1
+            start = time.perf_counter()
+            try:
+                response = await http.get(base_url + path)
+                if response.status_code != 200:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=60) as http:
+        await asyncio.gather(*(client(i, http) for i in range(concurrency)))
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "rps": len(latencies) / duration,
+        "p50_ms": statistics.median(latencies) if latencies else 0,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] if latencies else 0,
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", nargs="+", default=["sync", "async"])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 50, 100, 200])
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    print(f"{'mode':>6} {'clients':>8} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'erreurs':>8}")
+    for mode in args.modes:
+        process = start_server(mode, args.port)
+        try:
+            for concurrency in args.concurrency:
+                row = asyncio.run(run_level(f"http://127.0.0.1:{args.port}", concurrency, args.duration))
+                print(f"{mode:>6} {row['concurrency']:>8} {row['rps']:>8.0f} {row['p50_ms']:>8.1f} "
+                      f"{row['p95_ms']:>8.1f} {row['errors']:>8}")
+        finally:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,340 @@
 import os
-from neo4j import GraphDatabase
+from neo4j import AsyncGraphDatabase, GraphDatabase
 from dotenv import load_dotenv
+from db.pool_monitor import PoolMonitor
+from db.query_monitor import QueryMonitor
 
 load_dotenv()
 
+# Réglages du pool de connexions : variable d'environnement -> (option du driver, type)
+POOL_SETTINGS = {
+    "NEO4J_MAX_CONNECTION_POOL_SIZE": ("max_connection_pool_size", int),
+    "NEO4J_CONNECTION_ACQUISITION_TIMEOUT": ("connection_acquisition_timeout", float),
+    "NEO4J_MAX_CONNECTION_LIFETIME": ("max_connection_lifetime", float),
+    "NEO4J_CONNECTION_TIMEOUT": ("connection_timeout", float),
+    # Nécessite un driver qui supporte l'option (non transmise si absente)
+    "NEO4J_LIVENESS_CHECK_TIMEOUT": ("liveness_check_timeout", float),
+}
+
+def pool_config_from_env():
+    config = {}
+    for env_name, (option, cast) in POOL_SETTINGS.items():
+        value = os.getenv(env_name)
+        if value:
+            config[option] = cast(value)
+    return config
+
+def _no_rows(value):
+    return 0
+
+def _single_row(record):
+    return int(record is not None)
+
+class InstrumentedResult:
+    """Résultat dont la lecture complète clôt la mesure de la requête"""
+
+    def __init__(self, result, timer):
+        self._result = result
+        self._timer = timer
+        self._iterator = None
+
+    def __getattr__(self, name):
+        return getattr(self._result, name)
+
+    def __iter__(self):
+        try:
+            for record in self._result:
+                self._timer.rows += 1
+                yield record
+        except Exception:
+            self._timer.finish(failed=True)
+            raise
+        self._read(lambda: None, _no_rows)
+
+    def __next__(self):
+        if self._iterator is None:
+            self._iterator = iter(self)
+        return next(self._iterator)
+
+    def _read(self, read, count=len):
+        try:
+            value = read()
+            self._timer.rows += count(value)
+            # Le résultat est lu : le résumé ne coûte plus d'aller-retour
+            summary = self._result.consume()
+        except Exception:
+            self._timer.finish(failed=True)
+            raise
+        self._timer.finish(summary)
+        return value
+
+    def single(self, strict: bool = False):
+        return self._read(lambda: self._result.single(strict), _single_row)
+
+    def data(self, *keys):
+        return self._read(lambda: self._result.data(*keys))
+
+    def values(self, *keys):
+        return self._read(lambda: self._result.values(*keys))
+
+    def value(self, key=0, default=None):
+        return self._read(lambda: self._result.value(key, default))
+
+    def fetch(self, n: int):
+        records = self._result.fetch(n)
+        self._timer.rows += len(records)
+        return records
+
+    def consume(self):
+        if self._timer.done:
+            return self._result.consume()
+        return self._read(self._result.consume, _no_rows)
+
+    def close_measure(self, consume: bool):
+        """Fin de session ou de transaction : clore la mesure d'un résultat non lu"""
+        if self._timer.done:
+            return
+        if not consume:
+            self._timer.finish()
+            return
+        try:
+            self.consume()
+        except Exception:
+            pass
+
+class InstrumentedTransaction:
+    def __init__(self, tx, monitor: QueryMonitor):
+        self._tx = tx
+        self._monitor = monitor
+        self._results = []
+
+    def __getattr__(self, name):
+        return getattr(self._tx, name)
+
+    def run(self, query, parameters=None, **kwargs):
+        timer = self._monitor.start(query, parameters, kwargs)
+        try:
+            result = self._tx.run(query, parameters, **kwargs)
+        except Exception:
+            timer.finish(failed=True)
+            raise
+        result = InstrumentedResult(result, timer)
+        self._results.append(result)
+        return result
+
+    def close_measures(self, consume: bool):
+        for result in self._results:
+            result.close_measure(consume)
+
+class InstrumentedSession:
+    """
+    Session du driver dont chaque requête est mesurée (QueryMonitor). Les
+    résultats restent ceux du driver, enveloppés : le code des routes est inchangé.
+    """
+
+    def __init__(self, session, monitor: QueryMonitor):
+        self._session = session
+        self._monitor = monitor
+        self._tx = InstrumentedTransaction(session, monitor)
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # En cas d'exception le driver ne lit pas la fin des résultats : on ne la lit pas non plus
+        self._tx.close_measures(consume=exc_type is None)
+        return self._session.__exit__(exc_type, exc_value, traceback)
+
+    def run(self, query, parameters=None, **kwargs):
+        return self._tx.run(query, parameters, **kwargs)
+
+    def _work(self, work):
+        def instrumented_work(tx, *args, **kwargs):
+            tx = InstrumentedTransaction(tx, self._monitor)
+            try:
+                value = work(tx, *args, **kwargs)
+            except Exception:
+                tx.close_measures(consume=False)
+                raise
+            # Avant la validation : les résultats sont encore lisibles
+            tx.close_measures(consume=True)
+            return value
+        return instrumented_work
+
+    def execute_read(self, work, *args, **kwargs):
+        return self._session.execute_read(self._work(work), *args, **kwargs)
+
+    def execute_write(self, work, *args, **kwargs):
+        return self._session.execute_write(self._work(work), *args, **kwargs)
+
+    def close(self):
+        self._tx.close_measures(consume=True)
+        self._session.close()
+
+class InstrumentedDriver:
+    def __init__(self, driver, monitor: QueryMonitor):
+        self._driver = driver
+        self._monitor = monitor
+
+    def __getattr__(self, name):
+        return getattr(self._driver, name)
+
+    def session(self, **config):
+        return InstrumentedSession(self._driver.session(**config), self._monitor)
+
+class AsyncInstrumentedResult(InstrumentedResult):
+    async def __aiter__(self):
+        try:
+            async for record in self._result:
+                self._timer.rows += 1
+                yield record
+        except Exception:
+            self._timer.finish(failed=True)
+            raise
+        await self._read(None, _no_rows)
+
+    async def __anext__(self):
+        if self._iterator is None:
+            self._iterator = self.__aiter__()
+        return await self._iterator.__anext__()
+
+    async def _read(self, read, count=len):
+        try:
+            value = await read() if read else None
+            self._timer.rows += count(value)
+            summary = await self._result.consume()
+        except Exception:
+            self._timer.finish(failed=True)
+            raise
+        self._timer.finish(summary)
+        return value
+
+    async def single(self, strict: bool = False):
+        return await self._read(lambda: self._result.single(strict), _single_row)
+
+    async def data(self, *keys):
+        return await self._read(lambda: self._result.data(*keys))
+
+    async def values(self, *keys):
+        return await self._read(lambda: self._result.values(*keys))
+
+    async def value(self, key=0, default=None):
+        return await self._read(lambda: self._result.value(key, default))
+
+    async def fetch(self, n: int):
+        records = await self._result.fetch(n)
+        self._timer.rows += len(records)
+        return records
+
+    async def consume(self):
+        if self._timer.done:
+            return await self._result.consume()
+        return await self._read(self._result.consume, _no_rows)
+
+    async def close_measure(self, consume: bool):
+        if self._timer.done:
+            return
+        if not consume:
+            self._timer.finish()
+            return
+        try:
+            await self.consume()
+        except Exception:
+            pass
+
+class AsyncInstrumentedTransaction(InstrumentedTransaction):
+    async def run(self, query, parameters=None, **kwargs):
+        timer = self._monitor.start(query, parameters, kwargs)
+        try:
+            result = await self._tx.run(query, parameters, **kwargs)
+        except Exception:
+            timer.finish(failed=True)
+            raise
+        result = AsyncInstrumentedResult(result, timer)
+        self._results.append(result)
+        return result
+
+    async def close_measures(self, consume: bool):
+        for result in self._results:
+            await result.close_measure(consume)
+
+class AsyncInstrumentedSession:
+    def __init__(self, session, monitor: QueryMonitor):
+        self._session = session
+        self._monitor = monitor
+        self._tx = AsyncInstrumentedTransaction(session, monitor)
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self._tx.close_measures(consume=exc_type is None)
+        return await self._session.__aexit__(exc_type, exc_value, traceback)
+
+    async def run(self, query, parameters=None, **kwargs):
+        return await self._tx.run(query, parameters, **kwargs)
+
+    def _work(self, work):
+        async def instrumented_work(tx, *args, **kwargs):
+            tx = AsyncInstrumentedTransaction(tx, self._monitor)
+            try:
+                value = await work(tx, *args, **kwargs)
+            except Exception:
+                await tx.close_measures(consume=False)
+                raise
+            await tx.close_measures(consume=True)
+            return value
+        return instrumented_work
+
+    async def execute_read(self, work, *args, **kwargs):
+        return await self._session.execute_read(self._work(work), *args, **kwargs)
+
+    async def execute_write(self, work, *args, **kwargs):
+        return await self._session.execute_write(self._work(work), *args, **kwargs)
+
+    async def close(self):
+        await self._tx.close_measures(consume=True)
+        await self._session.close()
+
+class AsyncInstrumentedDriver(InstrumentedDriver):
+    def session(self, **config):
+        return AsyncInstrumentedSession(self._driver.session(**config), self._monitor)
+
 class Neo4jConnection:
     def __init__(self):
         self.uri = os.getenv("NEO4J_URI")
         self.username = os.getenv("NEO4J_USERNAME")
         self.password = os.getenv("NEO4J_PASSWORD")
+        # "sync" (défaut) ou "async" : en mode async les routers de routes/aio sont
+        # servis avec le driver asynchrone, le driver synchrone reste utilisé au démarrage
+        self.mode = os.getenv("NEO4J_DRIVER_MODE", "sync").lower()
         self.driver = None
+        self.async_driver = None
+        self.pool_config = pool_config_from_env()
+        self.pool_monitor = PoolMonitor("sync")
+        self.async_pool_monitor = PoolMonitor("async")
+        # Partagé par les deux drivers : une empreinte = une ligne, quel que soit le mode
+        self.query_monitor = QueryMonitor()
+
+    @property
+    def async_mode(self):
+        return self.mode == "async"
     
     def connect(self):
         try:
-            self.driver = GraphDatabase.driver(
+            driver = GraphDatabase.driver(
                 self.uri,
-                auth=(self.username, self.password)
+                auth=(self.username, self.password),
+                **self.pool_config
             )
+            self.pool_monitor.attach(driver)
+            self.driver = InstrumentedDriver(driver, self.query_monitor)
             with self.driver.session() as session:
                 result = session.run("RETURN 'Connected to Neo4j!' as message")
                 message = result.single()["message"]
@@ -26,9 +344,43 @@ class Neo4jConnection:
             print(f"❌ Erreur Neo4j: {e}")
             return False
     
+    async def connect_async(self):
+        try:
+            driver = AsyncGraphDatabase.driver(
+                self.uri,
+                auth=(self.username, self.password),
+                **self.pool_config
+            )
+            self.async_pool_monitor.attach(driver)
+            self.async_driver = AsyncInstrumentedDriver(driver, self.query_monitor)
+            async with self.async_driver.session() as session:
+                result = await session.run("RETURN 'Connected to Neo4j (async)!' as message")
+                record = await result.single()
+                print(f"✅ {record['message']}")
+            return True
+        except Exception as e:
+            print(f"❌ Erreur Neo4j (async): {e}")
+            return False
+
+    def pool_stats(self):
+        """Vue du pool : connexions utilisées/libres, attentes d'acquisition, créations/fermetures"""
+        stats = {"settings": self.pool_config, "pools": [self.pool_monitor.snapshot()]}
+        if self.async_driver:
+            stats["pools"].append(self.async_pool_monitor.snapshot())
+        return stats
+
+    def query_stats(self, limit: int = 10, sort: str = "total"):
+        """Requêtes Cypher les plus coûteuses, agrégées par empreinte"""
+        return {"slow_query_ms": self.query_monitor.slow_ms, "queries": self.query_monitor.top(limit, sort)}
+
     def close(self):
         if self.driver:
             self.driver.close()
             print("🔌 Connexion Neo4j fermée")
 
+    async def close_async(self):
+        if self.async_driver:
+            await self.async_driver.close()
+            print("🔌 Connexion Neo4j (async) fermée")
+
 neo4j_conn = Neo4jConnection()
@@ -0,0 +1,129 @@
+"""
+Statistiques du pool de connexions du driver Neo4j.
+
+Le driver n'expose pas de métriques de pool : on enveloppe les méthodes
+`acquire` et `opener` du pool interne (`driver._pool`) pour mesurer le temps
+d'attente d'une connexion et compter les connexions ouvertes. Si l'API interne
+change, le moniteur se désactive et /neo4j/pool l'indique.
+"""
+import inspect
+import threading
+import time
+
+from services import server_timing
+
+# Bornes (ms) de l'histogramme des temps d'acquisition
+WAIT_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+
+
+class PoolMonitor:
+    def __init__(self, name: str):
+        self.name = name
+        self.pool = None
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.acquisitions = 0
+            self.acquisition_failures = 0
+            self.wait_total_ms = 0.0
+            self.wait_max_ms = 0.0
+            self.wait_buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+            self.created = 0
+
+    def attach(self, driver) -> bool:
+        """Instrumenter le pool d'un driver (sync ou async)"""
+        pool = getattr(driver, "_pool", None)
+        if pool is None or not hasattr(pool, "acquire") or not hasattr(pool, "opener") or not hasattr(pool, "connections"):
+            self.pool = None
+            return False
+        self.pool = pool
+        pool.acquire = self._wrap(pool.acquire, self._record_acquisition)
+        pool.opener = self._wrap(pool.opener, self._record_creation)
+        return True
+
+    def _wrap(self, func, record):
+        if inspect.iscoroutinefunction(func):
+            async def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    result = await func(*args, **kwargs)
+                except Exception:
+                    record(start, failed=True)
+                    raise
+                record(start)
+                return result
+        else:
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    result = func(*args, **kwargs)
+                except Exception:
+                    record(start, failed=True)
+                    raise
+                record(start)
+                return result
+        return wrapper
+
+    def _record_acquisition(self, start: float, failed: bool = False):
+        wait_ms = (time.perf_counter() - start) * 1000
+        # Attente comprise dans la phase `db` de la requête en cours
+        server_timing.record("pool", wait_ms, exclusive=False)
+        with self._lock:
+            if failed:
+                self.acquisition_failures += 1
+                return
+            self.acquisitions += 1
+            self.wait_total_ms += wait_ms
+            self.wait_max_ms = max(self.wait_max_ms, wait_ms)
+            for i, bound in enumerate(WAIT_BUCKETS_MS):
+                if wait_ms <= bound:
+                    self.wait_buckets[i] += 1
+                    break
+            else:
+                self.wait_buckets[-1] += 1
+
+    def _record_creation(self, start: float, failed: bool = False):
+        if not failed:
+            with self._lock:
+                self.created += 1
+
+    def snapshot(self) -> dict:
+        if self.pool is None:
+            return {"name": self.name, "available": False}
+        in_use = idle = 0
+        for connections in list(self.pool.connections.values()):
+            for connection in list(connections):
+                if connection.in_use:
+                    in_use += 1
+                else:
+                    idle += 1
+        pool_config = getattr(self.pool, "pool_config", None)
+        workspace_config = getattr(self.pool, "workspace_config", None)
+        with self._lock:
+            labels = [f"<={bound}ms" for bound in WAIT_BUCKETS_MS] + [f">{WAIT_BUCKETS_MS[-1]}ms"]
+            return {
+                "name": self.name,
+                "available": True,
+                "config": {
+                    "max_connection_pool_size": getattr(pool_config, "max_connection_pool_size", None),
+                    "connection_acquisition_timeout": getattr(workspace_config, "connection_acquisition_timeout", None),
+                    "max_connection_lifetime": getattr(pool_config, "max_connection_lifetime", None),
+                    "connection_timeout": getattr(pool_config, "connection_timeout", None),
+                },
+                "connections": {
+                    "in_use": in_use,
+                    "idle": idle,
+                    "created": self.created,
+                    # Connexions ouvertes par le pool et qui n'y sont plus
+                    "closed": max(self.created - in_use - idle, 0),
+                },
+                "acquisition": {
+                    "count": self.acquisitions,
+                    "failures": self.acquisition_failures,
+                    "wait_avg_ms": self.wait_total_ms / self.acquisitions if self.acquisitions else 0.0,
+                    "wait_max_ms": self.wait_max_ms,
+                    "wait_histogram": dict(zip(labels, self.wait_buckets)),
+                },
+            }
@@ -0,0 +1,170 @@
+"""
+Statistiques des requêtes Cypher exécutées par l'API.
+
+Chaque requête passe par les sessions instrumentées de db/neo4j_conn.py, qui
+relèvent pour chaque exécution :
+- l'empreinte de la requête (texte normalisé, littéraux remplacés par `?`) ;
+- la forme des paramètres (types, jamais les valeurs) ;
+- la durée côté client, de `run()` à la lecture complète du résultat (ou à la
+  fermeture de la session / fin de transaction pour un résultat non lu) ;
+- les durées côté serveur du résumé (`result_available_after`,
+  `result_consumed_after`) ;
+- le nombre de lignes lues.
+Les mesures sont agrégées par empreinte ; une requête plus lente que
+SLOW_QUERY_MS est journalisée. GET /neo4j/queries renvoie les plus lentes.
+"""
+import functools
+import os
+import re
+import threading
+import time
+
+from services import server_timing
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "500"))
+# Nombre maximal d'empreintes suivies ; au-delà, les nouvelles sont regroupées
+QUERY_STATS_MAX = int(os.getenv("QUERY_STATS_MAX", "1000"))
+OTHER_QUERIES = "<autres requêtes>"
+# Formes de paramètres distinctes conservées par empreinte
+MAX_SHAPES = 5
+
+_STRING = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+_NUMBER = re.compile(r"(?<![\w$])\d+(?:\.\d+)?(?:[eE][+-]?\d+)?\b")
+_COMMENT = re.compile(r"//[^\n]*")
+_SPACES = re.compile(r"\s+")
+
+
+@functools.lru_cache(maxsize=4096)
+def fingerprint(query: str) -> str:
+    """Texte normalisé : commentaires retirés, littéraux remplacés, espaces réduits"""
+    text = _STRING.sub("?", query)
+    text = _COMMENT.sub(" ", text)
+    text = _NUMBER.sub("?", text)
+    return _SPACES.sub(" ", text).strip()
+
+
+def value_shape(value) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, (list, tuple)):
+        return f"list[{value_shape(value[0]) if value else ''}]"
+    if isinstance(value, dict):
+        return "map{" + ",".join(f"{key}:{value_shape(item)}" for key, item in sorted(value.items())) + "}"
+    return type(value).__name__
+
+
+def parameter_shapes(parameters) -> str:
+    return ", ".join(f"{name}: {value_shape(value)}" for name, value in sorted((parameters or {}).items()))
+
+
+class QueryStats:
+    __slots__ = ("count", "errors", "rows", "wall_total_ms", "wall_max_ms",
+                 "available_total_ms", "consumed_total_ms", "server_count", "shapes")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.rows = 0
+        self.wall_total_ms = 0.0
+        self.wall_max_ms = 0.0
+        self.available_total_ms = 0
+        self.consumed_total_ms = 0
+        self.server_count = 0
+        self.shapes = {}
+
+    def to_dict(self, query: str) -> dict:
+        return {
+            "query": query,
+            "count": self.count,
+            "errors": self.errors,
+            "total_ms": round(self.wall_total_ms, 3),
+            "mean_ms": round(self.wall_total_ms / self.count, 3),
+            "max_ms": round(self.wall_max_ms, 3),
+            # Durées serveur moyennes (ms), sur les exécutions dont le résumé est connu
+            "server_available_after_ms": self.available_total_ms / self.server_count if self.server_count else None,
+            "server_consumed_after_ms": self.consumed_total_ms / self.server_count if self.server_count else None,
+            "rows": self.rows,
+            "mean_rows": self.rows / self.count,
+            "parameter_shapes": sorted(self.shapes, key=self.shapes.get, reverse=True),
+        }
+
+
+class QueryTimer:
+    """Mesure d'une exécution, close une seule fois par `finish`"""
+    __slots__ = ("monitor", "query", "parameters", "start", "rows", "done")
+
+    def __init__(self, monitor, query: str, parameters: dict):
+        self.monitor = monitor
+        self.query = query
+        self.parameters = parameters
+        self.start = time.perf_counter()
+        self.rows = 0
+        self.done = False
+
+    def finish(self, summary=None, failed: bool = False):
+        if self.done:
+            return
+        self.done = True
+        wall_ms = (time.perf_counter() - self.start) * 1000
+        server_timing.record("db", wall_ms)
+        self.monitor.record(self.query, self.parameters, wall_ms, summary, self.rows, failed)
+
+
+SORT_KEYS = {
+    "total": lambda stats: stats.wall_total_ms,
+    "mean": lambda stats: stats.wall_total_ms / stats.count,
+    "max": lambda stats: stats.wall_max_ms,
+    "count": lambda stats: stats.count,
+}
+
+
+class QueryMonitor:
+    def __init__(self, slow_ms: float = SLOW_QUERY_MS, max_queries: int = QUERY_STATS_MAX):
+        self.slow_ms = slow_ms
+        self.max_queries = max_queries
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.stats = {}
+
+    def start(self, query, parameters=None, kwargs=None) -> QueryTimer:
+        if kwargs:
+            parameters = {**(parameters or {}), **kwargs}
+        # Un objet neo4j.Query porte son texte dans `text`
+        return QueryTimer(self, getattr(query, "text", query), parameters)
+
+    def record(self, query: str, parameters: dict, wall_ms: float, summary, rows: int, failed: bool = False):
+        key = fingerprint(query)
+        shapes = parameter_shapes(parameters)
+        available = getattr(summary, "result_available_after", None)
+        consumed = getattr(summary, "result_consumed_after", None)
+        with self._lock:
+            stats = self.stats.get(key)
+            if stats is None:
+                bucket = key if len(self.stats) < self.max_queries else OTHER_QUERIES
+                stats = self.stats.setdefault(bucket, QueryStats())
+            stats.count += 1
+            stats.errors += failed
+            stats.rows += rows
+            stats.wall_total_ms += wall_ms
+            stats.wall_max_ms = max(stats.wall_max_ms, wall_ms)
+            if available is not None and consumed is not None:
+                stats.server_count += 1
+                stats.available_total_ms += available
+                stats.consumed_total_ms += consumed
+            if shapes in stats.shapes or len(stats.shapes) < MAX_SHAPES:
+                stats.shapes[shapes] = stats.shapes.get(shapes, 0) + 1
+        if wall_ms >= self.slow_ms:
+            server = f", serveur {available} + {consumed} ms" if available is not None else ""
+            status = " (échec)" if failed else ""
+            print(f"🐢 Requête Cypher lente{status} : {wall_ms:.0f} ms{server}, {rows} lignes, "
+                  f"paramètres ({shapes}) : {key[:300]}")
+
+    def top(self, limit: int = 10, sort: str = "total"):
+        """Les `limit` empreintes les plus coûteuses selon `sort` (total, mean, max, count)"""
+        sort_key = SORT_KEYS[sort]
+        with self._lock:
+            ranked = sorted(self.stats.items(), key=lambda item: sort_key(item[1]), reverse=True)[:limit]
+            return [stats.to_dict(query) for query, stats in ranked]
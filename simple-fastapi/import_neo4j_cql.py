@@ -1,35 +1,419 @@
-from neo4j import GraphDatabase
+#!/usr/bin/env python3
+"""
+Import du jeu de données CQL (db/db-matrix.cql) dans Neo4j.
+
+Le script CQL est un unique CREATE dont les variables (TheMatrix, Keanu...) sont
+référencées d'un bout à l'autre : il ne peut donc pas être découpé en requêtes
+indépendantes. On l'analyse en nœuds et relations, puis on l'importe par lots :
+
+1. suppression des données existantes par tranches (--delete-batch-size)
+2. nœuds groupés par label, un lot = une transaction UNWIND ... MERGE
+3. relations groupées par type, un lot = une transaction UNWIND ... MERGE
+
+Les lots d'une même phase sont indépendants et s'exécutent sur un pool de workers.
+Chaque lot terminé est enregistré dans un fichier de reprise : après une erreur,
+relancer avec --resume pour ne rejouer que les lots manquants (les MERGE rendent
+un lot rejoué idempotent).
+
+La connexion utilise les mêmes variables d'environnement que db/neo4j_conn.py
+(NEO4J_URI, NEO4J_USERNAME, NEO4J_PASSWORD dans .env).
+"""
+import argparse
+import hashlib
+import json
+import os
 import re
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from db.neo4j_conn import neo4j_conn
+from services.schema import KEY_PROPERTIES, migrate, print_report
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CQL_PATH = os.path.join(BASE_DIR, "..", "db", "db-matrix.cql")
+DEFAULT_CHECKPOINT = os.path.join(BASE_DIR, ".import_checkpoint.json")
+
+IDENTIFIER = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+
+# ===== ANALYSE DU SCRIPT CQL =====
+
+class CypherScriptParser:
+    """Analyseur minimal pour les scripts CREATE (nœuds, relations, littéraux)"""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.pos = 0
+        self.nodes = {}
+        self.relationships = []
+
+    def parse(self):
+        while True:
+            self.skip()
+            if self.pos >= len(self.text):
+                break
+            if self.peek(";"):
+                self.pos += 1
+                continue
+            self.keyword("CREATE")
+            self.pattern()
+            while True:
+                self.skip()
+                if not self.peek(","):
+                    break
+                self.pos += 1
+                self.pattern()
+        # Le script référence parfois un nœud avant sa définition (ex. Parasite) :
+        # les références sont donc vérifiées une fois tout le script lu
+        for _, start, end, _ in self.relationships:
+            for variable in (start, end):
+                if variable not in self.nodes:
+                    raise ValueError(f"Variable '{variable}' utilisée mais jamais définie")
+        return self.nodes, self.relationships
+
+    # Lecture
+
+    def skip(self):
+        """Ignorer les espaces et les commentaires //"""
+        while self.pos < len(self.text):
+            if self.text[self.pos].isspace():
+                self.pos += 1
+            elif self.text.startswith("//", self.pos):
+                end = self.text.find("\n", self.pos)
+                self.pos = len(self.text) if end == -1 else end
+            else:
+                break
+
+    def peek(self, token: str) -> bool:
+        return self.text.startswith(token, self.pos)
+
+    def expect(self, token: str):
+        self.skip()
+        if not self.peek(token):
+            self.error(f"'{token}' attendu")
+        self.pos += len(token)
+
+    def keyword(self, word: str):
+        self.skip()
+        if self.text[self.pos:self.pos + len(word)].upper() != word:
+            self.error(f"{word} attendu")
+        self.pos += len(word)
+
+    def identifier(self) -> str:
+        self.skip()
+        match = IDENTIFIER.match(self.text, self.pos)
+        if not match:
+            self.error("identifiant attendu")
+        self.pos = match.end()
+        return match.group()
+
+    def error(self, message: str):
+        line = self.text.count("\n", 0, self.pos) + 1
+        raise ValueError(f"Ligne {line} : {message}")
+
+    # Motifs
+
+    def pattern(self):
+        start = self.node()
+        while True:
+            self.skip()
+            if not self.peek("-["):
+                return
+            self.pos += 2
+            self.expect(":")
+            rel_type = self.identifier()
+            self.skip()
+            props = self.map() if self.peek("{") else {}
+            self.expect("]->")
+            end = self.node()
+            self.relationships.append((rel_type, start, end, props))
+            start = end
+
+    def node(self) -> str:
+        self.expect("(")
+        variable = self.identifier()
+        self.skip()
+        if self.peek(":"):
+            self.pos += 1
+            label = self.identifier()
+            self.skip()
+            props = self.map() if self.peek("{") else {}
+            if variable in self.nodes:
+                self.error(f"variable '{variable}' déjà définie")
+            self.nodes[variable] = (label, props)
+        self.expect(")")
+        return variable
+
+    # Littéraux
+
+    def value(self):
+        self.skip()
+        char = self.text[self.pos:self.pos + 1]
+        if char in ("'", '"'):
+            return self.string(char)
+        if char == "[":
+            return self.list()
+        if char == "{":
+            return self.map()
+        match = re.compile(r"-?\d+(\.\d+)?([eE][-+]?\d+)?").match(self.text, self.pos)
+        if match:
+            self.pos = match.end()
+            return float(match.group()) if match.group(1) or match.group(2) else int(match.group())
+        word = self.identifier().lower()
+        if word in ("true", "false"):
+            return word == "true"
+        if word == "null":
+            return None
+        self.error(f"valeur inattendue '{word}'")
+
+    def string(self, quote: str) -> str:
+        self.pos += 1
+        chars = []
+        while self.pos < len(self.text):
+            char = self.text[self.pos]
+            if char == "\\":
+                chars.append(self.text[self.pos + 1])
+                self.pos += 2
+                continue
+            self.pos += 1
+            if char == quote:
+                return "".join(chars)
+            chars.append(char)
+        self.error("chaîne non terminée")
+
+    def list(self) -> list:
+        self.expect("[")
+        items = []
+        self.skip()
+        while not self.peek("]"):
+            items.append(self.value())
+            self.skip()
+            if self.peek(","):
+                self.pos += 1
+                self.skip()
+        self.pos += 1
+        return items
+
+    def map(self) -> dict:
+        self.expect("{")
+        result = {}
+        self.skip()
+        while not self.peek("}"):
+            key = self.identifier()
+            self.expect(":")
+            result[key] = self.value()
+            self.skip()
+            if self.peek(","):
+                self.pos += 1
+                self.skip()
+        self.pos += 1
+        return result
+
+
+def build_batches(nodes: dict, relationships: list, batch_size: int):
+    """Regrouper nœuds et relations en lots identifiés de façon stable (pour la reprise)"""
+    node_rows = defaultdict(list)
+    for variable, (label, props) in nodes.items():
+        key = KEY_PROPERTIES.get(label)
+        if not key or key not in props:
+            raise ValueError(f"Nœud '{variable}' : propriété clé '{key}' manquante pour le label {label}")
+        node_rows[label].append({"key": props[key], "props": props})
+
+    rel_rows = defaultdict(list)
+    for rel_type, start, end, props in relationships:
+        start_label, start_props = nodes[start]
+        end_label, end_props = nodes[end]
+        group = (rel_type, start_label, end_label)
+        rel_rows[group].append({
+            "start": start_props[KEY_PROPERTIES[start_label]],
+            "end": end_props[KEY_PROPERTIES[end_label]],
+            "props": props,
+        })
+
+    node_batches = []
+    for label, rows in sorted(node_rows.items()):
+        query = f"UNWIND $rows AS row MERGE (n:{label} {{{KEY_PROPERTIES[label]}: row.key}}) SET n += row.props"
+        for i in range(0, len(rows), batch_size):
+            node_batches.append((f"nodes:{label}:{i // batch_size}", query, rows[i:i + batch_size]))
+
+    rel_batches = []
+    for (rel_type, start_label, end_label), rows in sorted(rel_rows.items()):
+        query = (
+            f"UNWIND $rows AS row "
+            f"MATCH (a:{start_label} {{{KEY_PROPERTIES[start_label]}: row.start}}) "
+            f"MATCH (b:{end_label} {{{KEY_PROPERTIES[end_label]}: row.end}}) "
+            f"MERGE (a)-[r:{rel_type}]->(b) SET r += row.props"
+        )
+        for i in range(0, len(rows), batch_size):
+            rel_batches.append((f"rels:{rel_type}:{start_label}:{end_label}:{i // batch_size}", query, rows[i:i + batch_size]))
+    return node_batches, rel_batches
+
+
+# ===== REPRISE =====
+
+class Checkpoint:
+    def __init__(self, path: str, source_hash: str):
+        self.path = path
+        self.source_hash = source_hash
+        self.deleted = False
+        self.done = set()
+        self._lock = threading.Lock()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("source") != self.source_hash:
+            raise SystemExit("❌ Le fichier de reprise ne correspond pas à ce script CQL, relancez sans --resume")
+        self.deleted = data.get("deleted", False)
+        self.done = set(data.get("done", []))
+        return True
+
+    def mark(self, batch_id: str = None, deleted: bool = None):
+        with self._lock:
+            if batch_id:
+                self.done.add(batch_id)
+            if deleted is not None:
+                self.deleted = deleted
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"source": self.source_hash, "deleted": self.deleted, "done": sorted(self.done)}, f)
+            os.replace(tmp_path, self.path)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+# ===== IMPORT =====
+
+class Progress:
+    def __init__(self, phase: str, total_batches: int, total_rows: int):
+        self.phase = phase
+        self.total_batches = total_batches
+        self.total_rows = total_rows
+        self.batches = 0
+        self.rows = 0
+        self.start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def advance(self, rows: int):
+        with self._lock:
+            self.batches += 1
+            self.rows += rows
+            elapsed = time.perf_counter() - self.start
+            rate = self.rows / elapsed if elapsed else 0
+            print(f"  [{self.phase}] lot {self.batches}/{self.total_batches} "
+                  f"- {self.rows}/{self.total_rows} lignes - {rate:.0f} lignes/s")
+
+
+def delete_all(driver, database, chunk_size: int):
+    """Vider la base par tranches pour ne pas tout supprimer dans une seule transaction"""
+    deleted_total = 0
+    start = time.perf_counter()
+    with driver.session(database=database) as session:
+        while True:
+            deleted = session.execute_write(
+                lambda tx: tx.run(
+                    "MATCH (n) WITH n LIMIT $limit DETACH DELETE n RETURN count(*) AS deleted",
+                    limit=chunk_size,
+                ).single()["deleted"]
+            )
+            if not deleted:
+                break
+            deleted_total += deleted
+            elapsed = time.perf_counter() - start
+            print(f"  [suppression] {deleted_total} nœuds supprimés - {deleted_total / elapsed:.0f} nœuds/s")
+    return deleted_total
+
+
+def run_batches(driver, database, phase, batches, checkpoint, workers):
+    pending = [batch for batch in batches if batch[0] not in checkpoint.done]
+    skipped = len(batches) - len(pending)
+    if skipped:
+        print(f"  [{phase}] {skipped} lot(s) déjà importé(s), ignoré(s)")
+    progress = Progress(phase, len(pending), sum(len(rows) for _, _, rows in pending))
+
+    def run_batch(batch):
+        batch_id, query, rows = batch
+        with driver.session(database=database) as session:
+            session.execute_write(lambda tx: tx.run(query, rows=rows).consume())
+        checkpoint.mark(batch_id)
+        progress.advance(len(rows))
+        return batch_id
+
+    errors = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(run_batch, batch): batch[0] for batch in pending}
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                errors.append(futures[future])
+                print(f"❌ Erreur sur le lot {futures[future]} : {e}")
+    return progress.rows, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import parallèle et reprenable d'un script CQL dans Neo4j")
+    parser.add_argument("--file", default=DEFAULT_CQL_PATH, help="script CQL à importer")
+    parser.add_argument("--database", default=os.getenv("NEO4J_DATABASE"), help="base cible (défaut : base par défaut du serveur)")
+    parser.add_argument("--batch-size", type=int, default=1000, help="lignes par transaction")
+    parser.add_argument("--delete-batch-size", type=int, default=10000, help="nœuds supprimés par transaction")
+    parser.add_argument("--workers", type=int, default=4, help="lots importés en parallèle")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT, help="fichier de reprise")
+    parser.add_argument("--resume", action="store_true", help="reprendre un import interrompu")
+    parser.add_argument("--keep-existing", action="store_true", help="ne pas vider la base avant l'import")
+    args = parser.parse_args()
+
+    with open(args.file, encoding="utf-8") as f:
+        cql_script = f.read()
+    nodes, relationships = CypherScriptParser(cql_script).parse()
+    node_batches, rel_batches = build_batches(nodes, relationships, args.batch_size)
+    print(f"Script analysé : {len(nodes)} nœuds, {len(relationships)} relations, "
+          f"{len(node_batches) + len(rel_batches)} lots")
+
+    checkpoint = Checkpoint(args.checkpoint, hashlib.sha256(cql_script.encode("utf-8")).hexdigest())
+    if args.resume:
+        if checkpoint.load():
+            print(f"Reprise : {len(checkpoint.done)} lot(s) déjà importé(s)")
+    else:
+        checkpoint.clear()
+
+    if not neo4j_conn.connect():
+        sys.exit(1)
+    driver = neo4j_conn.driver
+    start = time.perf_counter()
+    try:
+        if not args.keep_existing and not checkpoint.deleted:
+            print("Suppression de toutes les données existantes...")
+            delete_all(driver, args.database, args.delete_batch_size)
+            checkpoint.mark(deleted=True)
+        # Contraintes d'unicité sur les propriétés clés, sans quoi chaque MERGE parcourt tout le label
+        print_report(migrate(driver, args.database))
+
+        print("Import des nœuds...")
+        node_rows, errors = run_batches(driver, args.database, "nœuds", node_batches, checkpoint, args.workers)
+        if errors:
+            sys.exit(f"❌ {len(errors)} lot(s) de nœuds en erreur, relancez avec --resume")
+
+        print("Import des relations...")
+        rel_rows, errors = run_batches(driver, args.database, "relations", rel_batches, checkpoint, args.workers)
+        if errors:
+            sys.exit(f"❌ {len(errors)} lot(s) de relations en erreur, relancez avec --resume")
+    finally:
+        neo4j_conn.close()
+
+    elapsed = time.perf_counter() - start
+    total = node_rows + rel_rows
+    checkpoint.clear()
+    print(f"Import terminé ! {node_rows} nœuds et {rel_rows} relations en {elapsed:.1f}s "
+          f"({total / elapsed if elapsed else 0:.0f} lignes/s)")
+
 
-# Paramètres de connexion Neo4j Aura (à adapter si besoin)
-uri = "neo4j+s://9bd559cc.databases.neo4j.io"
-user = "neo4j"
-password = "puc8nLkO7aB9uiv_yjQkAJ43cu9yzBsGwf4zvJ-3QL8"
-database = "neo4j"  # optionnel, par défaut 'neo4j'
-
-# Chemin relatif au script CQL (adapter si besoin)
-cql_path = "../db/db-matrix.cql"
-
-# Lecture du script CQL
-with open(cql_path, encoding="utf-8") as f:
-    cql_script = f.read()
-
-# Découpage en requêtes individuelles (par point-virgule, mais en gardant les blocs multi-lignes)
-# Sépare sur les points-virgules qui sont suivis d'un retour à la ligne et d'un CREATE ou d'un commentaire ou de la fin du fichier
-pattern = r";\s*(?=CREATE|//|#|$)"
-queries = [q.strip() for q in re.split(pattern, cql_script, flags=re.MULTILINE) if q.strip()]
-
-driver = GraphDatabase.driver(uri, auth=(user, password))
-
-with driver.session(database=database) as session:
-    # Suppression de toutes les données existantes
-    print("Suppression de toutes les données existantes...")
-    session.run("MATCH (n) DETACH DELETE n")
-    print("Base vidée. Import des nouvelles données...")
-    for query in queries:
-        try:
-            session.run(query)
-        except Exception as e:
-            print(f"Erreur lors de l'exécution d'une requête : {e}\nRequête : {query[:100]}...")
-
-print("Import terminé !")
+if __name__ == "__main__":
+    main()
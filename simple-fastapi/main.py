@@ -1,28 +1,87 @@
 from fastapi import FastAPI, Depends
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from db.neo4j_conn import neo4j_conn
-from fastapi.responses import RedirectResponse
+from db.query_monitor import SORT_KEYS
+from repositories import STORAGE_BACKEND, STORAGE_SNAPSHOT, memory_graph
+from services.fuzzy_index import load_movie_titles, load_person_names
+from services.schema import SCHEMA_MIGRATE_ON_STARTUP, migrate_on_startup
+from services.recommendations import load_recommendations
+from services.rating_similarity import rating_similarity
+from services.user_feed import user_feeds
+from services.graph_snapshot import graph_snapshot
+from services.stats_counters import STATS_RECONCILE_INTERVAL, reconcile_stats
+from services.metrics import MetricsMiddleware, request_metrics
+from services.server_timing import ServerTimingMiddleware
+from services import profiler
+from services.profiler import PROFILE_MAX_SECONDS
+from fastapi.responses import JSONResponse, PlainTextResponse, RedirectResponse
 from fastapi.security import OAuth2PasswordRequestForm
 from pydantic import BaseModel
-
-# Importer les routers modulaires
-from routes.movies import router as movies_router
-from routes.persons import router as persons_router
-from routes.users import router as users_router
-from routes.reviews import router as reviews_router
-from routes.stats import router as stats_router
-from routes.users import login as users_login
-from routes.users import register as users_register
-from routes.watchlists import router as watchlists_router
+import asyncio
+import inspect
+
+# Importer les routers modulaires (versions async si NEO4J_DRIVER_MODE=async ;
+# le stockage en mémoire est servi par les routers synchrones)
+NEO4J_ASYNC = neo4j_conn.async_mode and STORAGE_BACKEND == "neo4j"
+if NEO4J_ASYNC:
+    from routes.aio import movies, persons, users, reviews, stats, watchlists, export
+else:
+    from routes import movies, persons, users, reviews, stats, watchlists, export
+movies_router = movies.router
+persons_router = persons.router
+users_router = users.router
+reviews_router = reviews.router
+stats_router = stats.router
+watchlists_router = watchlists.router
+export_router = export.router
+users_login = users.login
+users_register = users.register
+
+async def reconcile_stats_periodically(interval: float):
+    """Corriger périodiquement la dérive des compteurs de /stats"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_in_threadpool(reconcile_stats)
+        except Exception as e:
+            print(f"⚠️ Réconciliation des statistiques impossible : {e}")
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    print("🔗 Connexion à Neo4j...")
-    neo4j_conn.connect()
+    if STORAGE_BACKEND == "memory":
+        print(f"📦 Chargement de l'instantané {STORAGE_SNAPSHOT}...")
+        ready = memory_graph.load_snapshot(STORAGE_SNAPSHOT)
+    else:
+        print("🔗 Connexion à Neo4j...")
+        ready = neo4j_conn.connect()
+        if ready and SCHEMA_MIGRATE_ON_STARTUP:
+            migrate_on_startup(neo4j_conn.driver)
+    if ready:
+        load_movie_titles()
+        load_person_names()
+        load_recommendations()
+        reconcile_stats()
+        # Similarités de notes calculées en tâche de fond
+        rating_similarity.start()
+        user_feeds.start()
+        graph_snapshot.start()
+    if NEO4J_ASYNC:
+        await neo4j_conn.connect_async()
+    reconcile_task = None
+    if STATS_RECONCILE_INTERVAL > 0:
+        reconcile_task = asyncio.create_task(reconcile_stats_periodically(STATS_RECONCILE_INTERVAL))
     yield
     # Shutdown
+    if reconcile_task:
+        reconcile_task.cancel()
+    rating_similarity.stop()
+    user_feeds.stop()
+    graph_snapshot.stop()
+    if NEO4J_ASYNC:
+        await neo4j_conn.close_async()
     neo4j_conn.close()
 
 # Créer l'application FastAPI
@@ -32,6 +91,23 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Stockage en mémoire : catalogue en lecture seule, les écritures sont refusées avant les routes
+READ_ONLY_POSTS = {"/movies/batch"}
+
+class ReadOnlyMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in ("GET", "HEAD", "OPTIONS") or scope["path"] in READ_ONLY_POSTS:
+            await self.app(scope, receive, send)
+            return
+        response = JSONResponse({"status": "error", "message": "Stockage en mémoire en lecture seule"}, status_code=405)
+        await response(scope, receive, send)
+
+if STORAGE_BACKEND == "memory":
+    app.add_middleware(ReadOnlyMiddleware)
+
 # Configuration CORS pour permettre la communication avec le front-end
 app.add_middleware(
     CORSMiddleware,
@@ -39,7 +115,11 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Last-Modified", "X-Next-Cursor", "Server-Timing"],
 )
+app.add_middleware(ServerTimingMiddleware)
+# Ajouté en dernier : middleware le plus externe, il mesure aussi le CORS
+app.add_middleware(MetricsMiddleware)
 
 # Routes de base
 @app.get("/")
@@ -68,6 +148,43 @@ def test_neo4j():
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Métriques HTTP au format texte Prometheus"""
+    return PlainTextResponse(request_metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/neo4j/pool", dependencies=[Depends(movies.verify_admin)])
+def neo4j_pool_stats():
+    """Statistiques du pool de connexions Neo4j (admin uniquement)"""
+    return {"status": "success", **neo4j_conn.pool_stats()}
+
+@app.get("/neo4j/queries", dependencies=[Depends(movies.verify_admin)])
+def neo4j_query_stats(limit: int = 10, sort: str = "total"):
+    """Requêtes Cypher les plus coûteuses, tri par durée totale, moyenne, maximale ou nombre (admin uniquement)"""
+    if sort not in SORT_KEYS:
+        return {"status": "error", "message": f"Tri inconnu : {sort} (valeurs : {', '.join(SORT_KEYS)})"}
+    return {"status": "success", **neo4j_conn.query_stats(max(1, min(limit, 100)), sort)}
+
+@app.get("/profile", dependencies=[Depends(movies.verify_admin)])
+def sampling_profile(seconds: float = 10, interval_ms: float = 5, top: int = 20, format: str = "json", idle: bool = False):
+    """Profil statistique de tous les threads pendant `seconds` secondes (admin uniquement)"""
+    if format not in ("json", "collapsed"):
+        return {"status": "error", "message": "format doit valoir json ou collapsed"}
+    if seconds <= 0 or seconds > PROFILE_MAX_SECONDS:
+        return {"status": "error", "message": f"seconds doit être compris entre 0 et {PROFILE_MAX_SECONDS:g}"}
+    try:
+        stacks = profiler.profile(seconds, max(interval_ms, 1) / 1000, include_idle=idle)
+    except profiler.ProfilerBusy as e:
+        return {"status": "error", "message": str(e)}
+    if format == "collapsed":
+        return PlainTextResponse(profiler.collapsed(stacks))
+    return {
+        "status": "success",
+        "samples": sum(stacks.values()),
+        "top_functions": profiler.top_functions(stacks, max(1, min(top, 100))),
+        "collapsed": profiler.collapsed(stacks),
+    }
+
 # Inclusion des routers modulaires
 app.include_router(movies_router, prefix="/movies", tags=["movies"])
 app.include_router(persons_router, prefix="/persons", tags=["persons"])
@@ -75,6 +192,7 @@ app.include_router(users_router, prefix="/users", tags=["users"])
 app.include_router(reviews_router, prefix="/reviews", tags=["reviews"])
 app.include_router(stats_router, prefix="/stats", tags=["stats"])
 app.include_router(watchlists_router, prefix="/watchlists", tags=["watchlists"])
+app.include_router(export_router, prefix="/export", tags=["export"])
 
 # Correction FastAPI : redirection /movies vers /movies/
 @app.get("/movies", include_in_schema=False)
@@ -108,10 +226,16 @@ def redirect_stats():
 def redirect_recommend_similar_movies(title: str, limit: int = 10):
     return RedirectResponse(url=f"/movies/recommend/movies/similar/{title}?limit={limit}")
 
+async def call_handler(handler, *args):
+    """Appeler un handler de router, qu'il soit sync (threadpool) ou async"""
+    if inspect.iscoroutinefunction(handler):
+        return await handler(*args)
+    return await run_in_threadpool(handler, *args)
+
 # Correction FastAPI : proxy POST /login vers la fonction login du module users
 @app.post("/login", include_in_schema=False)
-def proxy_login(form_data: OAuth2PasswordRequestForm = Depends()):
-    return users_login(form_data)
+async def proxy_login(form_data: OAuth2PasswordRequestForm = Depends()):
+    return await call_handler(users_login, form_data)
 
 # Correction FastAPI : proxy POST /register vers la fonction register du module users
 class UserRegisterProxy(BaseModel):
@@ -120,8 +244,8 @@ class UserRegisterProxy(BaseModel):
     role: str = "user"
 
 @app.post("/register", include_in_schema=False)
-def proxy_register(user: UserRegisterProxy):
-    return users_register(user)
+async def proxy_register(user: UserRegisterProxy):
+    return await call_handler(users_register, user)
 
 @app.get("/watchlists", include_in_schema=False)
 def redirect_watchlists():
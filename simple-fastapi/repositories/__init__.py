@@ -0,0 +1,31 @@
+"""
+Couche d'accès aux données : les lectures des routes et des chargements du
+démarrage passent par `repositories`, dont le backend est choisi par
+STORAGE_BACKEND :
+- `neo4j` (défaut) : requêtes Cypher sur la connexion db.neo4j_conn ;
+- `memory` : catalogue en lecture seule chargé au démarrage depuis l'instantané
+  NDJSON STORAGE_SNAPSHOT (format de GET /export), sans Neo4j.
+"""
+import os
+
+from db.neo4j_conn import neo4j_conn
+from repositories.base import Repositories
+from repositories.memory import MemoryGraph, memory_repositories
+from repositories.neo4j import neo4j_repositories
+
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "neo4j").lower()
+STORAGE_SNAPSHOT = os.getenv("STORAGE_SNAPSHOT", "")
+STORAGE_BACKENDS = ("neo4j", "memory")
+
+memory_graph = MemoryGraph()
+
+
+def create_repositories(backend: str) -> Repositories:
+    if backend == "memory":
+        return memory_repositories(memory_graph)
+    if backend == "neo4j":
+        return neo4j_repositories(neo4j_conn)
+    raise ValueError(f"STORAGE_BACKEND inconnu : {backend} (valeurs : {', '.join(STORAGE_BACKENDS)})")
+
+
+repositories = create_repositories(STORAGE_BACKEND)
@@ -0,0 +1,147 @@
+"""
+Interfaces des dépôts : lectures du catalogue utilisées par les routes et par
+les chargements du démarrage.
+
+Chaque backend (repositories.neo4j, repositories.memory) implémente ces
+classes avec le même contrat ; test_repositories.py vérifie les deux. Les
+lignes renvoyées sont des dicts aux clés des réponses de l'API. Les listes
+paginées prennent le curseur opaque de services.pagination et lèvent
+InvalidCursor s'il n'est pas valide.
+"""
+from abc import ABC, abstractmethod
+from typing import Iterable, List, Optional, Tuple
+
+
+class MovieRepository(ABC):
+    @abstractmethod
+    def count(self) -> int:
+        ...
+
+    @abstractmethod
+    def credit_counts(self) -> dict:
+        """Nombre de liens par type : {"acted_in", "directed", "produced"}"""
+
+    @abstractmethod
+    def latest(self) -> Optional[dict]:
+        """Premier film par date de sortie décroissante : {title, released}"""
+
+    @abstractmethod
+    def titles(self) -> Iterable[Tuple[str, Optional[int]]]:
+        """(titre, année) de tous les films"""
+
+    @abstractmethod
+    def credits(self) -> Iterable[Tuple[str, Optional[int], List[str]]]:
+        """(titre, année, noms crédités) de tous les films, un nom par lien"""
+
+    @abstractmethod
+    def page(self, limit: int, skip: int = 0, cursor: Optional[str] = None) -> List[dict]:
+        """{title, released, tagline} triés par (released DESC, title), sans date en premier"""
+
+    @abstractmethod
+    def rows(self, titles: List[str]) -> List[dict]:
+        """{title, released, tagline} des titres existants"""
+
+    @abstractmethod
+    def details(self, titles: List[str]) -> List[dict]:
+        """Films existants avec actors [{name, roles}], directors et producers"""
+
+    @abstractmethod
+    def actors(self, title: str) -> List[dict]:
+        """Acteurs du film {name, roles} triés par nom"""
+
+    @abstractmethod
+    def search(self, text: str, limit: int) -> List[dict]:
+        """Titres contenant `text` (sans casse) par date de sortie décroissante"""
+
+    @abstractmethod
+    def similar(self, title: str, limit: int) -> List[dict]:
+        """Films qui partagent des personnes avec `title` : {title, released, score}"""
+
+
+class PersonRepository(ABC):
+    @abstractmethod
+    def count(self) -> int:
+        ...
+
+    @abstractmethod
+    def names(self) -> Iterable[str]:
+        ...
+
+    @abstractmethod
+    def credits(self) -> Iterable[Tuple[str, str]]:
+        """(nom, titre) de tous les liens ACTED_IN, DIRECTED et PRODUCED"""
+
+    @abstractmethod
+    def page(self, limit: int, skip: int = 0, cursor: Optional[str] = None) -> List[dict]:
+        """{name, born} triés par nom"""
+
+    @abstractmethod
+    def details(self, name: str) -> Optional[dict]:
+        """{name, born, acted_in [{movie, roles}], directed, produced}, None si absente"""
+
+    @abstractmethod
+    def movies(self, name: str) -> List[dict]:
+        """Films joués {title, released, roles} par date de sortie décroissante"""
+
+    @abstractmethod
+    def collaborations(self, name1: str, name2: str) -> List[str]:
+        """Titres des films où les deux personnes ont joué"""
+
+
+class UserRepository(ABC):
+    @abstractmethod
+    def role(self, username: str) -> Optional[str]:
+        """Rôle enregistré, None si l'utilisateur ou son rôle est absent"""
+
+    @abstractmethod
+    def history(self, username: str) -> Tuple[dict, set]:
+        """({titre: note}, {titres enregistrés dans ses watchlists})"""
+
+
+class ReviewRepository(ABC):
+    @abstractmethod
+    def for_movie(self, title: str) -> List[dict]:
+        """{username, rating, comment, created_at} du plus récent au plus ancien"""
+
+    @abstractmethod
+    def ratings(self) -> Iterable[Tuple[str, str, int]]:
+        """(utilisateur, titre, note) de toutes les notes"""
+
+    @abstractmethod
+    def popular(self, min_average: float, limit: int) -> List[str]:
+        """Titres par nombre de notes puis moyenne décroissants (moyenne >= min_average)"""
+
+
+class WatchlistRepository(ABC):
+    @abstractmethod
+    def for_user(self, username: str) -> List[dict]:
+        """Watchlists de l'utilisateur avec movie_count, de la plus récente à la plus ancienne"""
+
+    @abstractmethod
+    def get(self, watchlist_id: str) -> Optional[dict]:
+        """{id, name, description, is_public, created_at, username (propriétaire)}"""
+
+    @abstractmethod
+    def movies(self, watchlist_id: str) -> List[dict]:
+        """{title, released, tagline} triés par titre"""
+
+    @abstractmethod
+    def public_page(self, limit: int, skip: int = 0, cursor: Optional[str] = None) -> List[dict]:
+        """Watchlists publiques avec movie_count et username, triées par (created_at DESC, id)"""
+
+    @abstractmethod
+    def containing(self, username: str, title: str) -> List[dict]:
+        """{id, name} des watchlists de l'utilisateur qui contiennent le film"""
+
+
+class Repositories:
+    """Dépôts d'un même backend"""
+
+    def __init__(self, backend: str, movies: MovieRepository, persons: PersonRepository, users: UserRepository,
+                 reviews: ReviewRepository, watchlists: WatchlistRepository):
+        self.backend = backend
+        self.movies = movies
+        self.persons = persons
+        self.users = users
+        self.reviews = reviews
+        self.watchlists = watchlists
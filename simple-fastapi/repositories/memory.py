@@ -0,0 +1,348 @@
+"""
+Dépôts en mémoire : le catalogue est chargé d'un instantané et servi sans Neo4j.
+
+L'instantané est un fichier NDJSON (éventuellement gzip) au format de
+GET /export?ratings=true&watchlists=true : une ligne par film (avec ses
+crédits), personne, note et watchlist publique. Des lignes
+`{"type": "user", "username": ..., "role": ...}` peuvent y être ajoutées pour
+les rôles ; une ligne watchlist peut porter `is_public: false`.
+
+`MemoryGraph` range les nœuds dans des dictionnaires indexés par clé et les
+liens dans des listes d'adjacence dans les deux sens ; les listes paginées
+sont pré-triées à la fin du chargement et reprises après le curseur par
+recherche dichotomique. Les tris et filtres reproduisent ceux des requêtes
+Cypher de repositories.neo4j (dates absentes en premier en ordre décroissant).
+Le backend est en lecture seule : les routes d'écriture restent servies par Neo4j.
+"""
+import gzip
+import json
+from collections import Counter, defaultdict
+
+from repositories.base import (
+    MovieRepository,
+    PersonRepository,
+    Repositories,
+    ReviewRepository,
+    UserRepository,
+    WatchlistRepository,
+)
+from services.pagination import decode_cursor
+
+
+def _descending(released):
+    """Clé de tri de released DESC : valeurs absentes en premier, comme Neo4j"""
+    return (0, 0) if released is None else (1, -released)
+
+
+def _newest_first(text):
+    """Clé de tri (avec reverse=True) de created_at DESC : valeurs absentes en premier, comme Neo4j"""
+    return (text is None, text or "")
+
+
+def _first(rows: list, keep) -> int:
+    """Indice de la première ligne qui vérifie `keep`, prédicat monotone sur l'ordre de `rows`"""
+    lo, hi = 0, len(rows)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if keep(rows[mid]):
+            hi = mid
+        else:
+            lo = mid + 1
+    return lo
+
+
+class MemoryGraph:
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.movies = {}                       # titre -> {title, released, tagline}
+        self.persons = {}                      # nom -> {name, born}
+        self.users = {}                        # utilisateur -> rôle
+        self.acted_in = defaultdict(dict)      # titre -> {nom: rôles}
+        self.directed = defaultdict(list)      # titre -> [noms]
+        self.produced = defaultdict(list)
+        self.person_acted = defaultdict(dict)  # nom -> {titre: rôles}
+        self.person_directed = defaultdict(list)
+        self.person_produced = defaultdict(list)
+        self.ratings = defaultdict(dict)       # titre -> {utilisateur: avis}
+        self.user_ratings = defaultdict(dict)  # utilisateur -> {titre: note}
+        self.watchlists = {}                   # id -> watchlist, avec owner et movies
+        self.user_watchlists = defaultdict(list)
+        self.movies_order = []
+        self.persons_order = []
+        self.public_order = []
+
+    def __len__(self):
+        return len(self.movies)
+
+    # Chargement
+
+    def load(self, records):
+        """Remplacer le contenu par des lignes au format de l'export (au démarrage, avant les lectures)"""
+        self.clear()
+        credits = []
+        for record in records:
+            kind = record.get("type")
+            if kind == "movie":
+                self.movies[record["title"]] = {key: record.get(key) for key in ("title", "released", "tagline")}
+                credits.append(record)
+            elif kind == "person":
+                self.persons[record["name"]] = {"name": record["name"], "born": record.get("born")}
+            elif kind == "user":
+                self.users[record["username"]] = record.get("role")
+            elif kind == "rating":
+                self._add_rating(record)
+            elif kind == "watchlist":
+                self._add_watchlist(record)
+        # Les crédits, notes et contenus ne sont liés qu'aux nœuds présents, comme les MATCH de l'import
+        for record in credits:
+            self._add_credits(record)
+        self._drop_dangling()
+        self._sort()
+
+    def load_snapshot(self, path: str) -> bool:
+        try:
+            opener = gzip.open if path.endswith(".gz") else open
+            with opener(path, "rt", encoding="utf-8") as lines:
+                self.load(json.loads(line) for line in lines if line.strip())
+        except Exception as e:
+            print(f"❌ Instantané {path} illisible : {e}")
+            return False
+        print(f"✅ Instantané chargé : {len(self.movies)} films, {len(self.persons)} personnes, "
+              f"{sum(map(len, self.ratings.values()))} notes, {len(self.watchlists)} watchlists")
+        return True
+
+    def _add_credits(self, movie: dict):
+        title = movie["title"]
+        for actor in movie.get("actors") or []:
+            if actor.get("name") in self.persons:
+                self.acted_in[title][actor["name"]] = actor.get("roles")
+                self.person_acted[actor["name"]][title] = actor.get("roles")
+        for relation, by_movie, by_person in (("directors", self.directed, self.person_directed),
+                                              ("producers", self.produced, self.person_produced)):
+            for name in movie.get(relation) or []:
+                if name in self.persons:
+                    by_movie[title].append(name)
+                    by_person[name].append(title)
+
+    def _add_rating(self, record: dict):
+        username = record["username"]
+        self.users.setdefault(username, None)
+        self.ratings[record["movie_title"]][username] = {
+            "username": username, "rating": record.get("rating"),
+            "comment": record.get("comment"), "created_at": record.get("created_at"),
+        }
+        self.user_ratings[username][record["movie_title"]] = record.get("rating")
+
+    def _add_watchlist(self, record: dict):
+        owner = record.get("username")
+        if owner is not None:
+            self.users.setdefault(owner, None)
+            self.user_watchlists[owner].append(record["id"])
+        self.watchlists[record["id"]] = {
+            "id": record["id"], "name": record.get("name"), "description": record.get("description"),
+            "is_public": record.get("is_public", True), "created_at": record.get("created_at"),
+            "owner": owner, "movies": list(dict.fromkeys(record.get("movies") or [])),
+        }
+
+    def _drop_dangling(self):
+        for title in [title for title in self.ratings if title not in self.movies]:
+            for username in self.ratings.pop(title):
+                del self.user_ratings[username][title]
+        for watchlist in self.watchlists.values():
+            watchlist["movies"] = [title for title in watchlist["movies"] if title in self.movies]
+
+    def _sort(self):
+        self.movies_order = sorted(self.movies.values(), key=lambda m: (_descending(m["released"]), m["title"]))
+        self.persons_order = sorted(self.persons.values(), key=lambda p: p["name"])
+        public = sorted((w for w in self.watchlists.values() if w["is_public"]), key=lambda w: w["id"])
+        self.public_order = sorted(public, key=lambda w: _newest_first(w["created_at"]), reverse=True)
+
+    # Lignes au format des réponses
+
+    def movie_row(self, title: str) -> dict:
+        return dict(self.movies[title])
+
+    def credited(self, title: str) -> list:
+        return list(self.acted_in.get(title, ())) + self.directed.get(title, []) + self.produced.get(title, [])
+
+    def watchlist_row(self, watchlist: dict, **extra) -> dict:
+        row = {key: watchlist[key] for key in ("id", "name", "description", "is_public", "created_at")}
+        return {**row, **extra}
+
+
+class MemoryRepository:
+    def __init__(self, graph: MemoryGraph):
+        self.graph = graph
+
+
+class MemoryMovieRepository(MemoryRepository, MovieRepository):
+    def count(self):
+        return len(self.graph.movies)
+
+    def credit_counts(self):
+        graph = self.graph
+        return {"acted_in": sum(map(len, graph.acted_in.values())),
+                "directed": sum(map(len, graph.directed.values())),
+                "produced": sum(map(len, graph.produced.values()))}
+
+    def latest(self):
+        if not self.graph.movies_order:
+            return None
+        movie = self.graph.movies_order[0]
+        return {"title": movie["title"], "released": movie["released"]}
+
+    def titles(self):
+        return [(title, movie["released"]) for title, movie in self.graph.movies.items()]
+
+    def credits(self):
+        return [(title, movie["released"], self.graph.credited(title)) for title, movie in self.graph.movies.items()]
+
+    def page(self, limit, skip=0, cursor=None):
+        order = self.graph.movies_order
+        start = 0
+        if cursor:
+            released, title = decode_cursor(cursor, "movies", 2)
+            if released is None:
+                start = _first(order, lambda m: m["released"] is not None or m["title"] > title)
+            else:
+                start = _first(order, lambda m: m["released"] is not None and m["released"] <= released
+                               and (m["released"] < released or m["title"] > title))
+        return [dict(movie) for movie in order[start + skip:start + skip + limit]]
+
+    def rows(self, titles):
+        return [self.graph.movie_row(title) for title in titles if title in self.graph.movies]
+
+    def details(self, titles):
+        graph = self.graph
+        return [{**graph.movie_row(title),
+                 "actors": [{"name": name, "roles": roles} for name, roles in graph.acted_in.get(title, {}).items()],
+                 "directors": list(graph.directed.get(title, ())),
+                 "producers": list(graph.produced.get(title, ()))}
+                for title in titles if title in graph.movies]
+
+    def actors(self, title):
+        return [{"name": name, "roles": roles} for name, roles in sorted(self.graph.acted_in.get(title, {}).items())]
+
+    def search(self, text, limit):
+        text = text.lower()
+        matches = [movie for movie in self.graph.movies_order if text in movie["title"].lower()]
+        return [dict(movie) for movie in matches[:limit]]
+
+    def similar(self, title, limit):
+        graph = self.graph
+        scores = Counter()
+        for name in graph.credited(title):
+            scores.update(other for other in (list(graph.person_acted.get(name, ())) + graph.person_directed.get(name, [])
+                                              + graph.person_produced.get(name, [])) if other != title)
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], _descending(graph.movies[item[0]]["released"])))
+        return [{"title": other, "released": graph.movies[other]["released"], "score": score}
+                for other, score in ranked[:limit]]
+
+
+class MemoryPersonRepository(MemoryRepository, PersonRepository):
+    def count(self):
+        return len(self.graph.persons)
+
+    def names(self):
+        return list(self.graph.persons)
+
+    def credits(self):
+        graph = self.graph
+        return [(name, title) for title in graph.movies for name in graph.credited(title)]
+
+    def page(self, limit, skip=0, cursor=None):
+        order = self.graph.persons_order
+        start = 0
+        if cursor:
+            (name,) = decode_cursor(cursor, "persons", 1)
+            start = _first(order, lambda p: p["name"] > name)
+        return [dict(person) for person in order[start + skip:start + skip + limit]]
+
+    def details(self, name):
+        graph = self.graph
+        if name not in graph.persons:
+            return None
+        return {**graph.persons[name],
+                "acted_in": [{"movie": title, "roles": roles} for title, roles in graph.person_acted.get(name, {}).items()],
+                "directed": list(graph.person_directed.get(name, ())),
+                "produced": list(graph.person_produced.get(name, ()))}
+
+    def movies(self, name):
+        graph = self.graph
+        rows = [{"title": title, "released": graph.movies[title]["released"], "roles": roles}
+                for title, roles in graph.person_acted.get(name, {}).items()]
+        return sorted(rows, key=lambda row: _descending(row["released"]))
+
+    def collaborations(self, name1, name2):
+        other = self.graph.person_acted.get(name2, {})
+        return [title for title in self.graph.person_acted.get(name1, {}) if title in other]
+
+
+class MemoryUserRepository(MemoryRepository, UserRepository):
+    def role(self, username):
+        return self.graph.users.get(username)
+
+    def history(self, username):
+        graph = self.graph
+        if username not in graph.users:
+            return {}, set()
+        saved = {title for watchlist_id in graph.user_watchlists.get(username, ())
+                 for title in graph.watchlists[watchlist_id]["movies"]}
+        return dict(graph.user_ratings.get(username, {})), saved
+
+
+class MemoryReviewRepository(MemoryRepository, ReviewRepository):
+    def for_movie(self, title):
+        reviews = [dict(review) for review in self.graph.ratings.get(title, {}).values()]
+        return sorted(reviews, key=lambda review: _newest_first(review["created_at"]), reverse=True)
+
+    def ratings(self):
+        return [(username, title, rating) for username, rated in self.graph.user_ratings.items()
+                for title, rating in rated.items()]
+
+    def popular(self, min_average, limit):
+        stats = []
+        for title, reviews in self.graph.ratings.items():
+            average = sum(review["rating"] for review in reviews.values()) / len(reviews)
+            if average >= min_average:
+                stats.append((-len(reviews), -average, title))
+        return [title for _, _, title in sorted(stats)[:limit]]
+
+
+class MemoryWatchlistRepository(MemoryRepository, WatchlistRepository):
+    def for_user(self, username):
+        graph = self.graph
+        rows = [graph.watchlist_row(graph.watchlists[watchlist_id], movie_count=len(graph.watchlists[watchlist_id]["movies"]))
+                for watchlist_id in graph.user_watchlists.get(username, ())]
+        return sorted(rows, key=lambda row: _newest_first(row["created_at"]), reverse=True)
+
+    def get(self, watchlist_id):
+        watchlist = self.graph.watchlists.get(watchlist_id)
+        return self.graph.watchlist_row(watchlist, username=watchlist["owner"]) if watchlist else None
+
+    def movies(self, watchlist_id):
+        watchlist = self.graph.watchlists.get(watchlist_id)
+        return [self.graph.movie_row(title) for title in sorted(watchlist["movies"])] if watchlist else []
+
+    def public_page(self, limit, skip=0, cursor=None):
+        order = self.graph.public_order
+        start = 0
+        if cursor:
+            created_at, watchlist_id = decode_cursor(cursor, "watchlists", 2)
+            start = _first(order, lambda w: w["created_at"] is not None and w["created_at"] <= created_at
+                           and (w["created_at"] < created_at or w["id"] > watchlist_id))
+        return [self.graph.watchlist_row(watchlist, movie_count=len(watchlist["movies"]), username=watchlist["owner"])
+                for watchlist in order[start + skip:start + skip + limit]]
+
+    def containing(self, username, title):
+        graph = self.graph
+        return [{"id": watchlist_id, "name": graph.watchlists[watchlist_id]["name"]}
+                for watchlist_id in graph.user_watchlists.get(username, ())
+                if title in graph.watchlists[watchlist_id]["movies"]]
+
+
+def memory_repositories(graph: MemoryGraph) -> Repositories:
+    return Repositories("memory", MemoryMovieRepository(graph), MemoryPersonRepository(graph),
+                        MemoryUserRepository(graph), MemoryReviewRepository(graph), MemoryWatchlistRepository(graph))
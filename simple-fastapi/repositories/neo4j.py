@@ -0,0 +1,256 @@
+"""
+Dépôts servis par Neo4j (backend par défaut), avec le driver synchrone de la connexion.
+
+Les requêtes reprises par les routes asynchrones (routes/aio) et par le
+substitut des benchmarks sont exposées comme constantes.
+"""
+from typing import List, Optional
+
+from repositories.base import (
+    MovieRepository,
+    PersonRepository,
+    Repositories,
+    ReviewRepository,
+    UserRepository,
+    WatchlistRepository,
+)
+from services.pagination import movies_page_query, persons_page_query, public_watchlists_page_query
+
+COUNT_QUERIES = {
+    "movies": "MATCH (m:Movie) RETURN count(m) as count",
+    "persons": "MATCH (p:Person) RETURN count(p) as count",
+    "acted_in": "MATCH ()-[r:ACTED_IN]->() RETURN count(r) as count",
+    "directed": "MATCH ()-[r:DIRECTED]->() RETURN count(r) as count",
+    "produced": "MATCH ()-[r:PRODUCED]->() RETURN count(r) as count",
+}
+
+LATEST_MOVIE_QUERY = """
+    MATCH (m:Movie)
+    RETURN m.title as title, m.released as released
+    ORDER BY m.released DESC
+    LIMIT 1
+"""
+
+# Détails de plusieurs films en une requête ; les compréhensions de motifs évitent
+# le produit cartésien de trois OPTIONAL MATCH
+MOVIES_DETAILS_CYPHER = """
+UNWIND $titles AS title
+MATCH (m:Movie {title: title})
+RETURN m.title as title, m.released as released, m.tagline as tagline,
+       [(p:Person)-[r:ACTED_IN]->(m) | {name: p.name, roles: r.roles}] as actors,
+       [(d:Person)-[:DIRECTED]->(m) | d.name] as directors,
+       [(prod:Person)-[:PRODUCED]->(m) | prod.name] as producers
+"""
+
+SIMILAR_MOVIES_CYPHER = """
+MATCH (m:Movie {title: $title})<-[:ACTED_IN|:DIRECTED|:PRODUCED]-(p:Person)-[:ACTED_IN|:DIRECTED|:PRODUCED]->(rec:Movie)
+WHERE rec.title <> m.title
+RETURN rec.title AS title, rec.released AS released, count(*) AS score
+ORDER BY score DESC, rec.released DESC
+LIMIT $limit
+"""
+
+ROLE_QUERY = "MATCH (u:User {username: $username}) RETURN u.role as role"
+
+USER_HISTORY_QUERY = """
+    MATCH (u:User {username: $username})
+    OPTIONAL MATCH (u)-[r:RATED]->(rated:Movie)
+    WITH u, collect({title: rated.title, rating: r.rating}) as rated
+    OPTIONAL MATCH (u)-[:OWNS]->(:Watchlist)-[:CONTAINS]->(saved:Movie)
+    RETURN rated, collect(DISTINCT saved.title) as saved
+"""
+
+POPULAR_MOVIES_QUERY = """
+    MATCH (:User)-[r:RATED]->(m:Movie)
+    WITH m, count(r) as ratings, avg(r.rating) as average
+    WHERE average >= $min_average
+    RETURN m.title as title
+    ORDER BY ratings DESC, average DESC, title
+    LIMIT $limit
+"""
+
+
+class Neo4jRepository:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def _rows(self, cypher: str, **params) -> List[dict]:
+        with self.conn.driver.session() as session:
+            return [dict(record) for record in session.run(cypher, **params)]
+
+    def _single(self, cypher: str, **params) -> Optional[dict]:
+        with self.conn.driver.session() as session:
+            record = session.run(cypher, **params).single()
+        return dict(record) if record else None
+
+
+class Neo4jMovieRepository(Neo4jRepository, MovieRepository):
+    def count(self):
+        return self._single(COUNT_QUERIES["movies"])["count"]
+
+    def credit_counts(self):
+        return {key: self._single(COUNT_QUERIES[key])["count"] for key in ("acted_in", "directed", "produced")}
+
+    def latest(self):
+        return self._single(LATEST_MOVIE_QUERY)
+
+    def titles(self):
+        rows = self._rows("MATCH (m:Movie) RETURN m.title as title, m.released as released")
+        return [(row["title"], row["released"]) for row in rows if row["title"]]
+
+    def credits(self):
+        rows = self._rows("""
+            MATCH (m:Movie)
+            OPTIONAL MATCH (m)<-[:ACTED_IN|DIRECTED|PRODUCED]-(p:Person)
+            RETURN m.title as title, m.released as released, collect(p.name) as credited
+        """)
+        return [(row["title"], row["released"], row["credited"]) for row in rows if row["title"]]
+
+    def page(self, limit, skip=0, cursor=None):
+        cypher, params = movies_page_query(cursor)
+        return self._rows(cypher, skip=skip, limit=limit, **params)
+
+    def rows(self, titles):
+        return self._rows("""
+            UNWIND $titles AS t
+            MATCH (m:Movie {title: t})
+            RETURN m.title as title, m.released as released, m.tagline as tagline
+        """, titles=titles)
+
+    def details(self, titles):
+        return self._rows(MOVIES_DETAILS_CYPHER, titles=titles) if titles else []
+
+    def actors(self, title):
+        return self._rows("""
+            MATCH (p:Person)-[r:ACTED_IN]->(m:Movie {title: $title})
+            RETURN p.name as name, r.roles as roles
+            ORDER BY name
+        """, title=title)
+
+    def search(self, text, limit):
+        return self._rows("""
+            MATCH (m:Movie)
+            WHERE toLower(m.title) CONTAINS toLower($search)
+            RETURN m.title as title, m.released as released, m.tagline as tagline
+            ORDER BY m.released DESC
+            LIMIT $limit
+        """, search=text, limit=limit)
+
+    def similar(self, title, limit):
+        return self._rows(SIMILAR_MOVIES_CYPHER, title=title, limit=limit)
+
+
+class Neo4jPersonRepository(Neo4jRepository, PersonRepository):
+    def count(self):
+        return self._single(COUNT_QUERIES["persons"])["count"]
+
+    def names(self):
+        return [row["name"] for row in self._rows("MATCH (p:Person) RETURN p.name as name") if row["name"]]
+
+    def credits(self):
+        rows = self._rows("""
+            MATCH (p:Person)-[:ACTED_IN|DIRECTED|PRODUCED]->(m:Movie)
+            RETURN p.name as name, m.title as title
+        """)
+        return [(row["name"], row["title"]) for row in rows if row["name"] and row["title"]]
+
+    def page(self, limit, skip=0, cursor=None):
+        cypher, params = persons_page_query(cursor)
+        return self._rows(cypher, skip=skip, limit=limit, **params)
+
+    def details(self, name):
+        return self._single("""
+            MATCH (p:Person {name: $name})
+            RETURN p.name as name, p.born as born,
+                   [(p)-[r:ACTED_IN]->(m:Movie) | {movie: m.title, roles: r.roles}] as acted_in,
+                   [(p)-[:DIRECTED]->(m:Movie) | m.title] as directed,
+                   [(p)-[:PRODUCED]->(m:Movie) | m.title] as produced
+        """, name=name)
+
+    def movies(self, name):
+        return self._rows("""
+            MATCH (p:Person {name: $name})-[r:ACTED_IN]->(m:Movie)
+            RETURN m.title as title, m.released as released, r.roles as roles
+            ORDER BY m.released DESC
+        """, name=name)
+
+    def collaborations(self, name1, name2):
+        rows = self._rows("""
+            MATCH (p1:Person {name: $person1})-[:ACTED_IN]->(m:Movie)<-[:ACTED_IN]-(p2:Person {name: $person2})
+            RETURN m.title as title
+        """, person1=name1, person2=name2)
+        return [row["title"] for row in rows]
+
+
+class Neo4jUserRepository(Neo4jRepository, UserRepository):
+    def role(self, username):
+        record = self._single(ROLE_QUERY, username=username)
+        return record["role"] if record else None
+
+    def history(self, username):
+        record = self._single(USER_HISTORY_QUERY, username=username)
+        if not record:
+            return {}, set()
+        rated = {item["title"]: item["rating"] for item in record["rated"] if item["title"]}
+        return rated, set(record["saved"])
+
+
+class Neo4jReviewRepository(Neo4jRepository, ReviewRepository):
+    def for_movie(self, title):
+        return self._rows("""
+            MATCH (u:User)-[r:RATED]->(m:Movie {title: $movie_title})
+            RETURN u.username as username, r.rating as rating, r.comment as comment, r.created_at as created_at
+            ORDER BY r.created_at DESC
+        """, movie_title=title)
+
+    def ratings(self):
+        rows = self._rows("""
+            MATCH (u:User)-[r:RATED]->(m:Movie)
+            RETURN u.username as username, m.title as title, r.rating as rating
+        """)
+        return [(row["username"], row["title"], row["rating"]) for row in rows]
+
+    def popular(self, min_average, limit):
+        return [row["title"] for row in self._rows(POPULAR_MOVIES_QUERY, min_average=min_average, limit=limit)]
+
+
+class Neo4jWatchlistRepository(Neo4jRepository, WatchlistRepository):
+    def for_user(self, username):
+        return self._rows("""
+            MATCH (u:User {username: $username})-[:OWNS]->(w:Watchlist)
+            OPTIONAL MATCH (w)-[:CONTAINS]->(m:Movie)
+            RETURN w.id as id, w.name as name, w.description as description,
+                   w.is_public as is_public, w.created_at as created_at,
+                   count(m) as movie_count
+            ORDER BY w.created_at DESC
+        """, username=username)
+
+    def get(self, watchlist_id):
+        return self._single("""
+            MATCH (w:Watchlist {id: $watchlist_id})
+            OPTIONAL MATCH (owner:User)-[:OWNS]->(w)
+            RETURN w.id as id, w.name as name, w.description as description,
+                   w.is_public as is_public, w.created_at as created_at, owner.username as username
+        """, watchlist_id=watchlist_id)
+
+    def movies(self, watchlist_id):
+        return self._rows("""
+            MATCH (w:Watchlist {id: $watchlist_id})-[:CONTAINS]->(m:Movie)
+            RETURN m.title as title, m.released as released, m.tagline as tagline
+            ORDER BY m.title
+        """, watchlist_id=watchlist_id)
+
+    def public_page(self, limit, skip=0, cursor=None):
+        cypher, params = public_watchlists_page_query(cursor)
+        return self._rows(cypher, skip=skip, limit=limit, **params)
+
+    def containing(self, username, title):
+        return self._rows("""
+            MATCH (u:User {username: $username})-[:OWNS]->(w:Watchlist)-[:CONTAINS]->(m:Movie {title: $movie_title})
+            RETURN w.id as id, w.name as name
+        """, username=username, movie_title=title)
+
+
+def neo4j_repositories(conn) -> Repositories:
+    return Repositories("neo4j", Neo4jMovieRepository(conn), Neo4jPersonRepository(conn),
+                        Neo4jUserRepository(conn), Neo4jReviewRepository(conn), Neo4jWatchlistRepository(conn))
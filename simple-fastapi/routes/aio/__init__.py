@@ -0,0 +1 @@
+# Versions async des routers (NEO4J_DRIVER_MODE=async)
@@ -0,0 +1,43 @@
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from db.neo4j_conn import neo4j_conn
+from repositories.neo4j import ROLE_QUERY
+from services.auth import (
+    decode_payload,
+    role_cache,
+    role_from_claim,
+    security,
+)
+from services.server_timing import phase
+
+# Dépendances d'authentification (async : exécutées sur la boucle d'événements,
+# sans occuper de thread du threadpool). Même résolution du rôle que
+# services.auth : claim du token, puis cache, puis Neo4j.
+
+async def decode_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    with phase("auth"):
+        return decode_payload(credentials.credentials)
+
+async def verify_token(payload: dict = Depends(decode_token)):
+    return payload["sub"]
+
+async def resolve_role(payload: dict) -> str:
+    with phase("auth"):
+        role = role_from_claim(payload)
+        if role is not None:
+            return role
+        username = payload["sub"]
+        role = role_cache.get(username)
+        if role is not None:
+            return role
+        async with neo4j_conn.async_driver.session() as session:
+            result = await session.run(ROLE_QUERY, username=username)
+            record = await result.single()
+        role = record["role"] if record else None
+        role_cache.set(username, role)
+        return role or ""
+
+async def verify_admin(payload: dict = Depends(decode_token)):
+    if await resolve_role(payload) != "admin":
+        raise HTTPException(status_code=403, detail="Admin privileges required")
+    return payload["sub"]
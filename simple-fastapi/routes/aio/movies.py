@@ -0,0 +1,349 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from db.neo4j_conn import neo4j_conn
+from neo4j.exceptions import ConstraintError
+from services.fuzzy_index import movie_titles
+from services.stats_counters import db_stats
+from services.http_cache import bump, cached_response
+from services.pagination import InvalidCursor, movies_page_query, next_cursor
+from services.recommendations import movie_recommendations
+from services.graph_snapshot import graph_snapshot
+from services.rating_similarity import rating_similarity
+from services.user_feed import user_feeds
+from services.bulk_ingest import NdjsonBatcher
+from typing import Optional
+from routes.aio.dependencies import verify_admin
+from repositories.neo4j import MOVIES_DETAILS_CYPHER, SIMILAR_MOVIES_CYPHER
+from routes.movies import (
+    ADD_ACTOR_CYPHER,
+    BULK_CREATE_CYPHER,
+    CREATE_MOVIE_CYPHER,
+    DELETE_MOVIE_CYPHER,
+    MAX_BATCH_TITLES,
+    UPDATE_MOVIE_CYPHER,
+    MovieBatchIn,
+    batch_results,
+    clean_credits,
+    index_credited_persons,
+    record_bulk_write,
+    record_movie_write,
+    resolve_batch,
+    validate_bulk_movie,
+)
+from services.server_timing import TimedRoute
+
+router = APIRouter(route_class=TimedRoute)
+
+async def create_movie_tx(tx, title, released, tagline, directors, producers, actors):
+    result = await tx.run(CREATE_MOVIE_CYPHER, title=title, released=released, tagline=tagline,
+                          directors=directors, producers=producers, actors=actors)
+    record = await result.single()
+    if not record:
+        return None
+    return dict(record, persons=(await result.consume()).counters.nodes_created - 1)
+
+async def update_movie_tx(tx, title, properties, directors=None, producers=None, actors=None):
+    result = await tx.run(UPDATE_MOVIE_CYPHER, title=title, properties=properties,
+                          directors=directors, producers=producers, actors=actors)
+    record = await result.single()
+    if not record:
+        return None
+    return dict(record, persons=(await result.consume()).counters.nodes_created)
+
+async def bulk_create_tx(tx, movies):
+    result = await tx.run(BULK_CREATE_CYPHER, movies=movies)
+    records = [dict(record) async for record in result]
+    return records, (await result.consume()).counters.nodes_created
+
+# ===== MOVIES ROUTES (async) =====
+
+@router.get("/")
+@cached_response("movies")
+async def get_all_movies(limit: int = 20, skip: int = 0, cursor: Optional[str] = None):
+    try:
+        cypher, params = movies_page_query(cursor)
+        async with neo4j_conn.async_driver.session() as session:
+            result = await session.run(cypher, skip=skip, limit=limit, **params)
+            movies = await result.data()
+        return {"status": "success", "movies": movies, "count": len(movies),
+                "next_cursor": next_cursor(movies, limit, "movies", "released", "title")}
+    except InvalidCursor as e:
+        return {"status": "error", "message": str(e)}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+@router.post("/bulk", dependencies=[Depends(verify_admin)])
+async def bulk_create_movies(request: Request, username: str = Depends(verify_admin)):
+    """Import NDJSON (un film par ligne), écrit par lots de BULK_BATCH_SIZE ; rapport ligne par ligne"""
+    batcher = NdjsonBatcher(validate_bulk_movie)
+
+    async def apply(batches):
+        for batch in batches:
+            try:
+                async with neo4j_conn.async_driver.session() as session:
+                    records, nodes_created = await session.execute_write(bulk_create_tx, [movie for _, movie in batch])
+            except Exception as e:
+                batcher.batch_failed(batch, str(e))
+                continue
+            batcher.batch_written(batch, record_bulk_write(batch, records, nodes_created))
+
+    async for chunk in request.stream():
+        await apply(batcher.feed(chunk))
+    await apply(batcher.finish())
+    bump("movies", "persons")
+    return batcher.report()
+
+@router.post("/batch")
+async def get_movies_batch(batch: MovieBatchIn):
+    """Détails (acteurs, réalisateurs, producteurs) de plusieurs films en un seul appel"""
+    if len(batch.titles) > MAX_BATCH_TITLES:
+        return {"status": "error", "message": f"{MAX_BATCH_TITLES} titres au maximum par requête"}
+    try:
+        matches, titles = resolve_batch(batch.titles)
+        records = []
+        if titles:
+            async with neo4j_conn.async_driver.session() as session:
+                result = await session.run(MOVIES_DETAILS_CYPHER, titles=titles)
+                records = [record async for record in result]
+        return batch_results(batch.titles, matches, records)
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+@router.get("/search")
+async def search_movies(q: str, limit: int = 10, fuzzy: bool = True):
+    try:
+        async with neo4j_conn.async_driver.session() as session:
+            if fuzzy:
+                matches = movie_titles.search(q)
+                # Même tri que la version Cypher : similarité puis année de sortie
+                matches.sort(key=lambda m: (-m[1], -(m[2].get("released") or 0)))
+                matches = matches[:limit]
+                similarities = {key: score for key, score, _ in matches}
+                result = await session.run('''
+                    UNWIND $titles AS t
+                    MATCH (m:Movie {title: t})
+                    RETURN m.title as title, m.released as released, m.tagline as tagline
+                ''', titles=list(similarities))
+                movies = [dict(record, similarity=similarities[record["title"]]) for record in await result.data()]
+                movies.sort(key=lambda m: (-m["similarity"], -(m["released"] or 0)))
+            else:
+                result = await session.run('''
+                    MATCH (m:Movie)
+                    WHERE toLower(m.title) CONTAINS toLower($search)
+                    RETURN m.title as title, m.released as released, m.tagline as tagline
+                    ORDER BY m.released DESC
+                    LIMIT $limit
+                ''', search=q, limit=limit)
+                movies = await result.data()
+        return {"status": "success", "movies": movies, "query": q, "count": len(movies)}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+@router.get("/search/movies")
+async def search_movies_alias(q: str, limit: int = 10, fuzzy: bool = True):
+    return await search_movies(q=q, limit=limit, fuzzy=fuzzy)
+
+@router.get("/recommend/similar/{title}")
+async def recommend_similar_movies(title: str, limit: int = 5):
+    try:
+        match = movie_titles.best_match(title)
+        if not match:
+            return {"status": "success", "recommendations": [], "base_title": title}
+        if movie_recommendations.loaded:
+            movies = movie_recommendations.similar(match[0], limit)
+        else:
+            async with neo4j_conn.async_driver.session() as session:
+                result = await session.run(SIMILAR_MOVIES_CYPHER, title=match[0], limit=limit)
+                movies = await result.data()
+        return {"status": "success", "recommendations": movies, "base_title": title}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+@router.get("/recommend/movies/similar/{title}")
+async def recommend_similar_movies_alias(title: str, limit: int = 5):
+    return await recommend_similar_movies(title=title, limit=limit)
+
+@router.get("/recommend/also-liked/{title}")
+async def recommend_also_liked(title: str, limit: int = 5):
+    """Films bien notés par les utilisateurs qui ont aimé ce film (similarité des notes)"""
+    try:
+        if not rating_similarity.loaded:
+            return {"status": "error", "message": "Recommandations en cours de calcul"}
+        match = movie_titles.best_match(title)
+        if not match:
+            return {"status": "success", "recommendations": [], "base_title": title}
+        return {"status": "success", "recommendations": rating_similarity.similar(match[0], limit), "base_title": title}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+# Routes à segment fixe déclarées au-dessus : /{title} capturerait « search »
+@router.get("/{title}")
+@cached_response("movies")
+async def get_movie_by_title(title: str):
+    try:
+        match = movie_titles.best_match(title)
+        if not match:
+            return {"status": "error", "message": "Film non trouvé"}
+        matched_title, similarity = match
+        async with neo4j_conn.async_driver.session() as session:
+            cypher = '''
+            MATCH (m:Movie {title: $title})
+            OPTIONAL MATCH (p:Person)-[r:ACTED_IN]->(m)
+            OPTIONAL MATCH (d:Person)-[:DIRECTED]->(m)
+            OPTIONAL MATCH (prod:Person)-[:PRODUCED]->(m)
+            RETURN m.title as title, m.released as released, m.tagline as tagline,
+                   collect(DISTINCT {name: p.name, roles: r.roles}) as actors,
+                   collect(DISTINCT d.name) as directors,
+                   collect(DISTINCT prod.name) as producers
+            '''
+            result = await session.run(cypher, title=matched_title)
+            record = await result.single()
+            if not record or not record["title"]:
+                return {"status": "error", "message": "Film non trouvé"}
+            return {
+                "status": "success",
+                "title": record["title"],
+                "released": record["released"],
+                "tagline": record["tagline"],
+                "actors": [a for a in record["actors"] if a["name"]],
+                "directors": [d for d in record["directors"] if d],
+                "producers": [p for p in record["producers"] if p],
+                "similarity": similarity
+            }
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+@router.post("", dependencies=[Depends(verify_admin)])
+async def create_movie(movie_data: dict, username: str = Depends(verify_admin)):
+    try:
+        title = movie_data.get("title")
+        released = movie_data.get("released")
+        tagline = movie_data.get("tagline", "")
+        if not title or not released:
+            return {"status": "error", "message": "Titre et année de sortie requis"}
+        directors, producers, actors = clean_credits(movie_data)
+        async with neo4j_conn.async_driver.session() as session:
+            created = await session.execute_write(create_movie_tx, title, released, tagline, directors, producers, actors)
+        if not created:
+            return {"status": "error", "message": "Film déjà existant"}
+        movie_titles.add(title, released=released)
+        record_movie_write(created, created=True)
+        bump("movies", "persons")
+        index_credited_persons(directors, producers, actors)
+        return {"status": "success", "message": f"Film '{title}' créé avec succès avec toutes ses relations"}
+    except ConstraintError:
+        # Création concurrente du même titre, refusée par la contrainte d'unicité
+        return {"status": "error", "message": "Film déjà existant"}
+    except HTTPException as e:
+        if e.status_code == 403:
+            return {"status": "error", "message": "Vous n'avez pas les accès nécessaires pour cette opération."}
+        raise
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+@router.put("/{title}", dependencies=[Depends(verify_admin)])
+async def update_movie(title: str, movie_data: dict, username: str = Depends(verify_admin)):
+    try:
+        properties = {key: movie_data[key] for key in ("released", "tagline") if key in movie_data}
+        directors, producers, actors = clean_credits(movie_data)
+        async with neo4j_conn.async_driver.session() as session:
+            updated = await session.execute_write(
+                update_movie_tx, title, properties,
+                directors=directors if "directors" in movie_data else None,
+                producers=producers if "producers" in movie_data else None,
+                actors=actors if "actors" in movie_data else None,
+            )
+        if not updated:
+            return {"status": "error", "message": "Film non trouvé"}
+        if "released" in movie_data:
+            movie_titles.update(title, released=movie_data["released"])
+        record_movie_write(updated, created=False)
+        bump("movies", "persons")
+        index_credited_persons(directors, producers, actors)
+        return {"status": "success", "message": f"Film '{title}' mis à jour avec succès avec toutes ses relations"}
+    except HTTPException as e:
+        if e.status_code == 403:
+            return {"status": "error", "message": "Vous n'avez pas les accès nécessaires pour cette opération."}
+        raise
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+@router.delete("/{title}", dependencies=[Depends(verify_admin)])
+async def delete_movie(title: str, username: str = Depends(verify_admin)):
+    try:
+        async with neo4j_conn.async_driver.session() as session:
+            deleted = await (await session.run(DELETE_MOVIE_CYPHER, title=title)).single()
+        if not deleted:
+            return {"status": "error", "message": "Film non trouvé"}
+        movie_titles.remove(title)
+        db_stats.apply(movies=-1, directed=-deleted["directed"], produced=-deleted["produced"],
+                       acted_in=-deleted["acted_in"])
+        db_stats.movie_removed(title)
+        movie_recommendations.remove_movie(title)
+        graph_snapshot.mark_dirty()
+        rating_similarity.remove_movie(title)
+        user_feeds.remove_movie(title)
+        # DETACH DELETE retire aussi les avis et les entrées de watchlists
+        bump("movies", "persons", "reviews", "watchlists")
+        return {"status": "success", "message": f"Film '{title}' supprimé avec succès"}
+    except HTTPException as e:
+        if e.status_code == 403:
+            return {"status": "error", "message": "Vous n'avez pas les accès nécessaires pour cette opération."}
+        raise
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+@router.post("/{movie_title}/actors", dependencies=[Depends(verify_admin)])
+async def add_actor_to_movie(movie_title: str, actor_data: dict, username: str = Depends(verify_admin)):
+    try:
+        actor_name = actor_data.get("name")
+        roles = actor_data.get("roles", [])
+        if not actor_name:
+            return {"status": "error", "message": "Nom de l'acteur requis"}
+        async with neo4j_conn.async_driver.session() as session:
+            movie_exists = await (await session.run("MATCH (m:Movie {title: $title}) RETURN m", title=movie_title)).single()
+            person_exists = await (await session.run("MATCH (p:Person {name: $name}) RETURN p", name=actor_name)).single()
+            if not movie_exists:
+                return {"status": "error", "message": "Film non trouvé"}
+            if not person_exists:
+                return {"status": "error", "message": "Acteur non trouvé"}
+            result = await session.run(ADD_ACTOR_CYPHER, actor_name=actor_name, movie_title=movie_title, roles=roles)
+            record = await result.single()
+            summary = await result.consume()
+        db_stats.apply(acted_in=summary.counters.relationships_created)
+        movie_recommendations.set_movie(movie_title, record["released"], record["credited"])
+        graph_snapshot.mark_dirty()
+        bump("movies", "persons")
+        return {"status": "success", "message": f"Acteur '{actor_name}' ajouté au film '{movie_title}'"}
+    except HTTPException as e:
+        if e.status_code == 403:
+            return {"status": "error", "message": "Vous n'avez pas les accès nécessaires pour cette opération."}
+        raise
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+@router.get("/{title}/actors")
+async def get_actors_by_movie(title: str):
+    try:
+        match = movie_titles.best_match(title)
+        if not match:
+            return {"status": "error", "message": "Aucun acteur trouvé pour ce film"}
+        matched_title, similarity = match
+        async with neo4j_conn.async_driver.session() as session:
+            cypher = '''
+            MATCH (p:Person)-[r:ACTED_IN]->(m:Movie {title: $title})
+            RETURN p.name as name, r.roles as roles, m.title as movie
+            ORDER BY name
+            '''
+            result = await session.run(cypher, title=matched_title)
+            actors = await result.data()
+        if not actors:
+            return {"status": "error", "message": "Aucun acteur trouvé pour ce film"}
+        return {
+            "status": "success",
+            "movie": actors[0]["movie"],
+            "actors": [{k: v for k, v in a.items() if k != "movie"} for a in actors],
+            "count": len(actors),
+            "similarity": similarity
+        }
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
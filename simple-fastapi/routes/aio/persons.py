@@ -0,0 +1,228 @@
+from fastapi import APIRouter, Depends, HTTPException
+from db.neo4j_conn import neo4j_conn
+from neo4j.exceptions import ConstraintError
+from services.fuzzy_index import person_names
+from routes.aio.dependencies import verify_admin
+from fastapi.concurrency import run_in_threadpool
+from routes.persons import DELETE_PERSON_CYPHER, person_path
+from services.graph_paths import PATH_MAX_DEPTH
+from services.stats_counters import db_stats
+from services.recommendations import movie_recommendations
+from services.graph_snapshot import graph_snapshot
+from services.http_cache import bump, cached_response
+from services.pagination import InvalidCursor, next_cursor, persons_page_query
+from typing import Optional
+from services.server_timing import TimedRoute
+
+router = APIRouter(route_class=TimedRoute)
+
+@router.get("/")
+@cached_response("persons")
+async def get_all_persons(limit: int = 20, skip: int = 0, cursor: Optional[str] = None):
+    try:
+        cypher, params = persons_page_query(cursor)
+        async with neo4j_conn.async_driver.session() as session:
+            result = await session.run(cypher, skip=skip, limit=limit, **params)
+            persons = await result.data()
+        return {"status": "success", "persons": persons, "count": len(persons),
+                "next_cursor": next_cursor(persons, limit, "persons", "name")}
+    except InvalidCursor as e:
+        return {"status": "error", "message": str(e)}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+@router.get("/path")
+async def get_person_path(person1: str, person2: str, max_depth: int = PATH_MAX_DEPTH):
+    try:
+        # Parcours en mémoire, borné par PATH_TIMEOUT : hors de la boucle d'événements
+        return await run_in_threadpool(person_path, person1, person2, max_depth)
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+@router.get("/actors/{name}/movies")
+async def get_movies_by_actor(name: str):
+    try:
+        match = person_names.best_match(name)
+        if not match:
+            return {"status": "error", "message": "Aucun film trouvé pour cet acteur"}
+        matched_name, similarity = match
+        async with neo4j_conn.async_driver.session() as session:
+            cypher = '''
+            MATCH (p:Person {name: $name})-[r:ACTED_IN]->(m:Movie)
+            RETURN m.title as title, m.released as released, r.roles as roles, p.name as actor
+            ORDER BY m.released DESC
+            '''
+            result = await session.run(cypher, name=matched_name)
+            movies = await result.data()
+        if not movies:
+            return {"status": "error", "message": "Aucun film trouvé pour cet acteur"}
+        return {
+            "status": "success",
+            "actor": movies[0]["actor"],
+            "movies": [{k: v for k, v in m.items() if k != "actor"} for m in movies],
+            "count": len(movies),
+            "similarity": similarity
+        }
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+@router.get("/collaborations")
+async def get_collaborations(person1: str, person2: str):
+    try:
+        match1, match2 = person_names.best_matches([person1, person2])
+        if not match1 or not match2:
+            return {"status": "error", "message": "Aucune collaboration trouvée"}
+        async with neo4j_conn.async_driver.session() as session:
+            cypher = '''
+            MATCH (p1:Person {name: $person1})-[:ACTED_IN]->(m:Movie)<-[:ACTED_IN]-(p2:Person {name: $person2})
+            RETURN collect(m.title) as movies, count(m) as collaborations, p1.name as person1, p2.name as person2
+            '''
+            result = await session.run(cypher, person1=match1[0], person2=match2[0])
+            record = await result.single()
+            if not record or not record["person1"] or not record["person2"]:
+                return {"status": "error", "message": "Aucune collaboration trouvée"}
+            return {
+                "status": "success",
+                "person1": record["person1"],
+                "person2": record["person2"],
+                "collaborations": record["collaborations"],
+                "movies": record["movies"],
+                "similarity1": match1[1],
+                "similarity2": match2[1]
+            }
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+# Routes à segment fixe déclarées au-dessus : /{name} capturerait « collaborations »
+@router.get("/{name}")
+@cached_response("persons")
+async def get_person_by_name(name: str):
+    try:
+        match = person_names.best_match(name)
+        if not match:
+            return {"status": "error", "message": "Personne non trouvée"}
+        matched_name, similarity = match
+        async with neo4j_conn.async_driver.session() as session:
+            cypher = '''
+            MATCH (p:Person {name: $name})
+            OPTIONAL MATCH (p)-[r:ACTED_IN]->(m:Movie)
+            WITH p, collect(CASE WHEN m IS NOT NULL THEN {movie: m.title, roles: r.roles} END) AS acted_in_raw
+            OPTIONAL MATCH (p)-[:DIRECTED]->(dm:Movie)
+            WITH p, acted_in_raw, collect(dm.title) AS directed_raw
+            OPTIONAL MATCH (p)-[:PRODUCED]->(pm:Movie)
+            WITH p, acted_in_raw, directed_raw, collect(pm.title) AS produced_raw
+            RETURN p.name as name, p.born as born,
+                   [x IN acted_in_raw WHERE x IS NOT NULL] as acted_in,
+                   [d IN directed_raw WHERE d IS NOT NULL] as directed,
+                   [pr IN produced_raw WHERE pr IS NOT NULL] as produced
+            '''
+            result = await session.run(cypher, name=matched_name)
+            record = await result.single()
+            if not record or not record["name"]:
+                return {"status": "error", "message": "Personne non trouvée"}
+            return {
+                "status": "success",
+                "name": record["name"],
+                "born": record["born"],
+                "acted_in": record["acted_in"],
+                "directed": record["directed"],
+                "produced": record["produced"],
+                "similarity": similarity
+            }
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+@router.post("", dependencies=[Depends(verify_admin)])
+async def create_person(person_data: dict, username: str = Depends(verify_admin)):
+    try:
+        name = person_data.get("name")
+        born = person_data.get("born")
+        if not name:
+            return {"status": "error", "message": "Nom requis"}
+        async with neo4j_conn.async_driver.session() as session:
+            existing = await session.run("MATCH (p:Person {name: $name}) RETURN p", name=name)
+            if await existing.single():
+                return {"status": "error", "message": "Personne déjà existante"}
+            if born:
+                await (await session.run("""
+                    CREATE (p:Person {name: $name, born: $born})
+                    RETURN p
+                """, name=name, born=born)).consume()
+            else:
+                await (await session.run("""
+                    CREATE (p:Person {name: $name})
+                    RETURN p
+                """, name=name)).consume()
+        person_names.add(name)
+        db_stats.apply(persons=1)
+        bump("persons")
+        return {"status": "success", "message": f"Personne '{name}' créée avec succès"}
+    except ConstraintError:
+        # Création concurrente du même nom, refusée par la contrainte d'unicité
+        return {"status": "error", "message": "Personne déjà existante"}
+    except HTTPException as e:
+        if e.status_code == 403:
+            return {"status": "error", "message": "Vous n'avez pas les accès nécessaires pour cette opération."}
+        raise
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+@router.put("/{name}", dependencies=[Depends(verify_admin)])
+async def update_person(name: str, person_data: dict, username: str = Depends(verify_admin)):
+    try:
+        new_name = person_data.get("name", name)
+        born = person_data.get("born")
+        async with neo4j_conn.async_driver.session() as session:
+            existing = await session.run("MATCH (p:Person {name: $name}) RETURN p", name=name)
+            if not await existing.single():
+                return {"status": "error", "message": "Personne non trouvée"}
+            if new_name != name:
+                name_conflict = await session.run("MATCH (p:Person {name: $name}) RETURN p", name=new_name)
+                if await name_conflict.single():
+                    return {"status": "error", "message": "Une personne avec ce nom existe déjà"}
+            if born is not None:
+                await session.run("""
+                    MATCH (p:Person {name: $old_name})
+                    SET p.name = $new_name, p.born = $born
+                    RETURN p
+                """, old_name=name, new_name=new_name, born=born)
+            else:
+                await session.run("""
+                    MATCH (p:Person {name: $old_name})
+                    SET p.name = $new_name
+                    RETURN p
+                """, old_name=name, new_name=new_name)
+        if new_name != name:
+            person_names.remove(name)
+            person_names.add(new_name)
+            movie_recommendations.rename_person(name, new_name)
+            graph_snapshot.mark_dirty()
+        bump("persons", "movies")
+        return {"status": "success", "message": f"Personne '{name}' mise à jour avec succès"}
+    except HTTPException as e:
+        if e.status_code == 403:
+            return {"status": "error", "message": "Vous n'avez pas les accès nécessaires pour cette opération."}
+        raise
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+@router.delete("/{name}", dependencies=[Depends(verify_admin)])
+async def delete_person(name: str, username: str = Depends(verify_admin)):
+    try:
+        async with neo4j_conn.async_driver.session() as session:
+            deleted = await (await session.run(DELETE_PERSON_CYPHER, name=name)).single()
+        if not deleted:
+            return {"status": "error", "message": "Personne non trouvée"}
+        person_names.remove(name)
+        movie_recommendations.remove_person(name)
+        graph_snapshot.mark_dirty()
+        db_stats.apply(persons=-1, directed=-deleted["directed"], produced=-deleted["produced"],
+                       acted_in=-deleted["acted_in"])
+        bump("persons", "movies")
+        return {"status": "success", "message": f"Personne '{name}' supprimée avec succès"}
+    except HTTPException as e:
+        if e.status_code == 403:
+            return {"status": "error", "message": "Vous n'avez pas les accès nécessaires pour cette opération."}
+        raise
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
@@ -0,0 +1,47 @@
+from fastapi import APIRouter, Depends, HTTPException
+from db.neo4j_conn import neo4j_conn
+from routes.aio.dependencies import decode_token, resolve_role
+from services.http_cache import bump, cached_response
+from services.rating_similarity import rating_similarity
+from services.user_feed import user_feeds
+from routes.reviews import ReviewIn, ReviewOut
+from datetime import datetime
+from services.server_timing import TimedRoute
+
+router = APIRouter(route_class=TimedRoute)
+
+@router.post("", response_model=ReviewOut)
+async def add_review(review: ReviewIn, payload: dict = Depends(decode_token)):
+    username = payload["sub"]
+    if await resolve_role(payload) == "admin":
+        raise HTTPException(status_code=403, detail="Administrators cannot leave reviews")
+    if not (1 <= review.rating <= 5):
+        raise HTTPException(status_code=400, detail="Rating must be between 1 and 5")
+    created_at = datetime.utcnow().isoformat()
+    async with neo4j_conn.async_driver.session() as session:
+        movie = await (await session.run("MATCH (m:Movie {title: $title}) RETURN m", title=review.movie_title)).single()
+        if not movie:
+            raise HTTPException(status_code=404, detail="Movie not found")
+        await session.run("""
+            MERGE (u:User {username: $username})
+            WITH u
+            MATCH (m:Movie {title: $movie_title})
+            MERGE (u)-[r:RATED]->(m)
+            SET r.rating = $rating, r.comment = $comment, r.created_at = $created_at
+        """, username=username, movie_title=review.movie_title, rating=review.rating, comment=review.comment, created_at=created_at)
+    bump("reviews")
+    rating_similarity.record_rating(username, review.movie_title, review.rating)
+    user_feeds.record_write(username, review.movie_title)
+    return ReviewOut(username=username, movie_title=review.movie_title, rating=review.rating, comment=review.comment, created_at=created_at)
+
+@router.get("/{movie_title}")
+@cached_response("reviews")
+async def get_reviews(movie_title: str):
+    async with neo4j_conn.async_driver.session() as session:
+        result = await session.run("""
+            MATCH (u:User)-[r:RATED]->(m:Movie {title: $movie_title})
+            RETURN u.username as username, r.rating as rating, r.comment as comment, r.created_at as created_at
+            ORDER BY r.created_at DESC
+        """, movie_title=movie_title)
+        reviews = await result.data()
+    return {"reviews": reviews, "count": len(reviews)}
@@ -0,0 +1,26 @@
+from fastapi import APIRouter
+from db.neo4j_conn import neo4j_conn
+from repositories.neo4j import COUNT_QUERIES, LATEST_MOVIE_QUERY
+from services.stats_counters import build_stats, db_stats
+from services.server_timing import TimedRoute
+
+router = APIRouter(route_class=TimedRoute)
+
+async def fetch_stats(session):
+    counts = {}
+    for key, query in COUNT_QUERIES.items():
+        counts[key] = (await (await session.run(query)).single())["count"]
+    latest_movie = await (await session.run(LATEST_MOVIE_QUERY)).single()
+    return build_stats(counts, latest_movie)
+
+@router.get("/")
+async def get_database_stats(fresh: bool = False):
+    try:
+        stats = None if fresh else db_stats.snapshot()
+        if stats is None:
+            async with neo4j_conn.async_driver.session() as session:
+                stats = await fetch_stats(session)
+            db_stats.load(stats)
+        return {"status": "success", "stats": stats}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
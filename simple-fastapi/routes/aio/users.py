@@ -0,0 +1,58 @@
+from fastapi import APIRouter, Depends, HTTPException, Body
+from fastapi.concurrency import run_in_threadpool
+from fastapi.security import OAuth2PasswordRequestForm
+from db.neo4j_conn import neo4j_conn
+from neo4j.exceptions import ConstraintError
+from routes.users import UserRegister, UserOut
+from services.auth import create_access_token, invalidate_role
+from services.rating_similarity import rating_similarity
+from services.user_feed import user_feeds
+from routes.aio.dependencies import verify_token
+import bcrypt
+from services.server_timing import TimedRoute
+
+router = APIRouter(route_class=TimedRoute)
+
+@router.post("/register", response_model=UserOut)
+async def register(user: UserRegister = Body(...)):
+    async with neo4j_conn.async_driver.session() as session:
+        existing = await session.run("MATCH (u:User {username: $username}) RETURN u", username=user.username)
+        if await existing.single():
+            raise HTTPException(status_code=400, detail="Username already exists")
+        # bcrypt est volontairement lent : hors de la boucle d'événements
+        hashed = (await run_in_threadpool(bcrypt.hashpw, user.password.encode(), bcrypt.gensalt())).decode()
+        role = user.role if user.role in ["admin", "user"] else "user"
+        try:
+            await (await session.run("CREATE (u:User {username: $username, password: $password, role: $role})", username=user.username, password=hashed, role=role)).consume()
+        except ConstraintError:
+            # Inscription concurrente du même nom, refusée par la contrainte d'unicité
+            raise HTTPException(status_code=400, detail="Username already exists")
+    invalidate_role(user.username)
+    return {"username": user.username, "role": role}
+
+@router.post("/login")
+async def login(form_data: OAuth2PasswordRequestForm = Depends()):
+    async with neo4j_conn.async_driver.session() as session:
+        result = await session.run("MATCH (u:User {username: $username}) RETURN u.password as password, u.role as role", username=form_data.username)
+        record = await result.single()
+        if not record:
+            raise HTTPException(status_code=400, detail="Incorrect username or password")
+        hashed = record["password"]
+        user_role = record["role"] or "user"
+        if not await run_in_threadpool(bcrypt.checkpw, form_data.password.encode(), hashed.encode()):
+            raise HTTPException(status_code=400, detail="Incorrect username or password")
+        token = create_access_token(form_data.username, user_role)
+        return {"access_token": token, "token_type": "bearer", "username": form_data.username, "role": user_role}
+
+@router.get("/me/also-liked")
+async def also_liked_for_me(limit: int = 10, username: str = Depends(verify_token)):
+    """Films proches de ceux que l'utilisateur a bien notés, hors films déjà notés"""
+    if not rating_similarity.loaded:
+        return {"status": "error", "message": "Recommandations en cours de calcul"}
+    return {"status": "success", "recommendations": rating_similarity.recommend_for_user(username, limit)}
+
+@router.get("/me/feed")
+async def my_feed(limit: int = 20, username: str = Depends(verify_token)):
+    """Fil personnalisé : films classés depuis le vivier précalculé de l'utilisateur, hors films notés ou enregistrés"""
+    # Sans vivier, feed lit l'historique de l'utilisateur (driver synchrone des dépôts)
+    return {"status": "success", **(await run_in_threadpool(user_feeds.feed, username, limit))}
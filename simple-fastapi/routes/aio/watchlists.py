@@ -0,0 +1,287 @@
+from fastapi import APIRouter, Depends, HTTPException
+from db.neo4j_conn import neo4j_conn
+from typing import List, Optional
+from routes.aio.dependencies import verify_token
+from services.http_cache import bump, cached_response
+from services.user_feed import user_feeds
+from services.pagination import InvalidCursor, next_cursor, public_watchlists_page_query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from routes.watchlists import WatchlistCreate, WatchlistMovie, WatchlistOut, WatchlistDetailOut
+from datetime import datetime
+from services.server_timing import TimedRoute
+
+router = APIRouter(route_class=TimedRoute)
+
+# ===== WATCHLIST ROUTES =====
+
+@router.post("", response_model=WatchlistOut)
+async def create_watchlist(watchlist: WatchlistCreate, username: str = Depends(verify_token)):
+    """Créer une nouvelle watchlist"""
+    try:
+        created_at = datetime.utcnow().isoformat()
+        async with neo4j_conn.async_driver.session() as session:
+            # Générer un ID unique pour la watchlist
+            result = await session.run("""
+                MATCH (u:User {username: $username})
+                CREATE (w:Watchlist {
+                    id: randomUUID(),
+                    name: $name,
+                    description: $description,
+                    is_public: $is_public,
+                    created_at: $created_at
+                })
+                CREATE (u)-[:OWNS]->(w)
+                RETURN w.id as id, w.name as name, w.description as description, 
+                       w.is_public as is_public, w.created_at as created_at
+            """, username=username, name=watchlist.name, description=watchlist.description,
+                is_public=watchlist.is_public, created_at=created_at)
+            
+            record = await result.single()
+            if not record:
+                raise HTTPException(status_code=400, detail="Erreur lors de la création de la watchlist")
+            
+            bump("watchlists")
+            
+            return WatchlistOut(
+                id=record["id"],
+                name=record["name"],
+                description=record["description"],
+                is_public=record["is_public"],
+                created_at=record["created_at"],
+                movie_count=0,
+                username=username
+            )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur serveur: {str(e)}")
+
+@router.get("", response_model=List[WatchlistOut])
+async def get_user_watchlists(username: str = Depends(verify_token)):
+    """Récupérer toutes les watchlists de l'utilisateur"""
+    try:
+        async with neo4j_conn.async_driver.session() as session:
+            result = await session.run("""
+                MATCH (u:User {username: $username})-[:OWNS]->(w:Watchlist)
+                OPTIONAL MATCH (w)-[:CONTAINS]->(m:Movie)
+                RETURN w.id as id, w.name as name, w.description as description,
+                       w.is_public as is_public, w.created_at as created_at,
+                       count(m) as movie_count
+                ORDER BY w.created_at DESC
+            """, username=username)
+            
+            watchlists = []
+            async for record in result:
+                watchlists.append(WatchlistOut(
+                    id=record["id"],
+                    name=record["name"],
+                    description=record["description"],
+                    is_public=record["is_public"],
+                    created_at=record["created_at"],
+                    movie_count=record["movie_count"],
+                    username=username
+                ))
+            return watchlists
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur serveur: {str(e)}")
+
+@router.get("/{watchlist_id}", response_model=WatchlistDetailOut)
+async def get_watchlist_detail(watchlist_id: str, username: str = Depends(verify_token)):
+    """Récupérer le détail d'une watchlist avec ses films"""
+    try:
+        async with neo4j_conn.async_driver.session() as session:
+            # Vérifier l'accès à la watchlist
+            access_result = await session.run("""
+                MATCH (w:Watchlist {id: $watchlist_id})
+                OPTIONAL MATCH (owner:User)-[:OWNS]->(w)
+                RETURN w, owner.username as owner_username
+            """, watchlist_id=watchlist_id)
+            
+            access_record = await access_result.single()
+            if not access_record:
+                raise HTTPException(status_code=404, detail="Watchlist non trouvée")
+            
+            watchlist_data = access_record["w"]
+            owner_username = access_record["owner_username"]
+            
+            # Vérifier les permissions d'accès
+            if not watchlist_data["is_public"] and owner_username != username:
+                raise HTTPException(status_code=403, detail="Accès refusé à cette watchlist privée")
+            
+            # Récupérer les films de la watchlist
+            movies_result = await session.run("""
+                MATCH (w:Watchlist {id: $watchlist_id})-[:CONTAINS]->(m:Movie)
+                RETURN m.title as title, m.released as released, m.tagline as tagline
+                ORDER BY m.title
+            """, watchlist_id=watchlist_id)
+            
+            movies = await movies_result.data()
+            
+            return WatchlistDetailOut(
+                id=watchlist_data["id"],
+                name=watchlist_data["name"],
+                description=watchlist_data["description"],
+                is_public=watchlist_data["is_public"],
+                created_at=watchlist_data["created_at"],
+                username=owner_username,
+                movies=movies
+            )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur serveur: {str(e)}")
+
+@router.post("/{watchlist_id}/movies")
+async def add_movie_to_watchlist(watchlist_id: str, movie: WatchlistMovie, username: str = Depends(verify_token)):
+    """Ajouter un film à une watchlist"""
+    try:
+        async with neo4j_conn.async_driver.session() as session:
+            # Vérifier que l'utilisateur possède cette watchlist
+            owner_check = await session.run("""
+                MATCH (u:User {username: $username})-[:OWNS]->(w:Watchlist {id: $watchlist_id})
+                RETURN w
+            """, username=username, watchlist_id=watchlist_id)
+            
+            if not await owner_check.single():
+                raise HTTPException(status_code=403, detail="Vous ne pouvez modifier que vos propres watchlists")
+            
+            # Vérifier que le film existe
+            movie_check = await session.run("""
+                MATCH (m:Movie {title: $movie_title})
+                RETURN m
+            """, movie_title=movie.movie_title)
+            
+            if not await movie_check.single():
+                raise HTTPException(status_code=404, detail="Film non trouvé")
+            
+            # Ajouter le film à la watchlist
+            result = await session.run("""
+                MATCH (w:Watchlist {id: $watchlist_id}), (m:Movie {title: $movie_title})
+                MERGE (w)-[:CONTAINS]->(m)
+                RETURN w, m
+            """, watchlist_id=watchlist_id, movie_title=movie.movie_title)
+            
+            if await result.single():
+                bump("watchlists")
+                user_feeds.record_write(username, movie.movie_title)
+                return {"status": "success", "message": f"Film '{movie.movie_title}' ajouté à la watchlist"}
+            else:
+                raise HTTPException(status_code=400, detail="Erreur lors de l'ajout du film")
+                
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur serveur: {str(e)}")
+
+@router.delete("/{watchlist_id}/movies/{movie_title}")
+async def remove_movie_from_watchlist(watchlist_id: str, movie_title: str, username: str = Depends(verify_token)):
+    """Retirer un film d'une watchlist"""
+    try:
+        async with neo4j_conn.async_driver.session() as session:
+            # Vérifier et supprimer en une seule requête
+            result = await session.run("""
+                MATCH (u:User {username: $username})-[:OWNS]->(w:Watchlist {id: $watchlist_id})-[r:CONTAINS]->(m:Movie {title: $movie_title})
+                DELETE r
+                RETURN w, m
+            """, username=username, watchlist_id=watchlist_id, movie_title=movie_title)
+            
+            if await result.single():
+                bump("watchlists")
+                user_feeds.record_write(username)
+                return {"status": "success", "message": f"Film '{movie_title}' retiré de la watchlist"}
+            else:
+                raise HTTPException(status_code=404, detail="Film non trouvé dans cette watchlist ou watchlist non trouvée")
+                
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur serveur: {str(e)}")
+
+@router.put("/{watchlist_id}")
+async def update_watchlist(watchlist_id: str, watchlist: WatchlistCreate, username: str = Depends(verify_token)):
+    """Mettre à jour une watchlist"""
+    try:
+        async with neo4j_conn.async_driver.session() as session:
+            result = await session.run("""
+                MATCH (u:User {username: $username})-[:OWNS]->(w:Watchlist {id: $watchlist_id})
+                SET w.name = $name, w.description = $description, w.is_public = $is_public
+                RETURN w
+            """, username=username, watchlist_id=watchlist_id, 
+                name=watchlist.name, description=watchlist.description, is_public=watchlist.is_public)
+            
+            if await result.single():
+                bump("watchlists")
+                return {"status": "success", "message": "Watchlist mise à jour avec succès"}
+            else:
+                raise HTTPException(status_code=404, detail="Watchlist non trouvée ou vous n'êtes pas le propriétaire")
+                
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur serveur: {str(e)}")
+
+@router.delete("/{watchlist_id}")
+async def delete_watchlist(watchlist_id: str, username: str = Depends(verify_token)):
+    """Supprimer une watchlist"""
+    try:
+        async with neo4j_conn.async_driver.session() as session:
+            result = await session.run("""
+                MATCH (u:User {username: $username})-[:OWNS]->(w:Watchlist {id: $watchlist_id})
+                DETACH DELETE w
+                RETURN count(w) as deleted
+            """, username=username, watchlist_id=watchlist_id)
+            
+            deleted_count = (await result.single())["deleted"]
+            if deleted_count > 0:
+                bump("watchlists")
+                user_feeds.record_write(username)
+                return {"status": "success", "message": "Watchlist supprimée avec succès"}
+            else:
+                raise HTTPException(status_code=404, detail="Watchlist non trouvée ou vous n'êtes pas le propriétaire")
+                
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur serveur: {str(e)}")
+
+@router.get("/public/all", response_model=List[WatchlistOut])
+@cached_response("watchlists")
+async def get_public_watchlists(limit: int = 20, skip: int = 0, cursor: Optional[str] = None):
+    """Récupérer les watchlists publiques (curseur de la page suivante dans l'en-tête X-Next-Cursor)"""
+    try:
+        cypher, params = public_watchlists_page_query(cursor)
+        async with neo4j_conn.async_driver.session() as session:
+            result = await session.run(cypher, skip=skip, limit=limit, **params)
+            
+            watchlists = []
+            async for record in result:
+                watchlists.append(WatchlistOut(
+                    id=record["id"],
+                    name=record["name"],
+                    description=record["description"],
+                    is_public=record["is_public"],
+                    created_at=record["created_at"],
+                    movie_count=record["movie_count"],
+                    username=record["username"]
+                ))
+        cursor = next_cursor(watchlists, limit, "watchlists", "created_at", "id")
+        headers = {"X-Next-Cursor": cursor} if cursor else None
+        return JSONResponse(content=jsonable_encoder(watchlists), headers=headers)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur serveur: {str(e)}")
+
+@router.get("/movie/{movie_title}/check")
+async def check_movie_in_watchlists(movie_title: str, username: str = Depends(verify_token)):
+    """Vérifier dans quelles watchlists se trouve un film"""
+    try:
+        async with neo4j_conn.async_driver.session() as session:
+            result = await session.run("""
+                MATCH (u:User {username: $username})-[:OWNS]->(w:Watchlist)-[:CONTAINS]->(m:Movie {title: $movie_title})
+                RETURN w.id as id, w.name as name
+            """, username=username, movie_title=movie_title)
+            
+            watchlists = [{"id": record["id"], "name": record["name"]} async for record in result]
+            return {"movie_title": movie_title, "in_watchlists": watchlists}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur serveur: {str(e)}")
\ No newline at end of file
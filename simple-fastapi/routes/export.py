@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
+from db.neo4j_conn import neo4j_conn
+from services.export import accepts_gzip, export_sections, export_stream
+from services.server_timing import TimedRoute
+
+router = APIRouter(route_class=TimedRoute)
+
+def export_headers(gzip: bool) -> dict:
+    headers = {"Content-Disposition": 'attachment; filename="catalog.ndjson"', "Vary": "Accept-Encoding"}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    return headers
+
+@router.get("")
+def export_catalog(request: Request, ratings: bool = False, watchlists: bool = False):
+    """Export NDJSON en flux : films avec crédits, personnes, et en option avis et watchlists publiques"""
+    if not neo4j_conn.driver:
+        return {"status": "error", "message": "Aucune connexion Neo4j"}
+    gzip = accepts_gzip(request.headers.get("accept-encoding"))
+    stream = export_stream(neo4j_conn.driver, export_sections(ratings, watchlists), gzip)
+    return StreamingResponse(stream, media_type="application/x-ndjson", headers=export_headers(gzip))
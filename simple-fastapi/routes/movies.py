@@ -1,93 +1,381 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Body
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Body
+from fastapi.concurrency import run_in_threadpool
 from db.neo4j_conn import neo4j_conn
-from typing import Optional
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from jose import jwt, JWTError
+from neo4j.exceptions import ConstraintError
+from repositories import repositories
+from services.fuzzy_index import movie_titles, person_names
+from services.auth import verify_admin
+from services.stats_counters import db_stats
+from services.http_cache import bump, cached_response
+from services.pagination import InvalidCursor, next_cursor
+from services.recommendations import movie_recommendations
+from services.graph_snapshot import graph_snapshot
+from services.rating_similarity import rating_similarity
+from services.user_feed import user_feeds
+from services.bulk_ingest import InvalidMovie, NdjsonBatcher
+from typing import List, Optional
+from pydantic import BaseModel
 from datetime import datetime
-import os
+from services.server_timing import TimedRoute
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
-# Auth: JWT obligatoire, plus de token statique
-SECRET_KEY = os.getenv("API_TOKEN", "supersecret")
-ALGORITHM = "HS256"
-security = HTTPBearer()
+def index_credited_persons(directors, producers, actors):
+    """Ajouter à l'index des noms les personnes créées par MERGE lors de l'écriture d'un film"""
+    names = directors + producers + [a["name"] for a in actors]
+    for name in names:
+        if name not in person_names:
+            person_names.add(name)
 
-# Dépendances d'authentification
+def clean_credits(movie_data: dict):
+    """Normaliser les listes de réalisateurs, producteurs et acteurs (noms vides ignorés)"""
+    directors = [d.strip() for d in movie_data.get("directors") or [] if d.strip()]
+    producers = [p.strip() for p in movie_data.get("producers") or [] if p.strip()]
+    actors = [
+        {"name": a["name"].strip(), "roles": a.get("roles", [])}
+        for a in movie_data.get("actors") or [] if a.get("name", "").strip()
+    ]
+    return directors, producers, actors
 
-def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    token = credentials.credentials
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username = payload.get("sub")
-        if not username:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-        return username
-    except JWTError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or missing token",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-
-def verify_admin(username: str = Depends(verify_token)):
-    with neo4j_conn.driver.session() as session:
-        result = session.run("MATCH (u:User {username: $username}) RETURN u.role as role", username=username)
-        record = result.single()
-        if not record or record["role"] != "admin":
-            raise HTTPException(status_code=403, detail="Admin privileges required")
-        return username
+# Liens d'un film vers ses personnes, appliqués en une seule requête via UNWIND.
+# Une liste à null laisse la relation correspondante intacte (mise à jour partielle).
+# Les variables *_before (nombre de liens avant l'écriture) donnent les deltas
+# appliqués aux compteurs de /stats ; `credited` (un nom par lien) met à jour
+# la matrice des co-crédits.
+CREDITS_CYPHER = """
+CALL {
+    WITH m
+    WITH m WHERE $directors IS NOT NULL
+    OPTIONAL MATCH (m)<-[r:DIRECTED]-()
+    DELETE r
+}
+CALL {
+    WITH m
+    UNWIND coalesce($directors, []) AS name
+    MERGE (p:Person {name: name})
+    MERGE (p)-[:DIRECTED]->(m)
+}
+CALL {
+    WITH m
+    WITH m WHERE $producers IS NOT NULL
+    OPTIONAL MATCH (m)<-[r:PRODUCED]-()
+    DELETE r
+}
+CALL {
+    WITH m
+    UNWIND coalesce($producers, []) AS name
+    MERGE (p:Person {name: name})
+    MERGE (p)-[:PRODUCED]->(m)
+}
+CALL {
+    WITH m
+    WITH m WHERE $actors IS NOT NULL
+    OPTIONAL MATCH (m)<-[r:ACTED_IN]-()
+    DELETE r
+}
+CALL {
+    WITH m
+    UNWIND coalesce($actors, []) AS actor
+    MERGE (p:Person {name: actor.name})
+    MERGE (p)-[:ACTED_IN {roles: actor.roles}]->(m)
+}
+RETURN m.title as title, m.released as released,
+       size([(m)<-[:DIRECTED]-() | 1]) - directed_before as directed,
+       size([(m)<-[:PRODUCED]-() | 1]) - produced_before as produced,
+       size([(m)<-[:ACTED_IN]-() | 1]) - acted_in_before as acted_in,
+       [(m)<-[:ACTED_IN|DIRECTED|PRODUCED]-(c:Person) | c.name] as credited
+"""
+
+CREATE_MOVIE_CYPHER = """
+OPTIONAL MATCH (existing:Movie {title: $title})
+WITH existing WHERE existing IS NULL
+CREATE (m:Movie {title: $title, released: $released, tagline: $tagline})
+WITH m, 0 AS directed_before, 0 AS produced_before, 0 AS acted_in_before
+""" + CREDITS_CYPHER
+
+UPDATE_MOVIE_CYPHER = """
+MATCH (m:Movie {title: $title})
+WITH m,
+     size([(m)<-[:DIRECTED]-() | 1]) AS directed_before,
+     size([(m)<-[:PRODUCED]-() | 1]) AS produced_before,
+     size([(m)<-[:ACTED_IN]-() | 1]) AS acted_in_before
+SET m += $properties
+""" + CREDITS_CYPHER
+
+def create_movie_tx(tx, title, released, tagline, directors, producers, actors):
+    """Créer le film et tous ses liens dans la même transaction ; None si le titre existe déjà"""
+    result = tx.run(CREATE_MOVIE_CYPHER, title=title, released=released, tagline=tagline,
+                    directors=directors, producers=producers, actors=actors)
+    record = result.single()
+    if not record:
+        return None
+    # Nœuds créés : le film et les personnes créées par MERGE
+    return dict(record, persons=result.consume().counters.nodes_created - 1)
+
+def update_movie_tx(tx, title, properties, directors=None, producers=None, actors=None):
+    """Mettre à jour le film et remplacer ses liens dans la même transaction ; None si absent"""
+    result = tx.run(UPDATE_MOVIE_CYPHER, title=title, properties=properties,
+                    directors=directors, producers=producers, actors=actors)
+    record = result.single()
+    if not record:
+        return None
+    return dict(record, persons=result.consume().counters.nodes_created)
+
+def record_movie_write(written: dict, created: bool):
+    """Appliquer aux compteurs de /stats le résultat de create_movie_tx / update_movie_tx"""
+    db_stats.apply(movies=1 if created else 0, persons=written["persons"], directed=written["directed"],
+                   produced=written["produced"], acted_in=written["acted_in"])
+    db_stats.movie_written(written["title"], written["released"])
+    movie_recommendations.set_movie(written["title"], written["released"], written["credited"])
+    if created:
+        user_feeds.add_movie(written["title"])
+    graph_snapshot.mark_dirty()
+
+ADD_ACTOR_CYPHER = """
+MATCH (p:Person {name: $actor_name}), (m:Movie {title: $movie_title})
+MERGE (p)-[:ACTED_IN {roles: $roles}]->(m)
+RETURN m.released as released, [(m)<-[:ACTED_IN|DIRECTED|PRODUCED]-(c:Person) | c.name] as credited
+"""
+
+# Création en masse : un film par ligne de $movies, ignoré si le titre existe déjà
+BULK_CREATE_CYPHER = """
+UNWIND $movies AS movie
+OPTIONAL MATCH (existing:Movie {title: movie.title})
+WITH movie WHERE existing IS NULL
+CREATE (m:Movie {title: movie.title, released: movie.released, tagline: movie.tagline})
+WITH m, movie
+CALL {
+    WITH m, movie
+    UNWIND movie.directors AS name
+    MERGE (p:Person {name: name})
+    MERGE (p)-[:DIRECTED]->(m)
+}
+CALL {
+    WITH m, movie
+    UNWIND movie.producers AS name
+    MERGE (p:Person {name: name})
+    MERGE (p)-[:PRODUCED]->(m)
+}
+CALL {
+    WITH m, movie
+    UNWIND movie.actors AS actor
+    MERGE (p:Person {name: actor.name})
+    MERGE (p)-[:ACTED_IN {roles: actor.roles}]->(m)
+}
+RETURN m.title as title, m.released as released,
+       size([(m)<-[:DIRECTED]-() | 1]) as directed,
+       size([(m)<-[:PRODUCED]-() | 1]) as produced,
+       size([(m)<-[:ACTED_IN]-() | 1]) as acted_in,
+       [(m)<-[:ACTED_IN|DIRECTED|PRODUCED]-(c:Person) | c.name] as credited
+"""
+
+def check_bulk_credits(movie_data: dict):
+    """Types des crédits d'une ligne de POST /movies/bulk, avant clean_credits"""
+    for key in ("directors", "producers"):
+        names = movie_data.get(key)
+        if names is None:
+            continue
+        if not isinstance(names, list) or not all(isinstance(name, str) for name in names):
+            raise InvalidMovie(f"{key} : liste de noms attendue")
+    actors = movie_data.get("actors")
+    if actors is None:
+        return
+    if not isinstance(actors, list):
+        raise InvalidMovie("actors : liste attendue")
+    for actor in actors:
+        if not isinstance(actor, dict) or not isinstance(actor.get("name"), str):
+            raise InvalidMovie("actors : objets {name, roles} attendus")
+        roles = actor.get("roles", [])
+        if not isinstance(roles, list) or not all(isinstance(role, str) for role in roles):
+            raise InvalidMovie(f"actors : rôles de {actor['name']!r} en liste de textes attendus")
+
+def validate_bulk_movie(movie_data: dict) -> dict:
+    """Film d'une ligne de POST /movies/bulk, normalisé comme pour POST /movies"""
+    title = movie_data.get("title")
+    released = movie_data.get("released")
+    if not isinstance(title, str) or not title.strip() or not released:
+        raise InvalidMovie("Titre et année de sortie requis")
+    if not isinstance(released, int) or isinstance(released, bool):
+        raise InvalidMovie("Année de sortie entière attendue")
+    check_bulk_credits(movie_data)
+    directors, producers, actors = clean_credits(movie_data)
+    return {"title": title.strip(), "released": released, "tagline": movie_data.get("tagline", ""),
+            "directors": directors, "producers": producers, "actors": actors}
+
+def bulk_create_tx(tx, movies):
+    """Écrire un lot ; renvoie (films créés, nombre de nœuds créés)"""
+    result = tx.run(BULK_CREATE_CYPHER, movies=movies)
+    records = [dict(record) for record in result]
+    return records, result.consume().counters.nodes_created
+
+def record_bulk_write(batch, records, nodes_created: int):
+    """Caches et compteurs après l'écriture d'un lot (équivalent de record_movie_write)"""
+    db_stats.apply(movies=len(records), persons=nodes_created - len(records),
+                   directed=sum(r["directed"] for r in records), produced=sum(r["produced"] for r in records),
+                   acted_in=sum(r["acted_in"] for r in records))
+    created = {record["title"] for record in records}
+    for record in records:
+        db_stats.movie_written(record["title"], record["released"])
+        movie_recommendations.set_movie(record["title"], record["released"], record["credited"])
+        movie_titles.add(record["title"], released=record["released"])
+        user_feeds.add_movie(record["title"])
+    for _, movie in batch:
+        if movie["title"] in created:
+            index_credited_persons(movie["directors"], movie["producers"], movie["actors"])
+    if records:
+        graph_snapshot.mark_dirty()
+    return created
+
+MAX_BATCH_TITLES = 100
+
+class MovieBatchIn(BaseModel):
+    titles: List[str]
+
+def resolve_batch(titles: List[str]):
+    """Titres exacts à charger pour une liste de titres approchés (une seule passe sur l'index)"""
+    matches = movie_titles.best_matches(titles)
+    return matches, sorted({match[0] for match in matches if match})
+
+def batch_results(titles: List[str], matches, records) -> dict:
+    """Un résultat par titre demandé, dans l'ordre de la requête"""
+    movies = {record["title"]: dict(record) for record in records}
+    results = []
+    for query, match in zip(titles, matches):
+        movie = movies.get(match[0]) if match else None
+        if movie is None:
+            results.append({"query": query, "status": "not_found"})
+        else:
+            results.append({"query": query, "status": "found", "similarity": match[1], "movie": movie})
+    return {"status": "success", "results": results,
+            "found": sum(1 for result in results if result["status"] == "found")}
+
+# Suppression d'un film : renvoie le nombre de liens supprimés par type
+DELETE_MOVIE_CYPHER = """
+MATCH (m:Movie {title: $title})
+WITH m,
+     size([(m)<-[:DIRECTED]-() | 1]) AS directed,
+     size([(m)<-[:PRODUCED]-() | 1]) AS produced,
+     size([(m)<-[:ACTED_IN]-() | 1]) AS acted_in
+DETACH DELETE m
+RETURN directed, produced, acted_in
+"""
 
 # ===== MOVIES ROUTES =====
 
 @router.get("/")
-def get_all_movies(limit: int = 20, skip: int = 0):
+@cached_response("movies")
+def get_all_movies(limit: int = 20, skip: int = 0, cursor: Optional[str] = None):
     try:
+        movies = repositories.movies.page(limit, skip, cursor)
+        return {"status": "success", "movies": movies, "count": len(movies),
+                "next_cursor": next_cursor(movies, limit, "movies", "released", "title")}
+    except InvalidCursor as e:
+        return {"status": "error", "message": str(e)}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+@router.post("/bulk", dependencies=[Depends(verify_admin)])
+async def bulk_create_movies(request: Request, username: str = Depends(verify_admin)):
+    """Import NDJSON (un film par ligne), écrit par lots de BULK_BATCH_SIZE ; rapport ligne par ligne"""
+    batcher = NdjsonBatcher(validate_bulk_movie)
+
+    def write(batch):
         with neo4j_conn.driver.session() as session:
-            result = session.run("""
-                MATCH (m:Movie)
-                RETURN m.title as title, m.released as released, m.tagline as tagline
-                ORDER BY m.released DESC
-                SKIP $skip LIMIT $limit
-            """, skip=skip, limit=limit)
-            movies = [dict(record) for record in result]
-        return {"status": "success", "movies": movies, "count": len(movies)}
+            return session.execute_write(bulk_create_tx, [movie for _, movie in batch])
+
+    async def apply(batches):
+        for batch in batches:
+            try:
+                records, nodes_created = await run_in_threadpool(write, batch)
+            except Exception as e:
+                batcher.batch_failed(batch, str(e))
+                continue
+            batcher.batch_written(batch, record_bulk_write(batch, records, nodes_created))
+
+    async for chunk in request.stream():
+        await apply(batcher.feed(chunk))
+    await apply(batcher.finish())
+    bump("movies", "persons")
+    return batcher.report()
+
+@router.post("/batch")
+def get_movies_batch(batch: MovieBatchIn):
+    """Détails (acteurs, réalisateurs, producteurs) de plusieurs films en un seul appel"""
+    if len(batch.titles) > MAX_BATCH_TITLES:
+        return {"status": "error", "message": f"{MAX_BATCH_TITLES} titres au maximum par requête"}
+    try:
+        matches, titles = resolve_batch(batch.titles)
+        return batch_results(batch.titles, matches, repositories.movies.details(titles))
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+@router.get("/search")
+def search_movies(q: str, limit: int = 10, fuzzy: bool = True):
+    try:
+        if fuzzy:
+            matches = movie_titles.search(q)
+            # Même tri que la version Cypher : similarité puis année de sortie
+            matches.sort(key=lambda m: (-m[1], -(m[2].get("released") or 0)))
+            matches = matches[:limit]
+            similarities = {key: score for key, score, _ in matches}
+            movies = [dict(row, similarity=similarities[row["title"]])
+                      for row in repositories.movies.rows(list(similarities))]
+            movies.sort(key=lambda m: (-m["similarity"], -(m["released"] or 0)))
+        else:
+            movies = repositories.movies.search(q, limit)
+        return {"status": "success", "movies": movies, "query": q, "count": len(movies)}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+@router.get("/search/movies")
+def search_movies_alias(q: str, limit: int = 10, fuzzy: bool = True):
+    return search_movies(q=q, limit=limit, fuzzy=fuzzy)
+
+@router.get("/recommend/similar/{title}")
+def recommend_similar_movies(title: str, limit: int = 5):
+    try:
+        match = movie_titles.best_match(title)
+        if not match:
+            return {"status": "success", "recommendations": [], "base_title": title}
+        if movie_recommendations.loaded:
+            movies = movie_recommendations.similar(match[0], limit)
+        else:
+            # Matrice non chargée (base indisponible au démarrage) : calcul dans la base
+            movies = repositories.movies.similar(match[0], limit)
+        return {"status": "success", "recommendations": movies, "base_title": title}
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
+@router.get("/recommend/movies/similar/{title}")
+def recommend_similar_movies_alias(title: str, limit: int = 5):
+    return recommend_similar_movies(title=title, limit=limit)
+
+@router.get("/recommend/also-liked/{title}")
+def recommend_also_liked(title: str, limit: int = 5):
+    """Films bien notés par les utilisateurs qui ont aimé ce film (similarité des notes)"""
+    try:
+        if not rating_similarity.loaded:
+            return {"status": "error", "message": "Recommandations en cours de calcul"}
+        match = movie_titles.best_match(title)
+        if not match:
+            return {"status": "success", "recommendations": [], "base_title": title}
+        return {"status": "success", "recommendations": rating_similarity.similar(match[0], limit), "base_title": title}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+# Routes à segment fixe déclarées au-dessus : /{title} capturerait « search »
 @router.get("/{title}")
+@cached_response("movies")
 def get_movie_by_title(title: str):
     try:
-        with neo4j_conn.driver.session() as session:
-            cypher = '''
-            MATCH (m:Movie)
-            WITH m, apoc.text.sorensenDiceSimilarity(toLower(m.title), toLower($title)) AS similarity
-            WHERE similarity > 0.5
-            OPTIONAL MATCH (p:Person)-[r:ACTED_IN]->(m)
-            OPTIONAL MATCH (d:Person)-[:DIRECTED]->(m)
-            OPTIONAL MATCH (prod:Person)-[:PRODUCED]->(m)
-            RETURN m.title as title, m.released as released, m.tagline as tagline,
-                   collect(DISTINCT {name: p.name, roles: r.roles}) as actors,
-                   collect(DISTINCT d.name) as directors,
-                   collect(DISTINCT prod.name) as producers,
-                   similarity
-            ORDER BY similarity DESC
-            LIMIT 1
-            '''
-            result = session.run(cypher, title=title)
-            record = result.single()
-            if not record or not record["title"]:
-                return {"status": "error", "message": "Film non trouvé"}
-            return {
-                "status": "success",
-                "title": record["title"],
-                "released": record["released"],
-                "tagline": record["tagline"],
-                "actors": [a for a in record["actors"] if a["name"]],
-                "directors": [d for d in record["directors"] if d],
-                "producers": [p for p in record["producers"] if p],
-                "similarity": record["similarity"]
-            }
+        match = movie_titles.best_match(title)
+        if not match:
+            return {"status": "error", "message": "Film non trouvé"}
+        matched_title, similarity = match
+        movies = repositories.movies.details([matched_title])
+        if not movies:
+            return {"status": "error", "message": "Film non trouvé"}
+        return {"status": "success", **movies[0], "similarity": similarity}
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
@@ -97,44 +385,21 @@ def create_movie(movie_data: dict, username: str = Depends(verify_admin)):
         title = movie_data.get("title")
         released = movie_data.get("released")
         tagline = movie_data.get("tagline", "")
-        directors = movie_data.get("directors", [])
-        producers = movie_data.get("producers", [])
-        actors = movie_data.get("actors", [])
         if not title or not released:
             return {"status": "error", "message": "Titre et année de sortie requis"}
+        directors, producers, actors = clean_credits(movie_data)
         with neo4j_conn.driver.session() as session:
-            existing = session.run("MATCH (m:Movie {title: $title}) RETURN m", title=title)
-            if existing.single():
-                return {"status": "error", "message": "Film déjà existant"}
-            session.run("""
-                CREATE (m:Movie {title: $title, released: $released, tagline: $tagline})
-                RETURN m
-            """, title=title, released=released, tagline=tagline)
-            for director in directors:
-                if director.strip():
-                    session.run("""
-                        MERGE (p:Person {name: $name})
-                        WITH p
-                        MATCH (m:Movie {title: $title})
-                        MERGE (p)-[:DIRECTED]->(m)
-                    """, name=director.strip(), title=title)
-            for producer in producers:
-                if producer.strip():
-                    session.run("""
-                        MERGE (p:Person {name: $name})
-                        WITH p
-                        MATCH (m:Movie {title: $title})
-                        MERGE (p)-[:PRODUCED]->(m)
-                    """, name=producer.strip(), title=title)
-            for actor in actors:
-                if actor.get("name", "").strip():
-                    session.run("""
-                        MERGE (p:Person {name: $name})
-                        WITH p
-                        MATCH (m:Movie {title: $title})
-                        MERGE (p)-[:ACTED_IN {roles: $roles}]->(m)
-                    """, name=actor["name"].strip(), title=title, roles=actor.get("roles", []))
+            created = session.execute_write(create_movie_tx, title, released, tagline, directors, producers, actors)
+        if not created:
+            return {"status": "error", "message": "Film déjà existant"}
+        movie_titles.add(title, released=released)
+        record_movie_write(created, created=True)
+        bump("movies", "persons")
+        index_credited_persons(directors, producers, actors)
         return {"status": "success", "message": f"Film '{title}' créé avec succès avec toutes ses relations"}
+    except ConstraintError:
+        # Création concurrente du même titre, refusée par la contrainte d'unicité
+        return {"status": "error", "message": "Film déjà existant"}
     except HTTPException as e:
         if e.status_code == 403:
             return {"status": "error", "message": "Vous n'avez pas les accès nécessaires pour cette opération."}
@@ -145,60 +410,22 @@ def create_movie(movie_data: dict, username: str = Depends(verify_admin)):
 @router.put("/{title}", dependencies=[Depends(verify_admin)])
 def update_movie(title: str, movie_data: dict, username: str = Depends(verify_admin)):
     try:
+        properties = {key: movie_data[key] for key in ("released", "tagline") if key in movie_data}
+        directors, producers, actors = clean_credits(movie_data)
         with neo4j_conn.driver.session() as session:
-            existing = session.run("MATCH (m:Movie {title: $title}) RETURN m", title=title)
-            if not existing.single():
-                return {"status": "error", "message": "Film non trouvé"}
-            set_clauses = []
-            params = {"title": title}
-            if "released" in movie_data:
-                set_clauses.append("m.released = $released")
-                params["released"] = movie_data["released"]
-            if "tagline" in movie_data:
-                set_clauses.append("m.tagline = $tagline")
-                params["tagline"] = movie_data["tagline"]
-            if set_clauses:
-                query = f"MATCH (m:Movie {{title: $title}}) SET {', '.join(set_clauses)} RETURN m"
-                session.run(query, **params)
-            if "directors" in movie_data:
-                session.run("""
-                    MATCH (m:Movie {title: $title})<-[r:DIRECTED]-()
-                    DELETE r
-                """, title=title)
-                for director in movie_data["directors"]:
-                    if director.strip():
-                        session.run("""
-                            MERGE (p:Person {name: $name})
-                            WITH p
-                            MATCH (m:Movie {title: $title})
-                            MERGE (p)-[:DIRECTED]->(m)
-                        """, name=director.strip(), title=title)
-            if "producers" in movie_data:
-                session.run("""
-                    MATCH (m:Movie {title: $title})<-[r:PRODUCED]-()
-                    DELETE r
-                """, title=title)
-                for producer in movie_data["producers"]:
-                    if producer.strip():
-                        session.run("""
-                            MERGE (p:Person {name: $name})
-                            WITH p
-                            MATCH (m:Movie {title: $title})
-                            MERGE (p)-[:PRODUCED]->(m)
-                        """, name=producer.strip(), title=title)
-            if "actors" in movie_data:
-                session.run("""
-                    MATCH (m:Movie {title: $title})<-[r:ACTED_IN]-()
-                    DELETE r
-                """, title=title)
-                for actor in movie_data["actors"]:
-                    if actor.get("name", "").strip():
-                        session.run("""
-                            MERGE (p:Person {name: $name})
-                            WITH p
-                            MATCH (m:Movie {title: $title})
-                            MERGE (p)-[:ACTED_IN {roles: $roles}]->(m)
-                        """, name=actor["name"].strip(), title=title, roles=actor.get("roles", []))
+            updated = session.execute_write(
+                update_movie_tx, title, properties,
+                directors=directors if "directors" in movie_data else None,
+                producers=producers if "producers" in movie_data else None,
+                actors=actors if "actors" in movie_data else None,
+            )
+        if not updated:
+            return {"status": "error", "message": "Film non trouvé"}
+        if "released" in movie_data:
+            movie_titles.update(title, released=movie_data["released"])
+        record_movie_write(updated, created=False)
+        bump("movies", "persons")
+        index_credited_persons(directors, producers, actors)
         return {"status": "success", "message": f"Film '{title}' mis à jour avec succès avec toutes ses relations"}
     except HTTPException as e:
         if e.status_code == 403:
@@ -211,13 +438,19 @@ def update_movie(title: str, movie_data: dict, username: str = Depends(verify_ad
 def delete_movie(title: str, username: str = Depends(verify_admin)):
     try:
         with neo4j_conn.driver.session() as session:
-            existing = session.run("MATCH (m:Movie {title: $title}) RETURN m", title=title)
-            if not existing.single():
-                return {"status": "error", "message": "Film non trouvé"}
-            session.run("""
-                MATCH (m:Movie {title: $title})
-                DETACH DELETE m
-            """, title=title)
+            deleted = session.run(DELETE_MOVIE_CYPHER, title=title).single()
+        if not deleted:
+            return {"status": "error", "message": "Film non trouvé"}
+        movie_titles.remove(title)
+        db_stats.apply(movies=-1, directed=-deleted["directed"], produced=-deleted["produced"],
+                       acted_in=-deleted["acted_in"])
+        db_stats.movie_removed(title)
+        movie_recommendations.remove_movie(title)
+        graph_snapshot.mark_dirty()
+        rating_similarity.remove_movie(title)
+        user_feeds.remove_movie(title)
+        # DETACH DELETE retire aussi les avis et les entrées de watchlists
+        bump("movies", "persons", "reviews", "watchlists")
         return {"status": "success", "message": f"Film '{title}' supprimé avec succès"}
     except HTTPException as e:
         if e.status_code == 403:
@@ -240,10 +473,13 @@ def add_actor_to_movie(movie_title: str, actor_data: dict, username: str = Depen
                 return {"status": "error", "message": "Film non trouvé"}
             if not person_exists:
                 return {"status": "error", "message": "Acteur non trouvé"}
-            session.run("""
-                MATCH (p:Person {name: $actor_name}), (m:Movie {title: $movie_title})
-                MERGE (p)-[:ACTED_IN {roles: $roles}]->(m)
-            """, actor_name=actor_name, movie_title=movie_title, roles=roles)
+            result = session.run(ADD_ACTOR_CYPHER, actor_name=actor_name, movie_title=movie_title, roles=roles)
+            record = result.single()
+            summary = result.consume()
+        db_stats.apply(acted_in=summary.counters.relationships_created)
+        movie_recommendations.set_movie(movie_title, record["released"], record["credited"])
+        graph_snapshot.mark_dirty()
+        bump("movies", "persons")
         return {"status": "success", "message": f"Acteur '{actor_name}' ajouté au film '{movie_title}'"}
     except HTTPException as e:
         if e.status_code == 403:
@@ -255,86 +491,19 @@ def add_actor_to_movie(movie_title: str, actor_data: dict, username: str = Depen
 @router.get("/{title}/actors")
 def get_actors_by_movie(title: str):
     try:
-        with neo4j_conn.driver.session() as session:
-            cypher = '''
-            MATCH (m:Movie)
-            WITH m, apoc.text.sorensenDiceSimilarity(toLower(m.title), toLower($title)) AS similarity
-            WHERE similarity > 0.5
-            WITH m, similarity
-            ORDER BY similarity DESC
-            LIMIT 1
-            MATCH (p:Person)-[r:ACTED_IN]->(m)
-            RETURN p.name as name, r.roles as roles, m.title as movie, similarity
-            ORDER BY name
-            '''
-            result = session.run(cypher, title=title)
-            actors = [dict(record) for record in result]
+        match = movie_titles.best_match(title)
+        if not match:
+            return {"status": "error", "message": "Aucun acteur trouvé pour ce film"}
+        matched_title, similarity = match
+        actors = repositories.movies.actors(matched_title)
         if not actors:
             return {"status": "error", "message": "Aucun acteur trouvé pour ce film"}
         return {
             "status": "success",
-            "movie": actors[0]["movie"],
-            "actors": [{k: v for k, v in a.items() if k != "movie" and k != "similarity"} for a in actors],
+            "movie": matched_title,
+            "actors": actors,
             "count": len(actors),
-            "similarity": actors[0]["similarity"]
+            "similarity": similarity
         }
     except Exception as e:
         return {"status": "error", "message": str(e)}
-
-@router.get("/search")
-def search_movies(q: str, limit: int = 10, fuzzy: bool = True):
-    try:
-        with neo4j_conn.driver.session() as session:
-            if fuzzy:
-                cypher = '''
-                MATCH (m:Movie)
-                WITH m, apoc.text.sorensenDiceSimilarity(toLower(m.title), toLower($search)) AS similarity
-                WHERE similarity > 0.5
-                RETURN m.title as title, m.released as released, m.tagline as tagline, similarity
-                ORDER BY similarity DESC, m.released DESC
-                LIMIT $limit
-                '''
-                result = session.run(cypher, search=q, limit=limit)
-                movies = [dict(record) for record in result]
-            else:
-                result = session.run('''
-                    MATCH (m:Movie)
-                    WHERE toLower(m.title) CONTAINS toLower($search)
-                    RETURN m.title as title, m.released as released, m.tagline as tagline
-                    ORDER BY m.released DESC
-                    LIMIT $limit
-                ''', search=q, limit=limit)
-                movies = [dict(record) for record in result]
-        return {"status": "success", "movies": movies, "query": q, "count": len(movies)}
-    except Exception as e:
-        return {"status": "error", "message": str(e)}
-
-@router.get("/search/movies")
-def search_movies_alias(q: str, limit: int = 10, fuzzy: bool = True):
-    return search_movies(q=q, limit=limit, fuzzy=fuzzy)
-
-@router.get("/recommend/similar/{title}")
-def recommend_similar_movies(title: str, limit: int = 5):
-    try:
-        with neo4j_conn.driver.session() as session:
-            result = session.run("""
-                MATCH (m:Movie)
-                WITH m, apoc.text.sorensenDiceSimilarity(toLower(m.title), toLower($title)) AS similarity
-                WHERE similarity > 0.5
-                WITH m, similarity
-                ORDER BY similarity DESC
-                LIMIT 1
-                MATCH (m)<-[:ACTED_IN|:DIRECTED|:PRODUCED]-(p:Person)-[:ACTED_IN|:DIRECTED|:PRODUCED]->(rec:Movie)
-                WHERE rec.title <> m.title
-                RETURN rec.title AS title, rec.released AS released, count(*) AS score
-                ORDER BY score DESC, rec.released DESC
-                LIMIT $limit
-            """, title=title, limit=limit)
-            movies = [dict(record) for record in result]
-        return {"status": "success", "recommendations": movies, "base_title": title}
-    except Exception as e:
-        return {"status": "error", "message": str(e)}
-
-@router.get("/recommend/movies/similar/{title}")
-def recommend_similar_movies_alias(title: str, limit: int = 5):
-    return recommend_similar_movies(title=title, limit=limit)
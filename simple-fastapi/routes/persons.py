@@ -1,89 +1,133 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Body
 from db.neo4j_conn import neo4j_conn
+from neo4j.exceptions import ConstraintError
+from repositories import repositories
+from services.fuzzy_index import person_names
+from services.auth import verify_admin
+from services.stats_counters import db_stats
+from services.recommendations import movie_recommendations
+from services.graph_paths import PATH_MAX_DEPTH, PathSearchTimeout, describe_path, shortest_path, snapshot_path
+from services.graph_snapshot import graph_snapshot
+from services.http_cache import bump, cached_response
+from services.pagination import InvalidCursor, next_cursor
 from typing import Optional
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from jose import jwt, JWTError
-import os
+from services.server_timing import TimedRoute
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
-SECRET_KEY = os.getenv("API_TOKEN", "supersecret")
-ALGORITHM = "HS256"
-security = HTTPBearer()
+# Suppression d'une personne : renvoie le nombre de liens supprimés par type
+DELETE_PERSON_CYPHER = """
+MATCH (p:Person {name: $name})
+WITH p,
+     size([(p)-[:DIRECTED]->() | 1]) AS directed,
+     size([(p)-[:PRODUCED]->() | 1]) AS produced,
+     size([(p)-[:ACTED_IN]->() | 1]) AS acted_in
+DETACH DELETE p
+RETURN directed, produced, acted_in
+"""
 
-def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    token = credentials.credentials
+@router.get("/")
+@cached_response("persons")
+def get_all_persons(limit: int = 20, skip: int = 0, cursor: Optional[str] = None):
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username = payload.get("sub")
-        if not username:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-        return username
-    except JWTError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or missing token",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        persons = repositories.persons.page(limit, skip, cursor)
+        return {"status": "success", "persons": persons, "count": len(persons),
+                "next_cursor": next_cursor(persons, limit, "persons", "name")}
+    except InvalidCursor as e:
+        return {"status": "error", "message": str(e)}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
 
-def verify_admin(username: str = Depends(verify_token)):
-    with neo4j_conn.driver.session() as session:
-        result = session.run("MATCH (u:User {username: $username}) RETURN u.role as role", username=username)
-        record = result.single()
-        if not record or record["role"] != "admin":
-            raise HTTPException(status_code=403, detail="Admin privileges required")
-        return username
+def person_path(person1: str, person2: str, max_depth: int):
+    """Plus court chemin entre deux personnes, noms résolus comme /persons/{name}"""
+    snapshot = graph_snapshot.current
+    if snapshot is None and not movie_recommendations.loaded:
+        return {"status": "error", "message": "Graphe des crédits en cours de chargement"}
+    match1, match2 = person_names.best_matches([person1, person2])
+    if not match1 or not match2:
+        return {"status": "error", "message": "Personne non trouvée"}
+    depth = min(max_depth, PATH_MAX_DEPTH)
+    try:
+        if snapshot is not None:
+            path = snapshot_path(snapshot, match1[0], match2[0], depth)
+        else:
+            path = shortest_path(match1[0], match2[0], movie_recommendations.persons_of,
+                                 movie_recommendations.movies_of, max_depth=depth)
+    except PathSearchTimeout:
+        return {"status": "error", "message": "Recherche de chemin interrompue (délai dépassé)"}
+    if path is None:
+        return {"status": "error", "message": f"Aucun chemin en {depth} degrés ou moins"}
+    return {
+        "status": "success",
+        "person1": match1[0],
+        "person2": match2[0],
+        "degrees": len(path) // 2,
+        "path": describe_path(path),
+        "similarity1": match1[1],
+        "similarity2": match2[1]
+    }
 
-@router.get("/")
-def get_all_persons(limit: int = 20, skip: int = 0):
+@router.get("/path")
+def get_person_path(person1: str, person2: str, max_depth: int = PATH_MAX_DEPTH):
     try:
-        with neo4j_conn.driver.session() as session:
-            result = session.run("""
-                MATCH (p:Person)
-                RETURN p.name as name, p.born as born
-                ORDER BY p.name
-                SKIP $skip LIMIT $limit
-            """, skip=skip, limit=limit)
-            persons = [dict(record) for record in result]
-        return {"status": "success", "persons": persons, "count": len(persons)}
+        return person_path(person1, person2, max_depth)
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+@router.get("/actors/{name}/movies")
+def get_movies_by_actor(name: str):
+    try:
+        match = person_names.best_match(name)
+        if not match:
+            return {"status": "error", "message": "Aucun film trouvé pour cet acteur"}
+        matched_name, similarity = match
+        movies = repositories.persons.movies(matched_name)
+        if not movies:
+            return {"status": "error", "message": "Aucun film trouvé pour cet acteur"}
+        return {
+            "status": "success",
+            "actor": matched_name,
+            "movies": movies,
+            "count": len(movies),
+            "similarity": similarity
+        }
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
+@router.get("/collaborations")
+def get_collaborations(person1: str, person2: str):
+    try:
+        match1, match2 = person_names.best_matches([person1, person2])
+        if not match1 or not match2:
+            return {"status": "error", "message": "Aucune collaboration trouvée"}
+        movies = repositories.persons.collaborations(match1[0], match2[0])
+        if not movies:
+            return {"status": "error", "message": "Aucune collaboration trouvée"}
+        return {
+            "status": "success",
+            "person1": match1[0],
+            "person2": match2[0],
+            "collaborations": len(movies),
+            "movies": movies,
+            "similarity1": match1[1],
+            "similarity2": match2[1]
+        }
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+# Routes à segment fixe déclarées au-dessus : /{name} capturerait « collaborations »
 @router.get("/{name}")
+@cached_response("persons")
 def get_person_by_name(name: str):
     try:
-        with neo4j_conn.driver.session() as session:
-            cypher = '''
-            MATCH (p:Person)
-            WITH p, apoc.text.sorensenDiceSimilarity(toLower(p.name), toLower($name)) AS similarity
-            WHERE similarity > 0.5
-            OPTIONAL MATCH (p)-[r:ACTED_IN]->(m:Movie)
-            WITH p, similarity, collect(CASE WHEN m IS NOT NULL THEN {movie: m.title, roles: r.roles} END) AS acted_in_raw
-            OPTIONAL MATCH (p)-[:DIRECTED]->(dm:Movie)
-            WITH p, similarity, acted_in_raw, collect(dm.title) AS directed_raw
-            OPTIONAL MATCH (p)-[:PRODUCED]->(pm:Movie)
-            WITH p, similarity, acted_in_raw, directed_raw, collect(pm.title) AS produced_raw
-            RETURN p.name as name, p.born as born,
-                   [x IN acted_in_raw WHERE x IS NOT NULL] as acted_in,
-                   [d IN directed_raw WHERE d IS NOT NULL] as directed,
-                   [pr IN produced_raw WHERE pr IS NOT NULL] as produced,
-                   similarity
-            ORDER BY similarity DESC
-            LIMIT 1
-            '''
-            result = session.run(cypher, name=name)
-            record = result.single()
-            if not record or not record["name"]:
-                return {"status": "error", "message": "Personne non trouvée"}
-            return {
-                "status": "success",
-                "name": record["name"],
-                "born": record["born"],
-                "acted_in": record["acted_in"],
-                "directed": record["directed"],
-                "produced": record["produced"],
-                "similarity": record["similarity"]
-            }
+        match = person_names.best_match(name)
+        if not match:
+            return {"status": "error", "message": "Personne non trouvée"}
+        matched_name, similarity = match
+        person = repositories.persons.details(matched_name)
+        if not person:
+            return {"status": "error", "message": "Personne non trouvée"}
+        return {"status": "success", **person, "similarity": similarity}
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
@@ -102,13 +146,19 @@ def create_person(person_data: dict, username: str = Depends(verify_admin)):
                 session.run("""
                     CREATE (p:Person {name: $name, born: $born})
                     RETURN p
-                """, name=name, born=born)
+                """, name=name, born=born).consume()
             else:
                 session.run("""
                     CREATE (p:Person {name: $name})
                     RETURN p
-                """, name=name)
+                """, name=name).consume()
+        person_names.add(name)
+        db_stats.apply(persons=1)
+        bump("persons")
         return {"status": "success", "message": f"Personne '{name}' créée avec succès"}
+    except ConstraintError:
+        # Création concurrente du même nom, refusée par la contrainte d'unicité
+        return {"status": "error", "message": "Personne déjà existante"}
     except HTTPException as e:
         if e.status_code == 403:
             return {"status": "error", "message": "Vous n'avez pas les accès nécessaires pour cette opération."}
@@ -141,6 +191,12 @@ def update_person(name: str, person_data: dict, username: str = Depends(verify_a
                     SET p.name = $new_name
                     RETURN p
                 """, old_name=name, new_name=new_name)
+        if new_name != name:
+            person_names.remove(name)
+            person_names.add(new_name)
+            movie_recommendations.rename_person(name, new_name)
+            graph_snapshot.mark_dirty()
+        bump("persons", "movies")
         return {"status": "success", "message": f"Personne '{name}' mise à jour avec succès"}
     except HTTPException as e:
         if e.status_code == 403:
@@ -153,13 +209,15 @@ def update_person(name: str, person_data: dict, username: str = Depends(verify_a
 def delete_person(name: str, username: str = Depends(verify_admin)):
     try:
         with neo4j_conn.driver.session() as session:
-            existing = session.run("MATCH (p:Person {name: $name}) RETURN p", name=name)
-            if not existing.single():
-                return {"status": "error", "message": "Personne non trouvée"}
-            session.run("""
-                MATCH (p:Person {name: $name})
-                DETACH DELETE p
-            """, name=name)
+            deleted = session.run(DELETE_PERSON_CYPHER, name=name).single()
+        if not deleted:
+            return {"status": "error", "message": "Personne non trouvée"}
+        person_names.remove(name)
+        movie_recommendations.remove_person(name)
+        graph_snapshot.mark_dirty()
+        db_stats.apply(persons=-1, directed=-deleted["directed"], produced=-deleted["produced"],
+                       acted_in=-deleted["acted_in"])
+        bump("persons", "movies")
         return {"status": "success", "message": f"Personne '{name}' supprimée avec succès"}
     except HTTPException as e:
         if e.status_code == 403:
@@ -167,68 +225,3 @@ def delete_person(name: str, username: str = Depends(verify_admin)):
         raise
     except Exception as e:
         return {"status": "error", "message": str(e)}
-
-@router.get("/actors/{name}/movies")
-def get_movies_by_actor(name: str):
-    try:
-        with neo4j_conn.driver.session() as session:
-            cypher = '''
-            MATCH (p:Person)
-            WITH p, apoc.text.sorensenDiceSimilarity(toLower(p.name), toLower($name)) AS similarity
-            WHERE similarity > 0.5
-            WITH p, similarity
-            ORDER BY similarity DESC
-            LIMIT 1
-            MATCH (p)-[r:ACTED_IN]->(m:Movie)
-            RETURN m.title as title, m.released as released, r.roles as roles, p.name as actor, similarity
-            ORDER BY m.released DESC
-            '''
-            result = session.run(cypher, name=name)
-            movies = [dict(record) for record in result]
-        if not movies:
-            return {"status": "error", "message": "Aucun film trouvé pour cet acteur"}
-        return {
-            "status": "success",
-            "actor": movies[0]["actor"],
-            "movies": [{k: v for k, v in m.items() if k != "actor" and k != "similarity"} for m in movies],
-            "count": len(movies),
-            "similarity": movies[0]["similarity"]
-        }
-    except Exception as e:
-        return {"status": "error", "message": str(e)}
-
-@router.get("/collaborations")
-def get_collaborations(person1: str, person2: str):
-    try:
-        with neo4j_conn.driver.session() as session:
-            cypher = '''
-            MATCH (p1:Person)
-            WITH p1, apoc.text.sorensenDiceSimilarity(toLower(p1.name), toLower($person1)) AS sim1
-            WHERE sim1 > 0.5
-            WITH p1, sim1
-            ORDER BY sim1 DESC
-            LIMIT 1
-            MATCH (p2:Person)
-            WITH p1, sim1, p2, apoc.text.sorensenDiceSimilarity(toLower(p2.name), toLower($person2)) AS sim2
-            WHERE sim2 > 0.5
-            WITH p1, sim1, p2, sim2
-            ORDER BY sim2 DESC
-            LIMIT 1
-            MATCH (p1)-[:ACTED_IN]->(m:Movie)<-[:ACTED_IN]-(p2)
-            RETURN collect(m.title) as movies, count(m) as collaborations, p1.name as person1, p2.name as person2, sim1, sim2
-            '''
-            result = session.run(cypher, person1=person1, person2=person2)
-            record = result.single()
-            if not record or not record["person1"] or not record["person2"]:
-                return {"status": "error", "message": "Aucune collaboration trouvée"}
-            return {
-                "status": "success",
-                "person1": record["person1"],
-                "person2": record["person2"],
-                "collaborations": record["collaborations"],
-                "movies": record["movies"],
-                "similarity1": record["sim1"],
-                "similarity2": record["sim2"]
-            }
-    except Exception as e:
-        return {"status": "error", "message": str(e)}
@@ -1,17 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Body
 from db.neo4j_conn import neo4j_conn
+from repositories import repositories
+from services.auth import decode_token, resolve_role
+from services.http_cache import bump, cached_response
+from services.rating_similarity import rating_similarity
+from services.user_feed import user_feeds
 from typing import Optional
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from jose import jwt, JWTError
 from pydantic import BaseModel
 from datetime import datetime
-import os
+from services.server_timing import TimedRoute
 
-router = APIRouter()
-
-SECRET_KEY = os.getenv("API_TOKEN", "supersecret")
-ALGORITHM = "HS256"
-security = HTTPBearer()
+router = APIRouter(route_class=TimedRoute)
 
 class ReviewIn(BaseModel):
     movie_title: str
@@ -25,36 +24,11 @@ class ReviewOut(BaseModel):
     comment: Optional[str] = None
     created_at: str
 
-def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    token = credentials.credentials
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username = payload.get("sub")
-        if not username:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-        return username
-    except JWTError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or missing token",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-
-def verify_admin(username: str = Depends(verify_token)):
-    with neo4j_conn.driver.session() as session:
-        result = session.run("MATCH (u:User {username: $username}) RETURN u.role as role", username=username)
-        record = result.single()
-        if not record or record["role"] != "admin":
-            raise HTTPException(status_code=403, detail="Admin privileges required")
-        return username
-
-@router.post("", response_model=ReviewOut, dependencies=[Depends(verify_token)])
-def add_review(review: ReviewIn, username: str = Depends(verify_token)):
-    with neo4j_conn.driver.session() as session:
-        user_result = session.run("MATCH (u:User {username: $username}) RETURN u.role as role", username=username)
-        user_record = user_result.single()
-        if user_record and user_record["role"] == "admin":
-            raise HTTPException(status_code=403, detail="Administrators cannot leave reviews")
+@router.post("", response_model=ReviewOut)
+def add_review(review: ReviewIn, payload: dict = Depends(decode_token)):
+    username = payload["sub"]
+    if resolve_role(payload) == "admin":
+        raise HTTPException(status_code=403, detail="Administrators cannot leave reviews")
     if not (1 <= review.rating <= 5):
         raise HTTPException(status_code=400, detail="Rating must be between 1 and 5")
     created_at = datetime.utcnow().isoformat()
@@ -69,15 +43,13 @@ def add_review(review: ReviewIn, username: str = Depends(verify_token)):
             MERGE (u)-[r:RATED]->(m)
             SET r.rating = $rating, r.comment = $comment, r.created_at = $created_at
         """, username=username, movie_title=review.movie_title, rating=review.rating, comment=review.comment, created_at=created_at)
+    bump("reviews")
+    rating_similarity.record_rating(username, review.movie_title, review.rating)
+    user_feeds.record_write(username, review.movie_title)
     return ReviewOut(username=username, movie_title=review.movie_title, rating=review.rating, comment=review.comment, created_at=created_at)
 
 @router.get("/{movie_title}")
+@cached_response("reviews")
 def get_reviews(movie_title: str):
-    with neo4j_conn.driver.session() as session:
-        result = session.run("""
-            MATCH (u:User)-[r:RATED]->(m:Movie {title: $movie_title})
-            RETURN u.username as username, r.rating as rating, r.comment as comment, r.created_at as created_at
-            ORDER BY r.created_at DESC
-        """, movie_title=movie_title)
-        reviews = [dict(record) for record in result]
+    reviews = repositories.reviews.for_movie(movie_title)
     return {"reviews": reviews, "count": len(reviews)}
@@ -1,35 +1,17 @@
 from fastapi import APIRouter
-from db.neo4j_conn import neo4j_conn
+from services.stats_counters import db_stats, fetch_stats
+from services.server_timing import TimedRoute
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 @router.get("/")
-def get_database_stats():
+def get_database_stats(fresh: bool = False):
     try:
-        with neo4j_conn.driver.session() as session:
-            movies_count = session.run("MATCH (m:Movie) RETURN count(m) as count").single()["count"]
-            persons_count = session.run("MATCH (p:Person) RETURN count(p) as count").single()["count"]
-            acted_in_count = session.run("MATCH ()-[r:ACTED_IN]->() RETURN count(r) as count").single()["count"]
-            directed_count = session.run("MATCH ()-[r:DIRECTED]->() RETURN count(r) as count").single()["count"]
-            produced_count = session.run("MATCH ()-[r:PRODUCED]->() RETURN count(r) as count").single()["count"]
-            latest_movie = session.run("""
-                MATCH (m:Movie) 
-                RETURN m.title as title, m.released as released 
-                ORDER BY m.released DESC 
-                LIMIT 1
-            """).single()
-        return {
-            "status": "success",
-            "stats": {
-                "movies_count": movies_count,
-                "persons_count": persons_count,
-                "relationships": {
-                    "acted_in": acted_in_count,
-                    "directed": directed_count,
-                    "produced": produced_count
-                },
-                "latest_movie": dict(latest_movie) if latest_movie else None
-            }
-        }
+        # Compteurs matérialisés ; fresh=true force les comptages exacts dans la base
+        stats = None if fresh else db_stats.snapshot()
+        if stats is None:
+            stats = fetch_stats()
+            db_stats.load(stats)
+        return {"status": "success", "stats": stats}
     except Exception as e:
         return {"status": "error", "message": str(e)}
@@ -1,19 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Body
 from db.neo4j_conn import neo4j_conn
+from neo4j.exceptions import ConstraintError
+from services.auth import create_access_token, invalidate_role, verify_token
+from services.rating_similarity import rating_similarity
+from services.user_feed import user_feeds
 from typing import Optional
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials, OAuth2PasswordRequestForm
-from jose import jwt, JWTError
+from fastapi.security import OAuth2PasswordRequestForm
 from pydantic import BaseModel
 import bcrypt
-import os
-from datetime import datetime, timedelta
+from services.server_timing import TimedRoute
 
-router = APIRouter()
-
-SECRET_KEY = os.getenv("API_TOKEN", "supersecret")
-ALGORITHM = "HS256"
-security = HTTPBearer()
-ACCESS_TOKEN_EXPIRE_MINUTES = 60
+router = APIRouter(route_class=TimedRoute)
 
 class UserRegister(BaseModel):
     username: str
@@ -24,29 +21,6 @@ class UserOut(BaseModel):
     username: str
     role: str
 
-def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    token = credentials.credentials
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username = payload.get("sub")
-        if not username:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-        return username
-    except JWTError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or missing token",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-
-def verify_admin(username: str = Depends(verify_token)):
-    with neo4j_conn.driver.session() as session:
-        result = session.run("MATCH (u:User {username: $username}) RETURN u.role as role", username=username)
-        record = result.single()
-        if not record or record["role"] != "admin":
-            raise HTTPException(status_code=403, detail="Admin privileges required")
-        return username
-
 @router.post("/register", response_model=UserOut)
 def register(user: UserRegister = Body(...)):
     with neo4j_conn.driver.session() as session:
@@ -55,7 +29,12 @@ def register(user: UserRegister = Body(...)):
             raise HTTPException(status_code=400, detail="Username already exists")
         hashed = bcrypt.hashpw(user.password.encode(), bcrypt.gensalt()).decode()
         role = user.role if user.role in ["admin", "user"] else "user"
-        session.run("CREATE (u:User {username: $username, password: $password, role: $role})", username=user.username, password=hashed, role=role)
+        try:
+            session.run("CREATE (u:User {username: $username, password: $password, role: $role})", username=user.username, password=hashed, role=role).consume()
+        except ConstraintError:
+            # Inscription concurrente du même nom, refusée par la contrainte d'unicité
+            raise HTTPException(status_code=400, detail="Username already exists")
+    invalidate_role(user.username)
     return {"username": user.username, "role": role}
 
 @router.post("/login")
@@ -69,7 +48,17 @@ def login(form_data: OAuth2PasswordRequestForm = Depends()):
         user_role = record["role"] or "user"
         if not bcrypt.checkpw(form_data.password.encode(), hashed.encode()):
             raise HTTPException(status_code=400, detail="Incorrect username or password")
-        expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-        to_encode = {"sub": form_data.username, "exp": expire}
-        token = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+        token = create_access_token(form_data.username, user_role)
         return {"access_token": token, "token_type": "bearer", "username": form_data.username, "role": user_role}
+
+@router.get("/me/also-liked")
+def also_liked_for_me(limit: int = 10, username: str = Depends(verify_token)):
+    """Films proches de ceux que l'utilisateur a bien notés, hors films déjà notés"""
+    if not rating_similarity.loaded:
+        return {"status": "error", "message": "Recommandations en cours de calcul"}
+    return {"status": "success", "recommendations": rating_similarity.recommend_for_user(username, limit)}
+
+@router.get("/me/feed")
+def my_feed(limit: int = 20, username: str = Depends(verify_token)):
+    """Fil personnalisé : films classés depuis le vivier précalculé de l'utilisateur, hors films notés ou enregistrés"""
+    return {"status": "success", **user_feeds.feed(username, limit)}
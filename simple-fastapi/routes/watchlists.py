@@ -1,17 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from db.neo4j_conn import neo4j_conn
+from repositories import repositories
+from services.auth import verify_token
+from services.http_cache import bump, cached_response
+from services.user_feed import user_feeds
+from services.pagination import InvalidCursor, next_cursor
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from typing import Optional, List
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from jose import jwt, JWTError
 from pydantic import BaseModel
 from datetime import datetime
-import os
+from services.server_timing import TimedRoute
 
-router = APIRouter()
-
-SECRET_KEY = os.getenv("API_TOKEN", "supersecret")
-ALGORITHM = "HS256"
-security = HTTPBearer()
+router = APIRouter(route_class=TimedRoute)
 
 # Modèles Pydantic
 class WatchlistCreate(BaseModel):
@@ -40,22 +41,6 @@ class WatchlistDetailOut(BaseModel):
     username: str
     movies: List[dict]
 
-# Dépendances d'authentification
-def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    token = credentials.credentials
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username = payload.get("sub")
-        if not username:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-        return username
-    except JWTError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or missing token",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-
 # ===== WATCHLIST ROUTES =====
 
 @router.post("", response_model=WatchlistOut)
@@ -84,6 +69,8 @@ def create_watchlist(watchlist: WatchlistCreate, username: str = Depends(verify_
             if not record:
                 raise HTTPException(status_code=400, detail="Erreur lors de la création de la watchlist")
             
+            bump("watchlists")
+            
             return WatchlistOut(
                 id=record["id"],
                 name=record["name"],
@@ -100,28 +87,7 @@ def create_watchlist(watchlist: WatchlistCreate, username: str = Depends(verify_
 def get_user_watchlists(username: str = Depends(verify_token)):
     """Récupérer toutes les watchlists de l'utilisateur"""
     try:
-        with neo4j_conn.driver.session() as session:
-            result = session.run("""
-                MATCH (u:User {username: $username})-[:OWNS]->(w:Watchlist)
-                OPTIONAL MATCH (w)-[:CONTAINS]->(m:Movie)
-                RETURN w.id as id, w.name as name, w.description as description,
-                       w.is_public as is_public, w.created_at as created_at,
-                       count(m) as movie_count
-                ORDER BY w.created_at DESC
-            """, username=username)
-            
-            watchlists = []
-            for record in result:
-                watchlists.append(WatchlistOut(
-                    id=record["id"],
-                    name=record["name"],
-                    description=record["description"],
-                    is_public=record["is_public"],
-                    created_at=record["created_at"],
-                    movie_count=record["movie_count"],
-                    username=username
-                ))
-            return watchlists
+        return [WatchlistOut(**row, username=username) for row in repositories.watchlists.for_user(username)]
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erreur serveur: {str(e)}")
 
@@ -129,43 +95,15 @@ def get_user_watchlists(username: str = Depends(verify_token)):
 def get_watchlist_detail(watchlist_id: str, username: str = Depends(verify_token)):
     """Récupérer le détail d'une watchlist avec ses films"""
     try:
-        with neo4j_conn.driver.session() as session:
-            # Vérifier l'accès à la watchlist
-            access_result = session.run("""
-                MATCH (w:Watchlist {id: $watchlist_id})
-                OPTIONAL MATCH (owner:User)-[:OWNS]->(w)
-                RETURN w, owner.username as owner_username
-            """, watchlist_id=watchlist_id)
-            
-            access_record = access_result.single()
-            if not access_record:
-                raise HTTPException(status_code=404, detail="Watchlist non trouvée")
-            
-            watchlist_data = access_record["w"]
-            owner_username = access_record["owner_username"]
-            
-            # Vérifier les permissions d'accès
-            if not watchlist_data["is_public"] and owner_username != username:
-                raise HTTPException(status_code=403, detail="Accès refusé à cette watchlist privée")
-            
-            # Récupérer les films de la watchlist
-            movies_result = session.run("""
-                MATCH (w:Watchlist {id: $watchlist_id})-[:CONTAINS]->(m:Movie)
-                RETURN m.title as title, m.released as released, m.tagline as tagline
-                ORDER BY m.title
-            """, watchlist_id=watchlist_id)
-            
-            movies = [dict(record) for record in movies_result]
-            
-            return WatchlistDetailOut(
-                id=watchlist_data["id"],
-                name=watchlist_data["name"],
-                description=watchlist_data["description"],
-                is_public=watchlist_data["is_public"],
-                created_at=watchlist_data["created_at"],
-                username=owner_username,
-                movies=movies
-            )
+        watchlist = repositories.watchlists.get(watchlist_id)
+        if not watchlist:
+            raise HTTPException(status_code=404, detail="Watchlist non trouvée")
+        
+        # Vérifier les permissions d'accès
+        if not watchlist["is_public"] and watchlist["username"] != username:
+            raise HTTPException(status_code=403, detail="Accès refusé à cette watchlist privée")
+        
+        return WatchlistDetailOut(**watchlist, movies=repositories.watchlists.movies(watchlist_id))
     except HTTPException:
         raise
     except Exception as e:
@@ -202,6 +140,8 @@ def add_movie_to_watchlist(watchlist_id: str, movie: WatchlistMovie, username: s
             """, watchlist_id=watchlist_id, movie_title=movie.movie_title)
             
             if result.single():
+                bump("watchlists")
+                user_feeds.record_write(username, movie.movie_title)
                 return {"status": "success", "message": f"Film '{movie.movie_title}' ajouté à la watchlist"}
             else:
                 raise HTTPException(status_code=400, detail="Erreur lors de l'ajout du film")
@@ -224,6 +164,8 @@ def remove_movie_from_watchlist(watchlist_id: str, movie_title: str, username: s
             """, username=username, watchlist_id=watchlist_id, movie_title=movie_title)
             
             if result.single():
+                bump("watchlists")
+                user_feeds.record_write(username)
                 return {"status": "success", "message": f"Film '{movie_title}' retiré de la watchlist"}
             else:
                 raise HTTPException(status_code=404, detail="Film non trouvé dans cette watchlist ou watchlist non trouvée")
@@ -246,6 +188,7 @@ def update_watchlist(watchlist_id: str, watchlist: WatchlistCreate, username: st
                 name=watchlist.name, description=watchlist.description, is_public=watchlist.is_public)
             
             if result.single():
+                bump("watchlists")
                 return {"status": "success", "message": "Watchlist mise à jour avec succès"}
             else:
                 raise HTTPException(status_code=404, detail="Watchlist non trouvée ou vous n'êtes pas le propriétaire")
@@ -268,6 +211,8 @@ def delete_watchlist(watchlist_id: str, username: str = Depends(verify_token)):
             
             deleted_count = result.single()["deleted"]
             if deleted_count > 0:
+                bump("watchlists")
+                user_feeds.record_write(username)
                 return {"status": "success", "message": "Watchlist supprimée avec succès"}
             else:
                 raise HTTPException(status_code=404, detail="Watchlist non trouvée ou vous n'êtes pas le propriétaire")
@@ -278,32 +223,16 @@ def delete_watchlist(watchlist_id: str, username: str = Depends(verify_token)):
         raise HTTPException(status_code=500, detail=f"Erreur serveur: {str(e)}")
 
 @router.get("/public/all", response_model=List[WatchlistOut])
-def get_public_watchlists(limit: int = 20, skip: int = 0):
-    """Récupérer les watchlists publiques"""
+@cached_response("watchlists")
+def get_public_watchlists(limit: int = 20, skip: int = 0, cursor: Optional[str] = None):
+    """Récupérer les watchlists publiques (curseur de la page suivante dans l'en-tête X-Next-Cursor)"""
     try:
-        with neo4j_conn.driver.session() as session:
-            result = session.run("""
-                MATCH (u:User)-[:OWNS]->(w:Watchlist {is_public: true})
-                OPTIONAL MATCH (w)-[:CONTAINS]->(m:Movie)
-                RETURN w.id as id, w.name as name, w.description as description,
-                       w.is_public as is_public, w.created_at as created_at,
-                       count(m) as movie_count, u.username as username
-                ORDER BY w.created_at DESC
-                SKIP $skip LIMIT $limit
-            """, skip=skip, limit=limit)
-            
-            watchlists = []
-            for record in result:
-                watchlists.append(WatchlistOut(
-                    id=record["id"],
-                    name=record["name"],
-                    description=record["description"],
-                    is_public=record["is_public"],
-                    created_at=record["created_at"],
-                    movie_count=record["movie_count"],
-                    username=record["username"]
-                ))
-            return watchlists
+        watchlists = [WatchlistOut(**row) for row in repositories.watchlists.public_page(limit, skip, cursor)]
+        cursor = next_cursor(watchlists, limit, "watchlists", "created_at", "id")
+        headers = {"X-Next-Cursor": cursor} if cursor else None
+        return JSONResponse(content=jsonable_encoder(watchlists), headers=headers)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erreur serveur: {str(e)}")
 
@@ -311,13 +240,7 @@ def get_public_watchlists(limit: int = 20, skip: int = 0):
 def check_movie_in_watchlists(movie_title: str, username: str = Depends(verify_token)):
     """Vérifier dans quelles watchlists se trouve un film"""
     try:
-        with neo4j_conn.driver.session() as session:
-            result = session.run("""
-                MATCH (u:User {username: $username})-[:OWNS]->(w:Watchlist)-[:CONTAINS]->(m:Movie {title: $movie_title})
-                RETURN w.id as id, w.name as name
-            """, username=username, movie_title=movie_title)
-            
-            watchlists = [{"id": record["id"], "name": record["name"]} for record in result]
-            return {"movie_title": movie_title, "in_watchlists": watchlists}
+        watchlists = repositories.watchlists.containing(username, movie_title)
+        return {"movie_title": movie_title, "in_watchlists": watchlists}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erreur serveur: {str(e)}")
\ No newline at end of file
@@ -0,0 +1 @@
+# Permet à Python de reconnaître ce dossier comme un package
@@ -0,0 +1,161 @@
+"""
+Authentification JWT et résolution des rôles, partagées par tous les routers.
+
+Le rôle est résolu sans aller-retour Neo4j sur le chemin chaud :
+1. claim `role` signé dans le token émis par /login ;
+2. sinon (anciens tokens, ou rôle modifié après l'émission du token),
+   cache TTL borné nom d'utilisateur -> rôle ;
+3. sinon lecture du rôle dans la base (repositories.users), qui remplit le cache.
+
+Tout changement de rôle doit appeler `invalidate_role(username)` : le cache est
+vidé pour cet utilisateur et les claims des tokens émis avant le changement
+sont ignorés. L'invalidation est locale au processus : avec plusieurs workers,
+un rôle modifié directement en base reste visible au plus ROLE_CACHE_TTL
+secondes dans le cache, et jusqu'à l'expiration du token via le claim.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Optional
+
+from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from jose import jwt, JWTError
+
+from repositories import repositories
+from services.server_timing import phase
+
+SECRET_KEY = os.getenv("API_TOKEN", "supersecret")
+ALGORITHM = "HS256"
+ACCESS_TOKEN_EXPIRE_MINUTES = 60
+ROLE_CACHE_TTL = float(os.getenv("ROLE_CACHE_TTL", "60"))
+ROLE_CACHE_SIZE = int(os.getenv("ROLE_CACHE_SIZE", "10000"))
+
+security = HTTPBearer()
+
+
+class RoleCache:
+    """Cache LRU à durée de vie limitée des rôles utilisateurs"""
+
+    def __init__(self, ttl: float, max_size: int, token_lifetime: float = ACCESS_TOKEN_EXPIRE_MINUTES * 60):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.token_lifetime = token_lifetime
+        self._entries = OrderedDict()
+        self._changed_at = OrderedDict()     # du changement le plus ancien au plus récent
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, username: str):
+        """Rôle en cache, ou None (un utilisateur sans rôle est mis en cache sous la valeur "")"""
+        with self._lock:
+            entry = self._entries.get(username)
+            if entry is None or entry[1] < time.monotonic():
+                self.misses += 1
+                return None
+            self._entries.move_to_end(username)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, username: str, role: Optional[str]):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[username] = (role or "", time.monotonic() + self.ttl)
+            self._entries.move_to_end(username)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, username: str):
+        now = time.time()
+        with self._lock:
+            self._entries.pop(username, None)
+            self._changed_at.pop(username, None)
+            self._changed_at[username] = now
+            # Tout token émis avant un changement plus ancien que leur durée de vie a expiré
+            while next(iter(self._changed_at.values())) < now - self.token_lifetime:
+                self._changed_at.popitem(last=False)
+
+    def claim_is_current(self, username: str, issued_at) -> bool:
+        """Un claim n'est fiable que s'il a été émis après le dernier changement de rôle connu"""
+        changed_at = self._changed_at.get(username)
+        return changed_at is None or (issued_at is not None and issued_at > changed_at)
+
+
+role_cache = RoleCache(ROLE_CACHE_TTL, ROLE_CACHE_SIZE)
+
+
+def create_access_token(username: str, role: str) -> str:
+    now = datetime.utcnow()
+    to_encode = {
+        "sub": username,
+        "role": role,
+        "iat": now,
+        "exp": now + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES),
+    }
+    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+
+
+def invalidate_role(username: str):
+    role_cache.invalidate(username)
+
+
+def role_from_claim(payload: dict) -> Optional[str]:
+    """Rôle porté par le token, ou None s'il faut le résoudre autrement"""
+    if "role" not in payload:
+        return None
+    if not role_cache.claim_is_current(payload["sub"], payload.get("iat")):
+        return None
+    return payload["role"] or ""
+
+
+def decode_payload(token: str) -> dict:
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or missing token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    if not payload.get("sub"):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    return payload
+
+
+def resolve_role(payload: dict) -> str:
+    with phase("auth"):
+        role = role_from_claim(payload)
+        if role is not None:
+            return role
+        username = payload["sub"]
+        role = role_cache.get(username)
+        if role is not None:
+            return role
+        role = repositories.users.role(username)
+        role_cache.set(username, role)
+        return role or ""
+
+
+# Dépendances d'authentification
+
+def decode_token(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
+    with phase("auth"):
+        return decode_payload(credentials.credentials)
+
+
+def verify_token(payload: dict = Depends(decode_token)) -> str:
+    return payload["sub"]
+
+
+def verify_role(payload: dict = Depends(decode_token)) -> str:
+    return resolve_role(payload)
+
+
+def verify_admin(payload: dict = Depends(decode_token)) -> str:
+    if resolve_role(payload) != "admin":
+        raise HTTPException(status_code=403, detail="Admin privileges required")
+    return payload["sub"]
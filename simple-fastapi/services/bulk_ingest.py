@@ -0,0 +1,116 @@
+"""
+Import en masse de films au format NDJSON (POST /movies/bulk).
+
+Le corps de la requête est lu morceau par morceau : chaque ligne complète est
+décodée, validée, puis rangée dans un lot. Dès qu'un lot atteint
+BULK_BATCH_SIZE films il est rendu à la route, qui l'écrit en une transaction
+(UNWIND) avant de lire la suite. Le corps n'est donc jamais entièrement en
+mémoire ; seul le rapport (un résultat par ligne) grandit avec l'import.
+
+Un lot dont la transaction échoue est annulé en entier et toutes ses lignes
+sont signalées en erreur ; les lots précédents restent écrits.
+"""
+import json
+import os
+
+BULK_BATCH_SIZE = int(os.getenv("BULK_BATCH_SIZE", "500"))
+BULK_MAX_LINE_BYTES = int(os.getenv("BULK_MAX_LINE_BYTES", "1048576"))
+
+
+class InvalidMovie(ValueError):
+    pass
+
+
+class NdjsonBatcher:
+    """
+    validate(dict) -> film normalisé, ou InvalidMovie. Chaque film d'un lot est
+    un couple (numéro de ligne, film).
+    """
+
+    def __init__(self, validate, batch_size: int = BULK_BATCH_SIZE, max_line_bytes: int = BULK_MAX_LINE_BYTES):
+        self.validate = validate
+        self.batch_size = batch_size
+        self.max_line_bytes = max_line_bytes
+        self.results = []
+        self._buffer = b""
+        self._line = 0
+        self._skipping = False
+        self._titles = set()
+        self._batch = []
+
+    def feed(self, chunk: bytes):
+        """Ajouter un morceau du corps ; renvoie les lots complets"""
+        batches = []
+        lines = (self._buffer + chunk).split(b"\n")
+        # Le dernier élément est une ligne incomplète (ou vide)
+        self._buffer = lines.pop()
+        for line in lines:
+            if self._skipping:
+                # Fin d'une ligne trop longue, déjà signalée
+                self._skipping = False
+                continue
+            batches.extend(self._add_line(line))
+        if len(self._buffer) > self.max_line_bytes and not self._skipping:
+            self._line += 1
+            self._error(f"Ligne de plus de {self.max_line_bytes} octets")
+            self._buffer = b""
+            self._skipping = True
+        elif self._skipping:
+            self._buffer = b""
+        return batches
+
+    def finish(self):
+        """Fin du corps : dernière ligne sans retour à la ligne et lot incomplet"""
+        batches = []
+        if self._buffer and not self._skipping:
+            batches.extend(self._add_line(self._buffer))
+        self._buffer = b""
+        if self._batch:
+            batches.append(self._batch)
+            self._batch = []
+        return batches
+
+    def _add_line(self, line: bytes):
+        self._line += 1
+        if not line.strip():
+            return []
+        if len(line) > self.max_line_bytes:
+            self._error(f"Ligne de plus de {self.max_line_bytes} octets")
+            return []
+        try:
+            data = json.loads(line)
+            if not isinstance(data, dict):
+                raise InvalidMovie("Objet JSON attendu")
+            movie = self.validate(data)
+        except (ValueError, UnicodeDecodeError) as e:
+            self._error(str(e) if isinstance(e, InvalidMovie) else f"JSON invalide : {e}")
+            return []
+        if movie["title"] in self._titles:
+            self._error("Titre en double dans l'import", movie["title"])
+            return []
+        self._titles.add(movie["title"])
+        self._batch.append((self._line, movie))
+        if len(self._batch) >= self.batch_size:
+            batch, self._batch = self._batch, []
+            return [batch]
+        return []
+
+    def _error(self, message: str, title: str = None):
+        self.results.append({"line": self._line, "title": title, "status": "error", "message": message})
+
+    def batch_written(self, batch, created_titles):
+        for line, movie in batch:
+            if movie["title"] in created_titles:
+                self.results.append({"line": line, "title": movie["title"], "status": "created"})
+            else:
+                self.results.append({"line": line, "title": movie["title"], "status": "error",
+                                     "message": "Film déjà existant"})
+
+    def batch_failed(self, batch, message: str):
+        for line, movie in batch:
+            self.results.append({"line": line, "title": movie["title"], "status": "error", "message": message})
+
+    def report(self) -> dict:
+        results = sorted(self.results, key=lambda result: result["line"])
+        created = sum(1 for result in results if result["status"] == "created")
+        return {"status": "success", "created": created, "failed": len(results) - created, "results": results}
@@ -0,0 +1,123 @@
+"""
+Export complet du catalogue en NDJSON (GET /export).
+
+Une ligne JSON par enregistrement, avec un champ "type" : movie (avec ses
+crédits), person, puis en option rating et watchlist (publiques uniquement).
+Les lignes sont produites au fil du curseur du driver (lu par lots de
+EXPORT_FETCH_SIZE enregistrements) et regroupées en morceaux d'environ
+EXPORT_CHUNK_SIZE octets : la mémoire reste constante quelle que soit la taille
+de la base. La réponse avance au rythme du client (chaque morceau attend que le
+précédent soit envoyé) et peut être compressée en gzip au fil de l'eau.
+"""
+import json
+import os
+import zlib
+
+EXPORT_FETCH_SIZE = int(os.getenv("EXPORT_FETCH_SIZE", "1000"))
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "65536"))
+
+EXPORT_QUERIES = {
+    "movie": """
+        MATCH (m:Movie)
+        RETURN m.title as title, m.released as released, m.tagline as tagline,
+               [(p:Person)-[r:ACTED_IN]->(m) | {name: p.name, roles: r.roles}] as actors,
+               [(d:Person)-[:DIRECTED]->(m) | d.name] as directors,
+               [(prod:Person)-[:PRODUCED]->(m) | prod.name] as producers
+    """,
+    "person": """
+        MATCH (p:Person)
+        RETURN p.name as name, p.born as born
+    """,
+    "rating": """
+        MATCH (u:User)-[r:RATED]->(m:Movie)
+        RETURN u.username as username, m.title as movie_title, r.rating as rating,
+               r.comment as comment, r.created_at as created_at
+    """,
+    "watchlist": """
+        MATCH (u:User)-[:OWNS]->(w:Watchlist {is_public: true})
+        RETURN w.id as id, w.name as name, w.description as description, w.created_at as created_at,
+               u.username as username, [(w)-[:CONTAINS]->(m:Movie) | m.title] as movies
+    """,
+}
+
+
+def export_sections(ratings: bool = False, watchlists: bool = False):
+    sections = ["movie", "person"]
+    if ratings:
+        sections.append("rating")
+    if watchlists:
+        sections.append("watchlist")
+    return sections
+
+
+def ndjson_line(section: str, record) -> bytes:
+    return (json.dumps({"type": section, **dict(record)}, ensure_ascii=False, default=str) + "\n").encode()
+
+
+class ChunkBuffer:
+    """Regrouper les lignes en morceaux, compressés en gzip si demandé"""
+
+    def __init__(self, gzip: bool):
+        self._compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if gzip else None
+        self._parts = []
+        self._size = 0
+
+    def add(self, line: bytes):
+        """Ajouter une ligne ; renvoie un morceau à envoyer quand le tampon est plein"""
+        self._parts.append(line)
+        self._size += len(line)
+        if self._size >= EXPORT_CHUNK_SIZE:
+            return self._flush()
+        return None
+
+    def _flush(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts, self._size = [], 0
+        if self._compressor:
+            # Z_SYNC_FLUSH : le client peut décompresser chaque morceau dès réception
+            data = self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+        return data
+
+    def close(self) -> bytes:
+        data = self._flush()
+        if self._compressor:
+            data += self._compressor.flush()
+        return data
+
+
+def export_stream(driver, sections, gzip: bool = False):
+    """Générateur synchrone des morceaux de l'export (driver Neo4j synchrone)"""
+    buffer = ChunkBuffer(gzip)
+    with driver.session(fetch_size=EXPORT_FETCH_SIZE) as session:
+        for section in sections:
+            # Chaque résultat est lu jusqu'au bout avant la requête suivante sur la session
+            for record in session.run(EXPORT_QUERIES[section]):
+                chunk = buffer.add(ndjson_line(section, record))
+                if chunk:
+                    yield chunk
+    tail = buffer.close()
+    if tail:
+        yield tail
+
+
+async def export_stream_async(driver, sections, gzip: bool = False):
+    """Même export avec le driver asynchrone"""
+    buffer = ChunkBuffer(gzip)
+    async with driver.session(fetch_size=EXPORT_FETCH_SIZE) as session:
+        for section in sections:
+            result = await session.run(EXPORT_QUERIES[section])
+            async for record in result:
+                chunk = buffer.add(ndjson_line(section, record))
+                if chunk:
+                    yield chunk
+    tail = buffer.close()
+    if tail:
+        yield tail
+
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    for part in (accept_encoding or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        if coding.strip().lower() == "gzip":
+            return params.replace(" ", "").lower() not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
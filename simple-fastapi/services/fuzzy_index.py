@@ -0,0 +1,176 @@
+"""
+Index n-grammes en mémoire pour la résolution floue des titres de films
+et des noms de personnes.
+
+Reproduit exactement apoc.text.sorensenDiceSimilarity (bigrammes par mot,
+intersection multi-ensemble) mais sans parcourir tous les nœuds :
+seules les entrées qui partagent au moins un bigramme avec la requête, et dont
+le nombre de bigrammes rend le seuil atteignable (filtre par longueur), sont scorées.
+"""
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from repositories import repositories
+
+SIMILARITY_THRESHOLD = 0.5
+
+
+def bigrams(text: str) -> Counter:
+    """Bigrammes d'un texte, calculés mot par mot comme dans APOC"""
+    grams = Counter()
+    for word in text.split():
+        for i in range(len(word) - 1):
+            grams[word[i:i + 2]] += 1
+    return grams
+
+
+def sorensen_dice(text1: str, text2: str) -> float:
+    """Équivalent Python de apoc.text.sorensenDiceSimilarity"""
+    if text1 == text2:
+        return 1.0
+    grams1 = bigrams(text1.upper())
+    grams2 = bigrams(text2.upper())
+    total = sum(grams1.values()) + sum(grams2.values())
+    if not total:
+        return 0.0
+    common = sum((grams1 & grams2).values())
+    return 2.0 * common / total
+
+
+def size_bounds(size: int, threshold: float) -> Tuple[float, float]:
+    """Bornes (exclusives) du nombre de bigrammes d'une entrée pouvant dépasser le seuil"""
+    # 2 * min(a, b) / (a + b) > seuil  <=>  a * t / (2 - t) < b < a * (2 - t) / t
+    if threshold <= 0:
+        return 0, float("inf")
+    return size * threshold / (2 - threshold), size * (2 - threshold) / threshold
+
+
+class NgramIndex:
+    def __init__(self, threshold: float = SIMILARITY_THRESHOLD):
+        self.threshold = threshold
+        self._lock = threading.RLock()
+        self._entries: Dict[str, dict] = {}
+        self._grams: Dict[str, Counter] = {}
+        self._sizes: Dict[str, int] = {}
+        # bigramme -> nombre de bigrammes de l'entrée -> entrées
+        self._postings: Dict[str, Dict[int, set]] = defaultdict(lambda: defaultdict(set))
+        self._exact: Dict[str, set] = defaultdict(set)
+        self.loaded = False
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key: str):
+        return key in self._entries
+
+    def load(self, items: Iterable[Tuple[str, dict]]):
+        """Remplacer tout le contenu de l'index"""
+        with self._lock:
+            self._entries.clear()
+            self._grams.clear()
+            self._sizes.clear()
+            self._postings.clear()
+            self._exact.clear()
+            for key, meta in items:
+                self._add(key, meta)
+            self.loaded = True
+
+    def add(self, key: str, **meta):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._add(key, meta)
+
+    def update(self, key: str, **meta):
+        with self._lock:
+            if key in self._entries:
+                self._entries[key].update(meta)
+
+    def remove(self, key: str):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def get(self, key: str) -> Optional[dict]:
+        return self._entries.get(key)
+
+    def search(self, query: str, threshold: Optional[float] = None) -> List[Tuple[str, float, dict]]:
+        """Toutes les entrées dont la similarité dépasse le seuil, de la plus proche à la moins proche"""
+        threshold = self.threshold if threshold is None else threshold
+        # Même normalisation que toLower(m.title) / toLower($title) dans les requêtes Cypher
+        lowered = query.lower()
+        query_grams = bigrams(lowered.upper())
+        query_size = sum(query_grams.values())
+        low, high = size_bounds(query_size, threshold)
+        with self._lock:
+            common = defaultdict(int)
+            for gram, count in query_grams.items():
+                for size, keys in self._postings.get(gram, {}).items():
+                    if not low < size < high:
+                        continue
+                    for key in keys:
+                        common[key] += min(count, self._grams[key][gram])
+            scores = {}
+            for key, shared in common.items():
+                scores[key] = 2.0 * shared / (query_size + self._sizes[key])
+            for key in self._exact.get(lowered, ()):
+                scores[key] = 1.0
+            matches = [(key, score, dict(self._entries[key])) for key, score in scores.items() if score > threshold]
+        matches.sort(key=lambda m: (-m[1], m[0]))
+        return matches
+
+    def best_match(self, query: str) -> Optional[Tuple[str, float]]:
+        matches = self.search(query)
+        if not matches:
+            return None
+        key, score, _ = matches[0]
+        return key, score
+
+    def best_matches(self, queries: Iterable[str]) -> List[Optional[Tuple[str, float]]]:
+        """Résoudre plusieurs requêtes en une seule passe sous le même verrou"""
+        with self._lock:
+            return [self.best_match(query) for query in queries]
+
+    def _add(self, key: str, meta: dict):
+        lowered = key.lower()
+        grams = bigrams(lowered.upper())
+        self._entries[key] = dict(meta)
+        self._grams[key] = grams
+        size = sum(grams.values())
+        self._sizes[key] = size
+        for gram in grams:
+            self._postings[gram][size].add(key)
+        self._exact[lowered].add(key)
+
+    def _remove(self, key: str):
+        lowered = key.lower()
+        size = self._sizes[key]
+        for gram in self._grams.pop(key):
+            buckets = self._postings[gram]
+            buckets[size].discard(key)
+            if not buckets[size]:
+                del buckets[size]
+            if not buckets:
+                del self._postings[gram]
+        self._exact[lowered].discard(key)
+        if not self._exact[lowered]:
+            del self._exact[lowered]
+        del self._entries[key]
+        del self._sizes[key]
+
+
+movie_titles = NgramIndex()
+person_names = NgramIndex()
+
+
+def load_movie_titles():
+    """Charger tous les titres de films dans l'index (appelé au démarrage)"""
+    movie_titles.load((title, {"released": released}) for title, released in repositories.movies.titles())
+    print(f"🔎 Index des titres chargé ({len(movie_titles)} films)")
+
+
+def load_person_names():
+    """Charger tous les noms de personnes dans l'index (appelé au démarrage)"""
+    person_names.load((name, {}) for name in repositories.persons.names())
+    print(f"🔎 Index des personnes chargé ({len(person_names)} personnes)")
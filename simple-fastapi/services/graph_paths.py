@@ -0,0 +1,131 @@
+"""
+Plus court chemin personne – film – personne ("nombre de Bacon").
+
+Recherche en largeur bidirectionnelle sur le graphe biparti Person/Movie des
+relations ACTED_IN, DIRECTED et PRODUCED, lu en mémoire (aucune requête Neo4j) :
+`snapshot_path` travaille sur l'instantané CSR (services.graph_snapshot) un
+niveau à la fois, `shortest_path` sur des fonctions de voisinage quelconques
+(matrice des co-crédits tant que l'instantané n'est pas prêt).
+À chaque étape on étend le côté dont la frontière est la plus petite ; la
+recherche s'arrête à PATH_MAX_DEPTH degrés de séparation ou après
+PATH_TIMEOUT secondes.
+"""
+import os
+import time
+
+import numpy as np
+
+PATH_MAX_DEPTH = int(os.getenv("PATH_MAX_DEPTH", "6"))
+PATH_TIMEOUT = float(os.getenv("PATH_TIMEOUT", "1.0"))
+
+
+class PathSearchTimeout(Exception):
+    pass
+
+
+def shortest_path(source: str, target: str, persons_of, movies_of,
+                  max_depth: int = PATH_MAX_DEPTH, timeout: float = PATH_TIMEOUT):
+    """
+    Chemin [personne, film, personne, ...] le plus court entre deux personnes,
+    ou None au-delà de max_depth degrés. persons_of(titre) et movies_of(nom)
+    donnent les voisins d'un nœud.
+    """
+    if source == target:
+        return [source]
+    deadline = time.monotonic() + timeout
+    # Nœuds : (False, nom de personne) ou (True, titre de film)
+    start, goal = (False, source), (False, target)
+    parents = ({start: None}, {goal: None})
+    frontiers = [[start], [goal]]
+    levels = [0, 0]
+    # Une personne à d degrés est à 2d arêtes. Les frontières avancent niveau par
+    # niveau : la première rencontre, pendant l'extension d'un niveau, donne un chemin de
+    # longueur levels[0] + levels[1] + 1, le plus court possible puisqu'aucune rencontre n'existait au niveau précédent.
+    while frontiers[0] and frontiers[1] and levels[0] + levels[1] < 2 * max_depth:
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        seen, other = parents[side], parents[1 - side]
+        next_frontier = []
+        for node in frontiers[side]:
+            if time.monotonic() > deadline:
+                raise PathSearchTimeout()
+            is_movie, key = node
+            for neighbour in (persons_of(key) if is_movie else movies_of(key)):
+                neighbour = (not is_movie, neighbour)
+                if neighbour in seen:
+                    continue
+                seen[neighbour] = node
+                if neighbour in other:
+                    return _join(parents, neighbour)
+                next_frontier.append(neighbour)
+        frontiers[side] = next_frontier
+        levels[side] += 1
+    return None
+
+
+def _join(parents, meeting):
+    path = []
+    node = meeting
+    while node is not None:
+        path.append(node[1])
+        node = parents[0][node]
+    path.reverse()
+    node = parents[1][meeting]
+    while node is not None:
+        path.append(node[1])
+        node = parents[1][node]
+    return path
+
+
+def snapshot_path(snapshot, source: str, target: str, max_depth: int = PATH_MAX_DEPTH,
+                  timeout: float = PATH_TIMEOUT):
+    """
+    Même recherche que shortest_path sur un GraphSnapshot, un niveau entier à la
+    fois : la frontière est un tableau d'identifiants étendu par GraphSnapshot.expand
+    et les nœuds vus sont marqués dans des tableaux de parents (-2 : non vu, -1 : départ).
+    """
+    if source == target:
+        return [source] if source in snapshot.person_index else None
+    if source not in snapshot.person_index or target not in snapshot.person_index:
+        return None
+    deadline = time.monotonic() + timeout
+    sizes = (len(snapshot.person_names), len(snapshot.movie_titles))
+    # parents[côté][0 : personnes, 1 : films]
+    parents = [[np.full(size, -2, dtype=np.int32) for size in sizes] for _ in range(2)]
+    frontiers = [np.array([snapshot.person_index[source]]), np.array([snapshot.person_index[target]])]
+    parents[0][0][frontiers[0]] = -1
+    parents[1][0][frontiers[1]] = -1
+    levels = [0, 0]
+    while len(frontiers[0]) and len(frontiers[1]) and levels[0] + levels[1] < 2 * max_depth:
+        if time.monotonic() > deadline:
+            raise PathSearchTimeout()
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        # Frontière de personnes aux niveaux pairs, de films aux niveaux impairs
+        kind = levels[side] % 2
+        sources, neighbours = snapshot.expand(bool(kind), frontiers[side])
+        seen = parents[side][1 - kind]
+        fresh = seen[neighbours] == -2
+        neighbours, first = np.unique(neighbours[fresh], return_index=True)
+        seen[neighbours] = sources[fresh][first]
+        met = neighbours[parents[1 - side][1 - kind][neighbours] != -2]
+        if len(met):
+            return _join_arrays(snapshot, parents, int(met[0]), 1 - kind)
+        frontiers[side] = neighbours
+        levels[side] += 1
+    return None
+
+
+def _join_arrays(snapshot, parents, meeting: int, kind: int):
+    halves = []
+    for side in (0, 1):
+        nodes, node, node_kind = [], meeting, kind
+        while node != -1:
+            nodes.append((node_kind, node))
+            node, node_kind = int(parents[side][node_kind][node]), 1 - node_kind
+        halves.append(nodes)
+    path = halves[0][::-1] + halves[1][1:]
+    return [snapshot.movie_titles[i] if node_kind else snapshot.person_names[i] for node_kind, i in path]
+
+
+def describe_path(path):
+    """Chemin alterné personne/film au format de l'API"""
+    return [{"person": key} if i % 2 == 0 else {"movie": key} for i, key in enumerate(path)]
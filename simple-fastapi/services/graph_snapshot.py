@@ -0,0 +1,151 @@
+"""
+Instantané en lecture seule du graphe biparti Person/Movie au format CSR.
+
+Les personnes et les films reçoivent des identifiants entiers (ordre des noms
+et des titres, chaînes internées). Les relations ACTED_IN, DIRECTED et
+PRODUCED (dédoublonnées) sont rangées dans deux tableaux NumPy par sens :
+- person_offsets[i]:person_offsets[i + 1] délimite dans person_targets les
+  films de la personne i ;
+- movie_offsets[j]:movie_offsets[j + 1] délimite dans movie_targets les
+  personnes du film j.
+Un instantané n'est jamais modifié : le thread de fond en construit un nouveau
+(au démarrage puis GRAPH_SNAPSHOT_DELAY secondes après une écriture signalée
+par `mark_dirty`) et remplace la référence d'un coup. Les routes de parcours
+lisent `graph_snapshot.current` une fois par requête.
+"""
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+from repositories import repositories
+
+GRAPH_SNAPSHOT_DELAY = float(os.getenv("GRAPH_SNAPSHOT_DELAY", "2"))
+
+
+class GraphSnapshot:
+    def __init__(self, person_names, movie_titles, person_offsets, person_targets, movie_offsets, movie_targets,
+                 person_index=None, movie_index=None):
+        self.person_names = person_names
+        self.movie_titles = movie_titles
+        self.person_index = person_index if person_index is not None else {name: i for i, name in enumerate(person_names)}
+        self.movie_index = movie_index if movie_index is not None else {title: j for j, title in enumerate(movie_titles)}
+        self.person_offsets = person_offsets
+        self.person_targets = person_targets
+        self.movie_offsets = movie_offsets
+        self.movie_targets = movie_targets
+        self.built_at = time.time()
+
+    @classmethod
+    def from_edges(cls, names, titles, edges):
+        """names, titles : nœuds (isolés compris) ; edges : couples (nom, titre)"""
+        edges = list(edges)
+        person_names = sorted({sys.intern(n) for n in names} | {sys.intern(n) for n, _ in edges})
+        movie_titles = sorted({sys.intern(t) for t in titles} | {sys.intern(t) for _, t in edges})
+        person_index = {name: i for i, name in enumerate(person_names)}
+        movie_index = {title: j for j, title in enumerate(movie_titles)}
+        n_persons, n_movies = len(person_names), len(movie_titles)
+        persons = np.fromiter((person_index[n] for n, _ in edges), dtype=np.int64, count=len(edges))
+        movies = np.fromiter((movie_index[t] for _, t in edges), dtype=np.int64, count=len(edges))
+        # Un seul lien par couple (une personne peut jouer et réaliser) ; codes triés par personne puis film
+        codes = np.unique(persons * max(n_movies, 1) + movies)
+        persons, movies = codes // max(n_movies, 1), codes % max(n_movies, 1)
+        person_offsets = _offsets(persons, n_persons)
+        order = np.argsort(movies, kind="stable")
+        movie_offsets = _offsets(movies[order], n_movies)
+        return cls(person_names, movie_titles, person_offsets, movies.astype(np.int32),
+                   movie_offsets, persons[order].astype(np.int32), person_index, movie_index)
+
+    def movies_of(self, person_id: int):
+        return self.person_targets[self.person_offsets[person_id]:self.person_offsets[person_id + 1]]
+
+    def persons_of(self, movie_id: int):
+        return self.movie_targets[self.movie_offsets[movie_id]:self.movie_offsets[movie_id + 1]]
+
+    def expand(self, from_movies: bool, ids):
+        """
+        Voisins de plusieurs nœuds d'un coup : (sources, voisins), un couple par lien.
+        from_movies : ids sont des films (voisins : personnes), sinon des personnes.
+        """
+        offsets, targets = (self.movie_offsets, self.movie_targets) if from_movies else \
+            (self.person_offsets, self.person_targets)
+        ids = np.asarray(ids, dtype=np.int64)
+        starts = offsets[ids]
+        counts = offsets[ids + 1] - starts
+        # Position de chaque voisin dans targets : début du segment + rang dans le segment
+        shifts = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+        return np.repeat(ids, counts), targets[np.arange(counts.sum()) + shifts]
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.person_targets)
+
+    @property
+    def nbytes(self) -> int:
+        """Taille des tableaux CSR (hors tables de noms)"""
+        return sum(array.nbytes for array in (self.person_offsets, self.person_targets,
+                                              self.movie_offsets, self.movie_targets))
+
+
+def _offsets(sorted_ids, size: int):
+    offsets = np.zeros(size + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sorted_ids, minlength=size), out=offsets[1:])
+    return offsets
+
+
+def fetch_graph():
+    names = list(repositories.persons.names())
+    titles = [title for title, _ in repositories.movies.titles()]
+    return names, titles, list(repositories.persons.credits())
+
+
+class GraphSnapshotStore:
+    def __init__(self, fetch=fetch_graph):
+        self.fetch = fetch
+        self.current = None
+        self._dirty = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def rebuild(self):
+        snapshot = GraphSnapshot.from_edges(*self.fetch())
+        # Remplacement atomique : les lectures en cours gardent l'ancien instantané
+        self.current = snapshot
+        return snapshot
+
+    def mark_dirty(self):
+        """À appeler après une écriture qui change les crédits, les personnes ou les films"""
+        self._dirty.set()
+
+    def start(self):
+        self._stop.clear()
+        self._dirty.set()
+        self._thread = threading.Thread(target=self._run, name="graph-snapshot", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._dirty.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._dirty.wait()
+            if self._stop.is_set():
+                break
+            # Regrouper les écritures rapprochées (sauf au premier chargement)
+            if self.current is not None:
+                self._stop.wait(GRAPH_SNAPSHOT_DELAY)
+            self._dirty.clear()
+            try:
+                snapshot = self.rebuild()
+                print(f"🕸️ Instantané du graphe : {len(snapshot.person_names)} personnes, "
+                      f"{len(snapshot.movie_titles)} films, {snapshot.edge_count} liens")
+            except Exception as e:
+                print(f"⚠️ Instantané du graphe non reconstruit : {e}")
+
+
+graph_snapshot = GraphSnapshotStore()
@@ -0,0 +1,182 @@
+"""
+Cache HTTP des routes de lecture : ETag fort, Last-Modified et réponses 304.
+
+Chaque domaine de données (films, personnes, avis, watchlists) a un numéro de
+version que les routes d'écriture incrémentent via `bump`. Une route décorée
+par `cached_response(*scopes)` garde en mémoire le corps JSON de sa dernière
+réponse par URL, avec les versions des domaines dont elle dépend :
+- tant que ces versions n'ont pas bougé, la réponse est resservie sans requête
+  Neo4j, et un If-None-Match correspondant reçoit un 304 sans corps ;
+- l'ETag est un hash du corps : après expiration (HTTP_CACHE_TTL, pour les
+  écritures faites hors de l'API) un contenu identique garde le même ETag.
+
+Les versions sont propres au processus : avec plusieurs workers chaque
+processus a son cache, et le TTL borne la durée des réponses périmées.
+"""
+import functools
+import hashlib
+import inspect
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from typing import NamedTuple
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+HTTP_CACHE_TTL = float(os.getenv("HTTP_CACHE_TTL", "60"))
+HTTP_CACHE_SIZE = int(os.getenv("HTTP_CACHE_SIZE", "1000"))
+HTTP_CACHE_MAX_AGE = int(os.getenv("HTTP_CACHE_MAX_AGE", "0"))
+
+SCOPES = ("movies", "persons", "reviews", "watchlists")
+
+
+class DataVersions:
+    def __init__(self, scopes):
+        self._lock = threading.Lock()
+        self.versions = dict.fromkeys(scopes, 0)
+
+    def bump(self, *scopes):
+        with self._lock:
+            for scope in scopes:
+                self.versions[scope] += 1
+
+    def current(self, scopes) -> tuple:
+        with self._lock:
+            return tuple(self.versions[scope] for scope in scopes)
+
+
+class CacheEntry(NamedTuple):
+    versions: tuple
+    etag: str
+    body: bytes
+    headers: dict
+    last_modified: int
+    expires: float
+
+
+class ResponseCache:
+    """Cache LRU borné des réponses, par clé d'URL"""
+
+    def __init__(self, ttl: float, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key, versions):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.versions != versions or entry.expires < time.monotonic():
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def store(self, key, versions, body: bytes, headers: dict = None):
+        etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        with self._lock:
+            previous = self._entries.get(key)
+            # Contenu inchangé : on garde la date de dernière modification
+            last_modified = previous.last_modified if previous and previous.etag == etag else int(time.time())
+            entry = CacheEntry(versions, etag, body, headers or {}, last_modified, time.monotonic() + self.ttl)
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+            return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+data_versions = DataVersions(SCOPES)
+response_cache = ResponseCache(HTTP_CACHE_TTL, HTTP_CACHE_SIZE)
+
+
+def bump(*scopes):
+    """À appeler après une écriture réussie sur les domaines concernés"""
+    data_versions.bump(*scopes)
+
+
+def not_modified(request: Request, etag: str, last_modified: int) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in candidates or etag in candidates
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return last_modified <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def build_response(request: Request, entry: CacheEntry) -> Response:
+    headers = {
+        **entry.headers,
+        "ETag": entry.etag,
+        "Last-Modified": formatdate(entry.last_modified, usegmt=True),
+        "Cache-Control": f"public, max-age={HTTP_CACHE_MAX_AGE}, must-revalidate",
+    }
+    if not_modified(request, entry.etag, entry.last_modified):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+def is_cacheable(payload) -> bool:
+    # Les réponses d'erreur au format {"status": "error"} ne sont pas mises en cache
+    return not (isinstance(payload, dict) and payload.get("status") == "error")
+
+
+def encode(payload):
+    """Corps JSON et en-têtes propres à la route (si elle renvoie déjà une Response)"""
+    if isinstance(payload, Response):
+        headers = {key: value for key, value in payload.headers.items()
+                   if key not in ("content-length", "content-type")}
+        return payload.body, headers
+    return json.dumps(jsonable_encoder(payload), ensure_ascii=False, separators=(",", ":")).encode(), None
+
+
+def cached_response(*scopes):
+    """Décorateur de route GET (sync ou async) dont la réponse dépend des domaines `scopes`"""
+    def decorator(func):
+        signature = inspect.signature(func)
+        parameters = list(signature.parameters.values())
+        parameters.append(inspect.Parameter("request", inspect.Parameter.KEYWORD_ONLY, annotation=Request))
+
+        def cache_key(request: Request):
+            return f"{request.url.path}?{request.url.query}"
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def wrapper(*args, request: Request, **kwargs):
+                key = cache_key(request)
+                versions = data_versions.current(scopes)
+                entry = response_cache.get(key, versions)
+                if entry is None:
+                    payload = await func(*args, **kwargs)
+                    if not is_cacheable(payload):
+                        return payload
+                    entry = response_cache.store(key, versions, *encode(payload))
+                return build_response(request, entry)
+        else:
+            @functools.wraps(func)
+            def wrapper(*args, request: Request, **kwargs):
+                key = cache_key(request)
+                versions = data_versions.current(scopes)
+                entry = response_cache.get(key, versions)
+                if entry is None:
+                    payload = func(*args, **kwargs)
+                    if not is_cacheable(payload):
+                        return payload
+                    entry = response_cache.store(key, versions, *encode(payload))
+                return build_response(request, entry)
+
+        wrapper.__signature__ = signature.replace(parameters=parameters)
+        return wrapper
+    return decorator
@@ -0,0 +1,139 @@
+"""
+Métriques HTTP de l'API au format texte Prometheus (GET /metrics).
+
+`MetricsMiddleware` est un middleware ASGI pur (pas de BaseHTTPMiddleware :
+les réponses en flux restent en flux) qui, pour chaque requête HTTP, relève :
+- le nombre de requêtes par méthode, modèle de route et code de statut ;
+- la latence (jusqu'au dernier octet envoyé) et la taille des réponses, en
+  histogrammes par méthode et modèle de route ;
+- le nombre de requêtes en cours.
+Le modèle de route (`/movies/{title}`) est lu sur la route choisie par le
+routeur FastAPI ; les chemins qui ne correspondent à aucune route sont comptés
+sous un seul libellé pour borner le nombre de séries.
+
+Le coût par requête est un horodatage, deux recherches par dichotomie et
+quelques incréments sous verrou.
+"""
+import bisect
+import threading
+import time
+from collections import defaultdict
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "total", "count")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+class RequestMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = defaultdict(int)                       # (méthode, route, statut) -> nombre
+            self.latency = defaultdict(lambda: Histogram(LATENCY_BUCKETS))
+            self.sizes = defaultdict(lambda: Histogram(SIZE_BUCKETS))
+            self.in_flight = 0
+
+    def started(self):
+        with self._lock:
+            self.in_flight += 1
+
+    def finished(self, method: str, route: str, status: int, seconds: float, size: int):
+        with self._lock:
+            self.in_flight -= 1
+            self.requests[(method, route, status)] += 1
+            self.latency[(method, route)].observe(seconds)
+            self.sizes[(method, route)].observe(size)
+
+    def render(self) -> str:
+        """Exposition au format texte Prometheus 0.0.4"""
+        with self._lock:
+            requests = dict(self.requests)
+            latency = {key: _copy(h) for key, h in self.latency.items()}
+            sizes = {key: _copy(h) for key, h in self.sizes.items()}
+            in_flight = self.in_flight
+        lines = [
+            "# HELP http_requests_total Requêtes HTTP traitées.",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, route, status), count in sorted(requests.items()):
+            lines.append(f'http_requests_total{{method="{method}",route="{_escape(route)}",status="{status}"}} {count}')
+        lines += ["# HELP http_requests_in_flight Requêtes HTTP en cours.",
+                  "# TYPE http_requests_in_flight gauge",
+                  f"http_requests_in_flight {in_flight}"]
+        _render_histograms(lines, "http_request_duration_seconds", "Durée des requêtes HTTP (jusqu'au dernier octet).", latency)
+        _render_histograms(lines, "http_response_size_bytes", "Taille du corps des réponses HTTP.", sizes)
+        return "\n".join(lines) + "\n"
+
+
+def _copy(histogram: Histogram) -> Histogram:
+    copy = Histogram(histogram.bounds)
+    copy.counts, copy.total, copy.count = list(histogram.counts), histogram.total, histogram.count
+    return copy
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _render_histograms(lines, name: str, help_text: str, histograms: dict):
+    lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for (method, route), histogram in sorted(histograms.items()):
+        labels = f'method="{method}",route="{_escape(route)}"'
+        cumulative = 0
+        for bound, count in zip(histogram.bounds, histogram.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound:g}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+        lines.append(f"{name}_sum{{{labels}}} {histogram.total:.6f}")
+        lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+
+request_metrics = RequestMetrics()
+
+
+class MetricsMiddleware:
+    def __init__(self, app, metrics: RequestMetrics = request_metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        response = {"status": 500, "size": 0}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                response["size"] += len(message.get("body", b""))
+            await send(message)
+
+        self.metrics.started()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Le routeur FastAPI ajoute la route choisie au scope
+            route = scope.get("route")
+            template = getattr(route, "path", None) or UNMATCHED_ROUTE
+            self.metrics.finished(scope["method"], template, response["status"],
+                                  time.perf_counter() - start, response["size"])
@@ -0,0 +1,104 @@
+"""
+Pagination par curseur (keyset) des listes.
+
+Le curseur est opaque pour le client : JSON encodé en base64 url-safe contenant
+le type de liste et les valeurs de tri de la dernière ligne renvoyée. La page
+suivante reprend strictement après ces valeurs (WHERE sur les propriétés
+indexées, voir services/schema.py) au lieu de trier puis d'écarter toutes les
+lignes précédentes.
+"""
+import base64
+import json
+from typing import Optional
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(kind: str, *values) -> str:
+    raw = json.dumps([kind, *values], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, kind: str, size: int) -> list:
+    """Valeurs de tri contenues dans le curseur ; InvalidCursor s'il n'est pas de ce type"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise InvalidCursor("Curseur invalide")
+    if not isinstance(values, list) or len(values) != size + 1 or values[0] != kind:
+        raise InvalidCursor("Curseur invalide")
+    return values[1:]
+
+
+def next_cursor(rows: list, limit: int, kind: str, *keys) -> Optional[str]:
+    """Curseur de la page suivante, ou None si la page n'est pas pleine (lignes dict ou modèles)"""
+    if not rows or len(rows) < limit:
+        return None
+    last = rows[-1]
+    return encode_cursor(kind, *(last[key] if isinstance(last, dict) else getattr(last, key) for key in keys))
+
+
+# Requêtes de liste : les clauses WHERE de reprise dépendent du curseur
+
+def movies_page_query(cursor: Optional[str]):
+    """Films triés par (released DESC, title) ; renvoie (cypher, paramètres)"""
+    where = ""
+    params = {}
+    if cursor:
+        released, title = decode_cursor(cursor, "movies", 2)
+        params = {"released": released, "title": title}
+        if released is None:
+            # Les films sans date sortent en premier avec ORDER BY ... DESC
+            where = "WHERE m.released IS NOT NULL OR m.title > $title"
+        else:
+            where = "WHERE m.released <= $released AND (m.released < $released OR m.title > $title)"
+    cypher = f"""
+        MATCH (m:Movie)
+        {where}
+        RETURN m.title as title, m.released as released, m.tagline as tagline
+        ORDER BY m.released DESC, m.title
+        SKIP $skip LIMIT $limit
+    """
+    return cypher, params
+
+
+def persons_page_query(cursor: Optional[str]):
+    """Personnes triées par nom ; renvoie (cypher, paramètres)"""
+    where = ""
+    params = {}
+    if cursor:
+        (name,) = decode_cursor(cursor, "persons", 1)
+        params = {"name": name}
+        where = "WHERE p.name > $name"
+    cypher = f"""
+        MATCH (p:Person)
+        {where}
+        RETURN p.name as name, p.born as born
+        ORDER BY p.name
+        SKIP $skip LIMIT $limit
+    """
+    return cypher, params
+
+
+def public_watchlists_page_query(cursor: Optional[str]):
+    """Watchlists publiques triées par (created_at DESC, id) ; renvoie (cypher, paramètres)"""
+    where = ""
+    params = {}
+    if cursor:
+        created_at, watchlist_id = decode_cursor(cursor, "watchlists", 2)
+        params = {"created_at": created_at, "id": watchlist_id}
+        where = "WHERE w.created_at <= $created_at AND (w.created_at < $created_at OR w.id > $id)"
+    cypher = f"""
+        MATCH (u:User)-[:OWNS]->(w:Watchlist {{is_public: true}})
+        {where}
+        OPTIONAL MATCH (w)-[:CONTAINS]->(m:Movie)
+        RETURN w.id as id, w.name as name, w.description as description,
+               w.is_public as is_public, w.created_at as created_at,
+               count(m) as movie_count, u.username as username
+        ORDER BY w.created_at DESC, w.id
+        SKIP $skip LIMIT $limit
+    """
+    return cypher, params
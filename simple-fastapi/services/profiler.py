@@ -0,0 +1,106 @@
+"""
+Profileur statistique à la demande (GET /profile, admin uniquement).
+
+Pendant la durée demandée, un échantillon des piles de tous les threads du
+worker est relevé toutes les `interval` secondes avec `sys._current_frames()`
+(threads du threadpool qui servent les routes synchrones, boucle d'événements
+qui exécute les routes asynchrones, threads de fond). Rien n'est installé dans
+l'interpréteur : le coût est celui du parcours des piles à chaque échantillon,
+supporté par le thread du profileur, et disparaît à la fin du profil.
+
+Le résultat est renvoyé au format « collapsed stacks » (une ligne
+`thread;fonction;...;fonction nombre` par pile distincte), lu par
+flamegraph.pl, speedscope ou inferno, avec un résumé des fonctions les plus
+présentes. Les threads au repos (attente d'une tâche, boucle sans événement)
+sont ignorés par défaut.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "60"))
+PROFILE_INTERVAL = 0.005
+
+# Dernier appel Python d'un thread qui attend : (fichier, fonction)
+IDLE_LEAVES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+    ("socket.py", "accept"),
+}
+
+_lock = threading.Lock()
+
+
+class ProfilerBusy(RuntimeError):
+    pass
+
+
+def frame_label(code) -> str:
+    path = code.co_filename
+    if "site-packages" in path:
+        path = path.rsplit("site-packages" + os.sep, 1)[-1]
+    else:
+        path = os.sep.join(path.split(os.sep)[-2:])
+    return f"{code.co_name} ({path}:{code.co_firstlineno})"
+
+
+def is_idle(frame) -> bool:
+    return (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name) in IDLE_LEAVES
+
+
+def sample(stacks: Counter, include_idle: bool = False, skip=()):
+    """Ajouter un échantillon des piles de tous les threads (sauf `skip`)"""
+    names = {thread.ident: thread.name for thread in threading.enumerate()}
+    for ident, frame in sys._current_frames().items():
+        if ident in skip or (not include_idle and is_idle(frame)):
+            continue
+        labels = []
+        while frame is not None:
+            labels.append(frame_label(frame.f_code))
+            frame = frame.f_back
+        labels.append(names.get(ident, f"thread-{ident}"))
+        stacks[";".join(reversed(labels))] += 1
+
+
+def profile(seconds: float, interval: float = PROFILE_INTERVAL, include_idle: bool = False) -> Counter:
+    """Échantillonner pendant `seconds` secondes ; un seul profil à la fois"""
+    if not _lock.acquire(blocking=False):
+        raise ProfilerBusy("Un profil est déjà en cours")
+    try:
+        stacks = Counter()
+        skip = {threading.get_ident()}
+        deadline = time.perf_counter() + min(seconds, PROFILE_MAX_SECONDS)
+        while time.perf_counter() < deadline:
+            sample(stacks, include_idle, skip)
+            time.sleep(interval)
+        return stacks
+    finally:
+        _lock.release()
+
+
+def collapsed(stacks: Counter) -> str:
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+def top_functions(stacks: Counter, limit: int = 20):
+    """Fonctions par nombre d'échantillons : en tête de pile (self) et présentes dans la pile (total)"""
+    own, total = Counter(), Counter()
+    samples = sum(stacks.values())
+    for stack, count in stacks.items():
+        # Le premier élément est le nom du thread
+        frames = stack.split(";")[1:]
+        if frames:
+            own[frames[-1]] += count
+        for label in set(frames):
+            total[label] += count
+    return [{
+        "function": label,
+        "self": own[label],
+        "total": count,
+        "self_percent": round(100 * own[label] / samples, 1),
+        "total_percent": round(100 * count / samples, 1),
+    } for label, count in sorted(total.items(), key=lambda item: (own[item[0]], item[1]), reverse=True)[:limit]]
@@ -0,0 +1,466 @@
+"""
+Filtrage collaboratif item-item à partir des relations (:User)-[:RATED]->(:Movie).
+
+Les notes sont centrées sur la moyenne de chaque utilisateur (cosinus ajusté),
+rangées dans une matrice creuse utilisateurs × films, et la similarité de deux
+films est le cosinus de leurs colonnes. Le produit Rᵀ·R est calculé par blocs
+de films pour borner la mémoire, et seuls les RATING_NEIGHBOURS meilleurs
+voisins (similarité positive) de chaque film sont gardés.
+
+Le calcul tourne dans un thread de fond :
+- reconstruction complète depuis la base au démarrage puis toutes les
+  RATING_REBUILD_INTERVAL secondes ;
+- entre deux, les notes enregistrées par les routes (`record_rating`,
+  `remove_movie`) sont regroupées et appliquées à la matrice gardée en
+  mémoire : seules les lignes des utilisateurs concernés sont remplacées et
+  seules les similarités des films modifiés sont recalculées (voir
+  `process_pending`). Le calcul se fait hors verrou ; les lectures ne sont
+  bloquées que le temps d'échanger les résultats.
+"""
+import os
+import threading
+import time
+from collections import defaultdict
+
+import numpy as np
+from scipy import sparse
+
+from repositories import repositories
+
+RATING_NEIGHBOURS = int(os.getenv("RATING_NEIGHBOURS", "50"))
+RATING_REBUILD_INTERVAL = float(os.getenv("RATING_REBUILD_INTERVAL", "3600"))
+# Délai de regroupement des notes avant un recalcul incrémental
+RATING_UPDATE_DELAY = float(os.getenv("RATING_UPDATE_DELAY", "5"))
+# Listes de voisins recalculées au plus par mise à jour incrémentale
+RATING_MAX_RECOMPUTE = int(os.getenv("RATING_MAX_RECOMPUTE", "500"))
+# Note à partir de laquelle un film compte comme "aimé" pour /users/me/also-liked
+HIGH_RATING = 4
+BLOCK_SIZE = 1024
+
+
+def centred_matrix(user_idx, movie_idx, ratings, shape):
+    """Matrice CSR utilisateurs × films des notes centrées sur la moyenne de chaque utilisateur"""
+    user_idx = np.asarray(user_idx, dtype=np.int64)
+    movie_idx = np.asarray(movie_idx, dtype=np.int64)
+    ratings = np.asarray(ratings, dtype=np.float64)
+    counts = np.bincount(user_idx, minlength=shape[0])
+    means = np.bincount(user_idx, weights=ratings, minlength=shape[0]) / np.maximum(counts, 1)
+    values = (ratings - means[user_idx]).astype(np.float32)
+    return sparse.csr_matrix((values, (user_idx, movie_idx)), shape=shape)
+
+
+def column_norms(by_movie) -> np.ndarray:
+    """Norme de chaque colonne (film) d'une matrice CSC"""
+    return np.sqrt(np.asarray(by_movie.multiply(by_movie).sum(axis=0)).ravel())
+
+
+def similarity_rows(by_movie, norms, rows, block_size: int = BLOCK_SIZE):
+    """
+    Similarités des films `rows` avec tous les autres, par blocs de films :
+    (indice, voisins, similarités) avec les seules similarités positives.
+    """
+    # Transposée d'une CSC : CSR films × utilisateurs, sans copie
+    movies_users = by_movie.T.tocsr()
+    rows = np.asarray(rows, dtype=np.int64)
+    for start in range(0, len(rows), block_size):
+        block = rows[start:start + block_size]
+        products = (movies_users[block] @ by_movie).tocsr()
+        for k, movie in enumerate(block):
+            lo, hi = products.indptr[k], products.indptr[k + 1]
+            cols = products.indices[lo:hi]
+            if norms[movie] == 0 or not len(cols):
+                yield int(movie), cols[:0], np.zeros(0, dtype=np.float32)
+                continue
+            sims = products.data[lo:hi] / (norms[movie] * norms[cols])
+            keep = (cols != movie) & (sims > 0)
+            yield int(movie), cols[keep], np.minimum(sims[keep], 1.0)
+
+
+def top_neighbours(cols, sims, top_n: int):
+    """Les top_n meilleurs voisins, triés par similarité décroissante puis indice"""
+    if len(sims) > top_n:
+        best = np.argpartition(-sims, top_n)[:top_n]
+        cols, sims = cols[best], sims[best]
+    order = np.lexsort((cols, -sims))
+    return cols[order], sims[order]
+
+
+def compute_neighbours(matrix, top_n: int, rows=None, block_size: int = BLOCK_SIZE) -> dict:
+    """
+    Meilleurs voisins des films `rows` (tous par défaut) : {indice: (indices, similarités)},
+    triés par similarité décroissante.
+    """
+    by_movie = matrix.tocsc()
+    rows = np.arange(matrix.shape[1]) if rows is None else rows
+    return {movie: top_neighbours(cols, sims, top_n)
+            for movie, cols, sims in similarity_rows(by_movie, column_norms(by_movie), rows, block_size)}
+
+
+def empty_lists(size: int):
+    """Listes de voisins vides au format de rank_rows"""
+    return (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0), np.zeros(size + 1, dtype=np.int64))
+
+
+def rank_rows(rows, cols, sims, keep: int, order, size: int):
+    """
+    Listes de voisins (lignes, colonnes, similarités, indptr) triées par film puis
+    similarité décroissante (égalités : ordre alphabétique `order`), `keep` voisins
+    au plus par film ; renvoie aussi (films, similarité) du premier voisin écarté.
+    """
+    index = np.lexsort((order[cols], -sims, rows))
+    rows, cols, sims = rows[index], cols[index], sims[index]
+    rank = np.arange(len(rows)) - np.searchsorted(rows, rows)
+    dropped = rank == keep
+    kept = rank < keep
+    first_dropped = (rows[dropped], sims[dropped])
+    rows, cols, sims = rows[kept], cols[kept], sims[kept]
+    return (rows, cols, sims, np.searchsorted(rows, np.arange(size + 1))), first_dropped
+
+
+class RatingSimilarity:
+    def __init__(self, top_n: int = RATING_NEIGHBOURS, max_recompute: int = RATING_MAX_RECOMPUTE):
+        self.top_n = top_n
+        self.max_recompute = max_recompute
+        self._lock = threading.Lock()
+        # Lus par les requêtes, sous verrou
+        self._ratings = defaultdict(dict)   # utilisateur -> {titre: note}
+        self._neighbours = {}               # titre -> [(titre, similarité)]
+        self._pending = []
+        # État du calcul, propre au thread de fond (hors verrou)
+        self._titles = []                   # indice -> titre
+        self._movie_index = {}              # titre -> indice de colonne
+        self._user_index = {}               # utilisateur -> indice de ligne
+        self._matrix = sparse.csr_matrix((0, 0), dtype=np.float32)
+        self._order = np.zeros(0, dtype=np.int64)  # indice -> rang alphabétique du titre (égalités)
+        self._lists = empty_lists(0)               # voisins gardés de chaque film (voir rank_rows)
+        self._bound = np.zeros(0)                  # majorant des similarités non gardées de chaque film
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self.loaded = False
+        self.last_run = {}
+
+    # Écritures signalées par les routes
+
+    def record_rating(self, username: str, title: str, rating: int):
+        with self._lock:
+            self._pending.append(("rate", username, title, rating))
+        self._wakeup.set()
+
+    def remove_movie(self, title: str):
+        with self._lock:
+            self._pending.append(("remove_movie", title))
+        self._wakeup.set()
+
+    # Lectures (chemin des requêtes : mémoire uniquement)
+
+    def similar(self, title: str, limit: int):
+        with self._lock:
+            return [{"title": other, "similarity": round(sim, 4)}
+                    for other, sim in self._neighbours.get(title, [])[:limit]]
+
+    def user_ratings(self, username: str) -> dict:
+        with self._lock:
+            return dict(self._ratings.get(username, {}))
+
+    def recommend_for_user(self, username: str, limit: int, exclude=()):
+        """Voisins des films que l'utilisateur a bien notés, pondérés par la similarité et l'écart à sa moyenne"""
+        with self._lock:
+            ratings = self._ratings.get(username)
+            if not ratings:
+                return []
+            mean = sum(ratings.values()) / len(ratings)
+            scores = defaultdict(float)
+            for title, rating in ratings.items():
+                weight = rating - mean
+                if rating < HIGH_RATING or weight <= 0:
+                    continue
+                for other, sim in self._neighbours.get(title, []):
+                    scores[other] += sim * weight
+        excluded = set(ratings) | set(exclude)
+        ranked = sorted(((t, s) for t, s in scores.items() if t not in excluded), key=lambda item: (-item[1], item[0]))
+        return [{"title": title, "score": round(score, 4)} for title, score in ranked[:limit]]
+
+    # Calcul
+
+    @property
+    def kept(self) -> int:
+        # Voisins gardés au-delà des top_n exposés : une similarité qui baisse ne
+        # force un recalcul que si la liste passe sous top_n voisins sûrs
+        return 2 * self.top_n
+
+    def _index(self, ratings: dict):
+        """Indices des utilisateurs et titres nouveaux, puis tableaux (ligne, colonne, note) de `ratings`"""
+        user_idx, movie_idx, values = [], [], []
+        titles = len(self._titles)
+        for username, movies in ratings.items():
+            u = self._user_index.setdefault(username, len(self._user_index))
+            for title, rating in movies.items():
+                if title not in self._movie_index:
+                    self._movie_index[title] = len(self._titles)
+                    self._titles.append(title)
+                user_idx.append(u)
+                movie_idx.append(self._movie_index[title])
+                values.append(rating)
+        if len(self._titles) != titles or len(self._order) != len(self._titles):
+            self._order = np.empty(len(self._titles), dtype=np.int64)
+            self._order[np.argsort(np.array(self._titles, dtype=object))] = np.arange(len(self._titles))
+        return user_idx, movie_idx, values
+
+    def _compute(self, by_movie, norms, movies, full_rows=None):
+        """
+        Listes gardées des films `movies` : (lignes, colonnes, similarités) et leurs
+        bornes (similarité du premier voisin écarté, 0 si aucun). `full_rows`
+        reçoit les similarités complètes de chaque film.
+        """
+        rows, cols, sims = [np.zeros(0, dtype=np.int64)], [np.zeros(0, dtype=np.int64)], [np.zeros(0)]
+        bounds = np.zeros(len(movies))
+        for k, (movie, movie_cols, movie_sims) in enumerate(similarity_rows(by_movie, norms, movies)):
+            if full_rows is not None:
+                full_rows.append((movie, movie_cols, movie_sims))
+            top_cols, top_sims = top_neighbours(movie_cols, movie_sims, self.kept + 1)
+            if len(top_sims) > self.kept:
+                bounds[k] = top_sims[self.kept]
+            rows.append(np.full(min(len(top_sims), self.kept), movie, dtype=np.int64))
+            cols.append(top_cols[:self.kept].astype(np.int64))
+            sims.append(top_sims[:self.kept])
+        return (np.concatenate(rows), np.concatenate(cols), np.concatenate(sims)), bounds
+
+    def _store(self, entries, size: int, movies=None):
+        """
+        Ranger les listes gardées (tronquées à `kept`) et relever les bornes des
+        listes tronquées. Avec `movies`, seules les listes de ces films sont
+        remplacées par `entries` ; les autres, déjà triées, sont gardées telles quelles.
+        """
+        (rows, cols, sims, _), (dropped_rows, dropped_sims) = rank_rows(*entries, self.kept, self._order, size)
+        self._bound[dropped_rows] = np.maximum(self._bound[dropped_rows], dropped_sims)
+        if movies is not None:
+            old_rows, old_cols, old_sims, _ = self._lists
+            replaced = np.zeros(size, dtype=bool)
+            replaced[movies] = True
+            others = ~replaced[old_rows]
+            rows = np.concatenate([old_rows[others], rows])
+            # Tri stable par film : l'ordre de chaque liste est conservé
+            index = np.argsort(rows, kind="stable")
+            rows = rows[index]
+            cols = np.concatenate([old_cols[others], cols])[index]
+            sims = np.concatenate([old_sims[others], sims])[index]
+        self._lists = (rows, cols, sims, np.searchsorted(rows, np.arange(size + 1)))
+
+    def _exposed(self):
+        """top_n premiers voisins de chaque film en tableaux (films × top_n), complétés par -1"""
+        rows, cols, sims, indptr = self._lists
+        rank = np.arange(len(rows)) - indptr[rows]
+        shown = rank < self.top_n
+        exposed_cols = np.full((len(indptr) - 1, self.top_n), -1, dtype=np.int64)
+        exposed_sims = np.zeros((len(indptr) - 1, self.top_n))
+        exposed_cols[rows[shown], rank[shown]] = cols[shown]
+        exposed_sims[rows[shown], rank[shown]] = sims[shown]
+        return exposed_cols, exposed_sims
+
+    def _named(self, movies) -> dict:
+        rows, cols, sims, indptr = self._lists
+        named = {}
+        for movie in movies:
+            lo = indptr[movie]
+            hi = min(indptr[movie + 1], lo + self.top_n)
+            named[self._titles[movie]] = [(self._titles[other], sim)
+                                          for other, sim in zip(cols[lo:hi].tolist(), sims[lo:hi].tolist())]
+        return named
+
+    def rebuild(self, rows):
+        """Reconstruction complète ; rows : (utilisateur, titre, note)"""
+        start = time.perf_counter()
+        ratings = defaultdict(dict)
+        for username, title, rating in rows:
+            if username and title and rating is not None:
+                ratings[username][title] = rating
+        # Titres indexés dans l'ordre alphabétique ; les titres nouveaux sont ajoutés à la fin
+        self._titles = sorted({title for movies in ratings.values() for title in movies})
+        self._movie_index = {title: i for i, title in enumerate(self._titles)}
+        self._user_index = {}
+        self._order = np.arange(len(self._titles))
+        user_idx, movie_idx, values = self._index(ratings)
+        shape = (len(self._user_index), len(self._titles))
+        self._matrix = centred_matrix(user_idx, movie_idx, values, shape)
+        by_movie = self._matrix.tocsc()
+        entries, self._bound = self._compute(by_movie, column_norms(by_movie), np.arange(shape[1]))
+        self._store(entries, shape[1])
+        named = self._named(range(shape[1]))
+        with self._lock:
+            self._ratings = ratings
+            self._neighbours = named
+            self.loaded = True
+        self.last_run = {"mode": "full", "users": shape[0], "movies": shape[1],
+                         "ratings": len(values), "duration_ms": round((time.perf_counter() - start) * 1000, 1)}
+
+    def process_pending(self):
+        """
+        Appliquer les notes en attente et mettre à jour les voisinages concernés.
+
+        Les notes modifiées changent la moyenne de leurs utilisateurs, donc les
+        colonnes de tous les films qu'ils ont notés (films « modifiés »). Seules
+        les lignes de ces utilisateurs sont remplacées dans la matrice, et seules
+        les similarités des films modifiés sont recalculées : les autres paires
+        ne changent pas. Chaque film garde 2 × top_n voisins et un majorant des
+        similarités écartées ; un film non modifié reçoit ses nouvelles
+        similarités avec les films modifiés et n'est recalculé que s'il lui
+        reste moins de top_n voisins au-dessus de ce majorant, dans la limite de
+        max_recompute films par passe. Au-delà, sa liste reste approchée jusqu'à
+        la prochaine reconstruction complète.
+        """
+        start = time.perf_counter()
+        with self._lock:
+            pending, self._pending = self._pending, []
+            if not pending:
+                return
+            dirty_titles, removed, changed = set(), set(), set()
+            for op in pending:
+                if op[0] == "rate":
+                    _, username, title, rating = op
+                    dirty_titles.update(self._ratings[username])
+                    self._ratings[username][title] = rating
+                    dirty_titles.add(title)
+                    changed.add(username)
+                else:
+                    _, title = op
+                    for username, movies in self._ratings.items():
+                        if movies.pop(title, None) is not None:
+                            dirty_titles.update(movies)
+                            changed.add(username)
+                    removed.add(title)
+                    dirty_titles.add(title)
+            changed = {username: dict(self._ratings[username]) for username in changed}
+        lock_ms = (time.perf_counter() - start) * 1000
+
+        # Matrice : lignes des utilisateurs modifiés remplacées, hors verrou
+        keep = np.ones(self._matrix.shape[0], dtype=np.float32)
+        keep[[self._user_index[u] for u in changed if u in self._user_index]] = 0
+        user_idx, movie_idx, values = self._index(changed)
+        shape = (len(self._user_index), len(self._titles))
+        size = shape[1]
+        matrix = (sparse.diags(keep) @ self._matrix).tocsr()
+        matrix.resize(shape)
+        matrix = (matrix + centred_matrix(user_idx, movie_idx, values, shape)).tocsr()
+        matrix.eliminate_zeros()
+        self._matrix = matrix
+        by_movie = matrix.tocsc()
+        norms = column_norms(by_movie)
+        self._bound = np.concatenate([self._bound, np.zeros(size - len(self._bound))])
+        rows, cols, sims, indptr = self._lists
+        indptr = np.concatenate([indptr, np.full(size + 1 - len(indptr), indptr[-1])])
+        self._lists = (rows, cols, sims, indptr)
+
+        dirty = np.array(sorted(self._movie_index[t] for t in dirty_titles if t in self._movie_index), dtype=np.int64)
+        is_dirty = np.zeros(size, dtype=bool)
+        is_dirty[dirty] = True
+        # Seuil d'entrée d'un film non modifié : son dernier voisin gardé si la liste est pleine, sinon son majorant
+        threshold = self._bound.copy()
+        full = np.diff(indptr) >= self.kept
+        threshold[full] = sims[indptr[:-1][full] + self.kept - 1]
+        # Films qui ont chaque film modifié pour voisin
+        holders = sparse.csc_matrix((np.ones(len(rows)), (rows, cols)), shape=(size, size))
+
+        full_rows = []
+        dirty_entries, dirty_bounds = self._compute(by_movie, norms, dirty, full_rows)
+        self._bound[dirty] = dirty_bounds
+        up_rows, up_cols, up_sims = [], [], []
+        for movie, movie_cols, movie_sims in full_rows:
+            entering = (movie_sims >= threshold[movie_cols]) & ~is_dirty[movie_cols]
+            held = holders.indices[holders.indptr[movie]:holders.indptr[movie + 1]]
+            held = held[~is_dirty[held]]
+            # Nouvelle similarité de chaque détenteur ; 0 si elle a disparu (l'entrée est retirée)
+            held_sims = np.zeros(len(held))
+            if len(movie_cols) and len(held):
+                order = np.argsort(movie_cols)
+                found = order[np.minimum(np.searchsorted(movie_cols, held, sorter=order), len(order) - 1)]
+                present = movie_cols[found] == held
+                held_sims[present] = movie_sims[found[present]]
+            targets = np.concatenate([movie_cols[entering], held])
+            up_rows.append(targets)
+            up_cols.append(np.full(len(targets), movie, dtype=np.int64))
+            up_sims.append(np.concatenate([movie_sims[entering], held_sims]))
+        up_rows = np.concatenate(up_rows + [np.zeros(0, dtype=np.int64)])
+        up_cols = np.concatenate(up_cols + [np.zeros(0, dtype=np.int64)])
+        up_sims = np.concatenate(up_sims + [np.zeros(0)])
+        # Entrée et détention du même voisin : même similarité, une seule entrée
+        _, unique = np.unique(up_rows * size + up_cols, return_index=True)
+        up_rows, up_cols, up_sims = up_rows[unique], up_cols[unique], up_sims[unique]
+
+        before_cols, before_sims = self._exposed()
+        # Listes à revoir : films modifiés et films qui reçoivent une similarité
+        updated = np.union1d(dirty, up_rows)
+        is_updated = np.zeros(size, dtype=bool)
+        is_updated[updated] = True
+        carried = is_updated[rows] & ~is_dirty[rows] & ~is_dirty[cols]
+        positive = up_sims > 0
+        self._store((np.concatenate([rows[carried], up_rows[positive], dirty_entries[0]]),
+                     np.concatenate([cols[carried], up_cols[positive], dirty_entries[1]]),
+                     np.concatenate([sims[carried], up_sims[positive], dirty_entries[2]])), size, updated)
+
+        # Listes qui n'ont plus top_n voisins au-dessus de leur majorant ; les films les plus notés d'abord
+        rows, cols, sims, indptr = self._lists
+        safe = np.bincount(rows[sims >= self._bound[rows]], minlength=size)
+        stale = np.nonzero((self._bound > 0) & (safe < self.top_n))[0]
+        popularity = np.diff(by_movie.indptr)
+        stale = stale[np.lexsort((stale, -popularity[stale]))]
+        recomputed = stale[:self.max_recompute]
+        if len(recomputed):
+            entries, self._bound[recomputed] = self._compute(by_movie, norms, recomputed)
+            self._store(entries, size, recomputed)
+
+        # Seules les listes dont les top_n voisins ont changé sont republiées
+        after_cols, after_sims = self._exposed()
+        touched = np.union1d(updated, recomputed)
+        touched = touched[(before_cols[touched] != after_cols[touched]).any(axis=1)
+                          | (before_sims[touched] != after_sims[touched]).any(axis=1)]
+        named = self._named(np.union1d(touched, dirty).tolist())
+        for title in removed:
+            named.pop(title, None)
+        with self._lock:
+            self._neighbours.update(named)
+            for title in removed:
+                self._neighbours.pop(title, None)
+        self.last_run = {"mode": "incremental", "users": shape[0], "movies": size,
+                         "ratings": matrix.nnz, "recomputed_movies": len(dirty) + len(recomputed),
+                         "patched_movies": len(np.setdiff1d(updated, dirty)),
+                         "republished_movies": len(touched),
+                         "approximated_movies": len(stale) - len(recomputed),
+                         "lock_ms": round(lock_ms, 2),
+                         "duration_ms": round((time.perf_counter() - start) * 1000, 1)}
+
+    # Thread de fond
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="rating-similarity", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _run(self):
+        next_rebuild = 0.0
+        while not self._stop.is_set():
+            try:
+                if time.monotonic() >= next_rebuild:
+                    self.rebuild(fetch_ratings())
+                    next_rebuild = time.monotonic() + RATING_REBUILD_INTERVAL
+                self.process_pending()
+            except Exception as e:
+                print(f"⚠️ Calcul des similarités de notes impossible : {e}")
+                next_rebuild = time.monotonic() + RATING_REBUILD_INTERVAL
+            self._wakeup.wait(timeout=max(next_rebuild - time.monotonic(), 0))
+            self._wakeup.clear()
+            # Laisser arriver les autres notes du même lot
+            self._stop.wait(RATING_UPDATE_DELAY)
+
+
+def fetch_ratings():
+    return repositories.reviews.ratings()
+
+
+rating_similarity = RatingSimilarity()
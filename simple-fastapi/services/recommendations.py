@@ -0,0 +1,146 @@
+"""
+Recommandations de films par co-crédits, en mémoire.
+
+Le score de deux films est celui de la requête Cypher d'origine : le nombre de
+chemins (m)<-[:ACTED_IN|DIRECTED|PRODUCED]-(p:Person)-[...]->(rec), soit
+la somme sur les personnes p de crédits(p, m) × crédits(p, rec). On garde la
+matrice creuse film × film de ces scores, construite au démarrage puis mise à
+jour par les routes d'écriture : quand les crédits d'un film changent de
+delta pour une personne p, seuls les scores entre ce film et les autres films
+de p bougent (de delta × crédits(p, autre film)).
+"""
+import heapq
+import threading
+from collections import Counter, defaultdict
+
+from repositories import repositories
+
+
+class CoCreditMatrix:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.loaded = False
+        self._movie_persons = {}                 # titre -> Counter(personne -> nombre de crédits)
+        self._person_movies = defaultdict(Counter)  # personne -> Counter(titre -> nombre de crédits)
+        self._released = {}
+        self._scores = defaultdict(Counter)      # titre -> Counter(autre titre -> score)
+
+    def __len__(self):
+        return len(self._movie_persons)
+
+    def load(self, movies):
+        """Remplacer la matrice ; movies : (titre, released, [nom de personne par crédit])"""
+        movie_persons = {}
+        person_movies = defaultdict(Counter)
+        released = {}
+        for title, movie_released, names in movies:
+            credits = Counter(names)
+            movie_persons[title] = credits
+            released[title] = movie_released
+            for name, count in credits.items():
+                person_movies[name][title] = count
+        scores = defaultdict(Counter)
+        for movies_of_person in person_movies.values():
+            items = list(movies_of_person.items())
+            for title, count in items:
+                row = scores[title]
+                for other, other_count in items:
+                    if other != title:
+                        row[other] += count * other_count
+        with self._lock:
+            self._movie_persons = movie_persons
+            self._person_movies = person_movies
+            self._released = released
+            self._scores = scores
+            self.loaded = True
+
+    def set_movie(self, title: str, released, names):
+        """Crédits complets d'un film après écriture (un nom de personne par relation)"""
+        with self._lock:
+            self._released[title] = released
+            self._apply_credits(title, Counter(names))
+
+    def _apply_credits(self, title: str, credits: Counter):
+        old = self._movie_persons.get(title, Counter())
+        for name in set(old) | set(credits):
+            delta = credits[name] - old[name]
+            if not delta:
+                continue
+            movies_of_person = self._person_movies[name]
+            for other, other_count in movies_of_person.items():
+                if other == title:
+                    continue
+                self._add_score(title, other, delta * other_count)
+                self._add_score(other, title, delta * other_count)
+            if credits[name]:
+                movies_of_person[title] = credits[name]
+            else:
+                del movies_of_person[title]
+                if not movies_of_person:
+                    del self._person_movies[name]
+        self._movie_persons[title] = +credits
+
+    def _add_score(self, title: str, other: str, delta: int):
+        row = self._scores[title]
+        row[other] += delta
+        if row[other] <= 0:
+            del row[other]
+        if not row:
+            del self._scores[title]
+
+    def remove_movie(self, title: str):
+        with self._lock:
+            self._apply_credits(title, Counter())
+            self._movie_persons.pop(title, None)
+            self._released.pop(title, None)
+            self._scores.pop(title, None)
+
+    def remove_person(self, name: str):
+        with self._lock:
+            for title in list(self._person_movies.get(name, ())):
+                credits = Counter(self._movie_persons[title])
+                del credits[name]
+                self._apply_credits(title, credits)
+
+    def rename_person(self, old_name: str, new_name: str):
+        with self._lock:
+            for title in list(self._person_movies.get(old_name, ())):
+                credits = Counter(self._movie_persons[title])
+                credits[new_name] += credits.pop(old_name)
+                self._apply_credits(title, credits)
+
+    def persons_of(self, title: str):
+        """Personnes créditées sur un film (voisins dans le graphe Person/Movie)"""
+        with self._lock:
+            return list(self._movie_persons.get(title, ()))
+
+    def movies_of(self, name: str):
+        with self._lock:
+            return list(self._person_movies.get(name, ()))
+
+    def score(self, title: str, other: str) -> int:
+        with self._lock:
+            return self._scores.get(title, Counter())[other]
+
+    def similar(self, title: str, limit: int):
+        """Films les plus proches, triés comme la requête Cypher : score DESC, released DESC"""
+        with self._lock:
+            row = self._scores.get(title)
+            if not row:
+                return []
+            released = self._released
+            # Avec ORDER BY ... DESC, Neo4j place les dates nulles en premier
+            best = heapq.nsmallest(
+                limit, row.items(),
+                key=lambda item: (-item[1], released.get(item[0]) is not None, -(released.get(item[0]) or 0), item[0]),
+            )
+            return [{"title": other, "released": released.get(other), "score": score} for other, score in best]
+
+
+movie_recommendations = CoCreditMatrix()
+
+
+def load_recommendations():
+    """Construire la matrice des co-crédits (appelé au démarrage)"""
+    movie_recommendations.load(repositories.movies.credits())
+    print(f"🎬 Matrice des co-crédits chargée ({len(movie_recommendations)} films)")
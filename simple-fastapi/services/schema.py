@@ -0,0 +1,176 @@
+"""
+Schéma Neo4j : contraintes d'unicité et index, appliqués par migrations versionnées.
+
+Chaque migration appliquée est enregistrée dans un nœud (:SchemaMigration {version}) ;
+les suivantes ne rejouent que les versions manquantes. Les instructions sont
+idempotentes (IF NOT EXISTS / IF EXISTS) : deux workers qui démarrent ensemble,
+ou une migration interrompue puis relancée, ne cassent rien.
+
+Lancé au démarrage (SCHEMA_MIGRATE_ON_STARTUP, activé par défaut) ou à la main :
+
+    python -m services.schema            # appliquer les migrations en attente
+    python -m services.schema --status   # versions appliquées et en attente
+"""
+import argparse
+import os
+import sys
+from typing import Callable, List, NamedTuple, Optional
+
+SCHEMA_MIGRATE_ON_STARTUP = os.getenv("SCHEMA_MIGRATE_ON_STARTUP", "1") != "0"
+
+# Propriété qui identifie un nœud de chaque label (MATCH et MERGE des routes)
+KEY_PROPERTIES = {"Movie": "title", "Person": "name", "User": "username", "Watchlist": "id"}
+
+APPLIED_QUERY = "MATCH (s:SchemaMigration) RETURN DISTINCT s.version as version"
+
+RECORD_QUERY = """
+    MERGE (s:SchemaMigration {version: $version})
+    SET s.name = $name, s.applied_at = toString(datetime())
+"""
+
+
+class SchemaError(RuntimeError):
+    pass
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    # Étapes : fonction(session) -> changements effectués (texte)
+    steps: List[Callable]
+
+
+def run_statement(session, cypher: str) -> dict:
+    counters = session.run(cypher).consume().counters
+    return {
+        "indexes_added": counters.indexes_added,
+        "indexes_removed": counters.indexes_removed,
+        "constraints_added": counters.constraints_added,
+        "constraints_removed": counters.constraints_removed,
+    }
+
+
+def create_index(name: str, label: str, prop: str) -> Callable:
+    def step(session):
+        counters = run_statement(session, f"CREATE INDEX {name} IF NOT EXISTS FOR (n:{label}) ON (n.{prop})")
+        return [f"index {name} créé sur :{label}({prop})"] if counters["indexes_added"] else []
+    return step
+
+
+def unique_key(label: str, prop: str) -> Callable:
+    """Contrainte d'unicité ; son index (range) remplace les index simples sur la même propriété"""
+    name = f"{label.lower()}_{prop}_unique"
+
+    def step(session):
+        duplicates = list(session.run(f"""
+            MATCH (n:{label}) WHERE n.{prop} IS NOT NULL
+            WITH n.{prop} as key, count(*) as nodes
+            WHERE nodes > 1
+            RETURN key, nodes ORDER BY nodes DESC, key LIMIT 5
+        """))
+        if duplicates:
+            examples = ", ".join(f"{record['key']!r} ×{record['nodes']}" for record in duplicates)
+            raise SchemaError(f"Doublons sur :{label}({prop}), à fusionner avant la contrainte : {examples}")
+        changes = []
+        # Neo4j refuse une contrainte d'unicité sur une propriété déjà couverte par un index range
+        redundant = session.run("""
+            SHOW INDEXES YIELD name, type, entityType, labelsOrTypes, properties, owningConstraint
+            WHERE type = 'RANGE' AND entityType = 'NODE' AND owningConstraint IS NULL
+              AND labelsOrTypes = [$label] AND properties = [$prop]
+            RETURN name
+        """, label=label, prop=prop)
+        for index_name in [record["name"] for record in redundant]:
+            if run_statement(session, f"DROP INDEX `{index_name}` IF EXISTS")["indexes_removed"]:
+                changes.append(f"index {index_name} supprimé (remplacé par {name})")
+        counters = run_statement(session, f"CREATE CONSTRAINT {name} IF NOT EXISTS FOR (n:{label}) REQUIRE n.{prop} IS UNIQUE")
+        if counters["constraints_added"]:
+            changes.append(f"contrainte {name} créée sur :{label}({prop})")
+        return changes
+    return step
+
+
+MIGRATIONS = [
+    Migration(1, "Unicité des clés", [unique_key(label, prop) for label, prop in KEY_PROPERTIES.items()]),
+    # Tris et prédicats de reprise de la pagination (Person.name est couvert par sa contrainte)
+    Migration(2, "Index de tri", [
+        create_index("movie_released", "Movie", "released"),
+        create_index("watchlist_created_at", "Watchlist", "created_at"),
+    ]),
+]
+
+
+def applied_versions(driver, database: Optional[str] = None) -> set:
+    with driver.session(database=database) as session:
+        return {record["version"] for record in session.run(APPLIED_QUERY)}
+
+
+def migrate(driver, database: Optional[str] = None, migrations: List[Migration] = MIGRATIONS) -> List[dict]:
+    """Appliquer les migrations en attente, dans l'ordre des versions
+
+    Renvoie le rapport [{version, name, changes}] des migrations appliquées ;
+    une migration en erreur lève SchemaError (ou l'erreur du driver) sans être
+    enregistrée, et les suivantes ne sont pas lancées.
+    """
+    done = applied_versions(driver, database)
+    report = []
+    for migration in sorted(migrations, key=lambda m: m.version):
+        if migration.version in done:
+            continue
+        changes = []
+        # Une session par étape : Neo4j n'accepte pas les instructions de schéma dans une transaction d'écriture
+        for step in migration.steps:
+            with driver.session(database=database) as session:
+                changes.extend(step(session))
+        with driver.session(database=database) as session:
+            session.run(RECORD_QUERY, version=migration.version, name=migration.name).consume()
+        report.append({"version": migration.version, "name": migration.name, "changes": changes})
+    return report
+
+
+def print_report(report: List[dict]):
+    if not report:
+        print("✅ Schéma Neo4j à jour")
+        return
+    for entry in report:
+        print(f"✅ Migration {entry['version']} ({entry['name']}) appliquée")
+        for change in entry["changes"] or ["rien à créer, schéma déjà en place"]:
+            print(f"   - {change}")
+
+
+def migrate_on_startup(driver) -> bool:
+    """Migrations du démarrage : une erreur est journalisée sans empêcher l'API de démarrer"""
+    try:
+        print_report(migrate(driver))
+        return True
+    except Exception as e:
+        print(f"❌ Migration du schéma Neo4j impossible : {e}")
+        return False
+
+
+def main():
+    from db.neo4j_conn import neo4j_conn
+
+    parser = argparse.ArgumentParser(description="Migrations du schéma Neo4j (contraintes et index)")
+    parser.add_argument("--database", default=os.getenv("NEO4J_DATABASE"), help="base cible (défaut : base par défaut du serveur)")
+    parser.add_argument("--status", action="store_true", help="afficher les versions sans rien appliquer")
+    args = parser.parse_args()
+
+    if not neo4j_conn.connect():
+        sys.exit(1)
+    try:
+        if args.status:
+            done = applied_versions(neo4j_conn.driver, args.database)
+            for migration in MIGRATIONS:
+                state = "appliquée" if migration.version in done else "en attente"
+                print(f"{migration.version}. {migration.name} : {state}")
+            return
+        try:
+            print_report(migrate(neo4j_conn.driver, args.database))
+        except Exception as e:
+            sys.exit(f"❌ Migration interrompue : {e}")
+    finally:
+        neo4j_conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Décomposition du temps de chaque requête dans l'en-tête `Server-Timing`.
+
+`ServerTimingMiddleware` place un chronomètre dans une variable de contexte
+(contextvars : propagée aux dépendances et routes synchrones exécutées dans le
+threadpool). Les phases y sont ajoutées par :
+- `auth` : décodage du JWT et résolution du rôle (services.auth, routes/aio/dependencies.py) ;
+- `db` : requêtes Cypher, de `run()` à la lecture complète du résultat (db/neo4j_conn.py) ;
+- `pool` : attente d'une connexion du pool Neo4j (déjà comprise dans `db`) ;
+- `app` : le reste du traitement de la route (validation, code de la route,
+  construction et sérialisation de la réponse), mesuré par `TimedRoute` ;
+- `total` : de l'arrivée de la requête à l'envoi des en-têtes.
+Chaque phase est comptée hors des phases qu'elle contient (`app` n'inclut ni
+`auth` ni `db`) : la somme des phases, hors `pool`, approche `total`.
+
+Une fraction SERVER_TIMING_LOG_RATE des requêtes est aussi journalisée.
+"""
+import contextvars
+import os
+import random
+import time
+from contextlib import contextmanager
+
+from fastapi.routing import APIRoute
+
+SERVER_TIMING_LOG_RATE = float(os.getenv("SERVER_TIMING_LOG_RATE", "0.01"))
+
+_timing = contextvars.ContextVar("server_timing", default=None)
+
+
+class RequestTiming:
+    __slots__ = ("start", "phases", "_stack")
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.phases = {}
+        # Phases ouvertes : [nom, durée des phases contenues]
+        self._stack = []
+
+    def add(self, name: str, ms: float, exclusive: bool = True):
+        self.phases[name] = self.phases.get(name, 0.0) + ms
+        if exclusive and self._stack:
+            self._stack[-1][1] += ms
+
+    def header(self, total_ms: float) -> str:
+        parts = [f"{name};dur={ms:.1f}" for name, ms in self.phases.items()]
+        parts.append(f"total;dur={total_ms:.1f}")
+        return ", ".join(parts)
+
+
+def current_timing():
+    return _timing.get()
+
+
+def record(name: str, ms: float, exclusive: bool = True):
+    """Ajouter une durée mesurée ailleurs (sans effet hors d'une requête)"""
+    timing = _timing.get()
+    if timing is not None:
+        timing.add(name, ms, exclusive)
+
+
+@contextmanager
+def phase(name: str):
+    timing = _timing.get()
+    if timing is None:
+        yield
+        return
+    frame = [name, 0.0]
+    timing._stack.append(frame)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = (time.perf_counter() - start) * 1000
+        timing._stack.pop()
+        timing.add(name, max(elapsed - frame[1], 0.0), exclusive=False)
+        # La phase englobante ne compte pas cette durée
+        if timing._stack:
+            timing._stack[-1][1] += elapsed
+
+
+class TimedRoute(APIRoute):
+    """Route dont le traitement complet est mesuré dans la phase `app`"""
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def timed_handler(request):
+            with phase("app"):
+                return await handler(request)
+
+        return timed_handler
+
+
+class ServerTimingMiddleware:
+    def __init__(self, app, log_rate: float = SERVER_TIMING_LOG_RATE):
+        self.app = app
+        self.log_rate = log_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        timing = RequestTiming()
+        token = _timing.set(timing)
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                total_ms = (time.perf_counter() - timing.start) * 1000
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", timing.header(total_ms).encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _timing.reset(token)
+            if self.log_rate and random.random() < self.log_rate:
+                route = getattr(scope.get("route"), "path", None) or scope["path"]
+                phases = " ".join(f"{name}={ms:.1f}" for name, ms in timing.phases.items())
+                total_ms = (time.perf_counter() - timing.start) * 1000
+                print(f"⏱️ {scope['method']} {route} {status['code']} : {phases} total={total_ms:.1f} ms")
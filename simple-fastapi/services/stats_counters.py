@@ -0,0 +1,107 @@
+"""
+Compteurs matérialisés pour /stats.
+
+Les routes d'écriture appliquent leurs deltas (films, personnes, liens
+ACTED_IN / DIRECTED / PRODUCED) et signalent les changements de date de sortie :
+/stats répond alors depuis la mémoire. Les écritures faites hors de l'API (import,
+console Neo4j) et les écritures concurrentes d'une réconciliation peuvent faire
+dériver les compteurs : `reconcile_stats` les recalcule périodiquement avec les
+requêtes exactes, également utilisées par /stats?fresh=true.
+"""
+import os
+import threading
+import time
+
+from repositories import repositories
+
+STATS_RECONCILE_INTERVAL = float(os.getenv("STATS_RECONCILE_INTERVAL", "300"))
+
+COUNT_KEYS = ("movies", "persons", "acted_in", "directed", "produced")
+
+
+def build_stats(counts: dict, latest_movie) -> dict:
+    """Mettre les compteurs au format de la réponse /stats"""
+    return {
+        "movies_count": counts["movies"],
+        "persons_count": counts["persons"],
+        "relationships": {
+            "acted_in": counts["acted_in"],
+            "directed": counts["directed"],
+            "produced": counts["produced"],
+        },
+        "latest_movie": dict(latest_movie) if latest_movie else None,
+    }
+
+
+def fetch_stats() -> dict:
+    """Chemin exact : comptages complets dans la base"""
+    counts = {"movies": repositories.movies.count(), "persons": repositories.persons.count(),
+              **repositories.movies.credit_counts()}
+    return build_stats(counts, repositories.movies.latest())
+
+
+class StatsCounters:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.loaded = False
+        self.counts = dict.fromkeys(COUNT_KEYS, 0)
+        self.latest_movie = None
+        # Le dernier film a été supprimé ou a changé de date : il faut le relire
+        self.latest_stale = False
+        self.reconciled_at = None
+
+    def load(self, stats: dict):
+        """Remplacer les compteurs par un résultat exact (format de build_stats)"""
+        with self._lock:
+            self.counts = {
+                "movies": stats["movies_count"],
+                "persons": stats["persons_count"],
+                **stats["relationships"],
+            }
+            self.latest_movie = dict(stats["latest_movie"]) if stats["latest_movie"] else None
+            self.latest_stale = False
+            self.loaded = True
+            self.reconciled_at = time.time()
+
+    def apply(self, **deltas):
+        with self._lock:
+            if not self.loaded:
+                return
+            for key, delta in deltas.items():
+                self.counts[key] += delta
+
+    def movie_written(self, title: str, released):
+        """Un film a été créé ou sa date de sortie a pu changer"""
+        with self._lock:
+            if not self.loaded or self.latest_stale:
+                return
+            latest = self.latest_movie
+            if latest is None:
+                self.latest_movie = {"title": title, "released": released}
+            elif latest["title"] == title:
+                if released != latest["released"]:
+                    self.latest_stale = True
+            elif released is not None and latest["released"] is not None and released > latest["released"]:
+                self.latest_movie = {"title": title, "released": released}
+
+    def movie_removed(self, title: str):
+        with self._lock:
+            if self.latest_movie and self.latest_movie["title"] == title:
+                self.latest_stale = True
+
+    def snapshot(self):
+        """Statistiques courantes, ou None si elles doivent être recalculées"""
+        with self._lock:
+            if not self.loaded or self.latest_stale:
+                return None
+            return build_stats(self.counts, self.latest_movie)
+
+
+db_stats = StatsCounters()
+
+
+def reconcile_stats() -> dict:
+    """Recalculer les compteurs avec les requêtes exactes"""
+    stats = fetch_stats()
+    db_stats.load(stats)
+    return stats
@@ -0,0 +1,222 @@
+"""
+Fil d'accueil personnalisé (/users/me/feed) servi depuis des viviers de candidats précalculés.
+
+Pour chaque utilisateur on garde en mémoire un vivier d'au plus FEED_POOL_SIZE
+films classés, construit hors du chemin des requêtes par un thread de fond :
+- voisins par notes (services.rating_similarity) des films qu'il a bien notés ;
+- voisins par co-crédits (services.recommendations) des films bien notés ou
+  enregistrés dans ses watchlists ;
+- films les plus appréciés de la base, pour compléter un historique court.
+Les films déjà notés ou enregistrés sont exclus.
+
+La requête ne fait que lire ce vivier et retirer les films notés ou
+enregistrés depuis sa construction. Après une écriture de l'utilisateur, son
+vivier est marqué périmé : il reste servi (filtré) pendant qu'un nouveau est
+construit. Un utilisateur sans vivier reçoit les films populaires, hors films
+notés ou enregistrés (lus dans son historique), en attendant le sien.
+"""
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import NamedTuple
+
+from repositories import repositories
+from services.rating_similarity import HIGH_RATING, rating_similarity
+from services.recommendations import movie_recommendations
+
+FEED_POOL_SIZE = int(os.getenv("FEED_POOL_SIZE", "200"))
+FEED_MAX_USERS = int(os.getenv("FEED_MAX_USERS", "10000"))
+FEED_POPULAR_INTERVAL = float(os.getenv("FEED_POPULAR_INTERVAL", "600"))
+# Voisins demandés par film source
+SEED_NEIGHBOURS = 20
+# Poids des sources dans le score d'un candidat
+RATING_WEIGHT = 1.0
+CREDIT_WEIGHT = 0.5
+POPULAR_WEIGHT = 0.1
+
+class FeedPool(NamedTuple):
+    candidates: list    # [(titre, score, sources)] triés par score décroissant
+    seen: frozenset     # films notés ou enregistrés au moment de la construction
+    built_at: float
+
+
+def build_candidates(rated: dict, saved, popular, size: int = FEED_POOL_SIZE, username: str = None,
+                     credits=movie_recommendations) -> list:
+    """Classer les candidats d'un utilisateur à partir de son historique (aucune requête Neo4j)"""
+    seen = set(rated) | set(saved)
+    scores = defaultdict(float)
+    sources = defaultdict(set)
+    if username is not None:
+        for item in rating_similarity.recommend_for_user(username, size, exclude=seen):
+            scores[item["title"]] += RATING_WEIGHT * item["score"]
+            sources[item["title"]].add("ratings")
+    seeds = [title for title, rating in rated.items() if rating >= HIGH_RATING] + list(saved)
+    for seed in seeds:
+        neighbours = credits.similar(seed, SEED_NEIGHBOURS)
+        if not neighbours:
+            continue
+        best = neighbours[0]["score"]
+        for item in neighbours:
+            scores[item["title"]] += CREDIT_WEIGHT * item["score"] / best
+            sources[item["title"]].add("credits")
+    for rank, title in enumerate(popular):
+        scores[title] += POPULAR_WEIGHT * (1 - rank / max(len(popular), 1))
+        sources[title].add("popular")
+    ranked = sorted(((title, score) for title, score in scores.items() if title not in seen),
+                    key=lambda item: (-item[1], item[0]))
+    return [(title, score, tuple(sorted(sources[title]))) for title, score in ranked[:size]]
+
+
+def fetch_user_history(username: str):
+    """Notes et films enregistrés d'un utilisateur : ({titre: note}, {titres})"""
+    return repositories.users.history(username)
+
+
+def fetch_popular_movies(limit: int = FEED_POOL_SIZE):
+    return repositories.reviews.popular(HIGH_RATING - 1, limit)
+
+
+class UserFeeds:
+    def __init__(self, fetch_history=fetch_user_history, fetch_popular=fetch_popular_movies,
+                 pool_size: int = FEED_POOL_SIZE, max_users: int = FEED_MAX_USERS,
+                 credits=movie_recommendations):
+        self.fetch_history = fetch_history
+        self.fetch_popular = fetch_popular
+        self.pool_size = pool_size
+        self.max_users = max_users
+        self.credits = credits
+        self._lock = threading.Lock()
+        self._pools = OrderedDict()          # utilisateur -> FeedPool
+        self._stale = set()
+        self._recent = defaultdict(set)      # films notés/enregistrés depuis la construction du vivier
+        self._removed = set()                # films supprimés (et pas recréés) depuis leur suppression
+        self._popular = []
+        self._queue = queue.Queue()
+        self._queued = set()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # Chemin des requêtes : mémoire, plus l'historique d'un utilisateur encore sans vivier
+
+    def feed(self, username: str, limit: int):
+        with self._lock:
+            pool = self._pools.get(username)
+            if pool is not None:
+                self._pools.move_to_end(username)
+            excluded = self._recent.get(username, set()) | self._removed
+            stale = pool is None or username in self._stale
+            popular = self._popular
+        if stale:
+            self._schedule(username)
+        if pool is None:
+            # Rare (premier appel, ou vivier évincé) : une lecture de l'historique plutôt qu'un fil
+            # qui repropose les films déjà notés ou enregistrés
+            rated, saved = self.fetch_history(username)
+            excluded |= rated.keys() | saved
+            items = [(title, 0.0, ("popular",)) for title in popular if title not in excluded]
+        else:
+            excluded |= pool.seen
+            items = [item for item in pool.candidates if item[0] not in excluded]
+        return {
+            "items": [{"title": title, "score": round(score, 4), "sources": list(sources)}
+                      for title, score, sources in items[:limit]],
+            "personalized": pool is not None,
+            "stale": stale,
+        }
+
+    # Écritures signalées par les routes
+
+    def record_write(self, username: str, title: str = None):
+        """Note ou ajout en watchlist (title : film à exclure tout de suite), ou autre écriture"""
+        with self._lock:
+            # Sans vivier, rien à filtrer : le premier vivier relira l'historique dans Neo4j
+            if username in self._pools:
+                if title:
+                    self._recent[username].add(title)
+                self._stale.add(username)
+
+    def remove_movie(self, title: str):
+        with self._lock:
+            self._removed.add(title)
+            if title in self._popular:
+                self._popular = [t for t in self._popular if t != title]
+
+    def add_movie(self, title: str):
+        """Film créé : un titre supprimé puis recréé redevient proposable"""
+        with self._lock:
+            self._removed.discard(title)
+
+    # Construction des viviers (thread de fond)
+
+    def _schedule(self, username: str):
+        with self._lock:
+            if username in self._queued:
+                return
+            self._queued.add(username)
+        self._queue.put(username)
+
+    def refresh(self, username: str):
+        # Les écritures arrivées pendant la lecture Neo4j restent exclues
+        with self._lock:
+            recent_before = set(self._recent.get(username, ()))
+            self._stale.discard(username)
+        rated, saved = self.fetch_history(username)
+        candidates = build_candidates(rated, saved, self._popular, self.pool_size, username, self.credits)
+        pool = FeedPool(candidates, frozenset(rated) | frozenset(saved), time.time())
+        with self._lock:
+            self._pools[username] = pool
+            self._pools.move_to_end(username)
+            recent = self._recent.get(username)
+            if recent is not None:
+                recent -= recent_before
+                if not recent:
+                    del self._recent[username]
+            while len(self._pools) > self.max_users:
+                evicted, _ = self._pools.popitem(last=False)
+                self._stale.discard(evicted)
+                self._recent.pop(evicted, None)
+        return pool
+
+    def refresh_popular(self):
+        popular = self.fetch_popular(self.pool_size)
+        with self._lock:
+            # Les viviers construits avant une suppression peuvent encore contenir le film
+            self._popular = [title for title in popular if title not in self._removed]
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="user-feeds", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._queue.put(None)
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _run(self):
+        next_popular = 0.0
+        while not self._stop.is_set():
+            if time.monotonic() >= next_popular:
+                try:
+                    self.refresh_popular()
+                except Exception as e:
+                    print(f"⚠️ Films populaires indisponibles : {e}")
+                next_popular = time.monotonic() + FEED_POPULAR_INTERVAL
+            try:
+                username = self._queue.get(timeout=max(next_popular - time.monotonic(), 0.1))
+            except queue.Empty:
+                continue
+            if username is None:
+                continue
+            with self._lock:
+                self._queued.discard(username)
+            try:
+                self.refresh(username)
+            except Exception as e:
+                print(f"⚠️ Fil de {username} non reconstruit : {e}")
+
+
+user_feeds = UserFeeds()
@@ -0,0 +1,55 @@
+"""
+Tests de la résolution des rôles (aucun serveur ni Neo4j requis).
+"""
+import time
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from services.auth import RoleCache, create_access_token, invalidate_role, role_cache, verify_admin
+
+app = FastAPI()
+
+@app.get("/admin")
+def admin_only(username: str = Depends(verify_admin)):
+    return {"username": username}
+
+client = TestClient(app)
+
+def auth(token):
+    return {"Authorization": f"Bearer {token}"}
+
+def test_role_claim_avoids_lookup():
+    assert client.get("/admin", headers=auth(create_access_token("claim_admin", "admin"))).json() == {"username": "claim_admin"}
+    assert client.get("/admin", headers=auth(create_access_token("claim_user", "user"))).status_code == 403
+    assert client.get("/admin", headers=auth("not-a-token")).status_code == 401
+
+def test_invalidation_discards_older_claims():
+    token = create_access_token("demoted", "admin")
+    time.sleep(1.1)  # iat est à la seconde près
+    invalidate_role("demoted")
+    role_cache.set("demoted", "user")
+    assert client.get("/admin", headers=auth(token)).status_code == 403
+    time.sleep(1.1)
+    assert client.get("/admin", headers=auth(create_access_token("demoted", "admin"))).status_code == 200
+
+def test_role_cache_ttl_and_size():
+    cache = RoleCache(ttl=0.05, max_size=2)
+    cache.set("a", "admin")
+    cache.set("b", None)
+    assert cache.get("b") == ""
+    assert cache.get("a") == "admin"
+    cache.set("c", "user")  # évince "b", le moins récemment utilisé
+    assert cache.get("b") is None
+    time.sleep(0.06)
+    assert cache.get("a") is None
+    assert RoleCache(ttl=0, max_size=2).get("a") is None
+
+def test_role_changes_are_forgotten_once_older_tokens_expired():
+    cache = RoleCache(ttl=60, max_size=10, token_lifetime=0.05)
+    cache.invalidate("a")
+    assert not cache.claim_is_current("a", time.time() - 1)
+    time.sleep(0.06)
+    cache.invalidate("b")
+    assert list(cache._changed_at) == ["b"]
+    assert cache.claim_is_current("a", time.time() - 1)
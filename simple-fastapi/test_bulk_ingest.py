@@ -0,0 +1,63 @@
+"""
+Tests du découpage NDJSON de POST /movies/bulk (aucun serveur ni Neo4j requis).
+"""
+import json
+
+from routes.movies import validate_bulk_movie
+from services.bulk_ingest import NdjsonBatcher
+
+def ndjson(movies):
+    return "".join(json.dumps(movie) + "\n" for movie in movies).encode()
+
+def feed_in_pieces(batcher, body, size):
+    batches = []
+    for start in range(0, len(body), size):
+        batches.extend(batcher.feed(body[start:start + size]))
+    return batches + batcher.finish()
+
+def test_batches_do_not_depend_on_chunking():
+    body = ndjson({"title": f"Movie {i}", "released": 2000, "actors": [{"name": " A ", "roles": []}]} for i in range(25))
+    for size in (1, 7, 100, len(body)):
+        batcher = NdjsonBatcher(validate_bulk_movie, batch_size=10)
+        batches = feed_in_pieces(batcher, body, size)
+        assert [len(batch) for batch in batches] == [10, 10, 5]
+        assert batches[0][0] == (1, {"title": "Movie 0", "released": 2000, "tagline": "", "directors": [],
+                                     "producers": [], "actors": [{"name": "A", "roles": []}]})
+        assert batcher.results == []
+
+def test_per_line_report():
+    body = b'{"title": "A", "released": 1999}\n\nnot json\n[1]\n{"title": "B"}\n{"title": "A", "released": 2000}\n' \
+           b'{"title": "C", "released": 2001}\n{"title": "D", "released": 2002}'
+    batcher = NdjsonBatcher(validate_bulk_movie, batch_size=2)
+    batches = feed_in_pieces(batcher, body, 5)
+    assert [[line for line, _ in batch] for batch in batches] == [[1, 7], [8]]
+    batcher.batch_written(batches[0], {"A"})
+    batcher.batch_failed(batches[1], "Neo4j indisponible")
+    report = batcher.report()
+    assert (report["created"], report["failed"]) == (1, 6)
+    statuses = [(r["line"], r["status"], r.get("message", "")[:12]) for r in report["results"]]
+    assert statuses == [(1, "created", ""), (3, "error", "JSON invalid"), (4, "error", "Objet JSON a"),
+                        (5, "error", "Titre et ann"), (6, "error", "Titre en dou"), (7, "error", "Film déjà ex"),
+                        (8, "error", "Neo4j indisp")]
+
+def test_overlong_line_is_skipped():
+    batcher = NdjsonBatcher(validate_bulk_movie, max_line_bytes=50)
+    body = b'{"title": "' + b"x" * 200 + b'", "released": 1}\n{"title": "ok", "released": 1}\n'
+    batches = feed_in_pieces(batcher, body, 16)
+    assert [[movie["title"] for _, movie in batch] for batch in batches] == [["ok"]]
+    assert [(r["line"], r["status"]) for r in batcher.results] == [(1, "error")]
+
+def test_malformed_credits_are_reported_per_line():
+    lines = [
+        {"title": "X", "released": 2000, "actors": ["Keanu"]},
+        {"title": "X", "released": 2000, "directors": [None]},
+        {"title": "X", "released": 2000, "producers": "Joel Silver"},
+        {"title": "X", "released": 2000, "actors": [{"name": "Keanu", "roles": "Neo"}]},
+        {"title": "X", "released": 2000, "actors": [{"roles": ["Neo"]}]},
+        {"title": "X", "released": 2000, "actors": {"name": "Keanu"}},
+        {"title": "Ok", "released": 2000, "directors": ["Lana"], "actors": [{"name": "Keanu", "roles": ["Neo"]}]},
+    ]
+    batcher = NdjsonBatcher(validate_bulk_movie)
+    batches = feed_in_pieces(batcher, ndjson(lines), 9)
+    assert [[movie["title"] for _, movie in batch] for batch in batches] == [["Ok"]]
+    assert [(r["line"], r["status"]) for r in batcher.results] == [(line, "error") for line in range(1, 7)]
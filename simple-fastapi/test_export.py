@@ -0,0 +1,77 @@
+"""
+Tests de l'export NDJSON (aucun serveur ni Neo4j requis : driver factice en mémoire).
+"""
+import gzip
+import json
+import zlib
+
+from services import export
+from services.export import ChunkBuffer, accepts_gzip, export_sections, export_stream
+
+class FakeSession:
+    def __init__(self, data, log):
+        self.data, self.log = data, log
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.log.append("closed")
+
+    def run(self, query):
+        section = next(name for name, cypher in export.EXPORT_QUERIES.items() if cypher == query)
+        self.log.append(section)
+        # Générateur : les enregistrements ne sont produits qu'à la lecture, comme le curseur du driver
+        return (record for record in self.data[section])
+
+class FakeDriver:
+    def __init__(self, data):
+        self.data, self.log = data, []
+
+    def session(self, fetch_size=None):
+        return FakeSession(self.data, self.log)
+
+DATA = {
+    "movie": [{"title": f"Movie {i}", "released": 2000 + i % 20, "tagline": "", "actors": [{"name": "A", "roles": ["r"]}],
+               "directors": ["D"], "producers": []} for i in range(500)],
+    "person": [{"name": f"Person {i}", "born": None} for i in range(300)],
+    "rating": [{"username": "ann", "movie_title": "Movie 1", "rating": 5, "comment": "é", "created_at": "2024"}],
+    "watchlist": [],
+}
+
+def read_lines(body: bytes):
+    return [json.loads(line) for line in body.decode().splitlines()]
+
+def test_stream_is_chunked_and_complete(monkeypatch):
+    monkeypatch.setattr(export, "EXPORT_CHUNK_SIZE", 4096)
+    driver = FakeDriver(DATA)
+    chunks = list(export_stream(driver, export_sections(ratings=True)))
+    assert len(chunks) > 5 and all(len(chunk) < 4096 + 1024 for chunk in chunks)
+    lines = read_lines(b"".join(chunks))
+    assert [line["type"] for line in lines] == ["movie"] * 500 + ["person"] * 300 + ["rating"]
+    assert lines[0]["actors"] == [{"name": "A", "roles": ["r"]}]
+    assert lines[-1]["comment"] == "é"
+    assert driver.log == ["movie", "person", "rating", "closed"]
+
+def test_gzip_chunks_decode_incrementally(monkeypatch):
+    monkeypatch.setattr(export, "EXPORT_CHUNK_SIZE", 4096)
+    chunks = list(export_stream(FakeDriver(DATA), export_sections(), gzip=True))
+    decoder = zlib.decompressobj(31)
+    # Chaque morceau se décompresse dès réception (Z_SYNC_FLUSH)
+    first = decoder.decompress(chunks[0])
+    assert first.startswith(b'{"type": "movie"') and first.endswith(b"\n")
+    assert read_lines(gzip.decompress(b"".join(chunks))) == read_lines(b"".join(export_stream(FakeDriver(DATA), export_sections())))
+
+def test_stream_stops_when_client_leaves():
+    driver = FakeDriver(DATA)
+    stream = export_stream(driver, export_sections())
+    next(stream)
+    stream.close()
+    assert driver.log == ["movie", "closed"]
+
+def test_accepts_gzip():
+    assert accepts_gzip("gzip, deflate, br")
+    assert accepts_gzip("br;q=1.0, gzip;q=0.8")
+    assert not accepts_gzip("gzip;q=0")
+    assert not accepts_gzip(None)
+    assert ChunkBuffer(False).close() == b""
@@ -0,0 +1,53 @@
+"""
+Tests de l'index n-grammes (aucun serveur ni Neo4j requis).
+"""
+from services.fuzzy_index import NgramIndex, sorensen_dice
+
+TITLES = ["The Matrix", "The Matrix Reloaded", "The Matrix Revolutions", "Top Gun", "Cast Away", "A"]
+
+def brute_force(query, titles):
+    scores = [(t, sorensen_dice(t.lower(), query.lower())) for t in titles]
+    return sorted([(t, s) for t, s in scores if s > 0.5], key=lambda m: (-m[1], m[0]))
+
+def make_index():
+    index = NgramIndex()
+    index.load((title, {"released": 2000}) for title in TITLES)
+    return index
+
+def test_sorensen_dice():
+    assert sorensen_dice("matrix", "matrix") == 1.0
+    assert sorensen_dice("", "") == 1.0
+    assert sorensen_dice("a", "b") == 0.0
+    # "NIGHT" / "NACHT" : seul le bigramme "HT" est commun
+    assert sorensen_dice("night", "nacht") == 0.25
+
+def test_search_matches_brute_force():
+    index = make_index()
+    for query in ["matrix", "the matrx", "THE MATRIX RELOADED", "top gun", "cast", "a", "zzz"]:
+        assert [(k, s) for k, s, _ in index.search(query)] == brute_force(query, TITLES)
+
+def test_best_match_and_updates():
+    index = make_index()
+    assert index.best_match("the matrix") == ("The Matrix", 1.0)
+    index.remove("The Matrix")
+    assert index.best_match("the matrix")[0] != "The Matrix"
+    index.add("Matrix 4", released=2021)
+    assert "Matrix 4" in index
+    index.update("Matrix 4", released=2022)
+    assert index.get("Matrix 4") == {"released": 2022}
+    assert index.best_match("zzz") is None
+
+def test_length_filter_keeps_results_exact():
+    names = ["Tom Hanks", "Tom Cruise", "Tom Tykwer", "Hank", "Thomas Hankinson-Smithers", "Tom"]
+    index = NgramIndex()
+    index.load((name, {}) for name in names)
+    for query in ["tom hanks", "tom", "hanks", "thomas hankinson", "tom tykwer"]:
+        assert [(k, s) for k, s, _ in index.search(query)] == brute_force(query, names)
+
+def test_best_matches_batch():
+    index = make_index()
+    assert index.best_matches(["top gun", "zzz", "matrix reloaded"]) == [
+        ("Top Gun", 1.0),
+        None,
+        index.best_match("matrix reloaded"),
+    ]
@@ -0,0 +1,87 @@
+"""
+Tests du plus court chemin personne – film – personne (aucun serveur ni Neo4j requis).
+"""
+import random
+from collections import deque
+
+import pytest
+
+from services.graph_paths import PathSearchTimeout, describe_path, shortest_path, snapshot_path
+from services.graph_snapshot import GraphSnapshot
+from services.recommendations import CoCreditMatrix
+
+def random_graph(rng, movies=60, persons=80):
+    matrix = CoCreditMatrix()
+    matrix.load((f"Movie {i}", 2000, [f"Person {rng.randrange(persons)}" for _ in range(rng.randint(1, 3))])
+                for i in range(movies))
+    return matrix
+
+def bfs_degrees(matrix, source, target):
+    """Degrés de séparation par BFS simple sur les personnes"""
+    depths = {source: 0}
+    todo = deque([source])
+    while todo:
+        person = todo.popleft()
+        for title in matrix.movies_of(person):
+            for other in matrix.persons_of(title):
+                if other not in depths:
+                    depths[other] = depths[person] + 1
+                    todo.append(other)
+    return depths.get(target)
+
+def assert_valid(matrix, path, source, target):
+    assert path[0] == source and path[-1] == target
+    for i in range(0, len(path) - 1, 2):
+        assert path[i + 1] in matrix.movies_of(path[i])
+        assert path[i + 2] in matrix.persons_of(path[i + 1])
+
+def test_bidirectional_matches_plain_bfs():
+    rng = random.Random(5)
+    matrix = random_graph(rng)
+    for _ in range(200):
+        source, target = f"Person {rng.randrange(80)}", f"Person {rng.randrange(80)}"
+        if not matrix.movies_of(source) or not matrix.movies_of(target):
+            continue
+        expected = bfs_degrees(matrix, source, target)
+        path = shortest_path(source, target, matrix.persons_of, matrix.movies_of, max_depth=100)
+        if expected is None:
+            assert path is None
+        else:
+            assert len(path) // 2 == expected
+            assert_valid(matrix, path, source, target)
+
+def test_depth_limit_and_description():
+    matrix = CoCreditMatrix()
+    matrix.load([("A", 2000, ["p1", "p2"]), ("B", 2000, ["p2", "p3"]), ("C", 2000, ["p3", "p4"])])
+    path = shortest_path("p1", "p4", matrix.persons_of, matrix.movies_of)
+    assert describe_path(path) == [{"person": "p1"}, {"movie": "A"}, {"person": "p2"}, {"movie": "B"},
+                                   {"person": "p3"}, {"movie": "C"}, {"person": "p4"}]
+    assert shortest_path("p1", "p4", matrix.persons_of, matrix.movies_of, max_depth=2) is None
+    assert shortest_path("p1", "p4", matrix.persons_of, matrix.movies_of, max_depth=3) == path
+
+def test_timeout():
+    matrix = random_graph(random.Random(6))
+    with pytest.raises(PathSearchTimeout):
+        shortest_path("Person 1", "nobody", matrix.persons_of, lambda name: ["Movie 1"] * 10, timeout=-1)
+
+def test_snapshot_matches_dict_graph():
+    rng = random.Random(7)
+    matrix = random_graph(rng)
+    edges = [(name, title) for title in (f"Movie {i}" for i in range(60)) for name in matrix.persons_of(title)]
+    snapshot = GraphSnapshot.from_edges(["Lonely"], [], edges + edges[:5])
+    assert snapshot.edge_count == len(edges)
+    for name, i in snapshot.person_index.items():
+        assert sorted(snapshot.movie_titles[j] for j in snapshot.movies_of(i)) == sorted(matrix.movies_of(name))
+    sources, neighbours = snapshot.expand(True, [0, 2])
+    assert sorted(zip(sources.tolist(), neighbours.tolist())) == \
+        sorted((j, int(i)) for j in (0, 2) for i in snapshot.persons_of(j))
+    for _ in range(200):
+        source, target = f"Person {rng.randrange(80)}", f"Person {rng.randrange(80)}"
+        if source not in snapshot.person_index or target not in snapshot.person_index:
+            continue
+        expected = shortest_path(source, target, matrix.persons_of, matrix.movies_of, max_depth=100)
+        path = snapshot_path(snapshot, source, target, max_depth=100)
+        assert (path and len(path)) == (expected and len(expected))
+        if path:
+            assert_valid(matrix, path, source, target)
+    assert snapshot_path(snapshot, "Lonely", "Person 1") is None
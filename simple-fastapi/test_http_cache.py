@@ -0,0 +1,79 @@
+"""
+Tests du cache HTTP des routes de lecture (aucun serveur ni Neo4j requis).
+"""
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+from services.http_cache import bump, cached_response, response_cache
+
+app = FastAPI()
+calls = {"sync": 0, "async": 0}
+
+@app.get("/items")
+@cached_response("movies")
+def list_items(limit: int = 20):
+    calls["sync"] += 1
+    if limit < 0:
+        return {"status": "error", "message": "limite invalide"}
+    return {"status": "success", "items": list(range(limit))}
+
+@app.get("/async-items")
+@cached_response("reviews")
+async def list_async_items():
+    calls["async"] += 1
+    return {"reviews": [], "count": 0}
+
+@app.get("/paged")
+@cached_response("watchlists")
+def paged_items():
+    return JSONResponse(content=[1, 2], headers={"X-Next-Cursor": "abc"})
+
+client = TestClient(app)
+
+def test_etag_and_304():
+    response_cache.clear()
+    first = client.get("/items?limit=3")
+    assert first.json() == {"status": "success", "items": [0, 1, 2]}
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"].startswith("public")
+    assert "last-modified" in first.headers
+    second = client.get("/items?limit=3", headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["etag"] == etag
+    assert calls["sync"] == 1
+    assert client.get("/items?limit=3", headers={"If-Modified-Since": first.headers["last-modified"]}).status_code == 304
+
+def test_bump_invalidates_only_its_scope():
+    response_cache.clear()
+    client.get("/items?limit=2")
+    client.get("/async-items")
+    before = dict(calls)
+    bump("reviews")
+    client.get("/items?limit=2")
+    client.get("/async-items")
+    assert calls["sync"] == before["sync"]
+    assert calls["async"] == before["async"] + 1
+    # Même contenu après invalidation : même ETag, toujours 304
+    etag = client.get("/items?limit=2").headers["etag"]
+    bump("movies")
+    assert client.get("/items?limit=2", headers={"If-None-Match": etag}).status_code == 304
+    assert calls["sync"] == before["sync"] + 1
+
+def test_errors_are_not_cached():
+    response_cache.clear()
+    before = calls["sync"]
+    assert "etag" not in client.get("/items?limit=-1").headers
+    client.get("/items?limit=-1")
+    assert calls["sync"] == before + 2
+    assert "request" not in str(app.openapi()["paths"]["/items"])
+
+def test_route_headers_are_cached():
+    response_cache.clear()
+    first = client.get("/paged")
+    assert first.json() == [1, 2]
+    assert first.headers["x-next-cursor"] == "abc"
+    second = client.get("/paged", headers={"If-None-Match": first.headers["etag"]})
+    assert second.status_code == 304
+    assert second.headers["x-next-cursor"] == "abc"
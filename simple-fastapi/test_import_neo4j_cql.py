@@ -0,0 +1,37 @@
+"""
+Tests de l'analyse du script CQL par l'importeur (aucun serveur ni Neo4j requis).
+"""
+import pytest
+from import_neo4j_cql import DEFAULT_CQL_PATH, CypherScriptParser, build_batches
+
+SCRIPT = """
+CREATE (TheMatrix:Movie {title:'The Matrix', released:1999, tagline:"Welcome to the Real World"})
+CREATE (Keanu:Person {name:'Keanu Reeves', born:1964})
+CREATE
+  (Keanu)-[:ACTED_IN {roles:['Neo']}]->(TheMatrix),
+  // commentaire
+  (Critic)-[:REVIEWED {summary:'You can\\'t handle the truth!', rating:87}]->(TheMatrix)
+CREATE (Critic:Person {name:'Jessica Thompson'})
+;
+"""
+
+def test_parse_nodes_and_relationships():
+    nodes, relationships = CypherScriptParser(SCRIPT).parse()
+    assert nodes["TheMatrix"] == ("Movie", {"title": "The Matrix", "released": 1999, "tagline": "Welcome to the Real World"})
+    assert relationships == [
+        ("ACTED_IN", "Keanu", "TheMatrix", {"roles": ["Neo"]}),
+        ("REVIEWED", "Critic", "TheMatrix", {"summary": "You can't handle the truth!", "rating": 87}),
+    ]
+
+def test_undefined_variable_is_rejected():
+    with pytest.raises(ValueError):
+        CypherScriptParser("CREATE (a)-[:KNOWS]->(b)").parse()
+
+def test_batches_from_dataset():
+    with open(DEFAULT_CQL_PATH, encoding="utf-8") as f:
+        nodes, relationships = CypherScriptParser(f.read()).parse()
+    node_batches, rel_batches = build_batches(nodes, relationships, batch_size=100)
+    assert sum(len(rows) for _, _, rows in node_batches) == len(nodes)
+    assert sum(len(rows) for _, _, rows in rel_batches) == len(relationships)
+    assert all(len(rows) <= 100 for _, _, rows in node_batches + rel_batches)
+    assert len({batch_id for batch_id, _, _ in node_batches + rel_batches}) == len(node_batches) + len(rel_batches)
@@ -0,0 +1,42 @@
+"""
+Tests des métriques HTTP (aucun serveur ni Neo4j requis).
+"""
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from services.metrics import MetricsMiddleware, RequestMetrics
+
+metrics = RequestMetrics()
+app = FastAPI()
+app.add_middleware(MetricsMiddleware, metrics=metrics)
+
+@app.get("/movies/{title}")
+def get_movie(title: str):
+    return {"title": title}
+
+@app.get("/stream")
+def stream():
+    return StreamingResponse(iter([b"a" * 600, b"b" * 600]))
+
+client = TestClient(app)
+
+def test_counts_by_route_template():
+    metrics.reset()
+    client.get("/movies/Alien")
+    client.get("/movies/Heat")
+    client.get("/nowhere")
+    client.get("/stream")
+    assert metrics.requests[("GET", "/movies/{title}", 200)] == 2
+    assert metrics.requests[("GET", "<unmatched>", 404)] == 1
+    assert metrics.sizes[("GET", "/stream")].total == 1200
+    assert metrics.in_flight == 0
+
+def test_prometheus_rendering():
+    metrics.reset()
+    client.get("/movies/Alien")
+    text = metrics.render()
+    assert 'http_requests_total{method="GET",route="/movies/{title}",status="200"} 1' in text
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/movies/{title}",le="+Inf"} 1' in text
+    assert 'http_response_size_bytes_bucket{method="GET",route="/movies/{title}",le="100"} 1' in text
+    assert "http_requests_in_flight 0" in text
@@ -0,0 +1,19 @@
+"""
+Tests de POST /movies/batch sans Neo4j : résolution des titres et assemblage des résultats.
+"""
+from routes.movies import batch_results, resolve_batch
+from services.fuzzy_index import movie_titles
+
+def test_batch_maps_results_to_queries():
+    movie_titles.load([("The Matrix", {}), ("Top Gun", {}), ("Cast Away", {})])
+    queries = ["the matrix", "Top Gun", "Nothing like it", "The Matrix"]
+    matches, titles = resolve_batch(queries)
+    # Un seul chargement par film, même demandé deux fois
+    assert titles == ["The Matrix", "Top Gun"]
+    records = [{"title": "The Matrix", "released": 1999, "tagline": "", "actors": [], "directors": [], "producers": []}]
+    response = batch_results(queries, matches, records)
+    assert [r["status"] for r in response["results"]] == ["found", "not_found", "not_found", "found"]
+    assert response["found"] == 2
+    assert response["results"][0]["movie"]["released"] == 1999
+    assert response["results"][0]["query"] == "the matrix"
+    assert response["results"][3]["similarity"] == 1.0
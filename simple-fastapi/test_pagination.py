@@ -0,0 +1,38 @@
+"""
+Tests de la pagination par curseur (aucun serveur ni Neo4j requis).
+"""
+import pytest
+
+from services.pagination import (
+    InvalidCursor,
+    decode_cursor,
+    encode_cursor,
+    movies_page_query,
+    next_cursor,
+    persons_page_query,
+)
+
+def test_cursor_round_trip():
+    cursor = encode_cursor("movies", 1999, "The Matrix")
+    assert "=" not in cursor
+    assert decode_cursor(cursor, "movies", 2) == [1999, "The Matrix"]
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor, "persons", 1)
+    with pytest.raises(InvalidCursor):
+        decode_cursor("pas-un-curseur", "movies", 2)
+
+def test_next_cursor_only_for_full_pages():
+    rows = [{"name": "Carrie-Anne Moss"}, {"name": "Keanu Reeves"}]
+    assert next_cursor(rows, 3, "persons", "name") is None
+    assert decode_cursor(next_cursor(rows, 2, "persons", "name"), "persons", 1) == ["Keanu Reeves"]
+
+def test_page_queries():
+    cypher, params = movies_page_query(None)
+    assert "WHERE" not in cypher and params == {}
+    cypher, params = movies_page_query(encode_cursor("movies", 1999, "The Matrix"))
+    assert "m.released <= $released" in cypher
+    assert params == {"released": 1999, "title": "The Matrix"}
+    cypher, params = movies_page_query(encode_cursor("movies", None, "Untitled"))
+    assert "m.released IS NOT NULL" in cypher
+    cypher, params = persons_page_query(encode_cursor("persons", "Keanu Reeves"))
+    assert "p.name > $name" in cypher and params == {"name": "Keanu Reeves"}
@@ -0,0 +1,41 @@
+"""
+Tests du profileur statistique (aucun serveur ni Neo4j requis).
+"""
+import threading
+import time
+
+import pytest
+
+from services import profiler
+
+def busy_loop(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+def test_profile_finds_busy_thread_and_skips_idle():
+    stop = threading.Event()
+    worker = threading.Thread(target=busy_loop, args=(stop,), name="busy")
+    idle = threading.Thread(target=stop.wait, name="idle")
+    worker.start()
+    idle.start()
+    try:
+        stacks = profiler.profile(0.3, interval=0.002)
+    finally:
+        stop.set()
+        worker.join()
+        idle.join()
+    lines = profiler.collapsed(stacks).splitlines()
+    busy = [line for line in lines if line.startswith("busy;")]
+    assert busy and all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert "busy_loop (simple-fastapi/test_profiler.py:" in busy[0]
+    assert not any(line.startswith("idle;") for line in lines)
+    top = profiler.top_functions(stacks, 5)
+    assert any(entry["function"].startswith("busy_loop") and entry["total_percent"] > 0 for entry in top)
+
+def test_single_profile_at_a_time():
+    thread = threading.Thread(target=profiler.profile, args=(0.3,))
+    thread.start()
+    time.sleep(0.05)
+    with pytest.raises(profiler.ProfilerBusy):
+        profiler.profile(0.01)
+    thread.join()
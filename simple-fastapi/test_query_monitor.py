@@ -0,0 +1,133 @@
+"""
+Tests de l'instrumentation des requêtes Cypher (aucun serveur ni Neo4j requis : driver factice).
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from db.neo4j_conn import AsyncInstrumentedDriver, InstrumentedDriver
+from db.query_monitor import OTHER_QUERIES, QueryMonitor, fingerprint, parameter_shapes
+
+class FakeResult:
+    def __init__(self, records):
+        self.records = list(records)
+        self.consumed = False
+
+    def __iter__(self):
+        while self.records:
+            yield self.records.pop(0)
+
+    def single(self, strict=False):
+        return self.records.pop(0) if self.records else None
+
+    def data(self):
+        records, self.records = self.records, []
+        return records
+
+    def consume(self):
+        self.records, self.consumed = [], True
+        return SimpleNamespace(result_available_after=2, result_consumed_after=3)
+
+class FakeSession:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def run(self, query, parameters=None, **kwargs):
+        if "FAIL" in query:
+            raise RuntimeError("syntax error")
+        return FakeResult({"n": i} for i in range(self.rows))
+
+    def execute_write(self, work, *args):
+        return work(self, *args)
+
+class FakeDriver:
+    def session(self, **config):
+        return FakeSession(3)
+
+class AsyncFakeResult(FakeResult):
+    async def __aiter__(self):
+        for record in FakeResult.__iter__(self):
+            yield record
+
+    async def single(self, strict=False):
+        return FakeResult.single(self)
+
+    async def consume(self):
+        return FakeResult.consume(self)
+
+class AsyncFakeSession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    async def run(self, query, parameters=None, **kwargs):
+        return AsyncFakeResult({"n": i} for i in range(3))
+
+class AsyncFakeDriver:
+    def session(self, **config):
+        return AsyncFakeSession()
+
+def by_query(monitor):
+    return {stats["query"]: stats for stats in monitor.top(100)}
+
+def test_fingerprint_and_shapes():
+    assert fingerprint("MATCH (m:Movie {title: 'Heat'})\n  WHERE m.released > 1990\n  RETURN m LIMIT 10") == \
+        "MATCH (m:Movie {title: ?}) WHERE m.released > ? RETURN m LIMIT ?"
+    assert fingerprint("MATCH (n) // commentaire\nRETURN n.p2, $limit") == "MATCH (n) RETURN n.p2, $limit"
+    assert parameter_shapes({"title": "Heat", "actors": [{"name": "A", "roles": ["r"]}], "born": None}) == \
+        "actors: list[map{name:str,roles:list[str]}], born: null, title: str"
+
+def test_session_reads_are_measured():
+    monitor = QueryMonitor(slow_ms=10_000)
+    driver = InstrumentedDriver(FakeDriver(), monitor)
+    with driver.session() as session:
+        assert session.run("MATCH (m) RETURN m LIMIT 1").single() == {"n": 0}
+        assert [record["n"] for record in session.run("MATCH (m) RETURN m", title="Heat")] == [0, 1, 2]
+        unread = session.run("CREATE (m:Movie {title: $title})", {"title": "Heat"})
+        with pytest.raises(RuntimeError):
+            session.run("FAIL")
+        session.execute_write(lambda tx: tx.run("MATCH (m) RETURN m").data())
+    assert unread.consumed
+    stats = by_query(monitor)
+    assert stats["MATCH (m) RETURN m LIMIT ?"]["rows"] == 1
+    assert stats["MATCH (m) RETURN m LIMIT ?"]["server_available_after_ms"] == 2
+    assert stats["MATCH (m) RETURN m"]["count"] == 2 and stats["MATCH (m) RETURN m"]["rows"] == 6
+    assert stats["MATCH (m) RETURN m"]["parameter_shapes"] == ["title: str", ""]
+    assert stats["CREATE (m:Movie {title: $title})"]["count"] == 1
+    assert stats["FAIL"]["errors"] == 1
+
+def test_slow_log_and_overflow(capsys):
+    monitor = QueryMonitor(slow_ms=0, max_queries=2)
+    for i in range(4):
+        monitor.record(f"MATCH (n:L{i}) RETURN n", {"id": 1}, 5.0 * (i + 1), None, 1)
+    assert "🐢 Requête Cypher lente : 20 ms" in capsys.readouterr().out
+    top = monitor.top(2, "max")
+    assert [stats["query"] for stats in top] == [OTHER_QUERIES, "MATCH (n:L1) RETURN n"]
+    assert top[0]["count"] == 2
+
+def test_async_session_is_measured():
+    monitor = QueryMonitor(slow_ms=10_000)
+    driver = AsyncInstrumentedDriver(AsyncFakeDriver(), monitor)
+
+    async def scenario():
+        async with driver.session() as session:
+            record = await (await session.run("MATCH (m) RETURN m LIMIT 1")).single()
+            result = await session.run("MATCH (m) RETURN m")
+            rows = [record async for record in result]
+            await session.run("MATCH (p) RETURN p")
+        return record, rows
+
+    record, rows = asyncio.run(scenario())
+    assert record == {"n": 0} and len(rows) == 3
+    stats = by_query(monitor)
+    assert stats["MATCH (m) RETURN m"]["rows"] == 3
+    assert stats["MATCH (p) RETURN p"]["count"] == 1
@@ -0,0 +1,109 @@
+"""
+Tests du filtrage collaboratif item-item sur les notes (aucun serveur ni Neo4j requis).
+"""
+import random
+
+import numpy as np
+
+from services.rating_similarity import RatingSimilarity, centred_matrix, compute_neighbours
+
+def random_rows(rng, users=40, movies=25, per_user=8):
+    return [(f"user{u}", f"Movie {m}", rng.randint(1, 5))
+            for u in range(users) for m in rng.sample(range(movies), rng.randint(1, per_user))]
+
+def test_neighbours_match_brute_force_cosine():
+    rng = np.random.default_rng(3)
+    dense = rng.integers(0, 6, size=(30, 12)).astype(float)
+    users, movies = np.nonzero(dense)
+    matrix = centred_matrix(users, movies, dense[users, movies], dense.shape)
+    centred = matrix.toarray()
+    norms = np.linalg.norm(centred, axis=0)
+    neighbours = compute_neighbours(matrix, top_n=4, block_size=5)
+    for movie, (cols, sims) in neighbours.items():
+        expected = [(other, centred[:, movie] @ centred[:, other] / (norms[movie] * norms[other]))
+                    for other in range(dense.shape[1]) if other != movie]
+        expected = sorted(((o, s) for o, s in expected if s > 0), key=lambda item: (-item[1], item[0]))[:4]
+        assert list(cols) == [o for o, _ in expected]
+        assert np.allclose(sims, [s for _, s in expected], atol=1e-5)
+
+def test_incremental_updates_match_rebuild():
+    rng = random.Random(4)
+    rows = random_rows(rng)
+    incremental = RatingSimilarity(top_n=5)
+    incremental.rebuild(rows)
+    ratings = {(user, title): rating for user, title, rating in rows}
+    for _ in range(30):
+        user, title, rating = f"user{rng.randrange(45)}", f"Movie {rng.randrange(25)}", rng.randint(1, 5)
+        incremental.record_rating(user, title, rating)
+        ratings[(user, title)] = rating
+    incremental.remove_movie("Movie 3")
+    ratings = {key: rating for key, rating in ratings.items() if key[1] != "Movie 3"}
+    incremental.process_pending()
+    assert incremental.last_run["mode"] == "incremental"
+
+    rebuilt = RatingSimilarity(top_n=5)
+    rebuilt.rebuild([(user, title, rating) for (user, title), rating in ratings.items()])
+    titles = {title for _, title in ratings}
+    for title in titles:
+        assert incremental.similar(title, 5) == rebuilt.similar(title, 5)
+    assert incremental.similar("Movie 3", 5) == []
+
+def test_recommend_for_user_skips_rated_movies():
+    store = RatingSimilarity(top_n=5)
+    store.rebuild([
+        ("ann", "Alien", 5), ("ann", "Aliens", 5), ("ann", "Heat", 1),
+        ("bob", "Alien", 5), ("bob", "Aliens", 4), ("bob", "Heat", 2),
+        ("eve", "Alien", 1), ("eve", "Aliens", 2), ("eve", "Heat", 5),
+        ("joe", "Alien", 5), ("joe", "Heat", 1),
+    ])
+    assert store.similar("Alien", 5)[0]["title"] == "Aliens"
+    recommendations = store.recommend_for_user("joe", 5)
+    assert [r["title"] for r in recommendations] == ["Aliens"]
+    assert store.recommend_for_user("nobody", 5) == []
+
+def apply_random_ratings(rng, store, ratings, count):
+    for _ in range(count):
+        user, title, rating = f"user{rng.randrange(45)}", f"Movie {rng.randrange(28)}", rng.randint(1, 5)
+        store.record_rating(user, title, rating)
+        ratings[(user, title)] = rating
+
+def rebuilt_from(ratings, top_n=5):
+    store = RatingSimilarity(top_n=top_n)
+    store.rebuild([(user, title, rating) for (user, title), rating in ratings.items()])
+    return store
+
+def test_successive_incremental_passes_stay_exact():
+    rng = random.Random(7)
+    rows = random_rows(rng)
+    store = RatingSimilarity(top_n=5)
+    store.rebuild(rows)
+    ratings = {(user, title): rating for user, title, rating in rows}
+    for step in range(6):
+        apply_random_ratings(rng, store, ratings, 1 if step % 2 else 6)
+        store.process_pending()
+        rebuilt = rebuilt_from(ratings)
+        for title in {title for _, title in ratings}:
+            assert store.similar(title, 5) == rebuilt.similar(title, 5), (step, title)
+
+def test_single_rating_recomputes_few_movies():
+    rows = [(f"user{u}", f"Movie {(u + k) % 200}", 1 + (u * k) % 5) for u in range(400) for k in range(3)]
+    store = RatingSimilarity(top_n=5)
+    store.rebuild(rows)
+    store.record_rating("user0", "Movie 1", 5)
+    store.process_pending()
+    assert store.last_run["recomputed_movies"] < 20
+    assert store.last_run["movies"] == 200
+
+def test_capped_recompute_keeps_true_similarities():
+    rng = random.Random(11)
+    rows = random_rows(rng)
+    store = RatingSimilarity(top_n=5, max_recompute=0)
+    store.rebuild(rows)
+    ratings = {(user, title): rating for user, title, rating in rows}
+    apply_random_ratings(rng, store, ratings, 10)
+    store.process_pending()
+    rebuilt = rebuilt_from(ratings, top_n=100)
+    for title in {title for _, title in ratings}:
+        # Listes non recalculées : éventuellement incomplètes, mais chaque similarité est à jour
+        exact = {r["title"]: r["similarity"] for r in rebuilt.similar(title, 100)}
+        assert all(exact.get(r["title"]) == r["similarity"] for r in store.similar(title, 5))
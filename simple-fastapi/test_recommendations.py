@@ -0,0 +1,56 @@
+"""
+Tests de la matrice des co-crédits (aucun serveur ni Neo4j requis).
+"""
+import random
+
+from services.recommendations import CoCreditMatrix
+
+def brute_force_score(credits, title, other):
+    """Nombre de chemins (title)<-(p)->(other), comme count(*) dans la requête Cypher"""
+    return sum(credits[title].count(name) * credits[other].count(name) for name in set(credits[title]))
+
+def random_credits(rng, movies=30, persons=20):
+    return {f"Movie {i}": [f"Person {rng.randrange(persons)}" for _ in range(rng.randrange(0, 6))]
+            for i in range(movies)}
+
+def assert_matches(matrix, credits):
+    for title in credits:
+        for other in credits:
+            if other != title:
+                assert matrix.score(title, other) == brute_force_score(credits, title, other)
+
+def test_load_matches_brute_force():
+    credits = random_credits(random.Random(1))
+    matrix = CoCreditMatrix()
+    matrix.load((title, 2000, names) for title, names in credits.items())
+    assert_matches(matrix, credits)
+
+def test_incremental_updates_match_rebuild():
+    rng = random.Random(2)
+    credits = random_credits(rng)
+    matrix = CoCreditMatrix()
+    matrix.load((title, 2000, names) for title, names in credits.items())
+    for _ in range(50):
+        title = f"Movie {rng.randrange(35)}"
+        credits[title] = [f"Person {rng.randrange(20)}" for _ in range(rng.randrange(0, 6))]
+        matrix.set_movie(title, 2000, credits[title])
+    del credits["Movie 3"]
+    matrix.remove_movie("Movie 3")
+    matrix.remove_person("Person 4")
+    credits = {title: [n for n in names if n != "Person 4"] for title, names in credits.items()}
+    matrix.rename_person("Person 5", "Person 6")
+    credits = {title: ["Person 6" if n == "Person 5" else n for n in names] for title, names in credits.items()}
+    assert_matches(matrix, credits)
+
+def test_similar_ordering():
+    matrix = CoCreditMatrix()
+    matrix.load([
+        ("Base", 2000, ["A", "B", "C"]),
+        ("Old", 1990, ["A", "B"]),
+        ("New", 2010, ["A", "B"]),
+        ("Undated", None, ["C"]),
+        ("Far", 2020, ["C"]),
+    ])
+    assert [m["title"] for m in matrix.similar("Base", 10)] == ["New", "Old", "Undated", "Far"]
+    assert matrix.similar("Base", 1) == [{"title": "New", "released": 2010, "score": 2}]
+    assert matrix.similar("Unknown", 5) == []
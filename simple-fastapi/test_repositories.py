@@ -0,0 +1,272 @@
+"""
+Tests de conformité des dépôts : le même jeu de données et les mêmes
+assertions pour chaque backend.
+
+- memory : instantané NDJSON écrit dans un fichier temporaire (aucun serveur ni Neo4j requis) ;
+- neo4j : données créées dans la base de .env puis supprimées ; lancé seulement
+  avec REPOSITORY_TESTS_NEO4J=1 (les nœuds de test portent une propriété
+  `conformance` et la base peut contenir d'autres données : les assertions ne
+  portent que sur les éléments du jeu de test).
+"""
+import gzip
+import json
+import os
+import uuid
+
+import pytest
+
+from db.neo4j_conn import Neo4jConnection
+from repositories.memory import MemoryGraph, memory_repositories
+from repositories.neo4j import neo4j_repositories
+from services.pagination import InvalidCursor, next_cursor
+
+KEANU, CARRIE, LANA, NOBODY = "Conformance Keanu", "Conformance Carrie", "Conformance Lana", "Conformance Nobody"
+ALPHA, BETA, GAMMA, DELTA = "Conformance Alpha", "Conformance Beta", "Conformance Gamma", "Conformance Delta"
+
+MOVIES = [
+    {"title": ALPHA, "released": 1999, "tagline": "Bienvenue",
+     "actors": [{"name": KEANU, "roles": ["Neo"]}, {"name": CARRIE, "roles": ["Trinity"]}],
+     "directors": [LANA], "producers": [LANA]},
+    {"title": BETA, "released": 2003, "tagline": None,
+     "actors": [{"name": KEANU, "roles": ["Neo", "Thomas"]}, {"name": CARRIE, "roles": ["Trinity"]}],
+     "directors": [LANA], "producers": []},
+    {"title": GAMMA, "released": 2003, "tagline": "Suite", "actors": [{"name": CARRIE, "roles": ["Trinity"]}],
+     "directors": [], "producers": []},
+    {"title": DELTA, "released": None, "tagline": None, "actors": [], "directors": [], "producers": []},
+]
+PERSONS = [{"name": KEANU, "born": 1964}, {"name": CARRIE, "born": 1967}, {"name": LANA, "born": None},
+           {"name": NOBODY, "born": 1980}]
+USERS = [{"username": "conformance_ann", "role": "user"}, {"username": "conformance_bob", "role": "admin"}]
+RATINGS = [
+    {"username": "conformance_ann", "movie_title": ALPHA, "rating": 5, "comment": "Culte", "created_at": "2024-01-02T10:00:00"},
+    {"username": "conformance_bob", "movie_title": ALPHA, "rating": 4, "comment": None, "created_at": "2024-01-03T10:00:00"},
+    {"username": "conformance_ann", "movie_title": BETA, "rating": 4, "comment": "Bien", "created_at": "2024-01-01T10:00:00"},
+    {"username": "conformance_bob", "movie_title": GAMMA, "rating": 5, "comment": None, "created_at": "2024-01-04T10:00:00"},
+]
+WATCHLISTS = [
+    {"id": "conformance-wl-1", "name": "À voir", "description": "Ce soir", "is_public": True,
+     "created_at": "2024-02-01T10:00:00", "username": "conformance_ann", "movies": [BETA, ALPHA]},
+    {"id": "conformance-wl-2", "name": "Vide", "description": None, "is_public": True,
+     "created_at": "2024-02-01T10:00:00", "username": "conformance_bob", "movies": []},
+    {"id": "conformance-wl-3", "name": "Secret", "description": None, "is_public": False,
+     "created_at": "2024-03-01T10:00:00", "username": "conformance_ann", "movies": [GAMMA]},
+]
+
+SEED_CYPHER = [
+    ("UNWIND $movies AS movie CREATE (:Movie {title: movie.title, released: movie.released, "
+     "tagline: movie.tagline, conformance: $run})", {"movies": MOVIES}),
+    ("UNWIND $persons AS person CREATE (:Person {name: person.name, born: person.born, conformance: $run})",
+     {"persons": PERSONS}),
+    ("""UNWIND $movies AS movie MATCH (m:Movie {title: movie.title})
+        CALL { WITH m, movie UNWIND movie.actors AS actor MATCH (p:Person {name: actor.name})
+               CREATE (p)-[:ACTED_IN {roles: actor.roles}]->(m) }
+        CALL { WITH m, movie UNWIND movie.directors AS name MATCH (p:Person {name: name}) CREATE (p)-[:DIRECTED]->(m) }
+        CALL { WITH m, movie UNWIND movie.producers AS name MATCH (p:Person {name: name}) CREATE (p)-[:PRODUCED]->(m) }""",
+     {"movies": MOVIES}),
+    ("UNWIND $users AS user CREATE (:User {username: user.username, role: user.role, conformance: $run})",
+     {"users": USERS}),
+    ("""UNWIND $ratings AS rating MATCH (u:User {username: rating.username}), (m:Movie {title: rating.movie_title})
+        CREATE (u)-[:RATED {rating: rating.rating, comment: rating.comment, created_at: rating.created_at}]->(m)""",
+     {"ratings": RATINGS}),
+    ("""UNWIND $watchlists AS wl MATCH (u:User {username: wl.username})
+        CREATE (u)-[:OWNS]->(w:Watchlist {id: wl.id, name: wl.name, description: wl.description,
+                                          is_public: wl.is_public, created_at: wl.created_at, conformance: $run})
+        WITH w, wl UNWIND wl.movies AS title MATCH (m:Movie {title: title}) CREATE (w)-[:CONTAINS]->(m)""",
+     {"watchlists": WATCHLISTS}),
+]
+
+
+def snapshot_lines():
+    """Jeu de test au format de GET /export, plus les rôles et une watchlist privée"""
+    for section, rows in (("movie", MOVIES), ("person", PERSONS), ("user", USERS), ("rating", RATINGS),
+                          ("watchlist", WATCHLISTS)):
+        for row in rows:
+            yield json.dumps({"type": section, **row}, ensure_ascii=False) + "\n"
+
+
+def memory_backend(tmp_path_factory):
+    path = tmp_path_factory.mktemp("snapshot") / "catalog.ndjson.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        f.writelines(snapshot_lines())
+    graph = MemoryGraph()
+    assert graph.load_snapshot(str(path))
+    return memory_repositories(graph)
+
+
+def counts(repos):
+    return {"movies": repos.movies.count(), "persons": repos.persons.count(), **repos.movies.credit_counts()}
+
+
+@pytest.fixture(scope="module", params=["memory", "neo4j"])
+def backend(request, tmp_path_factory):
+    """(dépôts, comptages avant l'ajout du jeu de test)"""
+    if request.param == "memory":
+        yield memory_backend(tmp_path_factory), dict.fromkeys(("movies", "persons", "acted_in", "directed", "produced"), 0)
+        return
+    if os.getenv("REPOSITORY_TESTS_NEO4J") != "1":
+        pytest.skip("REPOSITORY_TESTS_NEO4J=1 pour lancer la conformité contre Neo4j (.env)")
+    conn = Neo4jConnection()
+    if not conn.connect():
+        pytest.skip("Neo4j indisponible")
+    repos = neo4j_repositories(conn)
+    run = str(uuid.uuid4())
+    before = counts(repos)
+    try:
+        with conn.driver.session() as session:
+            for cypher, params in SEED_CYPHER:
+                session.run(cypher, run=run, **params).consume()
+        yield repos, before
+    finally:
+        with conn.driver.session() as session:
+            session.run("MATCH (n) WHERE n.conformance = $run DETACH DELETE n", run=run).consume()
+        conn.close()
+
+
+def only(rows, key, values):
+    return [row for row in rows if row[key] in values]
+
+
+def all_pages(page, kind, keys, limit=2):
+    """Toutes les lignes d'une liste, page par page avec le curseur"""
+    rows, cursor = [], None
+    while True:
+        batch = page(limit, 0, cursor)
+        rows.extend(batch)
+        cursor = next_cursor(batch, limit, kind, *keys)
+        if cursor is None:
+            return rows
+
+
+def test_counts_and_latest(backend):
+    repos, before = backend
+    after = counts(repos)
+    assert {key: after[key] - before[key] for key in after} == {
+        "movies": 4, "persons": 4, "acted_in": 5, "directed": 2, "produced": 1}
+    # Dates absentes en premier avec released DESC, comme la première page
+    assert repos.movies.latest()["released"] == repos.movies.page(1)[0]["released"]
+
+
+def test_movie_titles_and_credits(backend):
+    repos, _ = backend
+    titles = dict(repos.movies.titles())
+    assert {title: titles[title] for title in (ALPHA, DELTA)} == {ALPHA: 1999, DELTA: None}
+    credits = {title: sorted(names) for title, _, names in repos.movies.credits() if title.startswith("Conformance")}
+    assert credits == {ALPHA: sorted([KEANU, CARRIE, LANA, LANA]), BETA: sorted([KEANU, CARRIE, LANA]),
+                       GAMMA: [CARRIE], DELTA: []}
+
+
+def test_movie_page_order_and_cursor(backend):
+    repos, _ = backend
+    rows = all_pages(repos.movies.page, "movies", ("released", "title"))
+    assert [row["title"] for row in only(rows, "title", {ALPHA, BETA, GAMMA, DELTA})] == [DELTA, BETA, GAMMA, ALPHA]
+    assert len(rows) == len({row["title"] for row in rows})
+    assert only(rows, "title", {BETA})[0] == {"title": BETA, "released": 2003, "tagline": None}
+    with pytest.raises(InvalidCursor):
+        repos.movies.page(2, 0, "pas-un-curseur")
+
+
+def test_movie_details_rows_and_actors(backend):
+    repos, _ = backend
+    (alpha,) = repos.movies.details([ALPHA, "Conformance Absent"])
+    assert sorted(alpha["actors"], key=lambda a: a["name"]) == [{"name": CARRIE, "roles": ["Trinity"]},
+                                                                 {"name": KEANU, "roles": ["Neo"]}]
+    assert (alpha["title"], alpha["released"], alpha["tagline"]) == (ALPHA, 1999, "Bienvenue")
+    assert (alpha["directors"], alpha["producers"]) == ([LANA], [LANA])
+    assert repos.movies.details([DELTA])[0]["actors"] == []
+    assert repos.movies.details([]) == []
+    assert sorted(row["title"] for row in repos.movies.rows([GAMMA, ALPHA, "Conformance Absent"])) == [ALPHA, GAMMA]
+    assert repos.movies.actors(BETA) == [{"name": CARRIE, "roles": ["Trinity"]}, {"name": KEANU, "roles": ["Neo", "Thomas"]}]
+    assert repos.movies.actors(DELTA) == []
+
+
+def test_movie_search_and_similar(backend):
+    repos, _ = backend
+    found = [row["title"] for row in repos.movies.search("CONFORMANCE A", 10)]
+    assert found == [ALPHA]
+    found = [row["released"] for row in repos.movies.search("conformance", 10) if row["title"].startswith("Conformance")]
+    assert found == [None, 2003, 2003, 1999]
+    assert len(repos.movies.search("conformance", 2)) == 2
+    # Un chemin par lien : Lana réalise et produit Alpha puis réalise Beta
+    similar = repos.movies.similar(ALPHA, 10)
+    assert [(row["title"], row["score"]) for row in similar] == [(BETA, 4), (GAMMA, 1)]
+    assert repos.movies.similar("Conformance Absent", 10) == []
+
+
+def test_persons(backend):
+    repos, _ = backend
+    assert {KEANU, NOBODY} <= set(repos.persons.names())
+    rows = all_pages(repos.persons.page, "persons", ("name",))
+    assert only(rows, "name", {KEANU, CARRIE, LANA, NOBODY}) == [
+        {"name": CARRIE, "born": 1967}, {"name": KEANU, "born": 1964}, {"name": LANA, "born": None},
+        {"name": NOBODY, "born": 1980}]
+    assert sorted(title for name, title in repos.persons.credits() if name == LANA) == [ALPHA, ALPHA, BETA]
+    keanu = repos.persons.details(KEANU)
+    assert sorted(keanu["acted_in"], key=lambda a: a["movie"]) == [{"movie": ALPHA, "roles": ["Neo"]},
+                                                                  {"movie": BETA, "roles": ["Neo", "Thomas"]}]
+    assert (keanu["born"], keanu["directed"], keanu["produced"]) == (1964, [], [])
+    assert repos.persons.details(NOBODY) == {"name": NOBODY, "born": 1980, "acted_in": [], "directed": [], "produced": []}
+    assert repos.persons.details("Conformance Absent") is None
+    assert repos.persons.movies(KEANU) == [{"title": BETA, "released": 2003, "roles": ["Neo", "Thomas"]},
+                                           {"title": ALPHA, "released": 1999, "roles": ["Neo"]}]
+    assert sorted(repos.persons.collaborations(KEANU, CARRIE)) == [ALPHA, BETA]
+    assert repos.persons.collaborations(KEANU, NOBODY) == []
+
+
+def test_users(backend):
+    repos, _ = backend
+    assert repos.users.role("conformance_bob") == "admin"
+    assert repos.users.role("conformance_absent") is None
+    assert repos.users.history("conformance_ann") == ({ALPHA: 5, BETA: 4}, {ALPHA, BETA, GAMMA})
+    assert repos.users.history("conformance_absent") == ({}, set())
+
+
+def test_reviews(backend):
+    repos, _ = backend
+    assert repos.reviews.for_movie(ALPHA) == [
+        {"username": "conformance_bob", "rating": 4, "comment": None, "created_at": "2024-01-03T10:00:00"},
+        {"username": "conformance_ann", "rating": 5, "comment": "Culte", "created_at": "2024-01-02T10:00:00"},
+    ]
+    assert repos.reviews.for_movie(DELTA) == []
+    ratings = {(user, title): rating for user, title, rating in repos.reviews.ratings() if user.startswith("conformance")}
+    assert ratings == {(r["username"], r["movie_title"]): r["rating"] for r in RATINGS}
+    popular = [title for title in repos.reviews.popular(4.5, 1000) if title.startswith("Conformance")]
+    assert popular == [ALPHA, GAMMA]
+    assert len(repos.reviews.popular(0, 1)) == 1
+
+
+def test_watchlists(backend):
+    repos, _ = backend
+    mine = repos.watchlists.for_user("conformance_ann")
+    assert [(w["id"], w["movie_count"], w["is_public"]) for w in mine] == [
+        ("conformance-wl-3", 1, False), ("conformance-wl-1", 2, True)]
+    assert repos.watchlists.get("conformance-wl-3") == {
+        "id": "conformance-wl-3", "name": "Secret", "description": None, "is_public": False,
+        "created_at": "2024-03-01T10:00:00", "username": "conformance_ann"}
+    assert repos.watchlists.get("conformance-absent") is None
+    assert [m["title"] for m in repos.watchlists.movies("conformance-wl-1")] == [ALPHA, BETA]
+    assert repos.watchlists.movies("conformance-wl-2") == []
+    rows = all_pages(repos.watchlists.public_page, "watchlists", ("created_at", "id"), limit=1)
+    public = only(rows, "id", {w["id"] for w in WATCHLISTS})
+    assert [(w["id"], w["username"], w["movie_count"]) for w in public] == [
+        ("conformance-wl-1", "conformance_ann", 2), ("conformance-wl-2", "conformance_bob", 0)]
+    assert repos.watchlists.containing("conformance_ann", ALPHA) == [{"id": "conformance-wl-1", "name": "À voir"}]
+    assert repos.watchlists.containing("conformance_bob", ALPHA) == []
+
+
+def test_snapshot_ignores_links_to_missing_nodes(tmp_path):
+    path = tmp_path / "catalog.ndjson"
+    path.write_text("\n".join(json.dumps(line) for line in [
+        {"type": "movie", "title": "Heat", "released": 1995, "tagline": None,
+         "actors": [{"name": "Al Pacino", "roles": ["Hanna"]}], "directors": ["Michael Mann"], "producers": []},
+        {"type": "person", "name": "Al Pacino", "born": 1940},
+        {"type": "rating", "username": "ann", "movie_title": "Ronin", "rating": 4, "comment": None, "created_at": "2024"},
+        {"type": "watchlist", "id": "wl", "name": "Nuit", "description": None, "created_at": "2024",
+         "username": "ann", "movies": ["Heat", "Ronin"]},
+    ]) + "\n")
+    repos = memory_repositories(MemoryGraph())
+    assert repos.movies.graph.load_snapshot(str(path))
+    assert repos.movies.details(["Heat"])[0]["directors"] == []
+    assert repos.movies.credit_counts() == {"acted_in": 1, "directed": 0, "produced": 0}
+    assert list(repos.reviews.ratings()) == []
+    assert repos.watchlists.public_page(10)[0]["movie_count"] == 1
+    assert not MemoryGraph().load_snapshot(str(tmp_path / "absent.ndjson"))
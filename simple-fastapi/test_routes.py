@@ -0,0 +1,40 @@
+"""
+Tests de l'ordre des routes : chaque chemin GET atteint sa route, y compris
+celles à segment fixe voisines d'une route /{paramètre} (aucun serveur ni Neo4j requis).
+"""
+import pytest
+from starlette.routing import Match
+
+from routes import movies, persons
+from routes.aio import movies as aio_movies, persons as aio_persons
+
+MOVIE_PATHS = {
+    "/search": "search_movies",
+    "/search/movies": "search_movies_alias",
+    "/recommend/similar/Heat": "recommend_similar_movies",
+    "/recommend/movies/similar/Heat": "recommend_similar_movies_alias",
+    "/Heat": "get_movie_by_title",
+    "/Heat/actors": "get_actors_by_movie",
+}
+
+PERSON_PATHS = {
+    "/collaborations": "get_collaborations",
+    "/path": "get_person_path",
+    "/actors/Keanu Reeves/movies": "get_movies_by_actor",
+    "/Keanu Reeves": "get_person_by_name",
+}
+
+def resolve(router, path: str) -> str:
+    scope = {"type": "http", "method": "GET", "path": path, "root_path": ""}
+    for route in router.routes:
+        if route.matches(scope)[0] == Match.FULL:
+            return route.endpoint.__name__
+    return None
+
+@pytest.mark.parametrize("router", [persons.router, aio_persons.router], ids=["sync", "aio"])
+def test_person_paths_reach_their_route(router):
+    assert {path: resolve(router, path) for path in PERSON_PATHS} == PERSON_PATHS
+
+@pytest.mark.parametrize("router", [movies.router, aio_movies.router], ids=["sync", "aio"])
+def test_movie_paths_reach_their_route(router):
+    assert {path: resolve(router, path) for path in MOVIE_PATHS} == MOVIE_PATHS
@@ -0,0 +1,148 @@
+"""
+Tests des migrations du schéma Neo4j (aucun serveur ni Neo4j requis : driver factice
+qui simule les index, les contraintes et les versions enregistrées).
+"""
+import re
+
+import pytest
+
+from services import schema
+from services.schema import MIGRATIONS, SchemaError, migrate
+
+
+class Counters:
+    def __init__(self, **changes):
+        self.indexes_added = changes.get("indexes_added", 0)
+        self.indexes_removed = changes.get("indexes_removed", 0)
+        self.constraints_added = changes.get("constraints_added", 0)
+        self.constraints_removed = changes.get("constraints_removed", 0)
+
+
+class Summary:
+    def __init__(self, counters):
+        self.counters = counters
+
+
+class FakeResult(list):
+    def __init__(self, records=(), **changes):
+        super().__init__(records)
+        self.counters = Counters(**changes)
+
+    def consume(self):
+        return Summary(self.counters)
+
+
+class FakeDriver:
+    def __init__(self, indexes=None, duplicates=None):
+        # nom -> (label, propriété) pour les index range simples
+        self.indexes = dict(indexes or {})
+        self.constraints = {}
+        self.versions = set()
+        self.duplicates = duplicates or {}
+        self.statements = []
+        self.databases = set()
+
+    def session(self, database=None):
+        self.databases.add(database)
+        return FakeSession(self)
+
+
+class FakeSession:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def run(self, cypher, **params):
+        db = self.driver
+        cypher = " ".join(cypher.split())
+        db.statements.append(cypher)
+        if cypher.startswith("MATCH (s:SchemaMigration)"):
+            return FakeResult({"version": version} for version in db.versions)
+        if cypher.startswith("MERGE (s:SchemaMigration"):
+            db.versions.add(params["version"])
+            return FakeResult()
+        if cypher.startswith("MATCH (n:"):
+            label, prop = re.match(r"MATCH \(n:(\w+)\) WHERE n\.(\w+)", cypher).groups()
+            return FakeResult(db.duplicates.get((label, prop), []))
+        if cypher.startswith("SHOW INDEXES"):
+            target = (params["label"], params["prop"])
+            return FakeResult({"name": name} for name, schema_key in db.indexes.items() if schema_key == target)
+        if cypher.startswith("DROP INDEX"):
+            name = re.match(r"DROP INDEX `(\w+)`", cypher).group(1)
+            return FakeResult(indexes_removed=int(db.indexes.pop(name, None) is not None))
+        if cypher.startswith("CREATE CONSTRAINT"):
+            name, label, prop = re.match(r"CREATE CONSTRAINT (\w+) .* FOR \(n:(\w+)\) REQUIRE n\.(\w+)", cypher).groups()
+            if any(key == (label, prop) for key in db.indexes.values()):
+                raise RuntimeError("Un index existe déjà sur cette propriété")
+            added = name not in db.constraints
+            db.constraints[name] = (label, prop)
+            return FakeResult(constraints_added=int(added))
+        if cypher.startswith("CREATE INDEX"):
+            name, label, prop = re.match(r"CREATE INDEX (\w+) .* FOR \(n:(\w+)\) ON \(n\.(\w+)\)", cypher).groups()
+            added = name not in db.indexes
+            db.indexes[name] = (label, prop)
+            return FakeResult(indexes_added=int(added))
+        raise AssertionError(f"Requête inattendue : {cypher}")
+
+
+def test_fresh_database_gets_every_constraint_and_index():
+    driver = FakeDriver()
+    report = migrate(driver)
+    assert [entry["version"] for entry in report] == [migration.version for migration in MIGRATIONS]
+    assert set(driver.constraints.values()) == set(schema.KEY_PROPERTIES.items())
+    assert driver.indexes == {"movie_released": ("Movie", "released"), "watchlist_created_at": ("Watchlist", "created_at")}
+    assert "contrainte movie_title_unique créée sur :Movie(title)" in report[0]["changes"]
+    assert driver.versions == {1, 2}
+
+
+def test_second_run_changes_nothing():
+    driver = FakeDriver()
+    migrate(driver)
+    statements = len(driver.statements)
+    assert migrate(driver) == []
+    # Seule la lecture des versions appliquées est rejouée
+    assert len(driver.statements) == statements + 1
+
+
+def test_existing_key_indexes_are_replaced_by_constraints():
+    driver = FakeDriver(indexes={"person_name": ("Person", "name"), "import_movie_title": ("Movie", "title"),
+                                 "movie_released": ("Movie", "released")})
+    report = migrate(driver)
+    assert "index person_name supprimé (remplacé par person_name_unique)" in report[0]["changes"]
+    assert "index import_movie_title supprimé (remplacé par movie_title_unique)" in report[0]["changes"]
+    # Déjà présent : rien de créé, la migration est tout de même enregistrée
+    assert report[1]["changes"] == ["index watchlist_created_at créé sur :Watchlist(created_at)"]
+    assert set(driver.indexes) == {"movie_released", "watchlist_created_at"}
+
+
+def test_duplicates_stop_before_recording_the_version():
+    driver = FakeDriver(duplicates={("User", "username"): [{"key": "ann", "nodes": 2}]})
+    with pytest.raises(SchemaError, match="'ann' ×2"):
+        migrate(driver)
+    assert driver.versions == set()
+    assert "user_username_unique" not in driver.constraints
+    # Après fusion des doublons, la migration reprend là où elle s'était arrêtée
+    driver.duplicates = {}
+    assert [entry["version"] for entry in migrate(driver)] == [1, 2]
+    assert "user_username_unique" in driver.constraints
+
+
+def test_pending_versions_only_and_database_forwarded():
+    driver = FakeDriver()
+    driver.versions = {1}
+    report = migrate(driver, database="films")
+    assert [entry["version"] for entry in report] == [2]
+    assert driver.constraints == {}
+    assert driver.databases == {"films"}
+
+
+def test_startup_reports_failure_without_raising(capsys):
+    driver = FakeDriver(duplicates={("Movie", "title"): [{"key": "Heat", "nodes": 3}]})
+    assert not schema.migrate_on_startup(driver)
+    assert "❌" in capsys.readouterr().out
+    assert schema.migrate_on_startup(FakeDriver())
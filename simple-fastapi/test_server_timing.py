@@ -0,0 +1,56 @@
+"""
+Tests de l'en-tête Server-Timing (aucun serveur ni Neo4j requis).
+"""
+import time
+
+from fastapi import APIRouter, Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from db.query_monitor import QueryMonitor
+from services.server_timing import ServerTimingMiddleware, TimedRoute, phase
+
+def slow_auth():
+    # Dépendance synchrone : exécutée dans le threadpool, avec le contexte de la requête
+    with phase("auth"):
+        time.sleep(0.03)
+    return "ann"
+
+router = APIRouter(route_class=TimedRoute)
+
+@router.get("/movies/{title}")
+def get_movie(title: str, username: str = Depends(slow_auth)):
+    timer = QueryMonitor(slow_ms=10_000).start("MATCH (m:Movie {title: $title}) RETURN m", {"title": title})
+    time.sleep(0.02)
+    timer.finish()
+    return {"title": title, "user": username}
+
+app = FastAPI()
+app.include_router(router)
+app.add_middleware(ServerTimingMiddleware, log_rate=1.0)
+client = TestClient(app)
+
+def parse(header):
+    phases = {}
+    for part in header.split(", "):
+        name, duration = part.split(";dur=")
+        phases[name] = float(duration)
+    return phases
+
+def test_server_timing_phases(capsys):
+    response = client.get("/movies/Heat")
+    assert response.json() == {"title": "Heat", "user": "ann"}
+    phases = parse(response.headers["server-timing"])
+    assert set(phases) == {"auth", "db", "app", "total"}
+    assert phases["auth"] >= 30 and phases["db"] >= 20
+    # Chaque phase est comptée hors des phases qu'elle contient
+    assert phases["app"] < 20
+    assert phases["auth"] + phases["db"] + phases["app"] <= phases["total"] + 0.5
+    assert "⏱️ GET /movies/{title} 200 : auth=" in capsys.readouterr().out
+
+def test_no_timing_outside_requests():
+    with phase("auth"):
+        pass
+    timer = QueryMonitor(slow_ms=10_000).start("RETURN 1")
+    timer.finish()
+    response = client.get("/nowhere")
+    assert parse(response.headers["server-timing"]).keys() == {"total"}
@@ -0,0 +1,40 @@
+"""
+Tests des compteurs matérialisés de /stats (aucun serveur ni Neo4j requis).
+"""
+from services.stats_counters import StatsCounters, build_stats
+
+def make_counters():
+    counters = StatsCounters()
+    counts = {"movies": 2, "persons": 3, "acted_in": 4, "directed": 1, "produced": 0}
+    counters.load(build_stats(counts, {"title": "The Matrix Reloaded", "released": 2003}))
+    return counters
+
+def test_snapshot_requires_load():
+    counters = StatsCounters()
+    counters.apply(movies=1)
+    assert counters.snapshot() is None
+    assert make_counters().snapshot()["movies_count"] == 2
+
+def test_apply_deltas():
+    counters = make_counters()
+    counters.apply(movies=1, persons=2, acted_in=3, directed=1, produced=1)
+    counters.apply(persons=-1, acted_in=-2)
+    stats = counters.snapshot()
+    assert stats["movies_count"] == 3
+    assert stats["persons_count"] == 4
+    assert stats["relationships"] == {"acted_in": 5, "directed": 2, "produced": 1}
+
+def test_latest_movie_tracking():
+    counters = make_counters()
+    counters.movie_written("The Matrix", 1999)
+    assert counters.snapshot()["latest_movie"] == {"title": "The Matrix Reloaded", "released": 2003}
+    counters.movie_written("Matrix 4", 2021)
+    assert counters.snapshot()["latest_movie"] == {"title": "Matrix 4", "released": 2021}
+    counters.movie_written("Matrix 4", 2021)
+    assert counters.snapshot() is not None
+    # Le dernier film supprimé ou avancé dans le temps : il faut le relire dans Neo4j
+    counters.movie_removed("Matrix 4")
+    assert counters.snapshot() is None
+    counters = make_counters()
+    counters.movie_written("The Matrix Reloaded", 1990)
+    assert counters.snapshot() is None
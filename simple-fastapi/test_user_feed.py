@@ -0,0 +1,61 @@
+"""
+Tests du fil personnalisé (aucun serveur ni Neo4j requis).
+"""
+import pytest
+
+from services.recommendations import CoCreditMatrix
+from services.user_feed import UserFeeds, build_candidates
+
+histories = {"ann": ({"Alien": 5}, {"Aliens"}), "bob": ({"Heat": 2}, set())}
+
+@pytest.fixture
+def credits():
+    matrix = CoCreditMatrix()
+    matrix.load([
+        ("Alien", 1979, ["Sigourney Weaver", "Ridley Scott"]),
+        ("Aliens", 1986, ["Sigourney Weaver", "James Cameron"]),
+        ("Gorillas in the Mist", 1988, ["Sigourney Weaver"]),
+        ("Blade Runner", 1982, ["Ridley Scott", "Harrison Ford"]),
+        ("Heat", 1995, ["Al Pacino"]),
+    ])
+    return matrix
+
+@pytest.fixture
+def feeds(credits):
+    feeds = UserFeeds(fetch_history=lambda username: histories.get(username, ({}, set())),
+                      fetch_popular=lambda limit: ["Aliens", "Heat", "Blade Runner"], credits=credits)
+    feeds.refresh_popular()
+    return feeds
+
+def test_candidates_exclude_rated_and_saved(credits):
+    candidates = build_candidates({"Alien": 5}, {"Aliens"}, ["Heat"], credits=credits)
+    titles = [title for title, _, _ in candidates]
+    assert "Alien" not in titles and "Aliens" not in titles
+    assert set(titles) == {"Gorillas in the Mist", "Blade Runner", "Heat"}
+    assert candidates[-1] == ("Heat", candidates[-1][1], ("popular",))
+
+def test_cold_start_serves_unseen_popular_and_schedules_pool(feeds):
+    first = feeds.feed("ann", 10)
+    assert first["personalized"] is False and first["stale"] is True
+    assert [item["title"] for item in first["items"]] == ["Heat", "Blade Runner"]
+    assert [item["title"] for item in feeds.feed("bob", 10)["items"]] == ["Aliens", "Blade Runner"]
+    feeds.refresh(feeds._queue.get_nowait())
+    second = feeds.feed("ann", 10)
+    assert second["personalized"] is True and second["stale"] is False
+    assert "Aliens" not in [item["title"] for item in second["items"]]
+
+def test_writes_exclude_immediately_and_mark_stale(feeds):
+    feeds.refresh("ann")
+    feeds.record_write("ann", "Blade Runner")
+    feed = feeds.feed("ann", 10)
+    assert feed["stale"] is True
+    assert "Blade Runner" not in [item["title"] for item in feed["items"]]
+    feeds.remove_movie("Heat")
+    assert "Heat" not in [item["title"] for item in feeds.feed("ann", 10)["items"]]
+
+def test_recreated_movie_is_proposed_again(feeds):
+    feeds.refresh("ann")
+    feeds.remove_movie("Heat")
+    feeds.add_movie("Heat")
+    assert feeds._removed == set()
+    assert "Heat" in [item["title"] for item in feeds.feed("ann", 10)["items"]]